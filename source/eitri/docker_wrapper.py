@@ -35,6 +35,8 @@ import psycopg2
 # postgres/postgis image
 POSTGIS_IMAGE = 'github.com/CanalTP/docker-postgis.git'
 POSTGIS_CONTAINER_NAME = 'postgis:2.1'
+# name of the container kept between the runs of eitri
+REUSABLE_CONTAINER_NAME = 'eitri_postgis'
 
 
 class DbParams(object):
@@ -50,6 +52,9 @@ class DbParams(object):
                                                             dbname=self.dbname,
                                                             pwd=self.password)
 
+    def with_dbname(self, dbname):
+        return DbParams(self.host, dbname, self.user, self.password)
+
     def old_school_cnx_string(self):
         """
         old C++ component does not support the classic postgres://...
@@ -66,16 +71,25 @@ class DbParams(object):
 class PostgresDocker(object):
     """
     launch a temporary docker with a postgresql db
+
+    if reuse is True, the container is kept (stopped) at the end and reused by the next runs,
+    so the databases created in it (like the ED template database) are kept
     """
-    def __init__(self):
+    def __init__(self, reuse=False):
         log = logging.getLogger(__name__)
+        self.reuse = reuse
         self.docker = docker.Client(base_url='unix://var/run/docker.sock')
 
-        log.info("building the temporary docker image")
-        for build_output in self.docker.build(POSTGIS_IMAGE, tag=POSTGIS_CONTAINER_NAME, rm=True):
-            log.debug(build_output)
+        self.container_id = self._find_reusable_container() if reuse else None
+        if self.container_id:
+            log.info("reusing the docker {}".format(REUSABLE_CONTAINER_NAME))
+        else:
+            log.info("building the temporary docker image")
+            for build_output in self.docker.build(POSTGIS_IMAGE, tag=POSTGIS_CONTAINER_NAME, rm=True):
+                log.debug(build_output)
 
-        self.container_id = self.docker.create_container(POSTGIS_CONTAINER_NAME).get('Id')
+            name = REUSABLE_CONTAINER_NAME if reuse else None
+            self.container_id = self.docker.create_container(POSTGIS_CONTAINER_NAME, name=name).get('Id')
 
         log.info("docker id is {}".format(self.container_id))
 
@@ -93,10 +107,19 @@ class PostgresDocker(object):
     def __enter__(self):
         return self
 
+    def _find_reusable_container(self):
+        for cont in self.docker.containers(all=True):
+            if '/' + REUSABLE_CONTAINER_NAME in (cont.get('Names') or []):
+                return cont['Id']
+        return None
+
     def __exit__(self, *args, **kwargs):
         logging.getLogger(__name__).info("stoping the temporary docker")
         self.docker.stop(container=self.container_id)
 
+        if self.reuse:
+            return
+
         logging.getLogger(__name__).info("removing the temporary docker")
         self.docker.remove_container(container=self.container_id, v=True)
 
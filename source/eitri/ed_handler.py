@@ -29,6 +29,10 @@
 from contextlib import contextmanager
 import glob
 import os
+import re
+import threading
+import time
+import Queue
 from navitiacommon import utils, launch_exec
 from navitiacommon.launch_exec import launch_exec
 import psycopg2
@@ -38,6 +42,18 @@ import logging
 
 ALEMBIC_PATH = os.environ.get('ALEMBIC_PATH', '../sql')
 
+# name of the database used to build the data.nav
+WORK_DB_NAME = 'eitri'
+
+# the imports of a data type that have to wait for the imports of other data types (whatever their order),
+# the imports of data of the same family are also run one after the other, in their order (they clean the same tables)
+IMPORT_DEPENDENCIES = {
+    # fusio2ed can also load the fares, fare2ed truncates them
+    'fare': {'fusio', 'gtfs'},
+    # osm2ed can also load the pois, poi2ed truncates them
+    'poi': {'osm', 'geopal'},
+}
+
 
 @contextmanager
 def cd(new_dir):
@@ -52,6 +68,31 @@ def cd(new_dir):
         os.chdir(prev_dir)
 
 
+class PhaseTimer(object):
+    """
+    record the duration of the phases of the generation of the data.nav
+    """
+    def __init__(self):
+        self.phases = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name):
+        start = time.time()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.phases.append((name, time.time() - start))
+
+    def report(self):
+        width = max([len(name) for name, _ in self.phases] + [5])
+        lines = ['timing report:']
+        lines += ['  {name:<{width}}  {duration:8.1f}s'.format(name=name, width=width, duration=duration)
+                  for name, duration in self.phases]
+        return '\n'.join(lines)
+
+
 def binarize(db_params, output, ed_component_path):
     logging.getLogger(__name__).info('creating data.nav')
     ed2nav = 'ed2nav'
@@ -62,21 +103,50 @@ def binarize(db_params, output, ed_component_path):
                  "--connection-string", db_params.old_school_cnx_string()], logging.getLogger(__name__))
 
 
-def import_data(data_dir, db_params, ed_component_path):
+class DataImport(object):
     """
-    call the right component to import the data in the directory
+    import of a data directory in the ED database
+    """
+    def __init__(self, data_dir, data_type, file_to_load):
+        self.data_dir = data_dir
+        self.data_type = data_type
+        self.file_to_load = file_to_load
+        self.dependencies = []
+
+    def __str__(self):
+        return '{} ({})'.format(self.data_dir, self.data_type)
+
+    def depends_on(self, other, is_before):
+        if other.data_type in IMPORT_DEPENDENCIES.get(self.data_type, ()):
+            return True
+        return is_before and utils.family_of_data(other.data_type) == utils.family_of_data(self.data_type)
+
+
+def get_data_import(data_dir):
+    """
+    find the kind of data in the directory
 
     we loop through all files until we recognize one on them
     """
-    log = logging.getLogger(__name__)
     files = glob.glob(data_dir + "/*")
     data_type, file_to_load = utils.type_of_data(files)
     if not data_type:
-        log.info('unknown data type for dir {}, skipping'.format(data_dir))
-        return
+        logging.getLogger(__name__).info('unknown data type for dir {}, skipping'.format(data_dir))
+        return None
+    return DataImport(data_dir, data_type, file_to_load)
+
+
+def import_data(data_import, db_params, ed_component_path):
+    """
+    call the right component to import the data in the directory
+
+    return True if the import succeeded
+    """
+    log = logging.getLogger(__name__)
+    file_to_load = data_import.file_to_load
 
     # Note, we consider that we only have to load one kind of data per directory
-    import_component = data_type + '2ed'
+    import_component = data_import.data_type + '2ed'
     if ed_component_path:
         import_component = os.path.join(ed_component_path, import_component)
 
@@ -84,41 +154,114 @@ def import_data(data_dir, db_params, ed_component_path):
         #TODO: handle geopal as non zip
         # if it's a zip, we unzip it
         zip_file = zipfile.ZipFile(file_to_load)
-        zip_file.extractall(path=data_dir)
-        file_to_load = data_dir
+        zip_file.extractall(path=data_import.data_dir)
+        file_to_load = data_import.data_dir
 
     if launch_exec(import_component,
                 ["-i", file_to_load,
                  "--connection-string", db_params.old_school_cnx_string()],
                 log):
-        log.error('problem with running {}, stoping'.format(import_component))
-        exit(1)
+        log.error('problem with running {}'.format(import_component))
+        return False
+    return True
 
 
-def load_data(data_dirs, db_params, ed_component_path):
-    logging.getLogger(__name__).info('loading {}'.format(data_dirs))
+def load_data(data_dirs, db_params, ed_component_path, nb_jobs=1, timer=None):
+    """
+    import the data dirs, at most nb_jobs imports are run at the same time
 
-    for d in data_dirs:
-        import_data(d, db_params, ed_component_path)
+    an import is started only when all the imports it depends on are done (see IMPORT_DEPENDENCIES)
+    """
+    log = logging.getLogger(__name__)
+    log.info('loading {}'.format(data_dirs))
+    timer = timer or PhaseTimer()
 
+    imports = [i for i in (get_data_import(d) for d in data_dirs) if i]
+    for idx, data_import in enumerate(imports):
+        data_import.dependencies = [other for other_idx, other in enumerate(imports)
+                                    if other_idx != idx and data_import.depends_on(other, other_idx < idx)]
 
-def update_db(db_params):
+    def run(data_import):
+        try:
+            with timer.phase('import {}'.format(data_import)):
+                ok = import_data(data_import, db_params, ed_component_path)
+        except Exception:
+            log.exception('problem with the import of {}'.format(data_import))
+            ok = False
+        finished.put((data_import, ok))
+
+    finished = Queue.Queue()
+    pending = list(imports)
+    done = set()
+    nb_running = 0
+    while pending or nb_running:
+        for data_import in list(pending):
+            if nb_running >= max(nb_jobs, 1):
+                break
+            if all(dep in done for dep in data_import.dependencies):
+                pending.remove(data_import)
+                log.info('starting the import of {}'.format(data_import))
+                thread = threading.Thread(target=run, args=(data_import,))
+                thread.daemon = True
+                thread.start()
+                nb_running += 1
+
+        data_import, ok = finished.get()
+        nb_running -= 1
+        if not ok:
+            log.error('problem with the import of {}, stoping'.format(data_import))
+            exit(1)
+        done.add(data_import)
+
+
+def get_alembic_head(alembic_path=ALEMBIC_PATH):
     """
-    enable postgis on the db and update it's scheme
+    find the head revision of the ED schema from the alembic scripts, without any database
     """
-    cnx_string = db_params.cnx_string()
+    revision_re = re.compile(r'^revision\s*=\s*[\'"](\w+)[\'"]', re.M)
+    down_revision_re = re.compile(r'^down_revision\s*=\s*[\'"](\w+)[\'"]', re.M)
+    revisions = set()
+    down_revisions = set()
+    for script in glob.glob(os.path.join(alembic_path, 'alembic', 'versions', '*.py')):
+        with open(script) as f:
+            content = f.read()
+        revisions.update(revision_re.findall(content))
+        down_revisions.update(down_revision_re.findall(content))
+    heads = sorted(revisions - down_revisions)
+    if not heads:
+        raise Exception('impossible to find the alembic head in {}'.format(alembic_path))
+    return '_'.join(heads)
 
-    #we need to enable postgis on the db
+
+def _connect(db_params, dbname):
     cnx = psycopg2.connect(
-        database=db_params.dbname,
+        database=dbname,
         user=db_params.user,
         password=db_params.password,
         host=db_params.host
     )
+    # the databases cannot be created in a transaction
+    cnx.autocommit = True
+    return cnx
+
+
+def _database_exists(cursor, dbname):
+    cursor.execute("SELECT 1 FROM pg_database WHERE datname = %s;", (dbname,))
+    return cursor.fetchone() is not None
+
+
+def update_db(db_params):
+    """
+    enable postgis on the db and update it's scheme
+    """
+    cnx_string = db_params.cnx_string()
+
+    #we need to enable postgis on the db
+    cnx = _connect(db_params, db_params.dbname)
     c = cnx.cursor()
     c.execute("create extension postgis;")
     c.close()
-    cnx.commit()
+    cnx.close()
 
     logging.getLogger(__name__).info('message = {}'.format(c.statusmessage))
 
@@ -130,10 +273,42 @@ def update_db(db_params):
             raise Exception('problem with db update')
 
 
-def generate_nav(data_dir, db_params, output_file, ed_component_path):
+def create_db(db_params):
+    """
+    create the database used to build the data.nav and return its cnx params
+
+    the database is cloned from a template database with the ED schema already migrated,
+    there is one template by alembic head, it is created (and migrated) only if it does not exist yet
+    """
+    log = logging.getLogger(__name__)
+    template_name = 'eitri_template_{}'.format(get_alembic_head())
+    cnx = _connect(db_params, db_params.dbname)
+    c = cnx.cursor()
+    try:
+        if not _database_exists(c, template_name):
+            log.info('creating the template database {}'.format(template_name))
+            # the template is migrated under another name, so a failed migration does not leave a bad template
+            tmp_name = template_name + '_tmp'
+            c.execute('DROP DATABASE IF EXISTS "{}";'.format(tmp_name))
+            c.execute('CREATE DATABASE "{}";'.format(tmp_name))
+            update_db(db_params.with_dbname(tmp_name))
+            c.execute('ALTER DATABASE "{}" RENAME TO "{}";'.format(tmp_name, template_name))
+        else:
+            log.info('using the template database {}'.format(template_name))
+
+        c.execute('DROP DATABASE IF EXISTS "{}";'.format(WORK_DB_NAME))
+        c.execute('CREATE DATABASE "{}" TEMPLATE "{}";'.format(WORK_DB_NAME, template_name))
+    finally:
+        c.close()
+        cnx.close()
+    return db_params.with_dbname(WORK_DB_NAME)
+
+
+def generate_nav(data_dir, db_params, output_file, ed_component_path, nb_jobs=1, timer=None):
     """
     load all data either directly in data_dir if there is no sub dir, or all data in the subdir
     """
+    timer = timer or PhaseTimer()
     if not os.path.exists(data_dir):
         logging.getLogger(__name__).error('impossible to find {}, exiting'.format(data_dir))
 
@@ -145,8 +320,11 @@ def generate_nav(data_dir, db_params, output_file, ed_component_path):
         # if there is no sub dir, we import only the files in the dir
         data_dirs = [data_dir]
 
-    update_db(db_params)
+    with timer.phase('database creation'):
+        db_params = create_db(db_params)
 
-    load_data(data_dirs, db_params, ed_component_path)
+    with timer.phase('data import'):
+        load_data(data_dirs, db_params, ed_component_path, nb_jobs=nb_jobs, timer=timer)
 
-    binarize(db_params, output_file, ed_component_path)
+    with timer.phase('binarisation'):
+        binarize(db_params, output_file, ed_component_path)
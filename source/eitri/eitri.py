@@ -41,12 +41,15 @@ logging.basicConfig(level=logging.DEBUG)
 
 
 @clingon.clize()
-def eitri(data_dir, output_file='./data.nav.lz4', ed_component_path='', add_pythonpath=[]):
+def eitri(data_dir, output_file='./data.nav.lz4', ed_component_path='', add_pythonpath=[], nb_jobs=1,
+          reuse_db=False):
     """
     Generate a data.nav.lz4 file
 
     :param data_dir: directory with data. if several dataset (osm/gtfs/...) are available, they need to be in separate directory
     :param output_file: output data.nav.lz4 file path
+    :param nb_jobs: max number of imports (osm2ed, fusio2ed, ...) run at the same time
+    :param reuse_db: keep the postgres docker between the runs, to reuse the migrated template database
     """
 
     # there is some problems with environment variables and cmake, so all args
@@ -54,8 +57,15 @@ def eitri(data_dir, output_file='./data.nav.lz4', ed_component_path='', add_pyth
     for p in add_pythonpath:
         sys.path.append(p)
 
-    from ed_handler import generate_nav
+    from ed_handler import generate_nav, PhaseTimer
     from docker_wrapper import PostgresDocker
 
-    with PostgresDocker() as docker:
-        generate_nav(data_dir, docker.get_db_params(), output_file, ed_component_path=ed_component_path)
+    timer = PhaseTimer()
+    try:
+        with timer.phase('postgres docker'):
+            docker = PostgresDocker(reuse=reuse_db)
+        with docker:
+            generate_nav(data_dir, docker.get_db_params(), output_file, ed_component_path=ed_component_path,
+                         nb_jobs=nb_jobs, timer=timer)
+    finally:
+        logging.getLogger(__name__).info(timer.report())
@@ -0,0 +1,121 @@
+# coding=utf-8
+
+#  Copyright (c) 2001-2018, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+"""
+Measure the completion of the pt journeys of the distributed scenario with their fallbacks,
+compared with the previous completion (a deep copy of the pt response, and an aligned copy
+of each fallback path before extending the journey with it):
+
+    PYTHONPATH=..:../../navitiacommon python benchmark_completion.py --nb-journeys 50 --nb-points 300
+
+The pt journeys and the walking fallbacks are the ones of the tests of the helper classes,
+with --nb-points points in the shape of each section. It checks that both completions give
+the same response.
+"""
+from __future__ import absolute_import, print_function, unicode_literals, division
+import argparse
+import copy
+import functools
+import time
+import navitiacommon.response_pb2 as response_pb2
+import navitiacommon.type_pb2 as type_pb2
+from jormungandr.scenarios.helper_classes.helper_utils import _extend_journey
+from jormungandr.scenarios.helper_classes.tests.helper_classes_test import create_journeys_with_pt, \
+    create_walking_fallback, extend_journey_with_aligned_copy
+from jormungandr.street_network.tests.streetnetwork_test_utils import make_pt_object
+from jormungandr.utils import PeriodExtremity, SectionSorter
+
+SECTION_SORT_KEY = functools.cmp_to_key(SectionSorter())
+
+
+def add_shape(section, nb_points):
+    del section.shape[:]
+    for i in range(nb_points):
+        coord = section.shape.add()
+        coord.lon = 2 + i / 1e4
+        coord.lat = 48 + i / 1e4
+
+
+def make_pt_response(nb_journeys, nb_points):
+    response = response_pb2.Response()
+    for _ in range(nb_journeys):
+        journey = response.journeys.add()
+        journey.CopyFrom(create_journeys_with_pt())
+        for section in journey.sections:
+            if section.type == response_pb2.PUBLIC_TRANSPORT:
+                add_shape(section, nb_points)
+    return response
+
+
+def make_fallback(nb_points):
+    fallback = create_walking_fallback(make_pt_object(type_pb2.ADDRESS, 1.0, 1.0, "address"),
+                                       make_pt_object(type_pb2.STOP_POINT, 2.0, 2.0, "stop_point"))
+    for section in fallback.journeys[0].sections:
+        add_shape(section, nb_points)
+    return fallback
+
+
+def complete(pt_response, fallback_from, fallback_to, extend, copy_response):
+    if copy_response:
+        pt_response = copy.deepcopy(pt_response)
+    for journey in pt_response.journeys:
+        extend(journey, fallback_from, PeriodExtremity(journey.departure_date_time, False))
+        journey.sections.sort(key=SECTION_SORT_KEY)
+        extend(journey, fallback_to, PeriodExtremity(journey.arrival_date_time, True))
+        journey.sections.sort(key=SECTION_SORT_KEY)
+    return pt_response
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--nb-journeys', type=int, default=50)
+    parser.add_argument('--nb-points', type=int, default=300, help='number of points in the shape of a section')
+    parser.add_argument('--nb-runs', type=int, default=30, help='the median run is kept')
+    args = parser.parse_args()
+
+    fallback_from, fallback_to = make_fallback(args.nb_points), make_fallback(args.nb_points)
+    results = {}
+    for name, extend, copy_response in (('copies (before)', extend_journey_with_aligned_copy, True),
+                                        ('no copy', _extend_journey, False)):
+        durations = []
+        for _ in range(args.nb_runs):
+            pt_response = make_pt_response(args.nb_journeys, args.nb_points)
+            start = time.time()
+            results[name] = complete(pt_response, fallback_from, fallback_to, extend, copy_response)
+            durations.append(time.time() - start)
+        durations.sort()
+        print('{:16} {:8.2f} ms'.format(name, durations[len(durations) // 2] * 1000))
+
+    assert results['copies (before)'] == results['no copy'], 'the completions give different responses'
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+# coding=utf-8
+
+#  Copyright (c) 2001-2018, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+"""
+Measure the culling of the journeys (the choice of max_nb_journeys journeys covering as many sections as
+possible) on the recorded journey pools of payloads/culling_journey_pools.json, compared with the previous
+culling (all the combinations in a matrix):
+
+    PYTHONPATH=..:../../navitiacommon python benchmark_culling.py --max-nodes 20000
+
+Each pool has the sections (line, street network mode, type) and the pseudo duration of its journeys,
+the journeys to keep and the number of journeys to find. The previous culling is skipped when the pool
+has more than --max-combinations combinations. Both cullings must choose the same journeys.
+"""
+from __future__ import absolute_import, print_function, unicode_literals, division
+import argparse
+import io
+import json
+import os
+import time
+import numpy as np
+from jormungandr.scenarios.new_default import _get_best_selection
+from jormungandr.scenarios.utils import gen_all_combin, nCr
+
+PAYLOADS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'payloads')
+
+
+def load_pools():
+    with io.open(os.path.join(PAYLOADS_DIR, 'culling_journey_pools.json'), encoding='utf-8') as f:
+        pools = json.load(f)
+    for pool in pools:
+        sections_set = {tuple(s) for j in pool['journeys'] for s in j['sections']}
+        pool['sections_index'] = {s: i for i, s in enumerate(sorted(sections_set, key=repr))}
+    return pools
+
+
+def sections_masks(pool):
+    masks = []
+    for journey in pool['journeys']:
+        mask = 0
+        for section in journey['sections']:
+            mask |= 1 << pool['sections_index'][tuple(section)]
+        masks.append(mask)
+    return masks
+
+
+def sections_matrix(pool):
+    matrix = np.zeros((len(pool['journeys']), len(pool['sections_index'])), dtype=int)
+    for i, journey in enumerate(pool['journeys']):
+        matrix[i, [pool['sections_index'][tuple(s)] for s in journey['sections']]] = 1
+    return matrix
+
+
+def previous_selection(selected_sections_matrix, durations, nb_journeys_to_find, idx_of_jrny_must_keep):
+    """
+    the previous culling: all the combinations containing the must-keep journeys are scored in a matrix,
+    the best integrity then the smallest nb of sections are kept, the ties are broken by the sum of durations
+    """
+    nb_candidates = selected_sections_matrix.shape[0]
+    shape = (nCr(nb_candidates, nb_journeys_to_find), nb_journeys_to_find)
+    selected_journeys_matrix = np.empty(shape, dtype=np.uint16)
+    for i, combination in enumerate(gen_all_combin(nb_candidates, nb_journeys_to_find)):
+        selected_journeys_matrix[i] = combination
+
+    def _contains(idx_selected_jrny):
+        return set(idx_selected_jrny).issuperset(idx_of_jrny_must_keep)
+
+    selected_journeys_matrix = selected_journeys_matrix[np.apply_along_axis(_contains, 1, selected_journeys_matrix)]
+    selection_matrix = np.zeros((selected_journeys_matrix.shape[0], nb_candidates))
+    selection_matrix[np.arange(selected_journeys_matrix.shape[0])[:, None], selected_journeys_matrix] = 1
+
+    res_pool = np.dot(selection_matrix, selected_sections_matrix)
+    nb_sections = np.sum(res_pool, axis=1)
+    integrity = res_pool.shape[1] - np.array([np.count_nonzero(r) for r in res_pool])
+    the_best_idx = np.lexsort((nb_sections, integrity))[0]
+    best_indexes = np.where(np.logical_and(nb_sections == nb_sections[the_best_idx],
+                                           integrity == integrity[the_best_idx]))[0]
+    durations = np.array(durations)
+    the_best_index = min(best_indexes, key=lambda v: np.sum(durations[np.where(selection_matrix[v, :])]))
+    return [int(i) for i in np.where(selection_matrix[the_best_index, :])[0]]
+
+
+def measure(func, nb_runs):
+    durations = []
+    for _ in range(nb_runs):
+        start = time.time()
+        result = func()
+        durations.append(time.time() - start)
+    return min(durations), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--max-nodes', type=int, default=20000, help='the CULLING_JOURNEYS_MAX_NODES setting')
+    parser.add_argument('--max-combinations', type=int, default=1000000)
+    parser.add_argument('--nb-runs', type=int, default=3, help='the best run is kept')
+    args = parser.parse_args()
+
+    for pool in load_pools():
+        durations = [j['pseudo_duration'] for j in pool['journeys']]
+        k, must_keep = pool['nb_journeys_to_find'], pool['must_keep']
+        masks = sections_masks(pool)
+
+        new_duration, (selection, is_complete) = measure(
+            lambda: _get_best_selection(masks, durations, k, must_keep, args.max_nodes), args.nb_runs)
+        new_result = '{:8.4f}s{}'.format(new_duration, '' if is_complete else ' (budget reached)')
+
+        nb_combinations = nCr(len(masks), k)
+        if nb_combinations > args.max_combinations:
+            print('{:12} before: {:.1E} combinations, not computed   new: {}'.format(pool['name'], nb_combinations,
+                                                                                 new_result))
+            continue
+        matrix = sections_matrix(pool)
+        old_duration, old_selection = measure(lambda: previous_selection(matrix, durations, k, must_keep),
+                                              args.nb_runs)
+        print('{:12} before: {:8.4f}s   new: {}   {}'.format(pool['name'], old_duration, new_result,
+                                                            'same selection' if old_selection == selection
+                                                            else 'different selection'))
+        if is_complete:
+            assert old_selection == selection, 'the cullings choose different journeys'
+
+
+if __name__ == '__main__':
+    main()
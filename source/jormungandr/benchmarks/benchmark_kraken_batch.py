@@ -0,0 +1,151 @@
+# coding=utf-8
+
+#  Copyright (c) 2001-2018, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+"""
+Measure the end-to-end latency of the requests of a journey call sent to kraken in one batch,
+compared with the same requests sent in parallel on the multiplexed socket:
+
+    PYTHONPATH=.. python benchmark_kraken_batch.py --nb-workers 4 --nb-requests 4 --nb-concurrent-calls 2
+
+The fake kraken is a load balancer in front of --nb-workers workers. As kraken's workers, a worker
+computes the sub-requests of a batch one after the other. A pt journey takes --pt-duration ms to
+compute and a direct path --direct-path-duration ms. --nb-concurrent-calls journey calls are made
+at the same time, each with --nb-requests pt journeys and as many direct paths.
+"""
+from __future__ import absolute_import, print_function, unicode_literals, division
+import argparse
+import time
+import gevent
+import gevent.queue
+from zmq import green as zmq
+from jormungandr.multiplexed_socket import MultiplexedSocket, RequestBatch, BATCH_MARKER
+from jormungandr.tests.multiplexed_socket_tests import unpack_batch, pack_batch_response, make_part
+
+SOCKET_PATH = 'inproc://benchmark_kraken'
+
+
+class FakeKraken(object):
+    """
+    the load balancer gives each message to a free worker, a worker computes the requests of a batch
+    sequentially
+    """
+    def __init__(self, context, nb_workers, durations):
+        self.socket = context.socket(zmq.ROUTER)
+        self.socket.bind(SOCKET_PATH)
+        self.durations = durations
+        self.messages = gevent.queue.Queue()
+        self.greenlets = [gevent.spawn(self._load_balancer)]
+        self.greenlets += [gevent.spawn(self._worker) for _ in range(nb_workers)]
+
+    def _load_balancer(self):
+        while True:
+            self.messages.put(self.socket.recv_multipart())
+
+    def _compute(self, request):
+        gevent.sleep(self.durations[request[:2]])
+        return b'response to ' + request
+
+    def _worker(self):
+        while True:
+            address, empty, request = self.messages.get()
+            if request.startswith(BATCH_MARKER):
+                response = pack_batch_response([self._compute(r) for r in unpack_batch(request)])
+            else:
+                response = self._compute(request)
+            self.socket.send_multipart([address, empty, response])
+
+    def close(self):
+        gevent.killall(self.greenlets)
+        self.socket.close()
+
+
+def make_request(kind, idx):
+    return kind + str(idx).encode()
+
+
+def call_in_parallel(socket, kind, nb_requests):
+    calls = [gevent.spawn(socket.send_and_receive, make_request(kind, i), 60000) for i in range(nb_requests)]
+    gevent.joinall(calls, raise_error=True)
+    return [c.value for c in calls]
+
+
+def call_in_batch(socket, kind, nb_requests):
+    batch = RequestBatch()
+    for i in range(nb_requests):
+        batch.add_request([batch.add_part(i, make_part(make_request(kind, i), []))])
+    return socket.send_and_receive_batch(batch, 60000)
+
+
+def journey_call(socket, kind, nb_requests, send):
+    start = time.time()
+    responses = send(socket, kind, nb_requests)
+    assert responses == [b'response to ' + make_request(kind, i) for i in range(nb_requests)]
+    return time.time() - start
+
+
+def measure(socket, kind, nb_requests, send, nb_concurrent_calls, nb_runs):
+    latencies = []
+    for _ in range(nb_runs):
+        calls = [gevent.spawn(journey_call, socket, kind, nb_requests, send) for _ in range(nb_concurrent_calls)]
+        gevent.joinall(calls, raise_error=True)
+        latencies.extend(c.value for c in calls)
+    latencies.sort()
+    return latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.95)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--nb-workers', type=int, default=4, help='number of workers of the fake kraken')
+    parser.add_argument('--nb-requests', type=int, default=4, help='number of fallback modes of a journey call')
+    parser.add_argument('--nb-concurrent-calls', type=int, default=2)
+    parser.add_argument('--pt-duration', type=float, default=50, help='in ms')
+    parser.add_argument('--direct-path-duration', type=float, default=2, help='in ms')
+    parser.add_argument('--nb-runs', type=int, default=20)
+    args = parser.parse_args()
+
+    context = zmq.Context()
+    kraken = FakeKraken(context, args.nb_workers, {b'pt': args.pt_duration / 1000,
+                                                   b'dp': args.direct_path_duration / 1000})
+    socket = MultiplexedSocket(context, SOCKET_PATH, 'benchmark')
+    try:
+        for kind, name in ((b'pt', 'pt journeys'), (b'dp', 'direct paths')):
+            for send, send_name in ((call_in_parallel, 'parallel'), (call_in_batch, 'batch')):
+                median, p95 = measure(socket, kind, args.nb_requests, send, args.nb_concurrent_calls, args.nb_runs)
+                print('{:13} {:9} median {:8.2f} ms  p95 {:8.2f} ms'.format(name, send_name, median * 1000,
+                                                                           p95 * 1000))
+    finally:
+        socket.close()
+        kraken.close()
+        context.term()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+# coding=utf-8
+
+#  Copyright (c) 2001-2018, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+"""
+Compare the rate limiter of navitiacommon.ratelimit with the previous implementation
+(a redis lock around two pipelines) on a running redis:
+
+    PYTHONPATH=../../navitiacommon python benchmark_ratelimit.py --redis-host localhost --nb-acquire 2000
+
+For each implementation it prints the mean duration of a non blocking acquire
+and the number of round trips to redis it needs.
+"""
+from __future__ import absolute_import, print_function, division
+import argparse
+import logging
+import time
+import uuid
+import redis
+from redis.connection import Connection
+from navitiacommon.ratelimit import RateLimiter
+
+
+class LockRateLimiter(RateLimiter):
+    """
+    the previous implementation of _make_ping: the limits are checked and the request is recorded
+    in two pipelines, under a redis lock so that they are atomic
+    """
+
+    def _make_ping(self, key):
+        if not self.conditions:
+            return True, 0.0
+
+        min_requests, min_request_seconds = self.conditions[0]
+        if min_requests == 0:
+            return False, min_request_seconds
+
+        log_key = ':'.join((self.namespace, key, 'log'))
+        block_key = ':'.join((self.namespace, key, 'block'))
+        lock_key = ':'.join((self.namespace, key, 'lock'))
+
+        with self.redis.lock(lock_key, timeout=10):
+            with self.redis.pipeline() as pipe:
+                for requests, _ in self.conditions:
+                    pipe.lindex(log_key, requests - 1)
+                pipe.ttl(block_key)
+                pipe.get(block_key)
+                boundry_timestamps = pipe.execute()
+
+            blocked = boundry_timestamps.pop()
+            block_ttl = boundry_timestamps.pop()
+            if blocked is not None:
+                return False, block_ttl if block_ttl is not None else 0.5
+
+            timestamp = time.time()
+            for boundry_timestamp, (requests, seconds) in zip(boundry_timestamps, self.conditions):
+                if boundry_timestamp is not None:
+                    boundry_timestamp = float(boundry_timestamp)
+                    if boundry_timestamp + seconds > timestamp:
+                        return False, boundry_timestamp + seconds - timestamp
+
+            with self.redis.pipeline() as pipe:
+                pipe.lpush(log_key, timestamp)
+                max_requests, _ = self.conditions[-1]
+                pipe.ltrim(log_key, 0, max_requests - 1)
+                pipe.expire(log_key, self.list_ttl)
+                pipe.execute()
+
+        return True, 0.0
+
+
+class RoundTripCounter(object):
+    """
+    count the commands (or pipelines) sent to redis
+    """
+
+    def __init__(self):
+        self.count = 0
+        self._send_packed_command = Connection.send_packed_command
+
+    def __enter__(self):
+        counter = self
+
+        def send_packed_command(connection, command):
+            counter.count += 1
+            return counter._send_packed_command(connection, command)
+
+        Connection.send_packed_command = send_packed_command
+        return self
+
+    def __exit__(self, *args):
+        Connection.send_packed_command = self._send_packed_command
+
+
+def bench(limiter_class, args):
+    namespace = 'benchmark_ratelimit.{}'.format(uuid.uuid4().hex)
+    # the limits are never reached, every acquire goes through the whole check
+    limiter = limiter_class(conditions=[(args.nb_acquire * 10, 60), (args.nb_acquire * 20, 3600)],
+                            redis_host=args.redis_host, redis_port=args.redis_port,
+                            redis_namespace=namespace)
+    limiter.acquire('warmup', block=False)
+
+    with RoundTripCounter() as counter:
+        start = time.time()
+        for _ in range(args.nb_acquire):
+            assert limiter.acquire('bench', block=False)
+        duration = time.time() - start
+
+    for key in limiter.redis.keys('{}:*'.format(namespace)):
+        limiter.redis.delete(key)
+
+    print('{}: {:.1f}us/acquire, {:.1f} round trips/acquire'.format(
+        limiter_class.__name__, duration / args.nb_acquire * 1e6, counter.count / args.nb_acquire))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--redis-host', default='localhost')
+    parser.add_argument('--redis-port', type=int, default=6379)
+    parser.add_argument('--nb-acquire', type=int, default=2000)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    try:
+        redis.Redis(host=args.redis_host, port=args.redis_port).ping()
+    except redis.ConnectionError:
+        parser.error('no redis on {}:{}'.format(args.redis_host, args.redis_port))
+
+    for limiter_class in (LockRateLimiter, RateLimiter):
+        bench(limiter_class, args)
+
+
+if __name__ == '__main__':
+    main()
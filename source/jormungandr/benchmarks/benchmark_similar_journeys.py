@@ -0,0 +1,127 @@
+# coding=utf-8
+
+#  Copyright (c) 2001-2018, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+"""
+Measure the filter of the similar journeys of fill_journeys (the new journeys compared with each other and
+with the qualified journeys), compared with the previous filter (the sections of both journeys walked for
+each pair):
+
+    PYTHONPATH=..:../../navitiacommon python benchmark_similar_journeys.py --nb-journeys 10 30 60 120
+
+There are n new and n qualified journeys, with 1 to 3 vehicle journeys among --nb-vjs between their walking
+fallbacks. It checks that the filters delete the same journeys for the same reasons.
+"""
+from __future__ import absolute_import, print_function, unicode_literals, division
+import argparse
+import copy
+import itertools
+import random
+import time
+import navitiacommon.response_pb2 as response_pb2
+from jormungandr.scenarios import journey_filter as jf
+from jormungandr.scenarios.utils import compare
+
+
+def add_journeys(response, prefix, nb_journeys, nb_vjs):
+    for i in range(nb_journeys):
+        journey = response.journeys.add()
+        journey.internal_id = '{}_{}'.format(prefix, i)
+        journey.arrival_date_time = random.randint(0, 5) * 60
+        journey.duration = random.randint(0, 5) * 60
+        vjs = random.sample(range(nb_vjs), random.randint(1, 3))
+        journey.nb_transfers = len(vjs) - 1
+        section = journey.sections.add()
+        section.type = response_pb2.STREET_NETWORK
+        section.street_network.mode = response_pb2.Walking
+        for vj in vjs:
+            section = journey.sections.add()
+            section.type = response_pb2.PUBLIC_TRANSPORT
+            section.pt_display_informations.uris.vehicle_journey = 'vj_{}'.format(vj)
+        section = journey.sections.add()
+        section.type = response_pb2.STREET_NETWORK
+        section.street_network.mode = response_pb2.Walking
+
+
+def filter_all_pairs(new_journeys, qualified_journeys, request):
+    """
+    the previous jf._filter_similar_journeys, the sections of both journeys are walked for each pair
+    """
+    is_debug = request.get('debug', False)
+    for j1, j2 in itertools.chain(itertools.combinations(new_journeys, 2),
+                                  itertools.product(new_journeys, qualified_journeys)):
+        if jf.to_be_deleted(j1) or jf.to_be_deleted(j2):
+            continue
+        if compare(j1, j2, jf.similar_journeys_vj_generator):
+            jf._remove_worst_similar(j1, j2, request, is_debug)
+
+
+def filter_cached_pairs(new_journeys, qualified_journeys, request):
+    jf.filter_similar_vj_journeys(itertools.chain(itertools.combinations(new_journeys, 2),
+                                                  itertools.product(new_journeys, qualified_journeys)), request)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--nb-journeys', type=int, nargs='+', default=[10, 30, 60, 120])
+    parser.add_argument('--nb-vjs', type=int, default=6)
+    parser.add_argument('--nb-runs', type=int, default=30, help='the median run is kept')
+    args = parser.parse_args()
+
+    random.seed(42)
+    request = {'debug': True}
+    for nb_journeys in args.nb_journeys:
+        new_resp, qualified_resp = response_pb2.Response(), response_pb2.Response()
+        add_journeys(new_resp, 'new', nb_journeys, args.nb_vjs)
+        add_journeys(qualified_resp, 'qualified', nb_journeys, args.nb_vjs)
+
+        line = 'n={:<5}'.format(nb_journeys)
+        tags = {}
+        for name, filter_journeys in (('all pairs (before)', filter_all_pairs),
+                                      ('cached pairs', filter_cached_pairs),
+                                      ('by signature', jf.filter_similar_vj_journeys_by_signature)):
+            durations = []
+            for _ in range(args.nb_runs):
+                new_journeys = copy.deepcopy(new_resp).journeys
+                qualified_journeys = copy.deepcopy(qualified_resp).journeys
+                start = time.time()
+                filter_journeys(new_journeys, qualified_journeys, request)
+                durations.append(time.time() - start)
+            durations.sort()
+            line += '  {} {:.4f}s'.format(name, durations[len(durations) // 2])
+            tags[name] = [list(j.tags) for j in itertools.chain(new_journeys, qualified_journeys)]
+        print(line)
+
+        assert tags['all pairs (before)'] == tags['cached pairs'] == tags['by signature'], \
+            'the filters delete different journeys'
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+# coding=utf-8
+
+#  Copyright (c) 2001-2018, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+"""
+Measure the parsing throughput of the SIRI StopMonitoring responses, compared with the previous parsing
+(a full ElementTree searched with namespaced descendant lookups for each visit):
+
+    PYTHONPATH=..:../../navitiacommon python benchmark_siri_parsing.py --nb-visits 2000
+
+The recorded response of payloads/siri_stop_monitoring.xml has its visit repeated --nb-visits times,
+on 10 lines and 2 routes, and the passages of 4 route points of the stop are asked.
+"""
+from __future__ import absolute_import, print_function, unicode_literals, division
+import argparse
+import io
+import os
+import re
+import time
+import xml.etree.ElementTree as et
+import aniso8601
+from jormungandr.realtime_schedule.realtime_proxy import RealtimeProxyError
+from jormungandr.realtime_schedule.siri import Siri
+from jormungandr.realtime_schedule.tests.utils import MockRoutePoint
+from jormungandr.schedule import RealTimePassage
+
+PAYLOADS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'payloads')
+VISIT_RE = re.compile(r'( *<ns5:MonitoredStopVisit>.*?</ns5:MonitoredStopVisit>\n)', re.S)
+
+
+def parse_with_tree(siri, xml, route_points):
+    """
+    the previous Siri._get_passages_for_route_points
+    """
+    ns = {'siri': 'http://www.siri.org.uk/siri'}
+    try:
+        root = et.fromstring(xml)
+    except et.ParseError:
+        raise RealtimeProxyError('invalid xml')
+
+    def get_text(visit, path):
+        elt = visit.find(path, ns)
+        return elt.text if elt is not None else None
+
+    visits_by_key = {}
+    for visit in root.findall('.//siri:MonitoredStopVisit', ns):
+        key = (get_text(visit, './/siri:StopPointRef'),
+               get_text(visit, './/siri:LineRef'),
+               get_text(visit, './/siri:DirectionName'))
+        visits_by_key.setdefault(key, []).append(visit)
+
+    next_passages = {}
+    for route_point in route_points:
+        key = (route_point.fetch_stop_id(siri.object_id_tag),
+               route_point.fetch_line_id(siri.object_id_tag),
+               route_point.fetch_route_id(siri.object_id_tag))
+        passages = []
+        for visit in visits_by_key.get(key, []):
+            cur_destination = visit.find('.//siri:DestinationName', ns).text
+            cur_dt = aniso8601.parse_datetime(visit.find('.//siri:ExpectedDepartureTime', ns).text)
+            passages.append(RealTimePassage(cur_dt, cur_destination))
+        next_passages[route_point] = passages
+    return next_passages
+
+
+def make_payload(nb_visits):
+    with io.open(os.path.join(PAYLOADS_DIR, 'siri_stop_monitoring.xml'), encoding='utf-8') as f:
+        response = f.read()
+    visit = VISIT_RE.search(response).group(1)
+    visits = ''.join(visit.replace('>line_toto<', '>line_{}<'.format(i % 10))
+                          .replace('>route_tata<', '>route_{}<'.format(i % 2)) for i in range(nb_visits))
+    return response.replace(visit, visits).encode('utf-8')
+
+
+def bench(parse, siri, xml, route_points, nb_runs):
+    best = None
+    for _ in range(nb_runs):
+        start = time.time()
+        passages = parse(siri, xml, route_points)
+        duration = time.time() - start
+        best = duration if best is None else min(best, duration)
+    return best, passages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--nb-visits', type=int, default=2000)
+    parser.add_argument('--nb-runs', type=int, default=5, help='the best run is kept')
+    args = parser.parse_args()
+
+    siri = Siri(id='benchmark', service_url='http://bob.com/', requestor_ref='Stibada')
+    route_points = [MockRoutePoint(route_id='route_{}'.format(r), line_id='line_{}'.format(l), stop_id='stop_tutu')
+                    for l in (1, 2) for r in (0, 1)]
+    xml = make_payload(args.nb_visits)
+    print('payload: {} visits, {} kB'.format(args.nb_visits, len(xml) // 1024))
+
+    reference = None
+    for name, parse in (('tree + findall (before)', parse_with_tree),
+                        ('iterparse', Siri._get_passages_for_route_points)):
+        duration, passages = bench(parse, siri, xml, route_points, args.nb_runs)
+        # both parsings must give the same passages
+        result = {rp: [(p.datetime, p.direction) for p in passages[rp]] for rp in route_points}
+        assert reference is None or result == reference, name
+        reference = result
+        print('{:25} {:8.1f} ms {:8.0f} visits/s'.format(name, duration * 1000, args.nb_visits / duration))
+
+
+if __name__ == '__main__':
+    main()
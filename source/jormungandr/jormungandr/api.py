@@ -33,29 +33,20 @@
 from __future__ import absolute_import, print_function, unicode_literals, division
 import importlib
 from flask_restful.representations import json
-from flask import request, make_response
-from jormungandr import rest_api, app
+from flask import request, make_response, Response
+from jormungandr import rest_api, app, http_client
 from jormungandr.index import index
 from jormungandr.modules_loader import ModulesLoader
 import ujson
 import logging
 from jormungandr.new_relic import record_custom_parameter
 from jormungandr.authentication import get_user, get_token, get_app_name, get_used_coverages
+from jormungandr.interfaces.v1.serializer.heat_map import HEAT_MATRIX_MIMETYPE, get_raw_heat_matrix, \
+    encode_heat_matrix
 import six
 
 if rest_api.app.config.get('PATCH_WITH_GEVENT_SOCKET', False):
-    logger = logging.getLogger('jormungandr.patch_gevent')
-    logger.info("Attention! You'are patching requests.packages.urllib3.connection.connection.socket with gevent.socket,"
-                "parallel http/https calling by requests is activated")
-    # This line replaces the gevent.monkey.patch_socket()
-    # Note that "monkey_patch" only patches on http request because we want asynchronisation on that,
-    # but we don't want that for reddis because it may cause performance regression
-    import requests
-    import gevent.socket
-    requests.packages.urllib3.connection.connection.socket = gevent.socket
-
-    from gevent import monkey
-    monkey.patch_ssl()
+    http_client.use_gevent_socket()
 
 @rest_api.representation("text/jsonp")
 @rest_api.representation("application/jsonp")
@@ -75,6 +66,19 @@ def output_json(data, code, headers=None):
     return resp
 
 
+@rest_api.representation(HEAT_MATRIX_MIMETYPE)
+def output_heat_matrix(data, code, headers=None):
+    """
+    stream the heat matrix in its binary representation, the errors are still given in json
+    """
+    heat_matrix = get_raw_heat_matrix(data)
+    if code != 200 or heat_matrix is None:
+        return output_json(data, code, headers)
+    resp = Response(encode_heat_matrix(heat_matrix), code, mimetype=HEAT_MATRIX_MIMETYPE)
+    resp.headers.extend(headers or {})
+    return resp
+
+
 @app.after_request
 def access_log(response, *args, **kwargs):
     logger = logging.getLogger('jormungandr.access')
@@ -39,7 +39,8 @@ from jormungandr.exceptions import RegionNotFound
 import datetime
 import base64
 from navitiacommon.models import User, Instance, Key
-from jormungandr import cache, app as current_app
+from jormungandr import app as current_app
+from jormungandr.local_cache import memoize
 
 
 def authentication_required(func):
@@ -104,7 +105,7 @@ def get_token():
         return auth
 
 
-@cache.memoize(current_app.config['CACHE_CONFIGURATION'].get('TIMEOUT_AUTHENTICATION', 300))
+@memoize('has_access', current_app.config['CACHE_CONFIGURATION'].get('TIMEOUT_AUTHENTICATION', 300))
 def has_access(region, api, abort, user):
     """
     Check the Authorization of the current user for this region and this API.
@@ -136,7 +137,7 @@ def has_access(region, api, abort, user):
             return False
 
 
-@cache.memoize(current_app.config['CACHE_CONFIGURATION'].get('TIMEOUT_AUTHENTICATION', 300))
+@memoize('user', current_app.config['CACHE_CONFIGURATION'].get('TIMEOUT_AUTHENTICATION', 300))
 def cache_get_user(token):
     """
     We allow this method to be cached even if it depends on the current time
@@ -145,12 +146,12 @@ def cache_get_user(token):
     return User.get_from_token(token, datetime.datetime.now())
 
 
-@cache.memoize(current_app.config['CACHE_CONFIGURATION'].get('TIMEOUT_AUTHENTICATION', 300))
+@memoize('key', current_app.config['CACHE_CONFIGURATION'].get('TIMEOUT_AUTHENTICATION', 300))
 def cache_get_key(token):
     return Key.get_by_token(token)
 
 
-@cache.memoize(current_app.config['CACHE_CONFIGURATION'].get('TIMEOUT_AUTHENTICATION', 300))
+@memoize('available_instances', current_app.config['CACHE_CONFIGURATION'].get('TIMEOUT_AUTHENTICATION', 300))
 def get_all_available_instances(user):
     """
     get the list of instances that a user can use (for the autocomplete apis)
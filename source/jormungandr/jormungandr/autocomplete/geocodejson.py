@@ -33,6 +33,7 @@ from __future__ import absolute_import, print_function, unicode_literals, divisi
 import logging
 
 import jormungandr
+from jormungandr import http_client
 from jormungandr.autocomplete.abstract_autocomplete import AbstractAutocomplete
 from jormungandr.utils import get_lon_lat as get_lon_lat_from_id, get_house_number
 import requests
@@ -382,7 +383,7 @@ class GeocodeJson(AbstractAutocomplete):
     @staticmethod
     def call_bragi(url, method, **kwargs):
         try:
-            return method(url, **kwargs)
+            return method(url, connector='bragi', **kwargs)
         except requests.Timeout:
             logging.getLogger(__name__).error('autocomplete request timeout')
             raise TechnicalError('external autocomplete service timeout')
@@ -509,10 +510,10 @@ class GeocodeJson(AbstractAutocomplete):
         url = self.make_url('autocomplete')
 
         kwargs = {"params": params, "timeout": self.timeout}
-        method = requests.get
+        method = http_client.get
         if shape:
             kwargs["json"] = {"shape": shape}
-            method = requests.post
+            method = http_client.post
 
         raw_response = self.call_bragi(url, method, **kwargs)
         depth = request.get('depth', 1)
@@ -542,7 +543,7 @@ class GeocodeJson(AbstractAutocomplete):
         else:
             url = self.make_url('features', uri)
 
-        raw_response = self.call_bragi(url, requests.get, timeout=self.timeout, params=params)
+        raw_response = self.call_bragi(url, http_client.get, timeout=self.timeout, params=params)
         return self.response_marshaler(raw_response, uri)
 
     def status(self):
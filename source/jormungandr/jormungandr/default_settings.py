@@ -91,6 +91,14 @@ STAT_CONNECTION_TIMEOUT = float(os.getenv('JORMUNGANDR_STAT_CONNECTION_TIMEOUT',
 STAT_CIRCUIT_BREAKER_MAX_FAIL = int(os.getenv('JORMUNGANDR_STAT_CIRCUIT_BREAKER_MAX_FAIL', 5))
 # the circuit breaker retries after this timeout (in seconds)
 STAT_CIRCUIT_BREAKER_TIMEOUT_S = int(os.getenv('JORMUNGANDR_STAT_CIRCUIT_BREAKER_TIMEOUT_S', 60))
+# publish the stats in a background thread instead of during the request
+STAT_ASYNC_PUBLISH = boolean(os.getenv('JORMUNGANDR_STAT_ASYNC_PUBLISH', False))
+# max number of stats waiting to be published, the oldest ones are dropped when it is full
+STAT_QUEUE_MAX_SIZE = int(os.getenv('JORMUNGANDR_STAT_QUEUE_MAX_SIZE', 10000))
+# number of stats published by the background thread in one pass
+STAT_BATCH_SIZE = int(os.getenv('JORMUNGANDR_STAT_BATCH_SIZE', 100))
+# time given to publish the remaining stats when the worker stops (in seconds)
+STAT_FLUSH_TIMEOUT = int(os.getenv('JORMUNGANDR_STAT_FLUSH_TIMEOUT', 5))
 
 #Cache configuration, see https://pythonhosted.org/Flask-Cache/ for more information
 default_cache = {
@@ -100,6 +108,10 @@ default_cache = {
     'TIMEOUT_PARAMS': 600,
     'TIMEOUT_TIMEO': 60,
     'TIMEOUT_SYNTHESE': 30,
+    # process-local LRU in front of the cache for the small objects read on almost every request,
+    # configured by function name (see jormungandr.local_cache.memoize)
+    # ex: {'default': {'max_size': 1000, 'ttl': 10}, 'has_access': {'max_size': 5000, 'ttl': 30}}
+    'LOCAL_CACHE': {},
 }
 
 CACHE_CONFIGURATION = json.loads(os.getenv('JORMUNGANDR_CACHE_CONFIGURATION', '{}')) or default_cache
@@ -127,6 +139,10 @@ CIRCUIT_BREAKER_TIMEO_TIMEOUT_S = 60  # the circuit breaker retries after this t
 CIRCUIT_BREAKER_MAX_SYNTHESE_FAIL = 4  # max instance call failures before stopping attempt
 CIRCUIT_BREAKER_SYNTHESE_TIMEOUT_S = 60  # the circuit breaker retries after this timeout (in seconds)
 
+# a connection of a multiplexed socket still waiting for the late response of a request after this delay
+# (in seconds) is closed
+MULTIPLEXED_SOCKET_ABANDONED_TIMEOUT_S = 60
+
 CIRCUIT_BREAKER_MAX_JCDECAUX_FAIL = 4  # max instance call failures before stopping attempt
 CIRCUIT_BREAKER_JCDECAUX_TIMEOUT_S = 60  # the circuit breaker retries after this timeout (in seconds)
 
@@ -163,6 +179,62 @@ PATCH_WITH_GEVENT_SOCKET = bool(os.getenv('JORMUNGANDR_PATCH_WITH_GEVENT_SOCKET'
 
 GREENLET_POOL_SIZE = int(os.getenv('JORMUNGANDR_GEVENT_POOL_SIZE', 10))
 
+# connection pools of the http client used by the external connectors (street networks, bragi, realtime proxies,
+# parkings...), each connector keeps its connections alive in a pool of HTTP_POOL_MAXSIZE connections by host
+# for HTTP_POOL_CONNECTIONS hosts
+HTTP_POOL_CONNECTIONS = int(os.getenv('JORMUNGANDR_HTTP_POOL_CONNECTIONS', 10))
+HTTP_POOL_MAXSIZE = int(os.getenv('JORMUNGANDR_HTTP_POOL_MAXSIZE', 10))
+# wait for a free connection when the pool of a host is full instead of opening a connection that won't be kept
+HTTP_POOL_BLOCK = boolean(os.getenv('JORMUNGANDR_HTTP_POOL_BLOCK', False))
+# timeout (in seconds) of the calls of the connectors that haven't their own
+HTTP_DEFAULT_TIMEOUT = os.getenv('JORMUNGANDR_HTTP_DEFAULT_TIMEOUT', None)
+HTTP_DEFAULT_TIMEOUT = float(HTTP_DEFAULT_TIMEOUT) if HTTP_DEFAULT_TIMEOUT else None
+# configuration by connector (valhalla, here, geovelo, bragi, siri, siri_lite, timeo, synthese, cleverage,
+# instant_system, car_park, jcdecaux, cykleo)
+# ex: {"valhalla": {"pool_maxsize": 50, "timeout": 5}, "bragi": {"pool_block": true}}
+HTTP_POOL_CONNECTORS = json.loads(os.getenv('JORMUNGANDR_HTTP_POOL_CONNECTORS', '{}'))
+
+# keep an in-memory snapshot of the feeds of the bss and car park providers, refreshed in the background
+# (the refresh period is the TIMEOUT_<PROVIDER> of the cache configuration)
+PARKING_SNAPSHOT_ENABLED = boolean(os.getenv('JORMUNGANDR_PARKING_SNAPSHOT_ENABLED', False))
+# a snapshot older than that (in seconds) is not used anymore, when the provider can't be reached
+PARKING_SNAPSHOT_MAX_STALENESS = int(os.getenv('JORMUNGANDR_PARKING_SNAPSHOT_MAX_STALENESS', 300))
+
+# schedule the futures of the distributed scenario by stage (place, proximities_by_crowfly, fallback_durations,
+# streetnetwork_path, pt_journey, completion...) instead of one pool of GREENLET_POOL_SIZE greenlets by request
+FUTURE_SCHEDULER_BY_STAGE = boolean(os.getenv('JORMUNGANDR_FUTURE_SCHEDULER_BY_STAGE', False))
+# max number of running futures of each stage for a request, GREENLET_POOL_SIZE for the stages not given
+# ex: {"pt_journey": 4, "fallback_durations": 8}
+FUTURE_STAGES_MAX_GREENLETS = json.loads(os.getenv('JORMUNGANDR_FUTURE_STAGES_MAX_GREENLETS', '{}'))
+# max number of running futures for all the requests of the worker
+FUTURE_WORKER_MAX_GREENLETS = int(os.getenv('JORMUNGANDR_FUTURE_WORKER_MAX_GREENLETS', 100))
+# default deadline (in milliseconds) of the futures of a request, the unfinished ones are cancelled after it
+# (only with FUTURE_SCHEDULER_BY_STAGE)
+FUTURE_DEADLINE = os.getenv('JORMUNGANDR_FUTURE_DEADLINE', None)
+FUTURE_DEADLINE = int(FUTURE_DEADLINE) if FUTURE_DEADLINE else None
+
+# overall deadline (in milliseconds) of the calls to the realtime proxies of a departure_boards request,
+# the stop_schedules whose realtime passages are not available in time keep their base schedule
+REALTIME_DEADLINE = os.getenv('JORMUNGANDR_REALTIME_DEADLINE', None)
+REALTIME_DEADLINE = int(REALTIME_DEADLINE) if REALTIME_DEADLINE else None
+
+# cache of the street network computations of the fallbacks (crow fly proximities, routing matrices, fallback paths)
+# the coordinates of the origin are rounded with FALLBACK_CACHE_COORD_PRECISION decimals
+FALLBACK_CACHE_ENABLED = boolean(os.getenv('JORMUNGANDR_FALLBACK_CACHE_ENABLED', False))
+FALLBACK_CACHE_MAX_SIZE = int(os.getenv('JORMUNGANDR_FALLBACK_CACHE_MAX_SIZE', 1000))
+FALLBACK_CACHE_TTL = int(os.getenv('JORMUNGANDR_FALLBACK_CACHE_TTL', 300))  # in seconds
+# also use the shared cache (CACHE_CONFIGURATION) as a second tier
+FALLBACK_CACHE_SHARED = boolean(os.getenv('JORMUNGANDR_FALLBACK_CACHE_SHARED', False))
+FALLBACK_CACHE_COORD_PRECISION = int(os.getenv('JORMUNGANDR_FALLBACK_CACHE_COORD_PRECISION', 5))
+# the fallback paths of these modes don't depend on the datetime: they are computed once and re-timed for each
+# pt journey (and kept in the fallback cache when it's enabled)
+FALLBACK_CACHE_TIME_INDEPENDENT_MODES = json.loads(os.getenv('JORMUNGANDR_FALLBACK_CACHE_TIME_INDEPENDENT_MODES',
+                                                             '["walking", "bike"]'))
+
+# when a journey can be computed on several overlapping regions, call them all at the same time
+# (the priority of the regions is kept, the ones with a lower priority are cancelled as soon as possible)
+PARALLEL_REGIONS_DISPATCH = boolean(os.getenv('JORMUNGANDR_PARALLEL_REGIONS_DISPATCH', False))
+
 USE_SERPY = boolean(os.getenv('JORMUNGANDR_USE_SERPY', False))
 
 PARSER_MAX_COUNT = int(os.getenv('JORMUNGANDR_PARSER_MAX_COUNT', 1000))
@@ -172,3 +244,7 @@ if boolean(os.getenv('JORMUNGANDR_DISABLE_SQLPOOLING', False)):
     SQLALCHEMY_POOLCLASS = NullPool
 
 MAX_JOURNEYS_CALLS = int(os.getenv('JORMUNGANDR_MAX_JOURNEYS_CALLS', 20))
+
+# max number of nodes explored by the exact search of the best journeys when culling the journeys,
+# when reached, the best selection found so far is kept
+CULLING_JOURNEYS_MAX_NODES = int(os.getenv('JORMUNGANDR_CULLING_JOURNEYS_MAX_NODES', 20000))
@@ -0,0 +1,157 @@
+# coding=utf-8
+
+#  Copyright (c) 2001-2018, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+"""
+HTTP client shared by all the external connectors (street networks, bragi, realtime proxies, parkings...)
+
+Each connector has its own requests.Session, kept for the whole life of the worker, so the connections are
+kept alive and reused between the calls. The session pools the connections by host, the number of hosts
+and of connections by host (and the default timeout) can be configured for each connector.
+
+The connectors call the module functions (http_client.get(url, connector='valhalla', ...)), with the same
+arguments as requests.get/requests.post.
+"""
+
+from __future__ import absolute_import, print_function, unicode_literals, division
+import logging
+import requests
+from requests.adapters import HTTPAdapter
+from jormungandr import app
+
+DEFAULT_CONNECTOR = 'default'
+
+
+class HttpClient(object):
+    def __init__(self):
+        self._sessions = {}
+        self._timeouts = {}
+
+    @staticmethod
+    def get_connector_config(connector):
+        config = {
+            'pool_connections': app.config.get('HTTP_POOL_CONNECTIONS', 10),
+            'pool_maxsize': app.config.get('HTTP_POOL_MAXSIZE', 10),
+            'pool_block': app.config.get('HTTP_POOL_BLOCK', False),
+            'timeout': app.config.get('HTTP_DEFAULT_TIMEOUT', None),
+        }
+        config.update((app.config.get('HTTP_POOL_CONNECTORS') or {}).get(connector, {}))
+        return config
+
+    def get_session(self, connector=DEFAULT_CONNECTOR):
+        session = self._sessions.get(connector)
+        if session is not None:
+            return session
+        config = self.get_connector_config(connector)
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=config['pool_connections'],
+                              pool_maxsize=config['pool_maxsize'],
+                              pool_block=config['pool_block'])
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        self._timeouts[connector] = config['timeout']
+        logging.getLogger(__name__).debug('http session created for %s: %s', connector, config)
+        # another greenlet may have created the session in the meantime, the first one is kept
+        return self._sessions.setdefault(connector, session)
+
+    def request(self, method, url, connector=DEFAULT_CONNECTOR, **kwargs):
+        session = self.get_session(connector)
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self._timeouts.get(connector)
+        return session.request(method, url, **kwargs)
+
+    def status(self):
+        """
+        usage of the connection pools of each connector, by host
+
+        nb_reused_connections is the number of requests made on an already opened connection
+        """
+        status = []
+        for connector, session in sorted(self._sessions.items()):
+            adapter = session.get_adapter('http://')
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                nb_requests = getattr(pool, 'num_requests', 0)
+                nb_connections = getattr(pool, 'num_connections', 0)
+                status.append({
+                    'connector': connector,
+                    'scheme': pool.scheme,
+                    'host': pool.host,
+                    'port': pool.port,
+                    'max_size': pool.pool.maxsize if pool.pool else 0,
+                    'nb_idle_connections': sum(1 for c in list(pool.pool.queue) if c is not None)
+                                           if pool.pool else 0,
+                    'nb_connections': nb_connections,
+                    'nb_requests': nb_requests,
+                    'nb_reused_connections': max(nb_requests - nb_connections, 0),
+                })
+        return status
+
+    def clear(self):
+        for session in self._sessions.values():
+            session.close()
+        self._sessions.clear()
+
+
+client = HttpClient()
+
+
+def request(method, url, connector=DEFAULT_CONNECTOR, **kwargs):
+    return client.request(method, url, connector=connector, **kwargs)
+
+
+def get(url, connector=DEFAULT_CONNECTOR, **kwargs):
+    return client.request('GET', url, connector=connector, **kwargs)
+
+
+def post(url, connector=DEFAULT_CONNECTOR, **kwargs):
+    return client.request('POST', url, connector=connector, **kwargs)
+
+
+def get_status():
+    return client.status()
+
+
+def use_gevent_socket():
+    """
+    make the http calls cooperative with gevent: only the sockets of urllib3 are patched,
+    not the whole socket module, since we don't want that for redis as it may cause performance regression
+    """
+    logging.getLogger(__name__).info("Attention! You'are patching requests.packages.urllib3.connection.connection"
+                                     ".socket with gevent.socket, parallel http/https calling by requests is "
+                                     "activated")
+    import gevent.socket
+    requests.packages.urllib3.connection.connection.socket = gevent.socket
+
+    from gevent import monkey
+    monkey.patch_ssl()
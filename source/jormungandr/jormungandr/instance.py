@@ -42,9 +42,13 @@ from navitiacommon.default_values import get_value_or_default
 from jormungandr.timezone import set_request_instance_timezone
 import logging
 from .exceptions import DeadSocketException
+from jormungandr.multiplexed_socket import MultiplexedSocket
+from jormungandr.street_network.fallback_cache import FallbackCache
+from jormungandr.street_network import routing_matrix
+from jormungandr.local_cache import memoize
 from navitiacommon import models
 from importlib import import_module
-from jormungandr import cache, app, global_autocomplete
+from jormungandr import app, global_autocomplete
 from shapely import wkt
 from shapely.geos import ReadingError
 from shapely import geometry
@@ -100,7 +104,8 @@ class Instance(object):
                  ridesharing_configurations,
                  realtime_proxies_configuration,
                  zmq_socket_type,
-                 autocomplete_type):
+                 autocomplete_type,
+                 batch_api=False):
         self.geom = None
         self._sockets = queue.Queue()
         self.socket_path = zmq_socket
@@ -136,6 +141,23 @@ class Instance(object):
                                  'cannot initialize instance {}'.format(autocomplete_type, name))
 
         self.zmq_socket_type = zmq_socket_type
+        # with a 'multiplexed' socket, the requests to kraken share a pool of connections that survive the timeouts
+        self._multiplexed_socket = None
+        if zmq_socket_type == 'multiplexed':
+            self._multiplexed_socket = MultiplexedSocket(
+                context, zmq_socket, name,
+                abandoned_timeout=app.config.get('MULTIPLEXED_SOCKET_ABANDONED_TIMEOUT_S', 60))
+        # the kraken can handle several requests sent in one message, they are computed sequentially by one worker
+        # so only the direct paths are sent this way (only possible with a multiplexed socket)
+        self.has_batch_api = bool(batch_api and self._multiplexed_socket)
+
+        self.fallback_cache = None
+        if app.config.get('FALLBACK_CACHE_ENABLED', False):
+            self.fallback_cache = FallbackCache(self,
+                                                max_size=app.config.get('FALLBACK_CACHE_MAX_SIZE', 1000),
+                                                ttl=app.config.get('FALLBACK_CACHE_TTL', 300),
+                                                use_shared_cache=app.config.get('FALLBACK_CACHE_SHARED', False),
+                                                coord_precision=app.config.get('FALLBACK_CACHE_COORD_PRECISION', 5))
 
     def get_models(self):
         if self.name not in g.instances_model:
@@ -145,7 +167,7 @@ class Instance(object):
     def __repr__(self):
         return 'instance.{}'.format(self.name)
 
-    @cache.memoize(app.config['CACHE_CONFIGURATION'].get('TIMEOUT_PARAMS', 300))
+    @memoize('instance_models', app.config['CACHE_CONFIGURATION'].get('TIMEOUT_PARAMS', 300))
     def _get_models(self):
         if app.config['DISABLE_DATABASE']:
             return None
@@ -434,14 +456,25 @@ class Instance(object):
                          quiet=False,
                          **kwargs):
         logger = logging.getLogger(__name__)
-        with self.socket(self.context) as socket:
-            try:
-                request.request_id = flask.request.id
-            except RuntimeError:
-                # we aren't in a flask context, so there is no request
+        try:
+            request.request_id = flask.request.id
+        except RuntimeError:
+            # we aren't in a flask context, so there is no request
+
+            if 'flask_request_id' in kwargs:
+                request.request_id = kwargs['flask_request_id']
+        if self._multiplexed_socket:
+            pb = self._multiplexed_socket.send_and_receive(request.SerializeToString(), timeout=timeout)
+            if pb is None:
+                if not quiet:
+                    logger.error('request on %s failed: %s', self.socket_path, six.text_type(request))
+                raise DeadSocketException(self.name, self.socket_path)
+            resp = response_pb2.Response()
+            resp.ParseFromString(pb)
+            self.update_property(resp)#we update the timezone and geom of the instances at each request
+            return resp
 
-                if 'flask_request_id' in kwargs:
-                    request.request_id = kwargs['flask_request_id']
+        with self.socket(self.context) as socket:
             socket.send(request.SerializeToString())
             if socket.poll(timeout=timeout) > 0:
                 pb = socket.recv()
@@ -456,6 +489,61 @@ class Instance(object):
                     logger.error('request on %s failed: %s', self.socket_path, six.text_type(request))
                 raise DeadSocketException(self.name, self.socket_path)
 
+    def send_and_receive_batch(self, *args, **kwargs):
+        """
+        same as send_and_receive, but for a list of requests sent in one message
+        """
+        try:
+            return self.breaker.call(self._send_and_receive_batch, *args, **kwargs)
+        except pybreaker.CircuitBreakerError as e:
+            raise DeadSocketException(self.name, self.socket_path)
+
+    def _send_and_receive_batch(self,
+                                batch,
+                                timeout=app.config.get('INSTANCE_TIMEOUT', 10000),
+                                quiet=False,
+                                **kwargs):
+        """
+        send all the requests of the batch (a RequestBatch) to kraken in one round trip
+
+        return the list of the responses, in the same order as the requests
+        """
+        if not self.has_batch_api:
+            raise TechnicalError('batch api is not available on {}'.format(self.name))
+        logger = logging.getLogger(__name__)
+        try:
+            request_id = flask.request.id
+        except RuntimeError:
+            request_id = kwargs.get('flask_request_id')
+        if request_id is not None:
+            def build_request_id():
+                req = request_pb2.Request()
+                req.request_id = request_id
+                return req
+            request_id_part = batch.add_part(('request_id', request_id), build_request_id)
+            for part_indexes in batch.requests:
+                part_indexes.append(request_id_part)
+        pbs = self._multiplexed_socket.send_and_receive_batch(batch, timeout=timeout)
+        if pbs is None:
+            if not quiet:
+                logger.error('batch of %s requests on %s failed', len(batch), self.socket_path)
+            raise DeadSocketException(self.name, self.socket_path)
+        responses = []
+        for pb in pbs:
+            resp = response_pb2.Response()
+            resp.ParseFromString(pb)
+            self.update_property(resp)
+            responses.append(resp)
+        return responses
+
+    def socket_status(self):
+        """
+        metrics of the connection to kraken, only available for a multiplexed socket
+        """
+        if not self._multiplexed_socket:
+            return None
+        return self._multiplexed_socket.status()
+
     def get_id(self, id_):
         """
         Get the pt_object that have the given id
@@ -520,6 +608,8 @@ class Instance(object):
             logging.getLogger(__name__).debug('updating metadata for %s', self.name)
             with self.lock as lock:
                 self.publication_date = response.publication_date
+                if self.fallback_cache:
+                    self.fallback_cache.clear()
                 if response.metadatas.shape and response.metadatas.shape != "":
                     try:
                         self.geom = wkt.loads(response.metadatas.shape)
@@ -568,12 +658,13 @@ class Instance(object):
         service = self.get_street_network(mode, request)
         if not service:
             return None
-        return service.get_street_network_routing_matrix(origins,
-                                                         destinations,
-                                                         mode,
-                                                         max_duration_to_pt,
-                                                         request,
-                                                         **kwargs)
+        return routing_matrix.get_routing_matrix(service,
+                                                 origins,
+                                                 destinations,
+                                                 mode,
+                                                 max_duration_to_pt,
+                                                 request,
+                                                 **kwargs)
 
     def direct_path(self, mode, pt_object_origin, pt_object_destination, fallback_extremity, request, direct_path_type):
         """
@@ -31,7 +31,6 @@
 from __future__ import absolute_import, print_function, unicode_literals, division
 from flask import json
 
-from shapely import geometry
 from zmq import green as zmq
 from navitiacommon import type_pb2, request_pb2
 import glob
@@ -41,6 +40,8 @@ from jormungandr.exceptions import ApiNotFound, RegionNotFound,\
     DeadSocketException, InvalidArguments
 from jormungandr import authentication, cache, app
 from jormungandr.instance import Instance
+from jormungandr.region_index import CoordIndex
+from jormungandr.local_cache import memoize
 import gevent
 import os
 
@@ -86,6 +87,7 @@ class InstanceManager(object):
         self.start_ping = start_ping
         self.instances = {}
         self.context = zmq.Context()
+        self._coord_index = None
 
     def __repr__(self):
         return '<InstanceManager>'
@@ -98,7 +100,8 @@ class InstanceManager(object):
                             config.get('ridesharing'),
                             config.get('realtime_proxies', []),
                             config.get('zmq_socket_type', 'persistent'),
-                            config.get('default_autocomplete', 'kraken'))
+                            config.get('default_autocomplete', 'kraken'),
+                            config.get('batch_api', False))
         self.instances[instance.name] = instance
 
     def initialisation(self):
@@ -130,6 +133,7 @@ class InstanceManager(object):
 
     def _clear_cache(self):
         logging.getLogger(__name__).info('clear cache')
+        self._all_keys_of_id.clear_local()
         try:
             cache.delete_memoized(self._all_keys_of_id)
         except RuntimeError:
@@ -195,7 +199,7 @@ class InstanceManager(object):
             authentication.abort_request(user)
         return valid_instances
 
-    @cache.memoize(app.config['CACHE_CONFIGURATION'].get('TIMEOUT_PTOBJECTS', None))
+    @memoize('ids', app.config['CACHE_CONFIGURATION'].get('TIMEOUT_PTOBJECTS', None))
     def _all_keys_of_id(self, object_id):
         if object_id.count(";") == 1 or object_id[:6] == "coord:":
             if object_id.count(";") == 1:
@@ -220,9 +224,15 @@ class InstanceManager(object):
             raise RegionNotFound(object_id=object_id)
         return instances
 
+    def _get_coord_index(self):
+        instances = list(self.instances.values())
+        if not self._coord_index or not self._coord_index.is_up_to_date(instances):
+            # the shapes of the instances have changed (or it's the first call)
+            self._coord_index = CoordIndex(instances)
+        return self._coord_index
+
     def _all_keys_of_coord(self, lon, lat):
-        p = geometry.Point(lon, lat)
-        instances = [i.name for i in self.instances.values() if i.has_point(p)]
+        instances = self._get_coord_index().get_names(lon, lat)
         logging.getLogger(__name__).debug("all_keys_of_coord(self, {}, {}) returns {}".format(lon, lat, instances))
         if not instances:
             raise RegionNotFound(lon=lon, lat=lat)
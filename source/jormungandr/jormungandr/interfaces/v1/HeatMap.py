@@ -33,7 +33,7 @@ from flask.ext.restful import fields, abort
 from jormungandr import i_manager
 from jormungandr.interfaces.v1.fields import error,\
     PbField, NonNullList, NonNullNested,\
-    Links, JsonString, place,\
+    Links, HeatMatrix, place,\
     ListLit, beta_endpoint, feed_publisher
 from jormungandr.timezone import set_request_timezone
 from jormungandr.interfaces.v1.errors import ManageError
@@ -45,7 +45,7 @@ from jormungandr.interfaces.v1.serializer.api import HeatMapSerializer
 from jormungandr.interfaces.v1.decorators import get_serializer
 
 heat_map = {
-    "heat_matrix": JsonString(),
+    "heat_matrix": HeatMatrix(),
     'from': PbField(place, attribute='origin'),
     "to": PbField(place, attribute="destination"),
     'requested_date_time': DateTime()
@@ -45,9 +45,12 @@ from jormungandr.interfaces.v1.fields import DateTime, Integer
 from jormungandr.timezone import set_request_timezone
 from jormungandr.interfaces.v1.make_links import create_external_link, create_internal_link
 from jormungandr.interfaces.v1.errors import ManageError
-from collections import defaultdict
+from collections import defaultdict, namedtuple
 from navitiacommon import response_pb2
 from jormungandr.utils import date_to_timestamp
+from jormungandr import utils
+from copy import deepcopy
+import gevent
 from jormungandr.interfaces.v1.Calendars import calendar
 from jormungandr.interfaces.v1.serializer import api, base
 from jormungandr.interfaces.v1.decorators import get_serializer
@@ -451,6 +454,67 @@ class rig_journey(object):
         return wrapper
 
 
+def _fill_no_solution_error(response, region):
+    # If journeys list is empty and error field not exist, we create
+    # the error message field
+    if not response.journeys and not response.HasField(str('error')):
+        logging.getLogger(__name__).debug("impossible to find journeys for the region {},"
+                                          " insert error field in response ".format(region))
+        response.error.id = response_pb2.Error.no_solution
+        response.error.message = "no solution found for this journey"
+        response.response_type = response_pb2.NO_SOLUTION
+
+
+def _store_debug_error(region, response):
+    # In debug we store all errors
+    if not hasattr(g, 'errors_by_region'):
+        g.errors_by_region = {}
+    g.errors_by_region[region] = response.error
+
+
+def _has_only_non_pt_journeys(response):
+    non_pt_types = ("non_pt_walk", "non_pt_bike", "non_pt_bss", "car")
+    return all(j.type in non_pt_types for j in response.journeys) or \
+        all("non_pt" in j.tags for j in response.journeys)
+
+
+# the values set in 'g' by the dispatch of a region, given back to the request for the chosen region
+REGION_CONTEXT_ATTRIBUTES = ('timezone', 'scenario', 'origin_detail', 'destination_detail')
+
+# the outcome of the dispatch of a region in its greenlet (see Journeys._parallel_dispatch)
+RegionResult = namedtuple('RegionResult', ['response', 'exception', 'context'])
+
+
+def _make_region_error_response(region):
+    response = response_pb2.Response()
+    response.error.id = response_pb2.Error.internal_error
+    response.error.message = "error while asking journeys on the region {}".format(region)
+    return response
+
+
+def _choose_failed_response(responses):
+    """
+    none of the regions have found a public transport journey, choose the response to give
+    """
+    for response in responses:
+        if not response.HasField(str("error")):
+            return response
+
+    # if no response have been found for all the possible regions, we have a problem
+    # if all response had the same error we give it, else we give a generic 'no solution' error
+    responses = list(responses)
+    first_response = responses[0]
+    if all(r.error.id == first_response.error.id for r in responses):
+        return first_response
+
+    resp = response_pb2.Response()
+    er = resp.error
+    er.id = response_pb2.Error.no_solution
+    er.message = "No journey found"
+
+    return resp
+
+
 class Journeys(JourneyCommon):
 
     def __init__(self):
@@ -483,6 +547,10 @@ class Journeys(JourneyCommon):
                                 help="debug param to specify a custom scenario")
         parser_get.add_argument("_street_network", type=six.text_type, hidden=True,
                                 help="choose the streetnetwork component")
+        parser_get.add_argument("_parallel_regions_dispatch", type=BooleanType(), hidden=True,
+                                help="call all the possible regions at the same time")
+        parser_get.add_argument("_future_deadline", type=int, hidden=True,
+                                help="deadline (in milliseconds) of the computation with the distributed scenario")
         parser_get.add_argument("_walking_transfer_penalty", hidden=True, type=int)
         parser_get.add_argument("_max_successive_physical_mode", hidden=True, type=int)
         parser_get.add_argument("_max_additional_connections", hidden=True, type=int)
@@ -596,76 +664,147 @@ class Journeys(JourneyCommon):
         self._register_interpreted_parameters(args)
         logging.getLogger(__name__).debug("We are about to ask journeys on regions : {}".format(possible_regions))
 
+        if len(possible_regions) > 1 and self._use_parallel_dispatch(args):
+            return self._parallel_dispatch(possible_regions, args, api)
+
         # Store the different errors
         responses = {}
         for r in possible_regions:
-            self.region = r
-
-            set_request_timezone(self.region)
-
-            # Store the region in the 'g' object, which is local to a request
-            if args['debug']:
-                # In debug we store all queried region
-                if not hasattr(g, 'regions_called'):
-                    g.regions_called = []
-                g.regions_called.append(r)
-
-            # Save the original datetime for debuging purpose
-            original_datetime = args['original_datetime']
-            if original_datetime:
-                new_datetime = self.convert_to_utc(original_datetime)
-            args['datetime'] = date_to_timestamp(new_datetime)
+            self._set_region(r, args)
 
             response = i_manager.dispatch(args, api, instance_name=self.region)
 
-            # If journeys list is empty and error field not exist, we create
-            # the error message field
-            if not response.journeys and not response.HasField(str('error')):
-                logging.getLogger(__name__).debug("impossible to find journeys for the region {},"
-                                                 " insert error field in response ".format(r))
-                response.error.id = response_pb2.Error.no_solution
-                response.error.message = "no solution found for this journey"
-                response.response_type = response_pb2.NO_SOLUTION
+            _fill_no_solution_error(response, r)
 
             if response.HasField(str('error')) \
                     and len(possible_regions) != 1:
 
                 if args['debug']:
-                    # In debug we store all errors
-                    if not hasattr(g, 'errors_by_region'):
-                        g.errors_by_region = {}
-                    g.errors_by_region[r] = response.error
+                    _store_debug_error(r, response)
 
                 logging.getLogger(__name__).debug("impossible to find journeys for the region {},"
                                                  " we'll try the next possible region ".format(r))
                 responses[r] = response
                 continue
 
-            non_pt_types = ("non_pt_walk", "non_pt_bike", "non_pt_bss", "car")
-            if all(j.type in non_pt_types for j in response.journeys) or \
-               all("non_pt" in j.tags for j in response.journeys):
+            if _has_only_non_pt_journeys(response):
                 responses[r] = response
                 continue
 
             return response
 
-        for response in responses.values():
-            if not response.HasField(str("error")):
-                return response
+        return _choose_failed_response(responses.values())
 
+    def _set_region(self, r, args):
+        self.region = r
 
-        # if no response have been found for all the possible regions, we have a problem
-        # if all response had the same error we give it, else we give a generic 'no solution' error
-        first_response = list(responses.values())[0]
-        if all(r.error.id == first_response.error.id for r in responses.values()):
-            return first_response
+        set_request_timezone(self.region)
 
-        resp = response_pb2.Response()
-        er = resp.error
-        er.id = response_pb2.Error.no_solution
-        er.message = "No journey found"
+        # Store the region in the 'g' object, which is local to a request
+        if args['debug']:
+            # In debug we store all queried region
+            if not hasattr(g, 'regions_called'):
+                g.regions_called = []
+            g.regions_called.append(r)
+
+        # Save the original datetime for debuging purpose
+        original_datetime = args['original_datetime']
+        if original_datetime:
+            new_datetime = self.convert_to_utc(original_datetime)
+        args['datetime'] = date_to_timestamp(new_datetime)
+
+    @staticmethod
+    def _use_parallel_dispatch(args):
+        if args.get('_parallel_regions_dispatch') is not None:
+            return args['_parallel_regions_dispatch']
+        return app.config.get('PARALLEL_REGIONS_DISPATCH', False)
+
+    def _parallel_dispatch(self, possible_regions, args, api):
+        """
+        call all the possible regions at the same time
+
+        The regions are still considered in their priority order (as computed by compute_regions):
+        as soon as a region gives a public transport answer, all the regions with a lower priority are cancelled,
+        and we only wait for the regions with a higher priority to decide which one is the best.
+        """
+        reqctx = utils.copy_flask_request_context()
+        if args['debug']:
+            # the regions called by the greenlets are stored in the list of the request, shared by their 'g'
+            g.regions_called = getattr(g, 'regions_called', [])
+        request_g = dict(g.__dict__)
+
+        def worker(region, region_args):
+            # with gevent each greenlet has its own flask stacks: the request context is pushed with a new
+            # application context, whose 'g' starts with the values of the request's one (instances_model...)
+            with app.app_context(), utils.copy_context_in_greenlet_stack(reqctx):
+                g.__dict__.update(request_g)
+                try:
+                    # the state of the region (the timezone in 'g'...) is only set in the greenlet of the region
+                    self._set_region(region, region_args)
+                    response = i_manager.dispatch(region_args, api, instance_name=region)
+                except Exception as e:
+                    logging.getLogger(__name__).exception("error while asking journeys on the region {}"
+                                                          .format(region))
+                    return RegionResult(response=None, exception=e, context={})
+                context = {k: getattr(g, k) for k in REGION_CONTEXT_ATTRIBUTES if hasattr(g, k)}
+                return RegionResult(response=response, exception=None, context=context)
+
+        futures = []
+        for r in possible_regions:
+            # the scenarios update the arguments, each region needs its own copy
+            region_args = deepcopy(args)
+            futures.append(gevent.spawn(worker, r, region_args))
 
-        return resp
+        results = [None] * len(futures)
+        best = None
+        try:
+            for future in gevent.iwait(futures):
+                idx = futures.index(future)
+                if best is not None and idx > best:
+                    # the region has been cancelled
+                    continue
+                r = possible_regions[idx]
+                result = results[idx] = future.get()
+                if result.exception is not None:
+                    # as when the regions are called one after another, a failing region is skipped
+                    result = results[idx] = result._replace(response=_make_region_error_response(r))
+                response = result.response
+                _fill_no_solution_error(response, r)
+
+                if response.HasField(str('error')):
+                    if args['debug']:
+                        _store_debug_error(r, response)
+                    logging.getLogger(__name__).debug("impossible to find journeys for the region {}".format(r))
+                elif not _has_only_non_pt_journeys(response):
+                    best = idx
+                    logging.getLogger(__name__).debug("region {} has found some journeys, the regions with a lower "
+                                                      "priority are cancelled".format(r))
+                    gevent.killall(futures[idx + 1:], block=False)
+
+                if best is not None and all(res is not None for res in results[:best]):
+                    break
+        finally:
+            gevent.killall([f for f in futures if not f.ready()], block=False)
+
+        if best is None and all(res.exception is not None for res in results):
+            # no region could be called, the error of the first one is given as in the sequential mode
+            raise results[0].exception
+
+        responses = [res.response if res is not None else None for res in results]
+        if best is not None:
+            winner = best
+        else:
+            winner = next((idx for idx, resp in enumerate(responses) if not resp.HasField(str("error"))), 0)
+        # the state of the chosen region is restored in the request's greenlet,
+        # the response will be serialized with its timezone and its entry points
+        self.region = possible_regions[winner]
+        set_request_timezone(self.region)
+        for k, v in results[winner].context.items():
+            setattr(g, k, v)
+
+        if best is not None:
+            return responses[best]
+        return _choose_failed_response(responses)
 
     def options(self, **kwargs):
         return self.api_description(**kwargs)
@@ -38,7 +38,6 @@ from collections import deque
 from flask import url_for
 from flask_restful.utils import unpack
 from jormungandr.authentication import authentication_required
-from six.moves import map
 
 
 def protect(uri):
@@ -190,7 +189,9 @@ class complete_links(object):
     def get_links(self, data):
         queue = deque()
         result = {"notes": [], "exceptions": []}
-        queue.extend(list(data.values()))
+        # the ids already in result, to check the duplicates in constant time
+        seen_ids = {"notes": set(), "exceptions": set()}
+        queue.extend(data.values())
         while queue:
             elem = queue.pop()
             if isinstance(elem, (list, tuple)):
@@ -199,14 +200,14 @@ class complete_links(object):
                 collect = elem.get('type')
                 if collect in result:
                     link = self.make_and_get_link(elem, collect)
-                    if link.get('id') not in [l.get('id') for l in result[collect]]:
+                    if link['id'] not in seen_ids[collect]:
+                        seen_ids[collect].add(link['id'])
                         result[collect].append(link)
                     # Delete all items from link not in expected_keys
-                    del_keys = set(elem.keys()).difference(self.EXPECTED_ITEMS)
-                    if len(del_keys):
-                        list(map(elem.pop, del_keys))
+                    for key in set(elem.keys()).difference(self.EXPECTED_ITEMS):
+                        elem.pop(key)
                 else:
-                    queue.extend(list(elem.values()))
+                    queue.extend(elem.values())
         return result
 
     def __call__(self, f):
@@ -35,7 +35,10 @@ from flask.globals import g
 import pytz
 from jormungandr.interfaces.v1.make_links import create_internal_link, create_external_link
 from jormungandr.interfaces.v1.serializer import pt, base
+from jormungandr.interfaces.v1.serializer.heat_map import is_binary_heat_matrix_requested
 from jormungandr.utils import timestamp_to_str, get_current_datetime_str, get_timezone_str
+from jormungandr.local_cache import get_local_caches_status
+from jormungandr import http_client
 from navitiacommon import response_pb2, type_pb2
 import ujson
 
@@ -438,6 +441,16 @@ class JsonString(fields.Raw):
         return response
 
 
+class HeatMatrix(JsonString):
+    """
+    The heat matrix is kept in the json string given by kraken when its binary representation is requested
+    """
+    def format(self, value):
+        if is_binary_heat_matrix_requested():
+            return value
+        return super(HeatMatrix, self).format(value)
+
+
 class Durations(fields.Raw):
     def output(self, key, obj):
         if not obj.HasField(str("durations")):
@@ -901,7 +914,13 @@ instance_status = {
     "dataset_created_at": fields.String(),
     "autocomplete": fields.Raw(),
     "street_networks": fields.Raw(),
-    "ridesharing_services": fields.Raw()
+    "ridesharing_services": fields.Raw(),
+    "kraken_socket": fields.Raw(),
+    "fallback_cache": fields.Raw(),
+    "local_caches": fields.Raw(),
+    "future_stages": fields.Raw(),
+    "stat_publisher": fields.Raw(),
+    "http_pools": fields.Raw()
 }
 
 instance_parameters = {
@@ -1078,3 +1097,24 @@ def add_common_status(response, instance):
         response['status']['ridesharing_services'].append(rs.status())
 
     response['status']['autocomplete'] = instance.autocomplete.status()
+
+    if instance.fallback_cache:
+        response['status']['fallback_cache'] = instance.fallback_cache.status()
+
+    response['status']['local_caches'] = get_local_caches_status()
+
+    # the scenarios are imported lazily to avoid circular imports
+    from jormungandr.scenarios.helper_classes.helper_future import get_stages_status
+    future_stages = get_stages_status()
+    if future_stages:
+        response['status']['future_stages'] = future_stages
+
+    from jormungandr import stat_manager
+    if stat_manager.publisher:
+        response['status']['stat_publisher'] = stat_manager.publisher.status()
+
+    response['status']['http_pools'] = http_client.get_status()
+
+    socket_status = instance.socket_status()
+    if socket_status:
+        response['status']['kraken_socket'] = socket_status
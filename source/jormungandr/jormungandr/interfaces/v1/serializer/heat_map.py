@@ -31,7 +31,83 @@ from __future__ import absolute_import, print_function, unicode_literals, divisi
 from jormungandr.interfaces.v1.serializer.pt import PlaceSerializer
 from jormungandr.interfaces.v1.serializer.time import DateTimeField
 from jormungandr.interfaces.v1.serializer.jsonschema import JsonStrField, Field
+from flask import request, has_request_context
 import serpy
+import numpy as np
+import struct
+import re
+import six
+
+# the heat matrix can be returned as a packed binary grid when this mimetype is accepted
+HEAT_MATRIX_MIMETYPE = 'application/x-navitia-heat-matrix'
+HEAT_MATRIX_MAGIC = b'NHM1'
+# duration of the unreachable cells
+HEAT_MATRIX_NO_DATA = -1
+
+# little-endian header:
+# magic, nb of lat cells, nb of lon cells, no data value, min lat, max lat, min lon, max lon
+# it is followed by the int32 durations, line by line of lon (nb of lat cells durations by line)
+HEAT_MATRIX_HEADER = struct.Struct(str('<4sIIidddd'))
+
+_NUMBER = r'(-?[0-9.]+(?:e[-+]?[0-9]+)?)'
+_CELL_LAT_RE = re.compile(r'"min_lat":%(n)s,"center_lat":%(n)s,"max_lat":%(n)s' % {'n': _NUMBER})
+_CELL_LON_RE = re.compile(r'"min_lon":%(n)s,"center_lon":%(n)s,"max_lon":%(n)s' % {'n': _NUMBER})
+_LINE_RE = re.compile(r'"min_lon":%(n)s,"center_lon":%(n)s,"max_lon":%(n)s\},"duration":\[([^\]]*)\]'
+                      % {'n': _NUMBER})
+
+
+def is_binary_heat_matrix_requested():
+    return has_request_context() and \
+        request.accept_mimetypes.best_match(['application/json', HEAT_MATRIX_MIMETYPE]) == HEAT_MATRIX_MIMETYPE
+
+
+def get_raw_heat_matrix(data):
+    """
+    return the heat matrix of the response if it has been kept in the json string given by kraken
+    """
+    heat_maps = data.get('heat_maps') if hasattr(data, 'get') else None
+    if not heat_maps:
+        return None
+    heat_matrix = heat_maps[0].get('heat_matrix')
+    if isinstance(heat_matrix, six.string_types):
+        return heat_matrix
+    return None
+
+
+def encode_heat_matrix(heat_matrix):
+    """
+    Generate the binary representation of a heat matrix from the json string given by kraken
+
+    The string is scanned line by line, the whole matrix is never decoded in python objects
+    """
+    lines_start = heat_matrix.find('"lines"')
+    cell_lats = _CELL_LAT_RE.findall(heat_matrix, 0, lines_start)
+    nb_lons = heat_matrix.count('"cell_lon"', lines_start)
+    if not cell_lats or not nb_lons:
+        yield HEAT_MATRIX_HEADER.pack(HEAT_MATRIX_MAGIC, 0, 0, HEAT_MATRIX_NO_DATA, 0, 0, 0, 0)
+        return
+
+    first_lon = _CELL_LON_RE.search(heat_matrix, lines_start)
+    last_lon = _CELL_LON_RE.search(heat_matrix, heat_matrix.rfind('"cell_lon"'))
+    nb_lats = len(cell_lats)
+    yield HEAT_MATRIX_HEADER.pack(HEAT_MATRIX_MAGIC, nb_lats, nb_lons, HEAT_MATRIX_NO_DATA,
+                                  float(cell_lats[0][0]), float(cell_lats[-1][2]),
+                                  float(first_lon.group(1)), float(last_lon.group(3)))
+
+    no_data = '{}'.format(HEAT_MATRIX_NO_DATA)
+    for line in _LINE_RE.finditer(heat_matrix, lines_start):
+        durations = np.fromstring(line.group(4).replace('null', no_data), dtype=np.int32, sep=',')
+        yield durations.astype(str('<i4')).tobytes()
+
+
+class HeatMatrixField(JsonStrField):
+    """
+    The heat matrix is kept in the json string given by kraken when its binary representation is requested
+    """
+    def to_value(self, value):
+        if is_binary_heat_matrix_requested():
+            return value
+        return super(HeatMatrixField, self).to_value(value)
 
 
 class CellLatSchema(serpy.Serializer):
@@ -66,7 +142,7 @@ class HeatMatrixSchema(serpy.Serializer):
 
 
 class HeatMapSerializer(serpy.Serializer):
-    heat_matrix = JsonStrField(schema_type=HeatMatrixSchema)
+    heat_matrix = HeatMatrixField(schema_type=HeatMatrixSchema)
     origin = PlaceSerializer(label='from')
     to = PlaceSerializer(attr='destination', label='to')
     requested_date_time = DateTimeField()
@@ -118,15 +118,89 @@ class OutsideServiceCommon(serpy.DictSerializer):
 class StreetNetworkSerializer(OutsideServiceCommon):
     modes = StringListField(display_none=True)
     timeout = MethodField(schema_type=float, display_none=False)
+    matrix_chunk_size = MethodField(schema_type=int, display_none=False)
+    matrix_max_concurrency = MethodField(schema_type=int, display_none=False)
 
     def get_timeout(self, obj):
         return obj.get('timeout', None)
 
+    def get_matrix_chunk_size(self, obj):
+        return obj.get('matrix_chunk_size', None)
+
+    def get_matrix_max_concurrency(self, obj):
+        return obj.get('matrix_max_concurrency', None)
+
 
 class RidesharingServicesSerializer(OutsideServiceCommon):
     pass
 
 
+class KrakenSocketSerializer(serpy.DictSerializer):
+    in_flight = Field(schema_type=int, description='Number of requests waiting for a response')
+    max_in_flight = Field(schema_type=int)
+    nb_connections = Field(schema_type=int, description='Number of opened connections to kraken')
+    nb_requests = Field(schema_type=int)
+    nb_timeouts = Field(schema_type=int)
+    nb_late_responses = Field(schema_type=int)
+    nb_abandoned = Field(schema_type=int, description='Number of connections waiting for a late response')
+    nb_closed_abandoned = Field(schema_type=int,
+                                description='Number of connections closed because their late response never came')
+    nb_connection_errors = Field(schema_type=int)
+    mean_latency = Field(schema_type=float, display_none=False, description='Mean response time (s)')
+    max_latency = Field(schema_type=float, description='Max response time (s)')
+
+
+class FallbackCacheSerializer(serpy.DictSerializer):
+    local_hits = Field(schema_type=int)
+    shared_hits = Field(schema_type=int)
+    misses = Field(schema_type=int)
+    size = Field(schema_type=int)
+    max_size = Field(schema_type=int)
+    ttl = Field(schema_type=int)
+
+
+class LocalCacheSerializer(serpy.DictSerializer):
+    name = Field(schema_type=str)
+    hits = Field(schema_type=int)
+    misses = Field(schema_type=int)
+    hit_ratio = Field(schema_type=float)
+    size = Field(schema_type=int)
+    max_size = Field(schema_type=int)
+    ttl = Field(schema_type=int)
+
+
+class FutureStageSerializer(serpy.DictSerializer):
+    stage = Field(schema_type=str)
+    nb_futures = Field(schema_type=int)
+    nb_cancelled = Field(schema_type=int)
+    mean_queue_duration = Field(schema_type=float)
+    mean_duration = Field(schema_type=float)
+    max_duration = Field(schema_type=float)
+
+
+class StatPublisherSerializer(serpy.DictSerializer):
+    queue_size = Field(schema_type=int)
+    max_queue_size = Field(schema_type=int)
+    nb_dropped = Field(schema_type=int)
+    nb_published = Field(schema_type=int)
+    nb_errors = Field(schema_type=int)
+    mean_batch_latency = Field(schema_type=float)
+    max_batch_latency = Field(schema_type=float)
+
+
+class HttpPoolSerializer(serpy.DictSerializer):
+    connector = Field(schema_type=str)
+    scheme = Field(schema_type=str)
+    host = Field(schema_type=str)
+    port = Field(schema_type=int)
+    max_size = Field(schema_type=int, description='Max number of connections kept alive for the host')
+    nb_idle_connections = Field(schema_type=int)
+    nb_connections = Field(schema_type=int, description='Number of connections opened')
+    nb_requests = Field(schema_type=int)
+    nb_reused_connections = Field(schema_type=int,
+                                  description='Number of requests made on an already opened connection')
+
+
 class CoverageErrorSerializer(NullableDictSerializer):
     code = Field(schema_type=str)
     value = Field(schema_type=str)
@@ -154,6 +228,12 @@ class CommonStatusSerializer(NullableDictSerializer):
     kraken_version = MethodField(schema_type=str, display_none=False)
     region_id = Field(schema_type=str, display_none=False, description='Identifier of the coverage')
     error = CoverageErrorSerializer(display_none=False)
+    kraken_socket = KrakenSocketSerializer(display_none=False)
+    fallback_cache = FallbackCacheSerializer(display_none=False)
+    local_caches = LocalCacheSerializer(many=True, display_none=False)
+    future_stages = FutureStageSerializer(many=True, display_none=False)
+    stat_publisher = StatPublisherSerializer(display_none=False)
+    http_pools = HttpPoolSerializer(many=True, display_none=False)
 
     def get_kraken_version(self, obj):
         if "navitia_version" in obj:
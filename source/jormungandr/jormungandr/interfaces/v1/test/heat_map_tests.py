@@ -0,0 +1,72 @@
+# encoding: utf-8
+# Copyright (c) 2001-2014, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+from __future__ import absolute_import, print_function, unicode_literals, division
+import struct
+import ujson
+from jormungandr.interfaces.v1.serializer.heat_map import encode_heat_matrix, HEAT_MATRIX_HEADER, \
+    HEAT_MATRIX_MAGIC, HEAT_MATRIX_NO_DATA
+
+# a heat matrix as given by kraken, with 3 lat cells and 2 lon cells
+KRAKEN_HEAT_MATRIX = '{"line_headers":[' \
+    '{"cell_lat":{"min_lat":48.8,"center_lat":48.8023,"max_lat":48.8045}},' \
+    '{"cell_lat":{"min_lat":48.8045,"center_lat":48.8068,"max_lat":48.809}},' \
+    '{"cell_lat":{"min_lat":48.809,"center_lat":48.8113,"max_lat":48.8135}}],' \
+    '"lines":[' \
+    '{"cell_lon":{"min_lon":-2.25,"center_lon":-2.2466,"max_lon":-2.2432},"duration":[null,120,3600]},' \
+    '{"cell_lon":{"min_lon":-2.2432,"center_lon":-2.2398,"max_lon":-2.2364},"duration":[42,null,null]}]}'
+
+
+def decode(binary):
+    magic, nb_lats, nb_lons, no_data, min_lat, max_lat, min_lon, max_lon = HEAT_MATRIX_HEADER.unpack_from(binary)
+    durations = struct.unpack(str('<{}i'.format(nb_lats * nb_lons)), binary[HEAT_MATRIX_HEADER.size:])
+    return magic, nb_lats, nb_lons, no_data, (min_lat, max_lat, min_lon, max_lon), list(durations)
+
+
+def encode_heat_matrix_test():
+    binary = b''.join(encode_heat_matrix(KRAKEN_HEAT_MATRIX))
+    magic, nb_lats, nb_lons, no_data, bounds, durations = decode(binary)
+
+    assert magic == HEAT_MATRIX_MAGIC
+    assert (nb_lats, nb_lons) == (3, 2)
+    assert no_data == HEAT_MATRIX_NO_DATA
+    assert bounds == (48.8, 48.8135, -2.25, -2.2364)
+
+    # the durations are the same as in the json, line by line of lon
+    matrix = ujson.loads(KRAKEN_HEAT_MATRIX)
+    assert durations == [no_data if d is None else d for l in matrix['lines'] for d in l['duration']]
+
+
+def encode_empty_heat_matrix_test():
+    binary = b''.join(encode_heat_matrix('{"line_headers":[],"lines":[]}'))
+    magic, nb_lats, nb_lons, _, _, durations = decode(binary)
+    assert magic == HEAT_MATRIX_MAGIC
+    assert (nb_lats, nb_lons) == (0, 0)
+    assert durations == []
@@ -28,10 +28,14 @@
 # www.navitia.io
 from __future__ import absolute_import, print_function, unicode_literals, division
 import pytest
-from jormungandr import i_manager
+import gevent
+import mock
+from flask import g
+from jormungandr import i_manager, app
 from jormungandr.exceptions import RegionNotFound
 from jormungandr.interfaces.v1.journey_common import compute_regions
-from navitiacommon import models
+from jormungandr.interfaces.v1.Journeys import Journeys
+from navitiacommon import models, response_pb2
 
 
 class MockInstance:
@@ -196,3 +200,84 @@ class TestMultiCoverage:
         assert regions[1] == self.regions['netherlands'].name
         assert regions[2] == self.regions['france'].name
         assert regions[3] == self.regions['bolivia'].name
+
+
+class TestParallelDispatch:
+    """
+    the regions are called at the same time, each in its own greenlet
+    """
+    def _dispatch(self, regions, debug=True):
+        """
+        call _parallel_dispatch on the regions, given in their priority order as (name, delay, result):
+        the dispatch of a region waits for the delay, then returns a journey, a 'no_solution' error or raises
+        """
+        behaviours = {name: (delay, result) for name, delay, result in regions}
+
+        def dispatch(args, api, instance_name):
+            # as the scenarios, the dispatch uses the 'g' of the request
+            g.instances_model[instance_name] = 'model of {}'.format(instance_name)
+            g.scenario = 'scenario of {}'.format(instance_name)
+            g.origin_detail = {'id': 'origin of {}'.format(instance_name)}
+            delay, result = behaviours[instance_name]
+            gevent.sleep(delay)
+            if result == 'raise':
+                raise ValueError('error of {}'.format(instance_name))
+            response = response_pb2.Response()
+            if result == 'journey':
+                response.journeys.add().type = 'best'
+            return response
+
+        def set_request_timezone(region):
+            g.timezone = 'timezone of {}'.format(region)
+
+        journeys = Journeys.__new__(Journeys)
+        journeys.convert_to_utc = lambda dt: dt
+        args = {'debug': debug, 'original_datetime': 'dt', 'datetime': None}
+        with mock.patch.object(i_manager, 'dispatch', dispatch), \
+                mock.patch('jormungandr.interfaces.v1.Journeys.set_request_timezone', set_request_timezone), \
+                mock.patch('jormungandr.interfaces.v1.Journeys.date_to_timestamp', lambda dt: dt):
+            g.instances_model = {}
+            response = journeys._parallel_dispatch([name for name, _, _ in regions], args, None)
+        return journeys, response
+
+    def test_parallel_dispatch_first_region_without_solution(self):
+        with app.test_request_context('/'):
+            journeys, response = self._dispatch([('empty', 0.01, 'no_solution'), ('main', 0.02, 'journey')])
+
+            assert len(response.journeys) == 1
+            assert journeys.region == 'main'
+            # the 'g' values of the chosen region are given back to the request
+            assert g.timezone == 'timezone of main'
+            assert g.scenario == 'scenario of main'
+            assert g.origin_detail == {'id': 'origin of main'}
+            assert g.instances_model == {'empty': 'model of empty', 'main': 'model of main'}
+            assert g.regions_called == ['empty', 'main']
+            assert g.errors_by_region['empty'].id == response_pb2.Error.no_solution
+
+    def test_parallel_dispatch_failing_lower_priority_region(self):
+        """
+        a region with a lower priority raising before the answer of the first one doesn't fail the request
+        """
+        with app.test_request_context('/'):
+            journeys, response = self._dispatch([('main', 0.02, 'journey'), ('broken', 0, 'raise')])
+
+            assert len(response.journeys) == 1
+            assert journeys.region == 'main'
+            assert g.scenario == 'scenario of main'
+
+    def test_parallel_dispatch_failing_higher_priority_region(self):
+        with app.test_request_context('/'):
+            journeys, response = self._dispatch([('broken', 0, 'raise'), ('main', 0.01, 'journey')], debug=False)
+
+            assert len(response.journeys) == 1
+            assert journeys.region == 'main'
+            assert not hasattr(g, 'regions_called')
+
+    def test_parallel_dispatch_all_regions_failing(self):
+        """
+        as when the regions are called one after another, the error of the first region is raised
+        """
+        with app.test_request_context('/'):
+            with pytest.raises(ValueError) as e:
+                self._dispatch([('first', 0.01, 'raise'), ('second', 0, 'raise')])
+            assert 'error of first' in str(e.value)
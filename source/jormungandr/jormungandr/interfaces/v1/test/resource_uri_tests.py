@@ -116,3 +116,30 @@ def test_complete_links():
             for key in items:
                 assert key in ["category", "internal", "rel", "type", "id"]
 
+
+
+def test_complete_links_duplicated_ids():
+    """
+    the links are given in the order of the walk of the response (from its end), a duplicated id is only
+    given once, with the first occurrence found
+    """
+    def make_note(id_, value):
+        return {"category": "comment", "value": value, "internal": "True", "rel": "notes", "type": "notes",
+                "id": id_}
+
+    def mock_response():
+        return {
+            "date_times": [
+                {"links": [make_note("note:1", "first"), make_note("note:2", "")]},
+                {"links": [make_note("note:3", "")]},
+                {"links": [make_note("note:1", "last"), make_note("note:3", "")]},
+            ]
+        }
+
+    response = complete_links(MockResource())(mock_response)()
+    assert [n["id"] for n in response["notes"]] == ["note:3", "note:1", "note:2"]
+    assert response["notes"][1]["value"] == "last"
+    assert response["exceptions"] == []
+    for dt in response["date_times"]:
+        for link in dt["links"]:
+            assert set(link.keys()) == {"category", "internal", "rel", "type", "id"}
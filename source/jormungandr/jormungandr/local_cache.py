@@ -0,0 +1,154 @@
+# coding=utf-8
+
+#  Copyright (c) 2001-2018, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+from __future__ import absolute_import, print_function, unicode_literals, division
+from collections import OrderedDict
+import functools
+import time
+from jormungandr import cache, app
+
+
+class LocalCache(object):
+    """
+    A bounded LRU cache with a time to live, local to the process (no pickling, no network)
+
+    >>> c = LocalCache(max_size=2, ttl=60)
+    >>> c.get('a') is LocalCache.MISSING
+    True
+    >>> c.set('a', 1)
+    >>> c.set('b', 2)
+    >>> c.get('a')
+    1
+    >>> c.set('c', 3) # 'b' is the least recently used, it's evicted
+    >>> c.get('b') is LocalCache.MISSING
+    True
+    >>> c.stats() == {'hits': 1, 'misses': 2, 'size': 2, 'max_size': 2, 'ttl': 60}
+    True
+    """
+    MISSING = object()
+
+    def __init__(self, max_size=1000, ttl=60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """
+        return the value of the key, or LocalCache.MISSING if it isn't in the cache (or expired)
+        """
+        item = self._data.pop(key, None)
+        if item is None or item[1] < time.time():
+            self.misses += 1
+            return self.MISSING
+        self._data[key] = item
+        self.hits += 1
+        return item[0]
+
+    def set(self, key, value):
+        self._data.pop(key, None)
+        self._data[key] = (value, time.time() + self.ttl)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self._data),
+                'max_size': self.max_size, 'ttl': self.ttl}
+
+
+# all the local tiers of the memoized functions, by name
+memoized_local_caches = {}
+
+
+def _get_local_cache_conf(name):
+    conf = app.config['CACHE_CONFIGURATION'].get('LOCAL_CACHE', {})
+    return conf.get(name, conf.get('default'))
+
+
+def memoize(name, timeout):
+    """
+    Same as cache.memoize, with a process-local LRU in front of the shared cache
+
+    The small objects that are read on almost every request (user, authorizations, instance parameters...)
+    are then read without any network round trip nor unpickling.
+
+    The local tier is configured for each function in CACHE_CONFIGURATION['LOCAL_CACHE'] by its name
+    (with the 'default' entry as fallback):
+        'LOCAL_CACHE': {'default': {'max_size': 1000, 'ttl': 10}, 'user': {'max_size': 100, 'ttl': 30}}
+    Without configuration the local tier is not used.
+
+    Like with flask cache, the arguments are identified by their repr and None results are not cached.
+    The local tier can be cleared with 'clear_local'.
+
+    :param name: the name of the function in the configuration (and in /status)
+    :param timeout: the timeout of the shared cache
+    """
+    def decorator(f):
+        memoized = cache.memoize(timeout)(f)
+        conf = _get_local_cache_conf(name)
+        if not conf or not conf.get('max_size'):
+            memoized.clear_local = lambda: None
+            return memoized
+
+        local_cache = LocalCache(max_size=conf['max_size'], ttl=conf.get('ttl', 10))
+        memoized_local_caches[name] = local_cache
+
+        @functools.wraps(memoized)
+        def wrapper(*args, **kwargs):
+            key = (tuple(repr(a) for a in args), tuple(sorted((k, repr(v)) for k, v in kwargs.items())))
+            value = local_cache.get(key)
+            if value is LocalCache.MISSING:
+                value = memoized(*args, **kwargs)
+                if value is not None:
+                    local_cache.set(key, value)
+            return value
+
+        wrapper.clear_local = local_cache.clear
+        return wrapper
+    return decorator
+
+
+def get_local_caches_status():
+    status = []
+    for name, local_cache in sorted(memoized_local_caches.items()):
+        stats = local_cache.stats()
+        nb_calls = stats['hits'] + stats['misses']
+        stats['hit_ratio'] = stats['hits'] / nb_calls if nb_calls else None
+        stats['name'] = name
+        status.append(stats)
+    return status
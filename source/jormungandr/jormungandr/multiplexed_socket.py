@@ -0,0 +1,326 @@
+# coding=utf-8
+
+#  Copyright (c) 2001-2018, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+from __future__ import absolute_import, print_function, unicode_literals, division
+import logging
+import struct
+import time
+import gevent
+import gevent.event
+from zmq import green as zmq
+
+# a serialized protobuf never starts with a null byte (there is no field number 0)
+BATCH_MARKER = b'\x00batch'
+
+
+class RequestBatch(object):
+    """
+    Several requests sent to kraken in one message
+
+    A request is made of parts (fragments of a protobuf Request), kraken rebuilds it by parsing the
+    concatenation of its parts, which for protobuf is the same as merging them.
+    A part shared by several requests (the common parameters, the origins...) is built, serialized and sent
+    only once.
+    """
+    def __init__(self):
+        self.parts = []
+        self._part_indexes = {}
+        self.requests = []
+
+    def add_part(self, key, build_part):
+        """
+        :param key: identifies the content of the part, the part is only built the first time the key is seen
+        :param build_part: function returning the protobuf of the part, it can be a partial Request
+        :return: the index of the part
+        """
+        index = self._part_indexes.get(key)
+        if index is None:
+            index = self._part_indexes[key] = len(self.parts)
+            self.parts.append(build_part().SerializePartialToString())
+        return index
+
+    def add_request(self, part_indexes):
+        self.requests.append(list(part_indexes))
+
+    def __len__(self):
+        return len(self.requests)
+
+    def pack(self):
+        """
+        the message is BATCH_MARKER, the number of parts, then the size and the content of each part,
+        the number of requests, then for each request the number of its parts and their indexes
+        (all the integers are big endian uint32)
+        """
+        chunks = [BATCH_MARKER, struct.pack(str('>I'), len(self.parts))]
+        for part in self.parts:
+            chunks.append(struct.pack(str('>I'), len(part)))
+            chunks.append(part)
+        chunks.append(struct.pack(str('>I'), len(self.requests)))
+        for indexes in self.requests:
+            chunks.append(struct.pack(str('>{}I'.format(len(indexes) + 1)), len(indexes), *indexes))
+        return b''.join(chunks)
+
+
+def unpack_batch_response(message):
+    """
+    the response to a batch is BATCH_MARKER, the number of responses, then the size and the content of each
+    response
+
+    :return: the list of the serialized responses, None if the message isn't a valid batch response
+    """
+    if not message.startswith(BATCH_MARKER):
+        return None
+    try:
+        pos = len(BATCH_MARKER)
+        nb, = struct.unpack_from(str('>I'), message, pos)
+        pos += 4
+        responses = []
+        for _ in range(nb):
+            size, = struct.unpack_from(str('>I'), message, pos)
+            pos += 4
+            if pos + size > len(message):
+                return None
+            responses.append(message[pos:pos + size])
+            pos += size
+    except struct.error:
+        return None
+    return responses if pos == len(message) else None
+
+
+class _Connection(object):
+    """
+    A DEALER socket with at most one request in flight, its responses are read by a dedicated greenlet
+    """
+    def __init__(self, multiplexed_socket, socket):
+        self.socket = socket
+        # (AsyncResult, sending time) of the request in flight
+        self.pending = None
+        # the caller of the request in flight has given up (timeout), the response will be dropped
+        self.abandoned = False
+        self.reader = gevent.spawn(multiplexed_socket._receive_loop, self)
+
+    @property
+    def is_busy(self):
+        return self.pending is not None
+
+
+class MultiplexedSocket(object):
+    """
+    The connections to a kraken shared by all the greenlets of a worker
+
+    Each request is sent on a DEALER socket of the pool with the same envelope as a REQ socket: ['', request],
+    so kraken's load balancer sees the usual [address, '', request]. A connection has at most one request in
+    flight, the response is read by the greenlet of the connection and wakes up the greenlet waiting for it.
+
+    Unlike with the REQ sockets, a timeout doesn't kill the connection: it goes back to the pool once the late
+    response has arrived (and has been dropped). If the late response hasn't arrived after abandoned_timeout
+    (in seconds), the connection is closed, so a kraken that never answers doesn't leak sockets and greenlets.
+    A connection that fails (zmq error) is closed, the request in flight fails and the next requests use
+    new connections.
+
+    Several requests can also be sent in one message (see RequestBatch), it's a single frame so it goes through
+    kraken's load balancer like any request, the kraken answers with all the responses in one frame.
+    """
+
+    def __init__(self, context, socket_path, name, abandoned_timeout=60):
+        self.context = context
+        self.socket_path = socket_path
+        self.name = name
+        self.abandoned_timeout = abandoned_timeout
+        self._connections = []
+        self._idle_connections = []
+
+        # metrics
+        self.max_in_flight = 0
+        self.nb_requests = 0
+        self.nb_timeouts = 0
+        self.nb_late_responses = 0
+        self.nb_closed_abandoned = 0
+        self.nb_connection_errors = 0
+        self.nb_responses = 0
+        self._total_latency = 0.0
+        self._max_latency = 0.0
+
+    def _get_connection(self):
+        while self._idle_connections:
+            connection = self._idle_connections.pop()
+            if not connection.socket.closed:
+                return connection
+        socket = self.context.socket(zmq.DEALER)
+        socket.setsockopt(zmq.LINGER, 0)
+        socket.connect(self.socket_path)
+        connection = _Connection(self, socket)
+        self._connections.append(connection)
+        return connection
+
+    def _release(self, connection):
+        connection.pending = None
+        connection.abandoned = False
+        if not connection.socket.closed:
+            self._idle_connections.append(connection)
+
+    def _close_connection(self, connection):
+        if not connection.socket.closed:
+            connection.socket.close()
+        if connection in self._connections:
+            self._connections.remove(connection)
+        if connection in self._idle_connections:
+            self._idle_connections.remove(connection)
+        # the request in flight fails
+        if connection.pending is not None:
+            connection.pending[0].set(None)
+            connection.pending = None
+
+    def _receive_loop(self, connection):
+        logger = logging.getLogger(__name__)
+        socket = connection.socket
+        while not socket.closed:
+            try:
+                frames = socket.recv_multipart()
+            except zmq.ZMQError:
+                if not socket.closed:
+                    # the connection is dropped instead of retrying to read it
+                    logger.exception('error while receiving response from %s, the connection is closed',
+                                     self.socket_path)
+                    self.nb_connection_errors += 1
+                    self._close_connection(connection)
+                break
+            if len(frames) < 2 or frames[0] != b'':
+                logger.error('invalid envelope (%s frames) received from %s', len(frames), self.socket_path)
+                continue
+            if connection.pending is None:
+                logger.error('unexpected response received from %s', self.socket_path)
+                continue
+            result, start = connection.pending
+            if connection.abandoned:
+                # the caller has already given up on this request
+                self.nb_late_responses += 1
+            else:
+                self.nb_responses += 1
+                self._record_latency(time.time() - start)
+                result.set(frames[1:])
+            self._release(connection)
+
+    def _record_latency(self, latency):
+        self._total_latency += latency
+        self._max_latency = max(self._max_latency, latency)
+
+    def send_and_receive(self, request, timeout):
+        """
+        send a serialized request and wait for its response
+
+        :param request: the serialized protobuf
+        :param timeout: timeout in milliseconds
+        :return: the serialized response or None if it hasn't arrived before the timeout
+        """
+        pbs = self._send_and_receive([request], timeout)
+        return pbs[0] if pbs else None
+
+    def send_and_receive_batch(self, batch, timeout):
+        """
+        send all the requests of the batch in one message and wait for all their responses
+
+        :param batch: a RequestBatch
+        :return: the list of the serialized responses, in the order of the requests,
+        or None if they haven't arrived before the timeout
+        """
+        pbs = self._send_and_receive([batch.pack()], timeout)
+        if not pbs:
+            return None
+        responses = unpack_batch_response(pbs[0])
+        if responses is None or len(responses) != len(batch):
+            logging.getLogger(__name__).error('invalid response received for a batch of %s requests on %s',
+                                              len(batch), self.socket_path)
+            return None
+        return responses
+
+    def _send_and_receive(self, frames, timeout):
+        connection = self._get_connection()
+        result = gevent.event.AsyncResult()
+        connection.pending = (result, time.time())
+        self.nb_requests += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            connection.socket.send_multipart([b''] + frames)
+        except zmq.ZMQError:
+            logging.getLogger(__name__).exception('error while sending request to %s', self.socket_path)
+            self.nb_connection_errors += 1
+            self._close_connection(connection)
+            return None
+        try:
+            return result.get(timeout=timeout / 1000.0)
+        except gevent.Timeout:
+            self.nb_timeouts += 1
+            # the connection will go back to the pool when the late response arrives
+            connection.abandoned = True
+            gevent.spawn_later(self.abandoned_timeout, self._close_if_abandoned, connection, result)
+            return None
+
+    def _close_if_abandoned(self, connection, result):
+        """
+        close the connection if the late response of the request has still not arrived
+        """
+        if not connection.abandoned or connection.pending is None or connection.pending[0] is not result:
+            return
+        logging.getLogger(__name__).warning('no response from %s after %ss, the connection is closed',
+                                            self.socket_path, self.abandoned_timeout)
+        self.nb_closed_abandoned += 1
+        self._close_connection(connection)
+        connection.reader.kill(block=False)
+
+    @property
+    def in_flight(self):
+        return sum(1 for c in self._connections if c.is_busy and not c.abandoned)
+
+    @property
+    def nb_abandoned(self):
+        return sum(1 for c in self._connections if c.is_busy and c.abandoned)
+
+    def close(self):
+        for connection in list(self._connections):
+            self._close_connection(connection)
+            connection.reader.kill(block=False)
+        self._idle_connections = []
+
+    def status(self):
+        return {
+            'in_flight': self.in_flight,
+            'max_in_flight': self.max_in_flight,
+            'nb_connections': len(self._connections),
+            'nb_requests': self.nb_requests,
+            'nb_timeouts': self.nb_timeouts,
+            'nb_late_responses': self.nb_late_responses,
+            'nb_abandoned': self.nb_abandoned,
+            'nb_closed_abandoned': self.nb_closed_abandoned,
+            'nb_connection_errors': self.nb_connection_errors,
+            'mean_latency': self._total_latency / self.nb_responses if self.nb_responses else None,
+            'max_latency': self._max_latency,
+        }
@@ -37,6 +37,7 @@ import zeep
 from jormungandr import cache, app
 from jormungandr.parking_space_availability import AbstractParkingPlacesProvider
 from jormungandr.parking_space_availability.bss.stands import Stands
+from jormungandr.parking_space_availability.snapshot import make_snapshot_store
 from jormungandr.ptref import FeedPublisher
 
 DEFAULT_ATOS_FEED_PUBLISHER = None
@@ -54,6 +55,9 @@ class AtosProvider(AbstractParkingPlacesProvider):
         self._client = None
         self.breaker = pybreaker.CircuitBreaker(fail_max=kwargs.get('fail_max', 5), reset_timeout=kwargs.get('reset_timeout', 120))
         self._feed_publisher = FeedPublisher(**feed_publisher) if feed_publisher else None
+        self._snapshot = make_snapshot_store(repr(self), lambda: self.breaker.call(self._get_all_stands.uncached, self),
+                                             ttl=app.config['CACHE_CONFIGURATION'].get('TIMEOUT_ATOS', 30),
+                                             cold_start_timeout=self.timeout)
 
     def __repr__(self):
         return self.WS_URL + str(self.id_ao)
@@ -66,7 +70,10 @@ class AtosProvider(AbstractParkingPlacesProvider):
     def get_informations(self, poi):
         logging.debug('building stands')
         try:
-            all_stands = self.breaker.call(self._get_all_stands)
+            if self._snapshot:
+                all_stands = self._snapshot.get() or {}
+            else:
+                all_stands = self.breaker.call(self._get_all_stands)
             ref = poi.get('properties', {}).get('ref')
             if not ref:
                 return Stands(0, 0, 'UNAVAILABLE')
@@ -100,7 +107,8 @@ class AtosProvider(AbstractParkingPlacesProvider):
             transport.session.close()
 
     def status(self):
-        return {'network': self.network, 'operators': self.operators, 'id_ao': self.id_ao}
+        return {'network': self.network, 'operators': self.operators, 'id_ao': self.id_ao,
+                'snapshot': self._snapshot.status() if self._snapshot else None}
 
     def feed_publisher(self):
         return self._feed_publisher
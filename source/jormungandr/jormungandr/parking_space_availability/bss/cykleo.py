@@ -29,13 +29,14 @@
 # www.navitia.io
 from __future__ import absolute_import, print_function, unicode_literals, division
 from jormungandr.parking_space_availability import AbstractParkingPlacesProvider
-from jormungandr import cache, app
+from jormungandr import cache, app, http_client
 import pybreaker
 import logging
 import json
 import requests as requests
 from jormungandr.ptref import FeedPublisher
 from jormungandr.parking_space_availability.bss.stands import Stands
+from jormungandr.parking_space_availability.snapshot import make_snapshot_store
 
 
 DEFAULT_CYKLEO_FEED_PUBLISHER = {
@@ -63,10 +64,15 @@ class CykleoProvider(AbstractParkingPlacesProvider):
             fail_max=kwargs.get('circuit_breaker_max_fail', app.config['CIRCUIT_BREAKER_MAX_CYKLEO_FAIL']),
             reset_timeout=kwargs.get('circuit_breaker_reset_timeout', app.config['CIRCUIT_BREAKER_CYKLEO_TIMEOUT_S']))
         self._feed_publisher = FeedPublisher(**feed_publisher) if feed_publisher else None
+        # an empty feed is an error of the service, the previous snapshot is kept
+        self._snapshot = make_snapshot_store(repr(self), lambda: self._call_webservice.uncached(self) or None,
+                                             ttl=app.config['CACHE_CONFIGURATION'].get('TIMEOUT_CYKLEO', 30),
+                                             cold_start_timeout=self.timeout)
 
     def service_caller(self, method, url, headers, data=None, params=None):
         try:
-            kwargs = {"timeout": self.timeout, "verify": self.verify_certificate, "headers": headers}
+            kwargs = {"connector": "cykleo", "timeout": self.timeout, "verify": self.verify_certificate,
+                      "headers": headers}
             if data:
                 kwargs.update({"data": data})
             if params:
@@ -95,7 +101,7 @@ class CykleoProvider(AbstractParkingPlacesProvider):
         if self.service_id is not None:
             data.update({"serviceId": self.service_id})
 
-        response = self.service_caller(method=requests.post, url='{}/bo/auth'.format(self.url),
+        response = self.service_caller(method=http_client.post, url='{}/bo/auth'.format(self.url),
                                        headers=headers, data=json.dumps(data))
         if not response:
             return None
@@ -111,7 +117,7 @@ class CykleoProvider(AbstractParkingPlacesProvider):
         access_token = self.get_access_token()
         headers = {'Authorization': 'Bearer {}'.format(access_token)}
         params = None if self.organization_id is None else {'organization_id': self.organization_id}
-        data = self.service_caller(method=requests.get,
+        data = self.service_caller(method=http_client.get,
                                    url='{}/bo/stations/availability'.format(self.url),
                                    headers=headers,
                                    params=params)
@@ -128,7 +134,8 @@ class CykleoProvider(AbstractParkingPlacesProvider):
                properties.get('network', '').lower() == self.network
 
     def status(self):
-        return {'network': self.network, 'operators': self.operators}
+        return {'network': self.network, 'operators': self.operators,
+                'snapshot': self._snapshot.status() if self._snapshot else None}
 
     def feed_publisher(self):
         return self._feed_publisher
@@ -140,7 +147,7 @@ class CykleoProvider(AbstractParkingPlacesProvider):
         ref = poi.get('properties', {}).get('ref')
         if ref is not None:
             ref = ref.lstrip('0')
-        data = self._call_webservice()
+        data = self._snapshot.get() if self._snapshot else self._call_webservice()
 
         # Possible status values of the station: IN_SERVICE, IN_MAINTENANCE, OUT_OF_SERVICE, DISCONNECTED
         # and DECOMMISSIONED
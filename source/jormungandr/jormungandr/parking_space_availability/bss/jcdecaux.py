@@ -32,9 +32,10 @@ import logging
 import pybreaker
 import requests as requests
 
-from jormungandr import cache, app
+from jormungandr import cache, app, http_client
 from jormungandr.parking_space_availability import AbstractParkingPlacesProvider
 from jormungandr.parking_space_availability.bss.stands import Stands
+from jormungandr.parking_space_availability.snapshot import make_snapshot_store
 from jormungandr.ptref import FeedPublisher
 
 DEFAULT_JCDECAUX_FEED_PUBLISHER = {
@@ -60,6 +61,9 @@ class JcdecauxProvider(AbstractParkingPlacesProvider):
         reset_timeout = kwargs.get('circuit_breaker_reset_timeout', app.config['CIRCUIT_BREAKER_JCDECAUX_TIMEOUT_S'])
         self.breaker = pybreaker.CircuitBreaker(fail_max=fail_max, reset_timeout=reset_timeout)
         self._feed_publisher = FeedPublisher(**feed_publisher) if feed_publisher else None
+        self._snapshot = make_snapshot_store(repr(self), lambda: self._call_webservice.uncached(self),
+                                             ttl=app.config['CACHE_CONFIGURATION'].get('TIMEOUT_JCDECAUX', 30),
+                                             cold_start_timeout=self.timeout)
 
     def support_poi(self, poi):
         properties = poi.get('properties', {})
@@ -69,7 +73,8 @@ class JcdecauxProvider(AbstractParkingPlacesProvider):
     @cache.memoize(app.config['CACHE_CONFIGURATION'].get('TIMEOUT_JCDECAUX', 30))
     def _call_webservice(self):
         try:
-            data = self.breaker.call(requests.get, self.WS_URL_TEMPLATE.format(self.contract, self.api_key), timeout=self.timeout)
+            data = self.breaker.call(http_client.get, self.WS_URL_TEMPLATE.format(self.contract, self.api_key),
+                                     connector='jcdecaux', timeout=self.timeout)
             stands = {}
             for s in data.json():
                 stands[str(s['number'])] = s
@@ -85,7 +90,7 @@ class JcdecauxProvider(AbstractParkingPlacesProvider):
     def get_informations(self, poi):
         # Possible status values of the station: OPEN and CLOSED
         ref = poi.get('properties', {}).get('ref')
-        data = self._call_webservice()
+        data = self._snapshot.get() if self._snapshot else self._call_webservice()
         if data and 'status' in data.get(ref, {}):
             if data[ref]['status'] == 'OPEN':
                 return Stands(data[ref].get('available_bike_stands', 0), data[ref].get('available_bikes', 0), 'OPEN')
@@ -94,7 +99,8 @@ class JcdecauxProvider(AbstractParkingPlacesProvider):
         return Stands(0, 0, 'UNAVAILABLE')
 
     def status(self):
-        return {'network': self.network, 'operators': self.operators, 'contract': self.contract}
+        return {'network': self.network, 'operators': self.operators, 'contract': self.contract,
+                'snapshot': self._snapshot.status() if self._snapshot else None}
 
     def feed_publisher(self):
         return self._feed_publisher
@@ -30,7 +30,9 @@
 from __future__ import absolute_import, print_function, unicode_literals, division
 from jormungandr.parking_space_availability.bss.jcdecaux import JcdecauxProvider
 from jormungandr.parking_space_availability.bss.stands import Stands
+from jormungandr import app
 from mock import MagicMock
+import mock
 import requests_mock
 
 poi = {
@@ -124,3 +126,20 @@ def test_call_mocked_request():
         m.get('https://api.jcdecaux.com/vls/v1/stations/', json=webservice_response)
         assert provider.get_informations(poi) == Stands(4, 8, 'OPEN')
         assert m.called
+
+
+def parking_space_availability_jcdecaux_snapshot_not_memoized_test():
+    """
+    the snapshot is refreshed with the non memoized call, else it would be as old as the cache plus its ttl
+    """
+    webservice_response = {'2': {
+        'available_bike_stands': 4,
+        'available_bikes': 8,
+        'status': 'OPEN'
+    }}
+    with mock.patch.dict(app.config, {'PARKING_SNAPSHOT_ENABLED': True}):
+        provider = JcdecauxProvider(u"vélib'", 'Paris', 'api_key', {'jcdecaux'})
+    call_webservice = JcdecauxProvider.__dict__['_call_webservice']
+    with mock.patch.object(call_webservice, 'uncached', return_value=webservice_response) as uncached:
+        assert provider.get_informations(poi) == Stands(4, 8, 'OPEN')
+    uncached.assert_called_once_with(provider)
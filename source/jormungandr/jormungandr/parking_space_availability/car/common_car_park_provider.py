@@ -34,8 +34,9 @@ import logging
 import pybreaker
 import requests as requests
 
-from jormungandr import cache, app, utils, new_relic
+from jormungandr import cache, app, utils, new_relic, http_client
 from jormungandr.parking_space_availability import AbstractParkingPlacesProvider
+from jormungandr.parking_space_availability.snapshot import make_snapshot_store
 from abc import abstractmethod
 
 
@@ -55,6 +56,12 @@ class CommonCarParkProvider(AbstractParkingPlacesProvider):
         if kwargs.get('api_key'):
             self.api_key = kwargs.get('api_key')
 
+        request_url = self.ws_service_template.format(self.dataset)
+        self._snapshot = make_snapshot_store('car_park-{}'.format(self.dataset),
+                                             lambda: self._call_webservice.uncached(self, request_url),
+                                             ttl=app.config['CACHE_CONFIGURATION'].get('TIMEOUT_CAR_PARK', 30),
+                                             cold_start_timeout=self.timeout)
+
     @abstractmethod
     def process_data(self, data, poi):
         pass
@@ -63,7 +70,10 @@ class CommonCarParkProvider(AbstractParkingPlacesProvider):
         if not poi.get('properties', {}).get('ref'):
             return
 
-        data = self._call_webservice(self.ws_service_template.format(self.dataset))
+        if self._snapshot:
+            data = self._snapshot.get()
+        else:
+            data = self._call_webservice(self.ws_service_template.format(self.dataset))
 
         if data:
             return self.process_data(data, poi)
@@ -79,7 +89,8 @@ class CommonCarParkProvider(AbstractParkingPlacesProvider):
                 headers = {'Authorization': 'apiKey {}'.format(self.api_key)}
             else:
                 headers = None
-            data = self.breaker.call(requests.get, url=request_url, headers=headers, timeout=self.timeout)
+            data = self.breaker.call(http_client.get, url=request_url, connector='car_park', headers=headers,
+                                     timeout=self.timeout)
             # record in newrelic
             self.record_call("OK")
             return data.json()
@@ -102,7 +113,7 @@ class CommonCarParkProvider(AbstractParkingPlacesProvider):
         return None
 
     def status(self):
-        return {'operators': self.operators}
+        return {'operators': self.operators, 'snapshot': self._snapshot.status() if self._snapshot else None}
 
     def feed_publisher(self):
         return self._feed_publisher
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2001-2018, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+from __future__ import absolute_import, print_function, unicode_literals, division
+import logging
+import random
+import time
+import gevent
+from jormungandr import app
+
+
+class SnapshotStore(object):
+    """
+    In-memory snapshot of the whole feed of a provider, refreshed in the background
+
+    - the snapshot is served as long as it's not older than max_staleness, even if it's expired
+      (stale-while-revalidate): a request never waits for the provider once the snapshot is loaded
+    - when it's expired (after ttl, with a small jitter so that the workers don't refresh at the same time)
+      a refresh is launched in a greenlet, only one refresh is running at a time (single-flight)
+    - if the refresh fails (fetch returns None), the previous snapshot is kept
+    - the first call waits for the first load, at most cold_start_timeout seconds
+    - fetch must not be cached (the providers give the non memoized call): the age of the snapshot
+      is counted from its refresh, a cached feed would be older than max_staleness allows
+    """
+
+    def __init__(self, name, fetch, ttl, max_staleness, cold_start_timeout=None):
+        self.name = name
+        self._fetch = fetch
+        self.ttl = ttl
+        self.max_staleness = max_staleness
+        self.cold_start_timeout = cold_start_timeout
+        self._value = None
+        self._updated_at = None
+        self._next_refresh = 0
+        self._refreshing = None
+        self.nb_refreshes = 0
+        self.nb_errors = 0
+
+    def _refresh(self):
+        logger = logging.getLogger(__name__)
+        try:
+            value = self._fetch()
+        except Exception:
+            logger.exception('error while refreshing the snapshot of %s', self.name)
+            value = None
+        if value is None:
+            self.nb_errors += 1
+        else:
+            self._value = value
+            self._updated_at = time.time()
+            self.nb_refreshes += 1
+        self._next_refresh = time.time() + self.ttl * random.uniform(0.9, 1.1)
+
+    def _start_refresh(self):
+        if self._refreshing is None or self._refreshing.ready():
+            self._refreshing = gevent.spawn(self._refresh)
+        return self._refreshing
+
+    def get(self):
+        """
+        return the snapshot, None if it's not loaded or too old
+        """
+        if self._updated_at is None:
+            if time.time() >= self._next_refresh:
+                self._start_refresh().join(timeout=self.cold_start_timeout)
+            if self._updated_at is None:
+                return None
+        elif time.time() >= self._next_refresh:
+            self._start_refresh()
+
+        if time.time() - self._updated_at > self.max_staleness:
+            return None
+        return self._value
+
+    def status(self):
+        return {
+            'name': self.name,
+            'age': time.time() - self._updated_at if self._updated_at is not None else None,
+            'size': len(self._value) if self._value is not None else None,
+            'nb_refreshes': self.nb_refreshes,
+            'nb_errors': self.nb_errors,
+            'is_refreshing': self._refreshing is not None and not self._refreshing.ready(),
+        }
+
+
+def make_snapshot_store(name, fetch, ttl, cold_start_timeout):
+    """
+    build the snapshot store of a provider if they are activated, None otherwise
+    """
+    if not app.config.get('PARKING_SNAPSHOT_ENABLED', False):
+        return None
+    return SnapshotStore(name, fetch, ttl,
+                         max_staleness=app.config.get('PARKING_SNAPSHOT_MAX_STALENESS', 300),
+                         cold_start_timeout=cold_start_timeout)
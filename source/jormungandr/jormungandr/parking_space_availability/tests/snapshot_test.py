@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2001-2018, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+from __future__ import absolute_import, print_function, unicode_literals, division
+import gevent
+import gevent.event
+from jormungandr.parking_space_availability.snapshot import SnapshotStore
+
+
+class FakeFeed(object):
+    def __init__(self, values):
+        self.values = list(values)
+        self.nb_calls = 0
+        self.can_answer = gevent.event.Event()
+        self.can_answer.set()
+
+    def __call__(self):
+        self.nb_calls += 1
+        self.can_answer.wait()
+        return self.values.pop(0)
+
+
+def cold_start_test():
+    """
+    the first call waits for the first load
+    """
+    feed = FakeFeed([{'1': 'stands'}])
+    snapshot = SnapshotStore('test', feed, ttl=60, max_staleness=300, cold_start_timeout=1)
+
+    assert snapshot.get() == {'1': 'stands'}
+    assert snapshot.get() == {'1': 'stands'}
+    assert feed.nb_calls == 1
+
+
+def stale_while_revalidate_test():
+    """
+    an expired snapshot is still served while it's refreshed in the background, only once
+    """
+    feed = FakeFeed([{'1': 'old'}, {'1': 'new'}])
+    snapshot = SnapshotStore('test', feed, ttl=60, max_staleness=300, cold_start_timeout=1)
+    assert snapshot.get() == {'1': 'old'}
+
+    snapshot._next_refresh = 0
+    feed.can_answer.clear()
+    assert snapshot.get() == {'1': 'old'}
+    assert snapshot.get() == {'1': 'old'}
+    gevent.sleep(0)
+    assert snapshot.status()['is_refreshing']
+
+    feed.can_answer.set()
+    gevent.sleep(0)
+    assert snapshot.get() == {'1': 'new'}
+    assert feed.nb_calls == 2
+    assert snapshot.status()['nb_refreshes'] == 2
+
+
+def failed_refresh_test():
+    """
+    the previous snapshot is kept when the refresh fails, until it's too old
+    """
+    feed = FakeFeed([{'1': 'stands'}, None])
+    snapshot = SnapshotStore('test', feed, ttl=60, max_staleness=300, cold_start_timeout=1)
+    assert snapshot.get() == {'1': 'stands'}
+
+    snapshot._next_refresh = 0
+    snapshot.get()
+    gevent.sleep(0)
+    assert snapshot.get() == {'1': 'stands'}
+    assert snapshot.status()['nb_errors'] == 1
+
+    snapshot._updated_at -= 301
+    assert snapshot.get() is None
@@ -34,7 +34,7 @@ from flask import logging
 import pybreaker
 import pytz
 import requests as requests
-from jormungandr import cache, app
+from jormungandr import cache, app, http_client
 from jormungandr.schedule import RealTimePassage
 from datetime import datetime
 
@@ -85,7 +85,8 @@ class Cleverage(RealtimeProxy):
         """
         logging.getLogger(__name__).debug('Cleverage RT service , call url : {}'.format(url))
         try:
-            return self.breaker.call(requests.get, url, timeout=self.timeout, headers=self.service_args)
+            return self.breaker.call(http_client.get, url, connector='cleverage', timeout=self.timeout,
+                                     headers=self.service_args)
         except pybreaker.CircuitBreakerError as e:
             logging.getLogger(__name__).error('Cleverage RT service dead, using base '
                                               'schedule (error: {}'.format(e))
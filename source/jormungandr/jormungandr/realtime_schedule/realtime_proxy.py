@@ -36,6 +36,7 @@ from jormungandr.utils import timestamp_to_datetime, record_external_failure
 from jormungandr.utils import date_to_timestamp, pb_del_if
 from jormungandr import new_relic
 from navitiacommon import type_pb2
+from collections import OrderedDict
 import datetime
 import hashlib
 import logging
@@ -75,11 +76,25 @@ class RealtimeProxyError(RuntimeError):
     pass
 
 
+def group_route_points_by_stop(route_points, object_id_tag):
+    """
+    group the route points by the code of their stop point
+    """
+    groups = OrderedDict()
+    for route_point in route_points:
+        groups.setdefault(route_point.fetch_stop_id(object_id_tag), []).append(route_point)
+    return groups
+
+
 class RealtimeProxy(six.with_metaclass(ABCMeta, object)):
     """
     abstract class managing calls to external service providing real-time next passages
     """
 
+    # True if the proxy gets the next passages of all the route points of a stop with one call
+    # (it overrides _get_next_passages_for_route_points)
+    has_bulk_next_passages = False
+
     @abstractmethod
     def _get_next_passage_for_route_point(self, route_point, count, from_dt, current_dt, duration):
         """
@@ -87,6 +102,16 @@ class RealtimeProxy(six.with_metaclass(ABCMeta, object)):
         """
         pass
 
+    def _get_next_passages_for_route_points(self, route_points, count, from_dt, current_dt, duration):
+        """
+        get the next passages of several route points, returns a dict route_point => passages
+
+        by default the external service is called for each route point
+        """
+        return {route_point: self._get_next_passage_for_route_point(route_point, count, from_dt,
+                                                                    current_dt, duration)
+                for route_point in route_points}
+
     def _filter_passages(self, passages, count, from_dt, duration, timezone=None):
         """
         after getting the next passages from the proxy, we might want to filter some
@@ -130,6 +155,25 @@ class RealtimeProxy(six.with_metaclass(ABCMeta, object)):
             self.record_call('failure', reason=str(e))
             return None
 
+    def next_passages_for_route_points(self, route_points, count=None, from_dt=None, current_dt=None,
+                                       duration=86400, timezone=None):
+        """
+        bulk version of next_passage_for_route_point
+
+        returns a dict route_point => next realtime passages (None if they are not available)
+        """
+        try:
+            next_passages = self._get_next_passages_for_route_points(route_points, count, from_dt,
+                                                                     current_dt, duration)
+            self.record_call('ok')
+        except RealtimeProxyError as e:
+            self.record_call('failure', reason=str(e))
+            return {route_point: None for route_point in route_points}
+
+        return {route_point: self._filter_passages(next_passages.get(route_point), count, from_dt,
+                                                   duration, timezone)
+                for route_point in route_points}
+
     # Method used to filter schedules from kraken before merging. By default remove all schedules.
     # Overload this to keep some and mix kraken and proxy datas.
     def _filter_base_stop_schedule(self, date_time):
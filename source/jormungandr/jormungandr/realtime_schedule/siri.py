@@ -33,12 +33,33 @@ from __future__ import absolute_import, print_function, unicode_literals, divisi
 from flask import logging
 import pybreaker
 import requests as requests
-from jormungandr import cache, app
-from jormungandr.realtime_schedule.realtime_proxy import RealtimeProxy, RealtimeProxyError, floor_datetime
+from jormungandr import cache, app, http_client
+from jormungandr.realtime_schedule.realtime_proxy import RealtimeProxy, RealtimeProxyError, floor_datetime, \
+    group_route_points_by_stop
 from jormungandr.schedule import RealTimePassage
-import xml.etree.ElementTree as et
+try:
+    # the C implementation is several times faster to parse the (big) StopMonitoring responses
+    import xml.etree.cElementTree as et
+except ImportError:
+    import xml.etree.ElementTree as et
 import aniso8601
 from datetime import datetime
+from io import BytesIO
+import six
+
+
+SIRI_NS = '{http://www.siri.org.uk/siri}'
+MONITORED_STOP_VISIT_TAG = SIRI_NS + 'MonitoredStopVisit'
+# the C iterparse of python 2 only accepts native strings as events
+ITERPARSE_EVENTS = (str('start'), str('end'))
+# tags of a MonitoredStopVisit used to build the passages, only their first occurrence in a visit is kept
+VISIT_FIELD_TAGS = {
+    SIRI_NS + 'StopPointRef': 'stop',
+    SIRI_NS + 'LineRef': 'line',
+    SIRI_NS + 'DirectionName': 'route',
+    SIRI_NS + 'DestinationName': 'destination',
+    SIRI_NS + 'ExpectedDepartureTime': 'departure',
+}
 
 
 class Siri(RealtimeProxy):
@@ -120,16 +141,29 @@ class Siri(RealtimeProxy):
         except:
             return self.rt_system_id
 
+    has_bulk_next_passages = True
+
     def _get_next_passage_for_route_point(self, route_point, count, from_dt, current_dt, duration=None):
-        stop = route_point.fetch_stop_id(self.object_id_tag)
-        request = self._make_request(monitoring_ref=stop, dt=from_dt, count=count)
-        if not request:
-            return None
-        siri_response = self._call_siri(request)
-        if not siri_response or siri_response.status_code != 200:
-            raise RealtimeProxyError('invalid response')
-        logging.getLogger(__name__).debug('siri for {}: {}'.format(stop, siri_response.text))
-        return self._get_passages(siri_response.content, route_point)
+        return self._get_next_passages_for_route_points([route_point], count, from_dt,
+                                                        current_dt, duration)[route_point]
+
+    def _get_next_passages_for_route_points(self, route_points, count, from_dt, current_dt, duration=None):
+        """
+        siri is asked once by stop (MonitoringRef), the passages of all the routes of the stop are
+        then dispatched between the route points
+        """
+        next_passages = {}
+        for stop, stop_route_points in group_route_points_by_stop(route_points, self.object_id_tag).items():
+            request = self._make_request(monitoring_ref=stop, dt=from_dt, count=count)
+            if not request:
+                next_passages.update((route_point, None) for route_point in stop_route_points)
+                continue
+            siri_response = self._call_siri(request)
+            if not siri_response or siri_response.status_code != 200:
+                raise RealtimeProxyError('invalid response')
+            logging.getLogger(__name__).debug('siri for {}: {}'.format(stop, siri_response.text))
+            next_passages.update(self._get_passages_for_route_points(siri_response.content, stop_route_points))
+        return next_passages
 
     def status(self):
         return {
@@ -143,33 +177,55 @@ class Siri(RealtimeProxy):
         }
 
     def _get_passages(self, xml, route_point):
-        ns = {'siri': 'http://www.siri.org.uk/siri'}
+        return self._get_passages_for_route_points(xml, [route_point])[route_point]
+
+    def _get_passages_for_route_points(self, xml, route_points):
+        """
+        parse the StopMonitoring response once and dispatch its visits between the route points
+
+        the response is parsed incrementally, each visit is dropped as soon as it has been read
+        and only the visits matching the (stop, line, route) of a route point are kept
+        """
+        route_points_by_key = {}
+        for route_point in route_points:
+            key = (route_point.fetch_stop_id(self.object_id_tag),
+                   route_point.fetch_line_id(self.object_id_tag),
+                   route_point.fetch_route_id(self.object_id_tag))
+            route_points_by_key.setdefault(key, []).append(route_point)
+
+        passages_by_key = {key: [] for key in route_points_by_key}
+        if isinstance(xml, six.text_type):
+            xml = xml.encode('utf-8')
+        visit = None
         try:
-            root = et.fromstring(xml)
-        except et.ParseError as e:
+            for event, elt in et.iterparse(BytesIO(xml), events=ITERPARSE_EVENTS):
+                if event == 'start':
+                    if elt.tag == MONITORED_STOP_VISIT_TAG:
+                        visit = {}
+                    continue
+                if visit is None:
+                    continue
+                field = VISIT_FIELD_TAGS.get(elt.tag)
+                if field and field not in visit:
+                    visit[field] = elt.text
+                elif elt.tag == MONITORED_STOP_VISIT_TAG:
+                    passages = passages_by_key.get((visit.get('stop'), visit.get('line'), visit.get('route')))
+                    if passages is not None:
+                        passages.append(self._make_passage(visit))
+                    visit = None
+                    elt.clear()
+        except et.ParseError:
             logging.getLogger(__name__).exception("invalid xml")
             raise RealtimeProxyError('invalid xml')
 
-        stop = route_point.fetch_stop_id(self.object_id_tag)
-        line = route_point.fetch_line_id(self.object_id_tag)
-        route = route_point.fetch_route_id(self.object_id_tag)
-        next_passages = []
-        for visit in root.findall('.//siri:MonitoredStopVisit', ns):
-            cur_stop = visit.find('.//siri:StopPointRef', ns).text
-            if stop != cur_stop:
-                continue
-            cur_line = visit.find('.//siri:LineRef', ns).text
-            if line != cur_line:
-                continue
-            cur_route = visit.find('.//siri:DirectionName', ns).text
-            if route != cur_route:
-                continue
-            cur_destination = visit.find('.//siri:DestinationName', ns).text
-            cur_dt = visit.find('.//siri:ExpectedDepartureTime', ns).text
-            cur_dt = aniso8601.parse_datetime(cur_dt)
-            next_passages.append(RealTimePassage(cur_dt, cur_destination))
+        return {route_point: passages_by_key[key]
+                for key, rps in route_points_by_key.items() for route_point in rps}
 
-        return next_passages
+    @staticmethod
+    def _make_passage(visit):
+        if not visit.get('departure'):
+            raise RealtimeProxyError('invalid visit, no ExpectedDepartureTime')
+        return RealTimePassage(aniso8601.parse_datetime(visit['departure']), visit.get('destination'))
 
     @cache.memoize(app.config['CACHE_CONFIGURATION'].get('TIMEOUT_SIRI', 60))
     def _call_siri(self, request):
@@ -181,8 +237,9 @@ class Siri(RealtimeProxy):
 
         logging.getLogger(__name__).debug('siri RT service, post at {}: {}'.format(self.service_url, request))
         try:
-            return self.breaker.call(requests.post,
+            return self.breaker.call(http_client.post,
                                      url=self.service_url,
+                                     connector='siri',
                                      headers=headers,
                                      data=encoded_request,
                                      verify=False,
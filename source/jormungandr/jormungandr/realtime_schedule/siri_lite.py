@@ -34,7 +34,7 @@ import logging
 import pybreaker
 import pytz
 import requests as requests
-from jormungandr import cache, app
+from jormungandr import cache, app, http_client
 from jormungandr.schedule import RealTimePassage
 from datetime import datetime
 
@@ -66,7 +66,7 @@ class SiriLite(RealtimeProxy):
     def _call(self, url):
         self.log.debug('sirilite RT service, call url: {}'.format(url))
         try:
-            return self.breaker.call(requests.get, url, timeout=self.timeout)
+            return self.breaker.call(http_client.get, url, connector='siri_lite', timeout=self.timeout)
         except pybreaker.CircuitBreakerError as e:
             self.log.error('sirilite RT service dead, using base schedule (error: {}'.format(e))
             raise RealtimeProxyError('circuit breaker open')
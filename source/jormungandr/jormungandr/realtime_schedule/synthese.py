@@ -31,7 +31,8 @@
 from __future__ import absolute_import, print_function, unicode_literals, division
 import itertools
 
-from jormungandr.realtime_schedule.realtime_proxy import RealtimeProxy, RealtimeProxyError
+from jormungandr.realtime_schedule.realtime_proxy import RealtimeProxy, RealtimeProxyError, \
+    group_route_points_by_stop
 from jormungandr.schedule import RealTimePassage
 import xml.etree.ElementTree as et
 from jormungandr.interfaces.parsers import DateTimeFormat
@@ -39,7 +40,7 @@ import pytz
 from flask import logging
 import pybreaker
 import requests as requests
-from jormungandr import cache, app
+from jormungandr import cache, app, http_client
 from datetime import datetime
 from navitiacommon.ratelimit import RateLimiter, FakeRateLimiter
 from navitiacommon import type_pb2
@@ -122,7 +123,7 @@ class Synthese(RealtimeProxy):
         try:
             if not self.rate_limiter.acquire(self.rt_system_id, block=False):
                 raise RealtimeProxyError('maximum rate reached')
-            return self.breaker.call(requests.get, url, timeout=self.timeout)
+            return self.breaker.call(http_client.get, url, connector='synthese', timeout=self.timeout)
         except pybreaker.CircuitBreakerError as e:
             logging.getLogger(__name__).error('Synthese RT service dead, using base '
                                               'schedule (error: {}'.format(e))
@@ -138,7 +139,29 @@ class Synthese(RealtimeProxy):
             logging.getLogger(__name__).exception('Synthese RT error, using base schedule')
             raise RealtimeProxyError(str(e))
 
+    has_bulk_next_passages = True
+
     def _get_next_passage_for_route_point(self, route_point, count=None, from_dt=None, current_dt=None, duration=None):
+        return self._get_next_passages_for_route_points([route_point], count, from_dt,
+                                                        current_dt, duration)[route_point]
+
+    def _get_next_passages_for_route_points(self, route_points, count=None, from_dt=None, current_dt=None,
+                                            duration=None):
+        """
+        synthese is queried by stop point, so it is called once for all the route points of a stop
+        """
+        next_passages = {}
+        for stop_route_points in group_route_points_by_stop(route_points, self.object_id_tag).values():
+            passages = self._get_stop_passages(stop_route_points[0], count, from_dt)
+            for route_point in stop_route_points:
+                next_passages[route_point] = self._find_route_point_passages(route_point, passages) \
+                    if passages is not None else None
+        return next_passages
+
+    def _get_stop_passages(self, route_point, count=None, from_dt=None):
+        """
+        get all the synthese passages of the stop point of the route point
+        """
         url = self._make_url(route_point, count, from_dt)
         if not url:
             return None
@@ -155,9 +178,7 @@ class Synthese(RealtimeProxy):
             return None
 
         logging.getLogger(__name__).debug("synthese response: {}".format(r.text))
-        passages = self._get_synthese_passages(r.content)
-
-        return self._find_route_point_passages(route_point, passages)
+        return self._get_synthese_passages(r.content)
 
     def _make_url(self, route_point, count=None, from_dt=None):
         """
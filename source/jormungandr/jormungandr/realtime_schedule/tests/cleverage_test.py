@@ -382,7 +382,7 @@ def next_passage_for_route_point_test(mock_good_response):
 
     route_point = MockRoutePoint(line_code='05', stop_id='stop_tutu')
 
-    with mock.patch('requests.get', mock_requests.get):
+    with mock.patch('jormungandr.http_client.get', mock_requests.get):
         passages = cleverage.next_passage_for_route_point(route_point)
 
         assert len(passages) == 2
@@ -408,7 +408,7 @@ def next_passage_for_route_point_local_timezone_test(mock_good_response):
 
     route_point = MockRoutePoint(line_code='05', stop_id='stop_tutu')
 
-    with mock.patch('requests.get', mock_requests.get):
+    with mock.patch('jormungandr.http_client.get', mock_requests.get):
         passages = cleverage.next_passage_for_route_point(route_point)
 
         assert len(passages) == 2
@@ -434,7 +434,7 @@ def next_passage_for_empty_response_test(mock_empty_response):
 
     route_point = MockRoutePoint(line_code='05', stop_id='stop_tutu')
 
-    with mock.patch('requests.get', mock_requests.get):
+    with mock.patch('jormungandr.http_client.get', mock_requests.get):
         passages = cleverage.next_passage_for_route_point(route_point)
 
         assert passages is None
@@ -455,7 +455,7 @@ def next_passage_for_missing_line_response_test(mock_missing_line_response):
 
     route_point = MockRoutePoint(line_code='05', stop_id='stop_tutu')
 
-    with mock.patch('requests.get', mock_requests.get):
+    with mock.patch('jormungandr.http_client.get', mock_requests.get):
         passages = cleverage.next_passage_for_route_point(route_point)
 
         assert passages is None
@@ -476,7 +476,7 @@ def next_passage_with_theoric_time_response_test(mock_theoric_response):
 
     route_point = MockRoutePoint(line_code='05', stop_id='stop_tutu')
 
-    with mock.patch('requests.get', mock_requests.get):
+    with mock.patch('jormungandr.http_client.get', mock_requests.get):
         passages = cleverage.next_passage_for_route_point(route_point)
 
         assert len(passages) == 2
@@ -33,6 +33,9 @@ from dateutil.parser import parse
 import mock
 import pytz
 from jormungandr.realtime_schedule.siri import Siri
+from jormungandr.realtime_schedule.realtime_proxy import RealtimeProxyError
+import pytest
+import re
 import validators
 from jormungandr.realtime_schedule.tests.utils import MockRoutePoint, _timestamp
 import xml.etree.ElementTree as et
@@ -131,7 +134,7 @@ def next_passage_for_route_point_test():
     mock_requests = MockRequests({'http://bob.com/': (mock_good_response(), 200)})
     route_point = MockRoutePoint(route_id='route_tata', line_id='line_toto', stop_id='stop_tutu')
 
-    with mock.patch('requests.post', mock_requests.post):
+    with mock.patch('jormungandr.http_client.post', mock_requests.post):
         passages = siri._get_next_passage_for_route_point(route_point,
                                                           from_dt=_timestamp("12:00"),
                                                           current_dt=_timestamp("12:00"),
@@ -152,12 +155,74 @@ def next_passage_for_route_point_failure_test():
 
     route_point = MockRoutePoint(route_id='route_tata', line_id='line_toto', stop_id='stop_tutu')
 
-    with mock.patch('requests.post', mock_requests.post):
+    with mock.patch('jormungandr.http_client.post', mock_requests.post):
         passages = siri.next_passage_for_route_point(route_point, from_dt=_timestamp("12:00"), count=2)
 
         assert passages is None
 
+def next_passages_for_route_points_test():
+    """
+    siri is called once for all the route points of a stop, the passages are dispatched by route point
+    """
+    siri = Siri(id='tata', service_url='http://bob.com/', requestor_ref='Stibada')
+    mock_requests = MockRequests({'http://bob.com/': (mock_good_response(), 200)})
+    calls = []
+
+    def post(*args, **kwargs):
+        calls.append(kwargs)
+        return mock_requests.post(*args, **kwargs)
+
+    route_point = MockRoutePoint(route_id='route_tata', line_id='line_toto', stop_id='stop_tutu')
+    other_route_point = MockRoutePoint(route_id='route_titi', line_id='line_toto', stop_id='stop_tutu')
+
+    with mock.patch('jormungandr.http_client.post', post):
+        passages = siri.next_passages_for_route_points([route_point, other_route_point],
+                                                       from_dt=_timestamp("12:00", month=3, day=29), count=2)
+
+        assert len(calls) == 1
+        assert len(passages[route_point]) == 1
+        assert passages[route_point][0].datetime == datetime.datetime(2016, 3, 29, 13, 37, tzinfo=pytz.UTC)
+        assert passages[other_route_point] == []
+
+
 def status_test():
     siri = Siri(id=u"tata-é$~#@\"*!'`§èû", service_url='http://bob.com/', requestor_ref='Stibada')
     status = siri.status()
     assert status['id'] == u'tata-é$~#@"*!\'`§èû'
+
+
+def mock_big_response(nb_visits):
+    """
+    the good response with its visit repeated on 5 lines and 2 routes
+    """
+    response = mock_good_response()
+    visit = re.search(r'( *<ns5:MonitoredStopVisit>.*?</ns5:MonitoredStopVisit>\n)', response, re.S).group(1)
+    visits = ''.join(visit.replace('>line_toto<', '>line_{}<'.format(i % 5))
+                          .replace('>route_tata<', '>route_{}<'.format(i % 2)) for i in range(nb_visits))
+    return response.replace(visit, visits)
+
+
+def get_passages_for_route_points_big_response_test():
+    """
+    the response is parsed once and its visits are dispatched between all the route points
+    """
+    siri = Siri(id='tata', service_url='http://bob.com/', requestor_ref='Stibada')
+    route_points = [MockRoutePoint(route_id='route_{}'.format(r), line_id='line_{}'.format(l), stop_id='stop_tutu')
+                    for l in (1, 3) for r in (0, 1)]
+    unknown_route_point = MockRoutePoint(route_id='route_0', line_id='line_1', stop_id='stop_tata')
+
+    passages = siri._get_passages_for_route_points(mock_big_response(1000), route_points + [unknown_route_point])
+
+    for route_point in route_points:
+        assert len(passages[route_point]) == 100
+        assert passages[route_point][0].datetime == datetime.datetime(2016, 3, 29, 13, 37, tzinfo=pytz.UTC)
+        assert passages[route_point][0].direction == 'Georges Pompidou'
+    assert passages[unknown_route_point] == []
+
+
+def get_passages_for_route_points_invalid_xml_test():
+    siri = Siri(id='tata', service_url='http://bob.com/', requestor_ref='Stibada')
+    route_point = MockRoutePoint(route_id='route_tata', line_id='line_toto', stop_id='stop_tutu')
+
+    with pytest.raises(RealtimeProxyError):
+        siri._get_passages_for_route_points(mock_good_response()[:-200], [route_point])
@@ -34,6 +34,8 @@ import mock
 import pytz
 from jormungandr.realtime_schedule.synthese import Synthese
 import validators
+from pytest import raises
+from jormungandr.realtime_schedule.realtime_proxy import RealtimeProxyError
 from jormungandr.realtime_schedule.tests.utils import MockRoutePoint, _timestamp
 
 
@@ -141,7 +143,7 @@ def next_passage_for_route_point_test():
 
     route_point = MockRoutePoint(route_id='route_tata', line_id='line_toto', stop_id='stop_tutu')
 
-    with mock.patch('requests.get', mock_requests.get):
+    with mock.patch('jormungandr.http_client.get', mock_requests.get):
         passages = synthese.next_passage_for_route_point(route_point)
 
         assert len(passages) == 3
@@ -166,12 +168,55 @@ def next_passage_for_route_point_failure_test():
 
     route_point = MockRoutePoint(route_id='route_tata', line_id='line_toto', stop_id='stop_tutu')
 
-    with mock.patch('requests.get', mock_requests.get):
+    with mock.patch('jormungandr.http_client.get', mock_requests.get):
         passages = synthese.next_passage_for_route_point(route_point)
 
         assert passages is None
 
+def next_passages_for_route_points_test():
+    """
+    all the route points of a stop are handled with only one call to synthese
+    """
+    synthese = Synthese(id='tata', timezone='UTC', service_url='http://bob.com/')
+
+    mock_requests = MockRequests({
+        'http://bob.com/?SERVICE=tdg&roid=stop_tutu':
+        (mock_good_response(), 200)
+    })
+    calls = []
+
+    def get(url, *args, **kwargs):
+        calls.append(url)
+        return mock_requests.get(url, *args, **kwargs)
+
+    route_point_tata = MockRoutePoint(route_id='route_tata', line_id='line_toto', stop_id='stop_tutu')
+    route_point_toto = MockRoutePoint(route_id='route_toto', line_id='line_toto', stop_id='stop_tutu')
+
+    with mock.patch('jormungandr.http_client.get', get):
+        passages = synthese.next_passages_for_route_points([route_point_tata, route_point_toto])
+
+        assert len(calls) == 1
+        assert [p.datetime for p in passages[route_point_tata]] == \
+            [datetime.datetime(2016, 3, 29, 13, m, tzinfo=pytz.UTC) for m in (37, 47, 57)]
+        assert [p.datetime for p in passages[route_point_toto]] == \
+            [datetime.datetime(2016, 3, 29, 13, 48, tzinfo=pytz.UTC)]
+
+
 def status_test():
     synthese = Synthese(id=u'tata-é$~#@"*!\'`§èû', timezone='UTC', service_url='http://bob.com/')
     status = synthese.status()
     assert status['id'] == u"tata-é$~#@\"*!'`§èû"
+
+
+def redis_unavailable_test():
+    """
+    the rate limiter can be created without redis, the calls to synthese then fail with a RealtimeProxyError
+    """
+    # nothing listens on port 1
+    synthese = Synthese(id='tata', timezone='UTC', service_url='http://bob.com/',
+                        redis_host='localhost', redis_port=1)
+
+    with mock.patch('jormungandr.http_client.get') as mock_get:
+        with raises(RealtimeProxyError):
+            synthese._call_synthese.uncached(synthese, 'http://bob.com/?SERVICE=tdg&roid=stop_tutu')
+        assert not mock_get.called
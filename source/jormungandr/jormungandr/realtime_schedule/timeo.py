@@ -33,7 +33,7 @@ from flask import logging
 import pybreaker
 import pytz
 import requests as requests
-from jormungandr import cache, app
+from jormungandr import cache, app, http_client
 from jormungandr.realtime_schedule.realtime_proxy import RealtimeProxy, RealtimeProxyError, floor_datetime
 from jormungandr.schedule import RealTimePassage
 from datetime import datetime, time
@@ -112,7 +112,7 @@ class Timeo(RealtimeProxy):
         try:
             if not self.rate_limiter.acquire(self.rt_system_id, block=False):
                 return None
-            return self.breaker.call(requests.get, url, timeout=self.timeout)
+            return self.breaker.call(http_client.get, url, connector='timeo', timeout=self.timeout)
         except pybreaker.CircuitBreakerError as e:
             logging.getLogger(__name__).error('Timeo RT service dead, using base schedule (error: {}'.format(e),
                                               extra={'rt_system_id': unicode(self.rt_system_id)})
@@ -0,0 +1,75 @@
+# coding=utf-8
+
+#  Copyright (c) 2001-2018, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+from __future__ import absolute_import, print_function, unicode_literals, division
+import bisect
+from shapely import geometry
+from shapely.prepared import prep
+
+
+class CoordIndex(object):
+    """
+    Spatial index of the shapes of the instances
+
+    The shapes are prepared and sorted by the min longitude of their bounding box,
+    so a point is only tested against the few shapes whose bounding box contains it.
+
+    The index is built for a given version of the instances (their publication dates),
+    it has to be rebuilt when is_up_to_date returns False.
+    """
+    def __init__(self, instances):
+        self._version = self.get_version(instances)
+        entries = []
+        for instance in instances:
+            if not instance.geom:
+                continue
+            min_lon, min_lat, max_lon, max_lat = instance.geom.bounds
+            entries.append((min_lon, min_lat, max_lon, max_lat, instance.name, prep(instance.geom)))
+        entries.sort(key=lambda e: e[0])
+        self._min_lons = [e[0] for e in entries]
+        self._entries = entries
+
+    @staticmethod
+    def get_version(instances):
+        return sorted((i.name, i.publication_date) for i in instances)
+
+    def is_up_to_date(self, instances):
+        return self._version == self.get_version(instances)
+
+    def get_names(self, lon, lat):
+        """
+        return the names of the instances containing the point
+        """
+        p = geometry.Point(lon, lat)
+        end = bisect.bisect_right(self._min_lons, lon)
+        return [name for _, min_lat, max_lon, max_lat, name, geom in self._entries[:end]
+                if lon <= max_lon and min_lat <= lat <= max_lat and geom.contains(p)]
+
@@ -30,6 +30,7 @@
 from __future__ import absolute_import, print_function, unicode_literals, division
 import logging
 from jormungandr.scenarios import new_default
+from jormungandr import app
 from jormungandr.utils import PeriodExtremity
 from jormungandr.street_network.street_network import StreetNetworkPathType
 from jormungandr.scenarios.helper_classes import *
@@ -183,14 +184,18 @@ class Scenario(new_default.Scenario):
 
         Note that the cleaning process depends on the implementation of futures.
         """
+        deadline = request.get('_future_deadline') or app.config.get('FUTURE_DEADLINE')
         try:
-            with FutureManager() as future_manager:
+            with FutureManager(deadline=deadline / 1000.0 if deadline else None) as future_manager:
                 res = self._compute_all(future_manager, request, instance, krakens_call)
                 return res
         except PtException as e:
             return [e.get()]
         except EntryPointException as e:
             return [e.get()]
+        except FutureDeadlineException as e:
+            logger.warning("the futures deadline has been reached")
+            return [e.get()]
 
     def isochrone(self, request, instance):
         return new_default.Scenario().isochrone(request, instance)
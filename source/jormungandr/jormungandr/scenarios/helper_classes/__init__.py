@@ -34,6 +34,6 @@ from .place_by_uri import PlaceByUri
 from .pt_journey import PtJourneyPool
 from .proximities_by_crowfly import ProximitiesByCrowflyPool
 from .complete_pt_journey import wait_and_complete_pt_journey
-from .helper_exceptions import PtException, EntryPointException
+from .helper_exceptions import PtException, EntryPointException, FutureDeadlineException
 from .helper_utils import get_entry_point_or_raise, check_final_results_or_raise
 from .helper_future import FutureManager
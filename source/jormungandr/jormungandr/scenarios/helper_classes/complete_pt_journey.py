@@ -57,16 +57,17 @@ def wait_and_complete_pt_journey(future_manager,
     futures = []
     for elem in pt_journey_pool:
 
-        f = future_manager.create_future(complete_pt_journey,
-                                         requested_orig_obj=requested_orig_obj,
-                                         requested_dest_obj=requested_dest_obj,
-                                         pt_journey_pool_elem=elem,
-                                         streetnetwork_path_pool=streetnetwork_path_pool,
-                                         orig_places_free_access=orig_places_free_access,
-                                         dest_places_free_access=dest_places_free_access,
-                                         orig_fallback_durations_pool=orig_fallback_durations_pool,
-                                         dest_fallback_durations_pool=dest_fallback_durations_pool,
-                                         request=request)
+        f = future_manager.create_stage_future(helper_future.COMPLETION_STAGE,
+                                               complete_pt_journey,
+                                               requested_orig_obj=requested_orig_obj,
+                                               requested_dest_obj=requested_dest_obj,
+                                               pt_journey_pool_elem=elem,
+                                               streetnetwork_path_pool=streetnetwork_path_pool,
+                                               orig_places_free_access=orig_places_free_access,
+                                               dest_places_free_access=dest_places_free_access,
+                                               orig_fallback_durations_pool=orig_fallback_durations_pool,
+                                               dest_fallback_durations_pool=dest_fallback_durations_pool,
+                                               request=request)
         futures.append(f)
     # return a generator, so we block the main thread later when they are evaluated
     return (f.wait_and_get() for f in futures)
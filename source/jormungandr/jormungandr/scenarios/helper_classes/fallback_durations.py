@@ -38,6 +38,9 @@ import logging
 
 DurationElement = namedtuple('DurationElement', ['duration', 'status'])
 
+# the parameters of the request the street network computations depend on
+SPEED_PARAMETERS = ('walking_speed', 'bike_speed', 'car_speed', 'bss_speed', 'car_no_park_speed')
+
 
 class FallbackDurations:
     """
@@ -139,12 +142,7 @@ class FallbackDurations:
         else:
             origins = places_isochrone
             destinations = [center_isochrone]
-        sn_routing_matrix = self._instance.get_street_network_routing_matrix(origins,
-                                                                             destinations,
-                                                                             self._mode,
-                                                                             self._max_duration_to_pt,
-                                                                             self._request,
-                                                                             **self._speed_switcher)
+        sn_routing_matrix = self._get_street_network_routing_matrix(origins, destinations, places_isochrone)
 
         if not len(sn_routing_matrix.rows) or not len(sn_routing_matrix.rows[0].routing_response):
             logger.debug("no fallback durations found from %s by %s", self._requested_place_obj.uri, self._mode)
@@ -167,8 +165,31 @@ class FallbackDurations:
         logger.debug("finish fallback durations from %s by %s", self._requested_place_obj.uri, self._mode)
         return result
 
+    def _get_street_network_routing_matrix(self, origins, destinations, places_isochrone):
+        def compute():
+            return self._instance.get_street_network_routing_matrix(origins,
+                                                                    destinations,
+                                                                    self._mode,
+                                                                    self._max_duration_to_pt,
+                                                                    self._request,
+                                                                    **self._speed_switcher)
+        fallback_cache = self._instance.fallback_cache
+        if not fallback_cache:
+            return compute()
+
+        street_network = self._instance.get_street_network(self._mode, self._request)
+        key = (self._direct_path_type,
+               fallback_cache.snap(self._requested_place_obj),
+               self._mode,
+               tuple(self._request.get(s) for s in SPEED_PARAMETERS),
+               self._max_duration_to_pt,
+               street_network.sn_system_id,
+               tuple(p.uri for p in places_isochrone),
+               self._request['datetime'] if getattr(street_network, 'time_dependent_matrix', False) else None)
+        return fallback_cache.get_or_compute('routing_matrix', key, compute)
+
     def _async_request(self):
-        self._value = self._future_manager.create_future(self._do_request)
+        self._value = self._future_manager.create_stage_future(helper_future.FALLBACK_DURATIONS_STAGE, self._do_request)
 
     def wait_and_get(self):
         return self._value.wait_and_get() if self._value else None
@@ -53,3 +53,14 @@ class EntryPointException(Exception):
 
     def get(self):
         return self._response
+
+
+class FutureDeadlineException(Exception):
+    def __init__(self):
+        super(FutureDeadlineException, self).__init__()
+        from navitiacommon import response_pb2
+        self._response = _make_error_response("the computation of the journeys has exceeded the deadline",
+                                              response_pb2.Error.no_solution)
+
+    def get(self):
+        return self._response
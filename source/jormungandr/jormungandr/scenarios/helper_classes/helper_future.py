@@ -27,10 +27,15 @@
 # https://groups.google.com/d/forum/navitia
 # www.navitia.io
 from __future__ import absolute_import
+import logging
+import time
+import collections
 import gevent
 import gevent.pool
+import gevent.lock
 from jormungandr import app
 from contextlib import contextmanager
+from .helper_exceptions import FutureDeadlineException
 # Using abc.ABCMeta in a way it is compatible both with Python 2.7 and Python 3.x
 # http://stackoverflow.com/a/38668373/1614576
 import abc
@@ -43,6 +48,17 @@ use concurrent.futures ) by
    (the way to do cleaning depends on the library of future to use)
 """
 
+# the stages of the distributed scenario:
+# PlaceByUri -> ProximitiesByCrowfly -> FallbackDurations -> PtJourney -> completion of the journeys
+DEFAULT_STAGE = 'default'
+PLACE_STAGE = 'place'
+PLACES_FREE_ACCESS_STAGE = 'places_free_access'
+PROXIMITIES_BY_CROWFLY_STAGE = 'proximities_by_crowfly'
+FALLBACK_DURATIONS_STAGE = 'fallback_durations'
+STREETNETWORK_PATH_STAGE = 'streetnetwork_path'
+PT_JOURNEY_STAGE = 'pt_journey'
+COMPLETION_STAGE = 'completion'
+
 
 class _AbstractFuture(ABC):
     @abc.abstractmethod
@@ -55,8 +71,11 @@ class _AbstractFuture(ABC):
 
 
 class _AbstractPoolManager(ABC):
-    @abc.abstractmethod
     def create_future(self, fun, *args, **kwargs):
+        return self.create_stage_future(DEFAULT_STAGE, fun, *args, **kwargs)
+
+    @abc.abstractmethod
+    def create_stage_future(self, stage, fun, *args, **kwargs):
         pass
 
     @abc.abstractmethod
@@ -79,7 +98,7 @@ class _GeventPoolManager(_AbstractPoolManager):
     def __init__(self):
         self._pool = gevent.pool.Pool(app.config.get('GREENLET_POOL_SIZE', 8))
 
-    def create_future(self, fun, *args, **kwargs):
+    def create_stage_future(self, stage, fun, *args, **kwargs):
         return _GeventFuture(self._pool, fun, *args, **kwargs)
 
     def clean_futures(self):
@@ -92,9 +111,166 @@ class _GeventPoolManager(_AbstractPoolManager):
         self._pool.join()
 
 
+class _StageStats(object):
+    def __init__(self):
+        self.nb_futures = 0
+        self.nb_cancelled = 0
+        self.total_queue_duration = 0.0
+        self.total_duration = 0.0
+        self.max_duration = 0.0
+
+    def add(self, queue_duration, duration):
+        self.nb_futures += 1
+        self.total_queue_duration += queue_duration
+        self.total_duration += duration
+        self.max_duration = max(self.max_duration, duration)
+
+    def status(self):
+        return {
+            'nb_futures': self.nb_futures,
+            'nb_cancelled': self.nb_cancelled,
+            'mean_queue_duration': self.total_queue_duration / self.nb_futures if self.nb_futures else None,
+            'mean_duration': self.total_duration / self.nb_futures if self.nb_futures else None,
+            'max_duration': self.max_duration,
+        }
+
+
+# shared by all the requests of the worker
+_worker_semaphore = None
+_stages_stats = collections.defaultdict(_StageStats)
+
+
+def _get_worker_semaphore():
+    global _worker_semaphore
+    if _worker_semaphore is None:
+        _worker_semaphore = gevent.lock.BoundedSemaphore(app.config.get('FUTURE_WORKER_MAX_GREENLETS', 100))
+    return _worker_semaphore
+
+
+def get_stages_status():
+    """
+    timing of the futures by stage, for all the requests handled by the worker
+    """
+    return [dict(stage=stage, **stats.status()) for stage, stats in sorted(_stages_stats.items())]
+
+
+class _ScheduledFuture(_AbstractFuture):
+    def __init__(self, scheduler, stage, fun, *args, **kwargs):
+        self._scheduler = scheduler
+        self._future = gevent.spawn(scheduler.run, stage, fun, *args, **kwargs)
+
+    def get_future(self):
+        return self._future
+
+    def wait_and_get(self):
+        with self._scheduler.waiting():
+            return self._future.get()
+
+
+class _GeventScheduler(_AbstractPoolManager):
+    """
+    Schedule the futures of a request by stage
+
+    - each stage has its own limit of running futures (FUTURE_STAGES_MAX_GREENLETS, GREENLET_POOL_SIZE by default)
+      so the futures of a stage don't wait behind the ones of another stage
+    - the running futures of all the requests of the worker are capped by FUTURE_WORKER_MAX_GREENLETS
+    - a future waiting for another one (ex. FallbackDurations waiting for ProximitiesByCrowfly) gives back its
+      slots while it's waiting, so the futures it depends on can't be blocked by it
+    - with a deadline (in seconds), the unfinished futures are killed when it's reached, and waiting for them
+      raises a FutureDeadlineException
+    """
+    def __init__(self, deadline=None):
+        default_size = app.config.get('GREENLET_POOL_SIZE', 8)
+        stages_sizes = app.config.get('FUTURE_STAGES_MAX_GREENLETS', {})
+        self._stages_semaphores = collections.defaultdict(lambda: None)
+        self._stages_sizes = collections.defaultdict(lambda: default_size, stages_sizes)
+        self._worker_semaphore = _get_worker_semaphore()
+        self._futures = []
+        # greenlet => stage of the future it's running
+        self._running = {}
+        self._stages_timing = collections.defaultdict(float)
+        self._is_cancelled = False
+        self._deadline_timer = gevent.spawn_later(deadline, self._cancel) if deadline else None
+
+    def _get_stage_semaphore(self, stage):
+        semaphore = self._stages_semaphores[stage]
+        if semaphore is None:
+            semaphore = self._stages_semaphores[stage] = gevent.lock.BoundedSemaphore(self._stages_sizes[stage])
+        return semaphore
+
+    def _acquire(self, stage):
+        # the stage slot first, so a future waiting for its stage doesn't hold a slot of the worker
+        self._get_stage_semaphore(stage).acquire()
+        self._worker_semaphore.acquire()
+
+    def _release(self, stage):
+        self._worker_semaphore.release()
+        self._get_stage_semaphore(stage).release()
+
+    def run(self, stage, fun, *args, **kwargs):
+        start = time.time()
+        self._acquire(stage)
+        current = gevent.getcurrent()
+        self._running[current] = stage
+        started = time.time()
+        try:
+            return fun(*args, **kwargs)
+        finally:
+            # the slots may have been given back if the future has been cancelled while waiting
+            if self._running.pop(current, None) is not None:
+                self._release(stage)
+            duration = time.time() - started
+            self._stages_timing[stage] += duration
+            _stages_stats[stage].add(started - start, duration)
+
+    @contextmanager
+    def waiting(self):
+        """
+        give back the slots of the current future while it's waiting for another one
+        """
+        current = gevent.getcurrent()
+        stage = self._running.pop(current, None)
+        if stage is not None:
+            self._release(stage)
+        try:
+            yield
+        finally:
+            if stage is not None and not self._is_cancelled:
+                self._acquire(stage)
+                self._running[current] = stage
+
+    def create_stage_future(self, stage, fun, *args, **kwargs):
+        if self._is_cancelled:
+            raise FutureDeadlineException()
+        future = _ScheduledFuture(self, stage, fun, *args, **kwargs)
+        self._futures.append((stage, future.get_future()))
+        return future
+
+    def _cancel(self):
+        self._is_cancelled = True
+        for stage, greenlet in self._futures:
+            if not greenlet.ready():
+                _stages_stats[stage].nb_cancelled += 1
+                greenlet.kill(exception=FutureDeadlineException, block=False)
+
+    def clean_futures(self):
+        gevent.joinall([greenlet for _, greenlet in self._futures])
+        if self._deadline_timer is not None:
+            self._deadline_timer.kill(block=False)
+        logging.getLogger(__name__).debug('futures timing by stage: %s',
+                                          ', '.join('{}: {:.3f}s'.format(stage, duration)
+                                                    for stage, duration in sorted(self._stages_timing.items())))
+
+
 @contextmanager
-def FutureManager():
-    m = _GeventPoolManager()
+def FutureManager(deadline=None):
+    """
+    :param deadline: max duration (in seconds) of the futures, only used by the scheduler by stage
+    """
+    if app.config.get('FUTURE_SCHEDULER_BY_STAGE', False):
+        m = _GeventScheduler(deadline=deadline)
+    else:
+        m = _GeventPoolManager()
     try:
         yield m
     finally:
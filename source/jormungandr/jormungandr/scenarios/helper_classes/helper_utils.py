@@ -114,42 +114,50 @@ def _align_fallback_direct_path_datetime(fallback_direct_path, fallback_extremit
     return fallback_copy
 
 
-def _rename_journey_sections_ids(start_idx, sections):
-    for s in sections:
-        s.id = "dp_section_{}".format(start_idx)
-        start_idx += 1
-
-
-def _extend_pt_sections_with_direct_path(pt_journey, dp_journey):
-    if getattr(dp_journey, 'journeys', []) and hasattr(dp_journey.journeys[0], 'sections'):
-        _rename_journey_sections_ids(len(pt_journey.sections), dp_journey.journeys[0].sections)
-        pt_journey.sections.extend(dp_journey.journeys[0].sections)
-
-
 def _extend_journey(pt_journey, fallback_dp, fallback_period_extremity):
     """
+    append the sections of the fallback path to the pt journey, re-timed on fallback_period_extremity
+
+    the sections are copied once (the fallback path is shared by several journeys and is left untouched),
+    then re-timed and renamed in the journey
+
     :param fallback_period_extremity: is a PeriodExtremity (a datetime and it's meaning on the fallback period)
     """
-    aligned_fallback = _align_fallback_direct_path_datetime(fallback_dp, fallback_period_extremity)
+    fallback_journey = fallback_dp.journeys[0]
 
-    pt_journey.duration += aligned_fallback.journeys[0].duration
+    pt_journey.duration += fallback_journey.duration
     pt_journey.durations.total = pt_journey.duration
-    pt_journey.durations.walking += aligned_fallback.journeys[0].durations.walking
-    pt_journey.durations.bike += aligned_fallback.journeys[0].durations.bike
-    pt_journey.durations.car += aligned_fallback.journeys[0].durations.car
+    pt_journey.durations.walking += fallback_journey.durations.walking
+    pt_journey.durations.bike += fallback_journey.durations.bike
+    pt_journey.durations.car += fallback_journey.durations.car
 
-    pt_journey.distances.walking += aligned_fallback.journeys[0].distances.walking
-    pt_journey.distances.bike += aligned_fallback.journeys[0].distances.bike
-    pt_journey.distances.car += aligned_fallback.journeys[0].distances.car
+    pt_journey.distances.walking += fallback_journey.distances.walking
+    pt_journey.distances.bike += fallback_journey.distances.bike
+    pt_journey.distances.car += fallback_journey.distances.car
+
+    # align datetimes to requested ones (as we consider fallback duration are the same no matter when)
+    datetime, represents_start_fallback = fallback_period_extremity
+    if represents_start_fallback:
+        departure_date_time = datetime
+    else:
+        departure_date_time = datetime - fallback_journey.duration
+    delta = departure_date_time - fallback_journey.sections[0].begin_date_time
+
+    first_idx = len(pt_journey.sections)
+    pt_journey.sections.extend(fallback_journey.sections)
+    for idx in range(first_idx, len(pt_journey.sections)):
+        s = pt_journey.sections[idx]
+        s.id = "dp_section_{}".format(idx)
+        if delta != 0:
+            s.begin_date_time += delta
+            s.end_date_time += delta
 
     # For start fallback section copy pt_section.origin to last fallback_section.destination
     # where as for end fallback section copy last pt_section.destination to fallback_section.origin
-    if fallback_period_extremity.represents_start:
-        aligned_fallback.journeys[0].sections[0].origin.CopyFrom(pt_journey.sections[-1].destination)
+    if represents_start_fallback:
+        pt_journey.sections[first_idx].origin.CopyFrom(pt_journey.sections[first_idx - 1].destination)
     else:
-        aligned_fallback.journeys[0].sections[-1].destination.CopyFrom(pt_journey.sections[0].origin)
-
-    _extend_pt_sections_with_direct_path(pt_journey, aligned_fallback)
+        pt_journey.sections[-1].destination.CopyFrom(pt_journey.sections[0].origin)
 
 
 def _build_from(requested_orig_obj, pt_journeys, dep_mode, streetnetwork_path_pool, orig_accessible_by_crowfly,
@@ -270,22 +278,24 @@ def compute_fallback(from_obj,
         places_free_access = dest_places_free_access.wait_and_get()
         dest_all_free_access = places_free_access.odt | places_free_access.crowfly | places_free_access.free_radius
 
+        fallback_requests = []
         for journey in pt_journeys.journeys:
             # from
             pt_orig = journey.sections[0].origin
             direct_path_type = StreetNetworkPathType.BEGINNING_FALLBACK
             fallback_extremity_dep = PeriodExtremity(journey.departure_date_time, False)
             if from_obj.uri != pt_orig.uri and pt_orig.uri not in orig_all_free_access:
-                streetnetwork_path_pool.add_async_request(from_obj, pt_orig, dep_mode, fallback_extremity_dep,
-                                                          request, direct_path_type)
+                fallback_requests.append((from_obj, pt_orig, dep_mode, fallback_extremity_dep, direct_path_type))
 
             # to
             pt_dest = journey.sections[-1].destination
             direct_path_type = StreetNetworkPathType.ENDING_FALLBACK
             fallback_extremity_arr = PeriodExtremity(journey.arrival_date_time, True)
             if to_obj.uri != pt_dest.uri and pt_dest.uri not in dest_all_free_access:
-                streetnetwork_path_pool.add_async_request(pt_dest, to_obj, arr_mode, fallback_extremity_arr,
-                                                          request, direct_path_type)
+                fallback_requests.append((pt_dest, to_obj, arr_mode, fallback_extremity_arr, direct_path_type))
+
+        # the fallback paths shared by several journeys are computed only once
+        streetnetwork_path_pool.add_fallback_requests(fallback_requests, request)
 
 
 def complete_pt_journey(requested_orig_obj,
@@ -300,11 +310,14 @@ def complete_pt_journey(requested_orig_obj,
     """
     We complete the pt journey by adding the beginning fallback and the ending fallback
 
-    :return: pt_journeys: a deeply-copied list of pt_journeys with beginning and ending fallbacks
+    The pt response is completed in place: once the fallbacks are launched (compute_fallback), it's only used by
+    its completion, so there is no need to copy it.
+
+    :return: pt_journeys: the pt response with beginning and ending fallbacks
     """
     logger = logging.getLogger(__name__)
 
-    pt_journeys = copy.deepcopy(pt_journey_pool_elem.pt_journey.wait_and_get())
+    pt_journeys = pt_journey_pool_elem.pt_journey.wait_and_get()
     if not getattr(pt_journeys, "journeys", None):
         return pt_journeys
     dep_mode = pt_journey_pool_elem.dep_mode
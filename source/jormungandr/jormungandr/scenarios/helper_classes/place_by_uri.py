@@ -42,7 +42,7 @@ class PlaceByUri:
         return self._instance.georef.place(self._uri)
 
     def _async_request(self):
-        self._value = self._future_manager.create_future(self._do_request)
+        self._value = self._future_manager.create_stage_future(helper_future.PLACE_STAGE, self._do_request)
 
     def wait_and_get(self):
         return self._value.wait_and_get()
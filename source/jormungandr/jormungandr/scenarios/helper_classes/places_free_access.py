@@ -85,7 +85,7 @@ class PlacesFreeAccess:
         return PlaceFreeAccessResult(crowfly, odt, free_radius)
 
     def _async_request(self):
-        self._value = self._future_manager.create_future(self._do_request)
+        self._value = self._future_manager.create_stage_future(helper_future.PLACES_FREE_ACCESS_STAGE, self._do_request)
 
     def wait_and_get(self):
         return self._value.wait_and_get()
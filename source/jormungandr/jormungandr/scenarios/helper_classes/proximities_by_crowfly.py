@@ -70,9 +70,7 @@ class ProximitiesByCrowfly:
 
         coord = utils.get_pt_object_coord(self._requested_place_obj)
         if coord.lat and coord.lon:
-            crow_fly = self._instance.georef.get_crow_fly(utils.get_uri_pt_object(self._requested_place_obj),
-                                                          self._mode,  self._max_duration, self._max_nb_crowfly,
-                                                          **self._speed_switcher)
+            crow_fly = self._get_crow_fly()
 
             logger.debug("finish proximities by crowfly from %s in %s", self._requested_place_obj.uri, self._mode)
             return crow_fly
@@ -80,8 +78,24 @@ class ProximitiesByCrowfly:
         logger.debug("the coord of requested places is not valid: %s", coord)
         return []
 
+    def _get_crow_fly(self):
+        def compute():
+            return self._instance.georef.get_crow_fly(utils.get_uri_pt_object(self._requested_place_obj),
+                                                      self._mode, self._max_duration, self._max_nb_crowfly,
+                                                      **self._speed_switcher)
+        fallback_cache = self._instance.fallback_cache
+        if not fallback_cache:
+            return compute()
+        key = (fallback_cache.snap(self._requested_place_obj),
+               self._mode,
+               self._max_duration,
+               self._max_nb_crowfly,
+               self._speed_switcher.get(self._mode))
+        # the repeated field is converted to a list, it can then live without its response (and be pickled)
+        return fallback_cache.get_or_compute('crow_fly', key, lambda: list(compute()))
+
     def _async_request(self):
-        self._value = self._future_manager.create_future(self._do_request)
+        self._value = self._future_manager.create_stage_future(helper_future.PROXIMITIES_BY_CROWFLY_STAGE, self._do_request)
 
     def wait_and_get(self):
         return self._value.wait_and_get()
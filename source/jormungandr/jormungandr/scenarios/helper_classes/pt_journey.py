@@ -34,17 +34,45 @@ from navitiacommon import response_pb2
 from collections import namedtuple
 import copy
 import logging
+import time
 
 PtPoolElement = namedtuple('PtPoolElement', ['dep_mode', 'arr_mode', 'pt_journey'])
 
 
+def is_dominated_by_direct_path(journey, direct_path_duration, datetime, clockwise):
+    """
+    same criteria as kraken's when the direct path duration is given: the direct path is added to the pareto front
+    (with no transfer and its duration as street network duration) and removes the journeys it dominates
+    """
+    if clockwise:
+        dp_departure, dp_arrival = datetime, datetime + direct_path_duration
+        if dp_arrival != journey.arrival_date_time:
+            better_on_dt = dp_arrival <= journey.arrival_date_time
+        else:
+            better_on_dt = dp_departure >= journey.departure_date_time
+    else:
+        dp_departure, dp_arrival = datetime - direct_path_duration, datetime
+        if dp_departure != journey.departure_date_time:
+            better_on_dt = dp_departure >= journey.departure_date_time
+        else:
+            better_on_dt = dp_arrival <= journey.arrival_date_time
+    # the direct path is always better on the transfers
+    return better_on_dt and direct_path_duration <= journey.sn_dur + journey.transfer_dur
+
+
 class PtJourney:
     """
     Given a set of stop_points and their access time from origin and destination respectively, now we can compute the
     public transport journey
     """
     def __init__(self, future_manager, instance, orig_fallback_durtaions_pool, dest_fallback_durations_pool,
-                 dep_mode, arr_mode, periode_extremity, journey_params, bike_in_pt, request):
+                 dep_mode, arr_mode, periode_extremity, journey_params, bike_in_pt, request,
+                 direct_path=None):
+        """
+        :param direct_path: the StreetNetworkPath of the direct path, its duration is given to kraken to prune the
+                            journeys if it's known when the journey is computed, the journeys it dominates are
+                            removed afterward otherwise
+        """
         self._future_manager = future_manager
         self._instance = instance
         self._orig_fallback_durtaions_pool = orig_fallback_durtaions_pool
@@ -52,34 +80,48 @@ class PtJourney:
         self._dep_mode = dep_mode
         self._arr_mode = arr_mode
         self._periode_extremity = periode_extremity
-        self._journey_params = copy.deepcopy(journey_params)
+        # only direct_path_duration is set for each pt journey, the other parameters are shared
+        self._journey_params = copy.copy(journey_params)
         self._bike_in_pt = bike_in_pt
         self._request = request
+        self._direct_path = direct_path
+        self._direct_path_hint_used = False
         self._value = None
 
         self._async_request()
 
-    def _do_request(self):
+    def get_planner_args(self):
+        """
+        wait for the fallback durations and return the arguments of the call to the planner
+
+        return None if the journey cannot be computed
+        """
         logger = logging.getLogger(__name__)
         logger.debug("waiting for orig fallback durations with %s", self._dep_mode)
         orig_fallback_duration_status = self._orig_fallback_durtaions_pool.wait_and_get(self._dep_mode)
         logger.debug("waiting for dest fallback durations with %s", self._arr_mode)
         dest_fallback_duration_status = self._dest_fallback_durations_pool.wait_and_get(self._arr_mode)
 
-        logger.debug("requesting public transport journey with dep_mode: %s and arr_mode: %s",
-                     self._dep_mode,
-                     self._arr_mode)
-
         orig_fallback_durations = {k: v.duration for k, v in orig_fallback_duration_status.items()}
         dest_fallback_durations = {k: v.duration for k, v in dest_fallback_duration_status.items()}
 
         if not orig_fallback_durations or not dest_fallback_durations or not self._request.get('max_duration', 0):
             return None
-        resp = self._instance.planner.journeys(orig_fallback_durations,
-                                               dest_fallback_durations,
-                                               self._periode_extremity.datetime,
-                                               self._periode_extremity.represents_start,
-                                               self._journey_params, self._bike_in_pt)
+
+        self._journey_params.direct_path_duration = self._get_direct_path_duration(wait=False)
+        self._direct_path_hint_used = self._journey_params.direct_path_duration is not None
+        if self._direct_path is not None and not self._direct_path_hint_used:
+            logger.debug("direct path by %s not known yet, the pt journey with dep_mode: %s and arr_mode: %s is "
+                         "computed without it", self._dep_mode, self._dep_mode, self._arr_mode)
+        return (orig_fallback_durations,
+                dest_fallback_durations,
+                self._periode_extremity.datetime,
+                self._periode_extremity.represents_start,
+                self._journey_params, self._bike_in_pt)
+
+    def handle_response(self, resp, planner_args):
+        logger = logging.getLogger(__name__)
+        orig_fallback_durations, dest_fallback_durations = planner_args[0], planner_args[1]
         for j in resp.journeys:
             j.internal_id = str(utils.generate_id())
 
@@ -93,13 +135,56 @@ class PtJourney:
                 resp.error.id = response_pb2.Error.no_destination
                 resp.error.message = "no destination point"
 
+        # the pt journeys have been computed while the direct path was computed, it's needed now
+        self._filter_dominated_journeys(resp)
+
         logger.debug("finish public transport journey with dep_mode: %s and arr_mode: %s",
                      self._dep_mode,
                      self._arr_mode)
         return resp
 
+    def _do_request(self):
+        planner_args = self.get_planner_args()
+        if planner_args is None:
+            return None
+
+        logging.getLogger(__name__).debug("requesting public transport journey with dep_mode: %s and arr_mode: %s",
+                                          self._dep_mode,
+                                          self._arr_mode)
+        resp = self._instance.planner.journeys(*planner_args)
+        return self.handle_response(resp, planner_args)
+
+    def _get_direct_path_duration(self, wait):
+        if self._direct_path is None:
+            return None
+        dp = self._direct_path.wait_and_get() if wait else self._direct_path.get_if_ready()
+        if not getattr(dp, 'journeys', None):
+            return None
+        return dp.journeys[0].durations.total
+
+    def _filter_dominated_journeys(self, resp):
+        """
+        remove the journeys dominated by the direct path, when kraken didn't know it
+        """
+        if self._direct_path_hint_used or not resp.journeys:
+            return
+        start = time.time()
+        direct_path_duration = self._get_direct_path_duration(wait=True)
+        # time left of the direct path computation once the pt journeys are known (the rest was overlapped)
+        logging.getLogger(__name__).debug("pt journey with dep_mode: %s and arr_mode: %s waited %.3fs for the "
+                                          "direct path", self._dep_mode, self._arr_mode, time.time() - start)
+        if direct_path_duration is None:
+            return
+        dominated = [idx for idx, j in enumerate(resp.journeys)
+                     if is_dominated_by_direct_path(j, direct_path_duration, self._periode_extremity.datetime,
+                                                    self._periode_extremity.represents_start)]
+        for idx in reversed(dominated):
+            del resp.journeys[idx]
+        logging.getLogger(__name__).debug("%s pt journeys with dep_mode: %s and arr_mode: %s dominated by the "
+                                          "direct path", len(dominated), self._dep_mode, self._arr_mode)
+
     def _async_request(self):
-        self._value = self._future_manager.create_future(self._do_request)
+        self._value = self._future_manager.create_stage_future(helper_future.PT_JOURNEY_STAGE, self._do_request)
 
     def wait_and_get(self):
         return self._value.wait_and_get()
@@ -165,17 +250,13 @@ class PtJourneyPool:
         direct_path_type = StreetNetworkPathType.DIRECT
         periode_extremity = utils.PeriodExtremity(self._request['datetime'], self._request['clockwise'])
         for dep_mode, arr_mode in self._krakens_call:
-            dp = self._streetnetwork_path_pool.wait_and_get(self._requested_orig_obj,
-                                                            self._requested_dest_obj,
-                                                            dep_mode,
-                                                            periode_extremity,
-                                                            direct_path_type,
-                                                            request=self._request)
-            if dp.journeys:
-                self._journey_params.direct_path_duration = dp.journeys[0].durations.total
-            else:
-                self._journey_params.direct_path_duration = None
-
+            # the pt journey doesn't wait for the direct path, its duration is only a hint for kraken
+            dp = self._streetnetwork_path_pool.get(self._requested_orig_obj,
+                                                   self._requested_dest_obj,
+                                                   dep_mode,
+                                                   periode_extremity,
+                                                   direct_path_type,
+                                                   request=self._request)
             bike_in_pt = (dep_mode == 'bike' and arr_mode == 'bike')
             pt_journey = PtJourney(future_manager=self._future_manager,
                                    instance=self._instance,
@@ -186,7 +267,8 @@ class PtJourneyPool:
                                    periode_extremity=periode_extremity,
                                    journey_params=self._journey_params,
                                    bike_in_pt=bike_in_pt,
-                                   request=self._request)
+                                   request=self._request,
+                                   direct_path=dp)
 
             self._value.append(PtPoolElement(dep_mode, arr_mode, pt_journey))
 
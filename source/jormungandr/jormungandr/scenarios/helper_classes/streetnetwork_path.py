@@ -28,10 +28,15 @@
 # www.navitia.io
 from __future__ import absolute_import
 from . import helper_future
-from jormungandr import utils
+from .fallback_durations import SPEED_PARAMETERS
+from .helper_utils import _align_fallback_direct_path_datetime
+from .helper_exceptions import FutureDeadlineException
+from jormungandr import utils, app
 from jormungandr.street_network.street_network import StreetNetworkPathType
+import collections
 import logging
 from jormungandr.scenarios.utils import switch_back_to_ridesharing
+from navitiacommon import response_pb2
 
 class StreetNetworkPath:
     """
@@ -79,13 +84,91 @@ class StreetNetworkPath:
         return dp
 
     def _async_request(self):
-        self._value = self._future_manager.create_future(self._do_request)
+        self._value = self._future_manager.create_stage_future(helper_future.STREETNETWORK_PATH_STAGE, self._do_request)
 
     def wait_and_get(self):
         if self._value:
             return self._value.wait_and_get()
         return None
 
+    def get_if_ready(self):
+        """
+        return the path if it has already been computed, None otherwise (never waits)
+        """
+        if self._value:
+            future = self._value.get_future()
+            if future.ready() and future.successful():
+                return future.value
+        return None
+
+
+class FallbackPathBatch:
+    """
+    The fallback paths of a time independent mode that are neither cached nor already requested,
+    computed in one call to the street network service
+    """
+    def __init__(self, future_manager, streetnetwork_service, mode, paths, request, fallback_cache):
+        """
+        :param paths: dict of fallback path key vs (orig_obj, dest_obj, fallback_extremity, streetnetwork_path_type)
+        :param fallback_cache: the fallback cache of the instance, the computed paths are added to it (can be None)
+        """
+        self._streetnetwork_service = streetnetwork_service
+        self._mode = mode
+        self._paths = paths
+        self._request = request
+        self._fallback_cache = fallback_cache
+        self._value = future_manager.create_stage_future(helper_future.STREETNETWORK_PATH_STAGE, self._do_request)
+
+    def _do_request(self):
+        logger = logging.getLogger(__name__)
+        logger.debug("requesting %s fallback paths by %s", len(self._paths), self._mode)
+
+        keys = list(self._paths.keys())
+        try:
+            dps = self._streetnetwork_service.direct_paths_with_fp(self._mode, [self._paths[k] for k in keys],
+                                                                   self._request)
+        except FutureDeadlineException:
+            raise
+        except Exception:
+            # the paths are handled as if each of them had failed, the fallbacks are done without them
+            logger.exception("the %s fallback paths by %s have failed", len(self._paths), self._mode)
+            dps = [response_pb2.Response() for _ in keys]
+        result = {}
+        for key, dp in zip(keys, dps):
+            result[key] = dp
+            # a path without journey may come from a failure of the service, we don't keep it
+            if self._fallback_cache and getattr(dp, "journeys", None):
+                self._fallback_cache.set('fallback_path', key, dp)
+
+        logger.debug("finish %s fallback paths by %s", len(self._paths), self._mode)
+        return result
+
+    def get_path(self, key):
+        return self._value.wait_and_get().get(key)
+
+
+class TimeIndependentStreetNetworkPath(StreetNetworkPath):
+    """
+    A fallback path of a time independent mode (walking, bike...): the path is the same whatever the datetime,
+    it's computed once (or found in the fallback cache) and only re-timed for the fallback extremity
+    """
+    def __init__(self, future_manager, get_path, orig_obj, dest_obj, mode, fallback_extremity,
+                 streetnetwork_path_type):
+        """
+        :param get_path: function returning the path (computed for any datetime)
+        """
+        self._get_path = get_path
+        StreetNetworkPath.__init__(self, future_manager, None, orig_obj, dest_obj, mode, fallback_extremity, None,
+                                   streetnetwork_path_type)
+
+    def _do_request(self):
+        dp = self._get_path()
+        if not getattr(dp, "journeys", None):
+            return dp
+        dp = _align_fallback_direct_path_datetime(dp, self._fallback_extremity)
+        dp.journeys[0].internal_id = str(utils.generate_id())
+        return dp
+
 
 class StreetNetworkPathPool:
     """
@@ -96,6 +179,8 @@ class StreetNetworkPathPool:
         self._future_manager = future_manager
         self._instance = instance
         self._value = {}
+        # fallback path key vs function returning the path, for the time independent modes
+        self._fallback_paths = {}
 
     def add_async_request(self,
                           requested_orig_obj,
@@ -116,6 +201,61 @@ class StreetNetworkPathPool:
         self._value[key] = StreetNetworkPath(self._future_manager, streetnetwork_service, requested_orig_obj, requested_dest_obj, mode,
                                              period_extremity, request, streetnetwork_path_type)
 
+    @staticmethod
+    def _make_fallback_path_key(streetnetwork_service, orig_obj, dest_obj, mode, streetnetwork_path_type, request):
+        return (orig_obj.uri, dest_obj.uri, mode, streetnetwork_path_type, streetnetwork_service.sn_system_id,
+                tuple(request.get(s) for s in SPEED_PARAMETERS))
+
+    def add_fallback_requests(self, fallback_requests, request):
+        """
+        launch the computation of the fallback paths of the pt journeys
+
+        :param fallback_requests: list of (orig_obj, dest_obj, mode, period_extremity, streetnetwork_path_type)
+
+        The fallback paths of the time independent modes (FALLBACK_CACHE_TIME_INDEPENDENT_MODES) are computed
+        once for all the pt journeys of the request, and re-timed for each of them. They are kept in the
+        fallback cache of the instance when it's enabled. The missing ones are requested in one call by mode.
+        """
+        time_independent_modes = app.config.get('FALLBACK_CACHE_TIME_INDEPENDENT_MODES', [])
+        fallback_cache = self._instance.fallback_cache
+        # mode vs {fallback path key: (orig_obj, dest_obj, period_extremity, streetnetwork_path_type)}
+        missing_paths = collections.defaultdict(dict)
+        pending = []
+        for orig_obj, dest_obj, mode, period_extremity, streetnetwork_path_type in fallback_requests:
+            streetnetwork_service = self._instance.get_street_network(mode, request)
+            if mode not in time_independent_modes or not streetnetwork_service:
+                self.add_async_request(orig_obj, dest_obj, mode, period_extremity, request, streetnetwork_path_type)
+                continue
+            key = streetnetwork_service.make_path_key(mode, orig_obj.uri, dest_obj.uri, streetnetwork_path_type,
+                                                      period_extremity)
+            if key in self._value:
+                continue
+            fallback_path_key = self._make_fallback_path_key(streetnetwork_service, orig_obj, dest_obj, mode,
+                                                             streetnetwork_path_type, request)
+            if fallback_path_key not in self._fallback_paths and fallback_path_key not in missing_paths[mode]:
+                cached_path = fallback_cache.get('fallback_path', fallback_path_key) if fallback_cache else None
+                if cached_path is not None:
+                    self._fallback_paths[fallback_path_key] = lambda path=cached_path: path
+                else:
+                    missing_paths[mode][fallback_path_key] = (orig_obj, dest_obj, period_extremity,
+                                                              streetnetwork_path_type)
+            pending.append((key, fallback_path_key, orig_obj, dest_obj, mode, period_extremity,
+                            streetnetwork_path_type))
+
+        for mode, paths in missing_paths.items():
+            batch = FallbackPathBatch(self._future_manager, self._instance.get_street_network(mode, request), mode,
+                                      paths, request, fallback_cache)
+            for fallback_path_key in paths:
+                self._fallback_paths[fallback_path_key] = lambda k=fallback_path_key, b=batch: b.get_path(k)
+
+        for key, fallback_path_key, orig_obj, dest_obj, mode, period_extremity, streetnetwork_path_type in pending:
+            if key in self._value:
+                continue
+            self._value[key] = TimeIndependentStreetNetworkPath(self._future_manager,
+                                                                self._fallback_paths[fallback_path_key],
+                                                                orig_obj, dest_obj, mode, period_extremity,
+                                                                streetnetwork_path_type)
+
     def get_all_direct_paths(self):
         """
         Get all streetnetwork path of DIRECT type
@@ -133,13 +273,20 @@ class StreetNetworkPathPool:
                 return True
         return False
 
-    def wait_and_get(self, requested_orig_obj, requested_dest_obj, mode, period_extremity,
-                     streetnetwork_path_type, request):
+    def get(self, requested_orig_obj, requested_dest_obj, mode, period_extremity, streetnetwork_path_type, request):
+        """
+        return the StreetNetworkPath (not its value, it may not be computed yet)
+        """
         streetnetwork_service = self._instance.get_street_network(mode, request)
         key = streetnetwork_service.make_path_key(mode,
                                                   requested_orig_obj.uri,
                                                   requested_dest_obj.uri,
                                                   streetnetwork_path_type,
                                                   period_extremity) if streetnetwork_service else None
-        dp = self._value.get(key)
+        return self._value.get(key)
+
+    def wait_and_get(self, requested_orig_obj, requested_dest_obj, mode, period_extremity,
+                     streetnetwork_path_type, request):
+        dp = self.get(requested_orig_obj, requested_dest_obj, mode, period_extremity, streetnetwork_path_type,
+                      request)
         return dp.wait_and_get() if dp else None
@@ -30,6 +30,7 @@
 
 
 from __future__ import absolute_import, print_function, unicode_literals, division
+import copy
 import datetime
 import navitiacommon.response_pb2 as response_pb2
 import navitiacommon.type_pb2 as type_pb2
@@ -37,7 +38,7 @@ from jormungandr.scenarios.distributed import Scenario
 from jormungandr.utils import str_to_time_stamp
 from jormungandr.street_network.tests.streetnetwork_test_utils import make_pt_object
 from jormungandr.utils import PeriodExtremity, SectionSorter
-from jormungandr.scenarios.helper_classes.helper_utils import _extend_journey
+from jormungandr.scenarios.helper_classes.helper_utils import _extend_journey, _align_fallback_direct_path_datetime
 
 
 # This function creates a jouney with 4 sections from a stop_point to stop_point.
@@ -158,3 +159,84 @@ def extend_journey_for_build_to_test():
     # We should have the same object used for the last pt_section.destination and crowfly_section.origin
     assert crowfly_section.origin == pt_section.destination
     assert crowfly_section.origin.uri == "stop_point_4"
+
+
+# the previous implementation of _extend_journey, working on an aligned copy of the fallback path
+def extend_journey_with_aligned_copy(pt_journey, fallback_dp, fallback_period_extremity):
+    aligned_fallback = _align_fallback_direct_path_datetime(fallback_dp, fallback_period_extremity)
+    fallback_journey = aligned_fallback.journeys[0]
+
+    pt_journey.duration += fallback_journey.duration
+    pt_journey.durations.total = pt_journey.duration
+    pt_journey.durations.walking += fallback_journey.durations.walking
+    pt_journey.durations.bike += fallback_journey.durations.bike
+    pt_journey.durations.car += fallback_journey.durations.car
+
+    pt_journey.distances.walking += fallback_journey.distances.walking
+    pt_journey.distances.bike += fallback_journey.distances.bike
+    pt_journey.distances.car += fallback_journey.distances.car
+
+    if fallback_period_extremity.represents_start:
+        fallback_journey.sections[0].origin.CopyFrom(pt_journey.sections[-1].destination)
+    else:
+        fallback_journey.sections[-1].destination.CopyFrom(pt_journey.sections[0].origin)
+
+    for idx, s in enumerate(fallback_journey.sections):
+        s.id = "dp_section_{}".format(len(pt_journey.sections) + idx)
+    pt_journey.sections.extend(fallback_journey.sections)
+
+
+# a walking fallback of 2 sections with a geometry, computed for another datetime than the one of the journey
+def create_walking_fallback(origin, destination):
+    response = response_pb2.Response()
+    journey = response.journeys.add()
+    journey.departure_date_time = str_to_time_stamp("20180618T050000")
+    journey.duration = 8 * 60
+    journey.arrival_date_time = journey.departure_date_time + journey.duration
+    journey.durations.total = journey.duration
+    journey.durations.walking = journey.duration
+    journey.distances.walking = 600
+
+    previous_end = journey.departure_date_time
+    for idx, (section_origin, section_destination) in enumerate([(origin, destination), (destination, destination)]):
+        s = journey.sections.add()
+        s.type = response_pb2.STREET_NETWORK
+        s.id = "section_{}".format(idx)
+        s.origin.CopyFrom(section_origin)
+        s.destination.CopyFrom(section_destination)
+        s.duration = 4 * 60
+        s.begin_date_time = previous_end
+        s.end_date_time = previous_end = s.begin_date_time + s.duration
+        s.street_network.mode = response_pb2.Walking
+        for i in range(10):
+            coord = s.shape.add()
+            coord.lon = 1.0 + i / 1000
+            coord.lat = 2.0 + i / 1000
+    return response
+
+
+def check_extend_journey_without_copy(fallback_extremity, fallback):
+    fallback_before = copy.deepcopy(fallback)
+    expected = create_journeys_with_pt()
+    extend_journey_with_aligned_copy(expected, fallback, fallback_extremity)
+
+    pt_journey = create_journeys_with_pt()
+    _extend_journey(pt_journey, fallback, fallback_extremity)
+
+    assert pt_journey == expected
+    # the fallback path is shared by the journeys, it's never modified
+    assert fallback == fallback_before
+
+
+def extend_journey_without_copy_for_build_from_test():
+    pt_journey = create_journeys_with_pt()
+    fallback = create_walking_fallback(make_pt_object(type_pb2.ADDRESS, 1.0, 1.0, "address_1"),
+                                       make_pt_object(type_pb2.STOP_POINT, 2.0, 2.0, "stop_point_1_bis"))
+    check_extend_journey_without_copy(PeriodExtremity(pt_journey.departure_date_time, False), fallback)
+
+
+def extend_journey_without_copy_for_build_to_test():
+    pt_journey = create_journeys_with_pt()
+    fallback = create_walking_fallback(make_pt_object(type_pb2.STOP_POINT, 4.0, 4.0, "stop_point_4_bis"),
+                                       make_pt_object(type_pb2.ADDRESS, 5.0, 5.0, "address_1"))
+    check_extend_journey_without_copy(PeriodExtremity(pt_journey.arrival_date_time, True), fallback)
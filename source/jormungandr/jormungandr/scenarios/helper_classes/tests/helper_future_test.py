@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2001-2018, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+from __future__ import absolute_import, print_function, unicode_literals, division
+import gevent
+import pytest
+from jormungandr import app
+from jormungandr.scenarios.helper_classes import helper_future
+from jormungandr.scenarios.helper_classes.helper_exceptions import FutureDeadlineException
+
+
+@pytest.fixture
+def stages_config():
+    previous = app.config.get('FUTURE_STAGES_MAX_GREENLETS')
+    app.config['FUTURE_STAGES_MAX_GREENLETS'] = {'limited': 2, 'single': 1}
+    yield
+    app.config['FUTURE_STAGES_MAX_GREENLETS'] = previous
+
+
+def stage_limit_test(stages_config):
+    """
+    no more than 2 futures of the 'limited' stage are running at the same time
+    """
+    scheduler = helper_future._GeventScheduler()
+    running = []
+    max_running = []
+
+    def fun():
+        running.append(1)
+        max_running.append(len(running))
+        gevent.sleep(0.01)
+        running.pop()
+        return 42
+
+    futures = [scheduler.create_stage_future('limited', fun) for _ in range(6)]
+    scheduler.clean_futures()
+
+    assert [f.wait_and_get() for f in futures] == [42] * 6
+    assert max(max_running) == 2
+
+
+def waiting_gives_back_slots_test(stages_config):
+    """
+    a future waiting for another future of the same stage doesn't block it, even with one slot for the stage
+    """
+    scheduler = helper_future._GeventScheduler()
+
+    def child():
+        return 'child'
+
+    def parent():
+        return 'parent of ' + scheduler.create_stage_future('single', child).wait_and_get()
+
+    with gevent.Timeout(1):
+        future = scheduler.create_stage_future('single', parent)
+        assert future.wait_and_get() == 'parent of child'
+    scheduler.clean_futures()
+
+
+def deadline_test(stages_config):
+    """
+    the unfinished futures are cancelled when the deadline is reached
+    """
+    scheduler = helper_future._GeventScheduler(deadline=0.05)
+    nb_cancelled = helper_future._stages_stats['deadline_test'].nb_cancelled
+
+    fast = scheduler.create_stage_future('deadline_test', lambda: 'fast')
+    slow = scheduler.create_stage_future('deadline_test', gevent.sleep, 1)
+
+    assert fast.wait_and_get() == 'fast'
+    with pytest.raises(FutureDeadlineException):
+        slow.wait_and_get()
+    scheduler.clean_futures()
+
+    stages = {s['stage']: s for s in helper_future.get_stages_status()}
+    assert stages['deadline_test']['nb_cancelled'] == nb_cancelled + 1
+    assert stages['deadline_test']['nb_futures'] >= 1
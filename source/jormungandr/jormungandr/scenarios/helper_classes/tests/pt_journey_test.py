@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2001-2018, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+from __future__ import absolute_import, print_function, unicode_literals, division
+import navitiacommon.response_pb2 as response_pb2
+from jormungandr.planner import JourneyParameters
+from jormungandr.scenarios.helper_classes.fallback_durations import DurationElement
+from jormungandr.scenarios.helper_classes.pt_journey import PtJourney, is_dominated_by_direct_path
+from jormungandr.utils import PeriodExtremity
+
+DATETIME = 1000000
+
+
+def make_journey(departure, arrival, sn_dur, transfer_dur=0):
+    journey = response_pb2.Journey()
+    journey.departure_date_time = departure
+    journey.arrival_date_time = arrival
+    journey.sn_dur = sn_dur
+    journey.transfer_dur = transfer_dur
+    return journey
+
+
+def is_dominated_by_direct_path_clockwise_test():
+    # the direct path arrives at DATETIME + 600 with 600s of street network
+    assert is_dominated_by_direct_path(make_journey(DATETIME, DATETIME + 900, 700), 600, DATETIME, True)
+    # the journey arrives earlier
+    assert not is_dominated_by_direct_path(make_journey(DATETIME, DATETIME + 500, 700), 600, DATETIME, True)
+    # the journey has less street network
+    assert not is_dominated_by_direct_path(make_journey(DATETIME, DATETIME + 900, 300, 200), 600, DATETIME, True)
+    # same arrival, the journey leaves later
+    assert not is_dominated_by_direct_path(make_journey(DATETIME + 10, DATETIME + 600, 700), 600, DATETIME, True)
+
+
+def is_dominated_by_direct_path_anti_clockwise_test():
+    # the direct path leaves at DATETIME - 600
+    assert is_dominated_by_direct_path(make_journey(DATETIME - 900, DATETIME, 700), 600, DATETIME, False)
+    assert not is_dominated_by_direct_path(make_journey(DATETIME - 500, DATETIME, 700), 600, DATETIME, False)
+
+
+class SyncFutureManager(object):
+    def create_stage_future(self, stage, fun, *args, **kwargs):
+        class Future(object):
+            def wait_and_get(self):
+                return fun(*args, **kwargs)
+        return Future()
+
+
+class FakeFallbackDurationsPool(object):
+    def wait_and_get(self, mode):
+        return {'stop_point:A': DurationElement(60, response_pb2.reached)}
+
+
+class FakeDirectPath(object):
+    def __init__(self, duration, is_ready):
+        self.dp = response_pb2.Response()
+        self.dp.journeys.add().durations.total = duration
+        self.is_ready = is_ready
+        self.nb_waits = 0
+
+    def get_if_ready(self):
+        return self.dp if self.is_ready else None
+
+    def wait_and_get(self):
+        self.nb_waits += 1
+        return self.dp
+
+
+class FakePlanner(object):
+    def __init__(self):
+        self.direct_path_durations = []
+
+    def journeys(self, orig, dest, dt, clockwise, journey_params, bike_in_pt):
+        self.direct_path_durations.append(journey_params.direct_path_duration)
+        resp = response_pb2.Response()
+        resp.journeys.add().CopyFrom(make_journey(DATETIME, DATETIME + 500, 200))
+        resp.journeys.add().CopyFrom(make_journey(DATETIME, DATETIME + 900, 700))
+        return resp
+
+
+class FakeInstance(object):
+    def __init__(self):
+        self.planner = FakePlanner()
+
+
+def make_pt_journey(instance, direct_path):
+    return PtJourney(future_manager=SyncFutureManager(),
+                     instance=instance,
+                     orig_fallback_durtaions_pool=FakeFallbackDurationsPool(),
+                     dest_fallback_durations_pool=FakeFallbackDurationsPool(),
+                     dep_mode='car',
+                     arr_mode='walking',
+                     periode_extremity=PeriodExtremity(DATETIME, True),
+                     journey_params=JourneyParameters(),
+                     bike_in_pt=False,
+                     request={'max_duration': 86400},
+                     direct_path=direct_path)
+
+
+def pt_journey_with_known_direct_path_test():
+    """
+    the direct path is known when the pt journey is computed, kraken uses it
+    """
+    instance = FakeInstance()
+    direct_path = FakeDirectPath(600, is_ready=True)
+
+    resp = make_pt_journey(instance, direct_path).wait_and_get()
+
+    assert instance.planner.direct_path_durations == [600]
+    assert direct_path.nb_waits == 0
+    assert len(resp.journeys) == 2
+
+
+def pt_journey_without_waiting_direct_path_test():
+    """
+    the pt journey is computed without waiting for the direct path, the journeys it dominates are removed afterward
+    """
+    instance = FakeInstance()
+    direct_path = FakeDirectPath(600, is_ready=False)
+
+    resp = make_pt_journey(instance, direct_path).wait_and_get()
+
+    assert instance.planner.direct_path_durations == [None]
+    assert direct_path.nb_waits == 1
+    assert len(resp.journeys) == 1
+    assert resp.journeys[0].arrival_date_time == DATETIME + 500
+
+
+def pt_journey_without_direct_path_test():
+    instance = FakeInstance()
+
+    resp = make_pt_journey(instance, None).wait_and_get()
+
+    assert instance.planner.direct_path_durations == [None]
+    assert len(resp.journeys) == 2
@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2001-2018, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+
+from __future__ import absolute_import, print_function, unicode_literals, division
+import navitiacommon.response_pb2 as response_pb2
+from navitiacommon import type_pb2
+from jormungandr.scenarios.helper_classes.streetnetwork_path import StreetNetworkPathPool
+from jormungandr.street_network.fallback_cache import FallbackCache
+from jormungandr.street_network.street_network import StreetNetworkPathKey, StreetNetworkPathType
+from jormungandr.street_network.tests.streetnetwork_test_utils import make_pt_object
+from jormungandr.exceptions import TechnicalError
+from jormungandr.utils import PeriodExtremity
+
+DATETIME = 1000000
+DURATION = 300
+REQUEST = {'walking_speed': 1.12, 'bike_speed': 3.3}
+
+
+class LazyFuture(object):
+    """
+    computed the first time it's waited for
+    """
+    def __init__(self, fun):
+        self._fun = fun
+        self._value = None
+        self._is_done = False
+
+    def wait_and_get(self):
+        if not self._is_done:
+            self._value = self._fun()
+            self._is_done = True
+        return self._value
+
+
+class SyncFutureManager(object):
+    def create_stage_future(self, stage, fun, *args, **kwargs):
+        return LazyFuture(lambda: fun(*args, **kwargs))
+
+
+def make_path(datetime):
+    resp = response_pb2.Response()
+    journey = resp.journeys.add()
+    journey.duration = DURATION
+    journey.departure_date_time = datetime
+    journey.arrival_date_time = datetime + DURATION
+    section = journey.sections.add()
+    section.begin_date_time = datetime
+    section.end_date_time = datetime + DURATION
+    return resp
+
+
+class FakeStreetNetworkService(object):
+    """
+    the period extremity is part of the path key, as with HERE
+    """
+    sn_system_id = 'fake'
+
+    def __init__(self):
+        self.batches = []
+        self.nb_direct_paths = 0
+
+    def make_path_key(self, mode, orig_uri, dest_uri, streetnetwork_path_type, period_extremity):
+        return StreetNetworkPathKey(mode, orig_uri, dest_uri, streetnetwork_path_type, period_extremity)
+
+    def direct_paths_with_fp(self, mode, paths, request):
+        self.batches.append(sorted((o.uri, d.uri) for o, d, _, _ in paths))
+        return [make_path(fallback_extremity.datetime) for _, _, fallback_extremity, _ in paths]
+
+    def direct_path_with_fp(self, mode, pt_object_origin, pt_object_destination, fallback_extremity, request,
+                            direct_path_type):
+        self.nb_direct_paths += 1
+        return make_path(fallback_extremity.datetime)
+
+
+class FakeInstance(object):
+    def __init__(self, with_cache=False):
+        self.name = 'fake'
+        self.publication_date = 1
+        self.service = FakeStreetNetworkService()
+        self.fallback_cache = FallbackCache(self) if with_cache else None
+
+    def get_street_network(self, mode, request):
+        return self.service
+
+
+ADDRESS = make_pt_object(type_pb2.ADDRESS, 2.0, 48.0, 'address')
+SP1 = make_pt_object(type_pb2.STOP_POINT, 2.01, 48.0, 'sp1')
+SP2 = make_pt_object(type_pb2.STOP_POINT, 2.02, 48.0, 'sp2')
+BEGINNING_FALLBACK = StreetNetworkPathType.BEGINNING_FALLBACK
+
+
+def make_fallback_requests(shift=0):
+    return [(ADDRESS, SP1, 'walking', PeriodExtremity(DATETIME + shift, False), BEGINNING_FALLBACK),
+            (ADDRESS, SP1, 'walking', PeriodExtremity(DATETIME + shift + 600, False), BEGINNING_FALLBACK),
+            (ADDRESS, SP2, 'walking', PeriodExtremity(DATETIME + shift, False), BEGINNING_FALLBACK),
+            (ADDRESS, SP1, 'car', PeriodExtremity(DATETIME + shift, False), BEGINNING_FALLBACK)]
+
+
+def get_journey(pool, dest, mode, datetime):
+    dp = pool.wait_and_get(ADDRESS, dest, mode, PeriodExtremity(datetime, False), BEGINNING_FALLBACK, REQUEST)
+    assert len(dp.journeys) == 1
+    return dp.journeys[0]
+
+
+def fallback_paths_computed_once_test():
+    """
+    the walking paths to the same stop point are computed once for all the datetimes, in one call
+    """
+    instance = FakeInstance()
+    pool = StreetNetworkPathPool(SyncFutureManager(), instance)
+
+    pool.add_fallback_requests(make_fallback_requests(), REQUEST)
+
+    for datetime in (DATETIME, DATETIME + 600):
+        journey = get_journey(pool, SP1, 'walking', datetime)
+        # the path is re-timed for its datetime
+        assert journey.arrival_date_time == datetime
+        assert journey.departure_date_time == datetime - DURATION
+        assert journey.sections[0].begin_date_time == datetime - DURATION
+        assert journey.sections[0].end_date_time == datetime
+    assert get_journey(pool, SP2, 'walking', DATETIME).arrival_date_time == DATETIME
+    assert instance.service.batches == [[('address', 'sp1'), ('address', 'sp2')]]
+
+    # the car paths depend on the datetime, they are still computed one by one
+    get_journey(pool, SP1, 'car', DATETIME)
+    assert instance.service.nb_direct_paths == 1
+
+
+def fallback_paths_cached_test():
+    """
+    with the fallback cache, the walking paths computed by a request are reused by the next ones
+    """
+    instance = FakeInstance(with_cache=True)
+
+    first_pool = StreetNetworkPathPool(SyncFutureManager(), instance)
+    first_pool.add_fallback_requests(make_fallback_requests(), REQUEST)
+    get_journey(first_pool, SP1, 'walking', DATETIME)
+    assert len(instance.service.batches) == 1
+
+    second_pool = StreetNetworkPathPool(SyncFutureManager(), instance)
+    second_pool.add_fallback_requests(make_fallback_requests(shift=3600), REQUEST)
+    journey = get_journey(second_pool, SP2, 'walking', DATETIME + 3600)
+    assert journey.arrival_date_time == DATETIME + 3600
+    assert len(instance.service.batches) == 1
+
+    # with other speeds, the paths are not the same
+    third_pool = StreetNetworkPathPool(SyncFutureManager(), instance)
+    third_pool.add_fallback_requests(make_fallback_requests(), dict(REQUEST, walking_speed=2))
+    get_journey(third_pool, SP1, 'walking', DATETIME)
+    assert len(instance.service.batches) == 2
+
+
+class FailingStreetNetworkService(FakeStreetNetworkService):
+    def direct_paths_with_fp(self, mode, paths, request):
+        FakeStreetNetworkService.direct_paths_with_fp(self, mode, paths, request)
+        raise TechnicalError('the service has failed')
+
+
+def fallback_paths_failure_test():
+    """
+    when the call for the walking paths fails, the paths are empty and they are not cached
+    """
+    instance = FakeInstance(with_cache=True)
+    instance.service = FailingStreetNetworkService()
+    pool = StreetNetworkPathPool(SyncFutureManager(), instance)
+    pool.add_fallback_requests(make_fallback_requests(), REQUEST)
+
+    dp = pool.wait_and_get(ADDRESS, SP1, 'walking', PeriodExtremity(DATETIME, False), BEGINNING_FALLBACK, REQUEST)
+    assert not dp.journeys
+    assert not pool.wait_and_get(ADDRESS, SP2, 'walking', PeriodExtremity(DATETIME, False), BEGINNING_FALLBACK,
+                                 REQUEST).journeys
+
+    instance.service = FakeStreetNetworkService()
+    second_pool = StreetNetworkPathPool(SyncFutureManager(), instance)
+    second_pool.add_fallback_requests(make_fallback_requests(), REQUEST)
+    assert get_journey(second_pool, SP1, 'walking', DATETIME).arrival_date_time == DATETIME
+    assert len(instance.service.batches) == 1
@@ -30,6 +30,7 @@
 from __future__ import absolute_import, print_function, unicode_literals, division
 import logging
 import itertools
+import collections
 import datetime
 import abc
 import six
@@ -473,15 +474,13 @@ def apply_final_journey_filters(response_list, instance, request):
     final_line_filter = get_or_default(request, '_final_line_filter', False)
     if final_line_filter:
         journeys = journey_generator(response_list)
-        journey_pairs_pool = itertools.combinations(journeys, 2)
-        _filter_similar_line_journeys(journey_pairs_pool, request)
+        _filter_similar_journeys_by_signature(journeys, [], request, similar_journeys_line_generator)
 
     # we filter journeys having "shared sections" (same succession of stop_points + custom rules)
     no_shared_section = get_or_default(request, 'no_shared_section', False)
     if no_shared_section:
         journeys = journey_generator(response_list)
-        journey_pairs_pool = itertools.combinations(journeys, 2)
-        filter_shared_sections_journeys(journey_pairs_pool, request)
+        _filter_similar_journeys_by_signature(journeys, [], request, shared_section_generator)
 
     # we filter journeys having too much connections compared to minimum
     journeys = journey_generator(response_list)
@@ -548,6 +547,10 @@ def filter_similar_vj_journeys(journey_pairs_pool, request):
     _filter_similar_journeys(journey_pairs_pool, request, similar_journeys_vj_generator)
 
 
+def filter_similar_vj_journeys_by_signature(journeys, other_journeys, request):
+    _filter_similar_journeys_by_signature(journeys, other_journeys, request, similar_journeys_vj_generator)
+
+
 def _filter_similar_line_journeys(journey_pairs_pool, request):
     _filter_similar_journeys(journey_pairs_pool, request, similar_journeys_line_generator)
 
@@ -556,27 +559,76 @@ def filter_shared_sections_journeys(journey_pairs_pool, request):
     _filter_similar_journeys(journey_pairs_pool, request, shared_section_generator)
 
 
+def _get_signature(journey, similar_journey_generator):
+    """
+    The values of the generator for a journey, 2 journeys are similar if they have the same signature
+    (it's the same as utils.compare, but the sections of the journey are walked only once)
+    """
+    return tuple(similar_journey_generator(journey))
+
+
+def _remove_worst_similar(j1, j2, request, is_debug):
+    # After comparison, if the 2 journeys are similar, the worst one must be eliminated
+    worst = _get_worst_similar(j1, j2, request)
+    logging.getLogger(__name__).debug("the journeys {}, {} are similar, we delete {}".format(j1.internal_id,
+                                                                                             j2.internal_id,
+                                                                                             worst.internal_id))
+
+    mark_as_dead(worst, is_debug, 'duplicate_journey', 'similar_to_{other}'
+                  .format(other=j1.internal_id if worst == j2 else j2.internal_id))
+
+
 def _filter_similar_journeys(journey_pairs_pool, request, similar_journey_generator):
     """
     Compare journeys 2 by 2.
     The given generator tells which part of journeys are compared.
     In case of similar journeys, the function '_get_worst_similar_vjs' decides which one to delete.
     """
-
-    logger = logging.getLogger(__name__)
     is_debug = request.get('debug', False)
+    # the signature of each journey is computed only once
+    # the journey is kept with its signature so its id can't be reused by another object
+    signatures = {}
+
+    def _get_cached_signature(journey):
+        cached = signatures.get(id(journey))
+        if cached is None:
+            cached = signatures[id(journey)] = (journey, _get_signature(journey, similar_journey_generator))
+        return cached[1]
+
     for j1, j2 in journey_pairs_pool:
         if to_be_deleted(j1) or to_be_deleted(j2):
             continue
-        if compare(j1, j2, similar_journey_generator):
-            # After comparison, if the 2 journeys are similar, the worst one must be eliminated
-            worst = _get_worst_similar(j1, j2, request)
-            logger.debug("the journeys {}, {} are similar, we delete {}".format(j1.internal_id,
-                                                                                j2.internal_id,
-                                                                                worst.internal_id))
-
-            mark_as_dead(worst, is_debug, 'duplicate_journey', 'similar_to_{other}'
-                          .format(other=j1.internal_id if worst == j2 else j2.internal_id))
+        if _get_cached_signature(j1) == _get_cached_signature(j2):
+            _remove_worst_similar(j1, j2, request, is_debug)
+
+
+def _filter_similar_journeys_by_signature(journeys, other_journeys, request, similar_journey_generator):
+    """
+    Same as _filter_similar_journeys with the pairs
+    itertools.chain(itertools.combinations(journeys, 2), itertools.product(journeys, other_journeys))
+
+    Only journeys with the same signature can be similar, so the journeys are grouped by signature and only the
+    pairs of a group are compared.
+    A pair only changes the status of its 2 journeys, so the result is the same as with all the pairs as long as
+    the pairs of a group are handled in the same order.
+    """
+    is_debug = request.get('debug', False)
+    groups = collections.defaultdict(lambda: ([], []))
+    for j in journeys:
+        groups[_get_signature(j, similar_journey_generator)][0].append(j)
+    for j in other_journeys:
+        signature = _get_signature(j, similar_journey_generator)
+        if signature in groups:
+            groups[signature][1].append(j)
+
+    for group_journeys, group_other_journeys in groups.values():
+        if len(group_journeys) + len(group_other_journeys) < 2:
+            continue
+        for j1, j2 in itertools.chain(itertools.combinations(group_journeys, 2),
+                                      itertools.product(group_journeys, group_other_journeys)):
+            if to_be_deleted(j1) or to_be_deleted(j2):
+                continue
+            _remove_worst_similar(j1, j2, request, is_debug)
 
 
 def _filter_too_much_connections(journeys, instance, request):
@@ -37,7 +37,7 @@ from flask import g
 from jormungandr.scenarios import simple, journey_filter, helpers
 from jormungandr.scenarios.ridesharing.ridesharing_helper import decorate_journeys
 from jormungandr.scenarios.utils import journey_sorter, change_ids, updated_request_with_default, \
-    get_or_default, fill_uris, gen_all_combin, get_pseudo_duration, mode_weight, switch_back_to_ridesharing, nCr
+    get_or_default, fill_uris, get_pseudo_duration, mode_weight, switch_back_to_ridesharing
 from navitiacommon import type_pb2, response_pb2, request_pb2
 from jormungandr.scenarios.qualifier import min_from_criteria, arrival_crit, departure_crit, \
     duration_crit, transfers_crit, nonTC_crit, trip_carac, has_no_car, has_car, has_pt, \
@@ -307,106 +307,155 @@ def _build_candidate_pool_and_sections_set(journeys):
     return np.array(candidates_pool), sections_set, idx_of_jrny_must_keep
 
 
-def _build_selected_sections_matrix(sections_set, candidates_pool):
+def _build_sections_masks(sections_set, candidates_pool):
+    """
+    For each journey, build the bit mask of the sections it uses (the bit i is set if the journey uses the i-th
+    section of the sections set)
+    """
     sections_2_index_dict = dict()
     for index, value in enumerate(sections_set):
         sections_2_index_dict[value] = index
-    selected_sections_matrix = list()
-    nb_sections = len(sections_set)
 
+    masks = []
     for j in candidates_pool:
-        section_select = np.zeros(nb_sections, dtype=int)
-
-        def _gen_section_ind():
-            for s in j.sections:
-                ind = sections_2_index_dict.get(_get_section_id(s))
-                if ind is not None:
-                    yield ind
-        selected_indexes = list(_gen_section_ind())
-        section_select[selected_indexes] = 1
-        selected_sections_matrix.append(section_select)
-    return np.array(selected_sections_matrix)
-
-
-def _get_sorted_solutions_indexes(selected_sections_matrix, nb_journeys_to_find, idx_of_jrny_must_keep):
-    """
-    The entry is a 2D array where its lines are journeys, its columns are (non) chosen sections
-    """
-    logger = logging.getLogger(__name__)
-    """
-    Get a matrix which illustrate all possible non ordered combinations of t elements from n elements where n >= t with
-    their indexes.
-
-    Let's say we'd like to find all combinations of 2 elements from a set of 3.
-
-    selected_journeys_matrix will be like:
-
-    [[0,1]
-     [0,2]
-     [1,2]]
-    """
-    # Allocation of memory
-    shape = (nCr(selected_sections_matrix.shape[0], nb_journeys_to_find), nb_journeys_to_find)
-    selected_journeys_matrix = np.empty(shape, dtype=np.uint16)
-
-    def f((i, c)):
-        selected_journeys_matrix[i] = c
-
-    # replace line by line
-    from itertools import izip
-    map(f, izip(xrange(shape[0]), gen_all_combin(selected_sections_matrix.shape[0], nb_journeys_to_find)))
-    """
-    We should cut out those combinations that don't contain must-keep journeys
-    """
-    def _contains(idx_selected_jrny):
-        return set(idx_selected_jrny).issuperset(idx_of_jrny_must_keep)
-
-    selected_journeys_matrix = selected_journeys_matrix[np.apply_along_axis(_contains, 1, selected_journeys_matrix)]
+        mask = 0
+        for s in j.sections:
+            ind = sections_2_index_dict.get(_get_section_id(s))
+            if ind is not None:
+                mask |= 1 << ind
+        masks.append(mask)
+    return masks
 
-    selection_matrix = np.zeros((selected_journeys_matrix.shape[0], selected_sections_matrix.shape[0]))
 
-    """
-    Given  selected_journeys_matrix:
-    [[0,1]
-     [0,2]
-     [1,2]]
-
-    selection_matrix will be like:
-    [[1,1,0], -> the first one and the second are chosen, etc...
-     [1,0,1],
-     [0,1,1]]
-    """
-    # http://stackoverflow.com/questions/20103779/index-2d-numpy-array-by-a-2d-array-of-indices-without-loops
-    selection_matrix[np.arange(selected_journeys_matrix.shape[0])[:, None], selected_journeys_matrix] = 1
+def _nb_bits(mask):
+    return bin(mask).count('1')
 
-    res_pool = np.dot(selection_matrix, selected_sections_matrix)
 
+def _get_best_selection(sections_masks, durations, nb_journeys_to_find, idx_of_jrny_must_keep, max_nodes=None):
     """
-    Get number of sections(or tranfers) for every solution
+    Choose nb_journeys_to_find journeys among the candidates, all the must-keep journeys being chosen.
+
+    The best selection is the one which:
+     - covers as many sections as possible (the integrity of the selection)
+     - then has as few sections as possible (less transfers to do)
+     - then has the smallest sum of pseudo durations
+     - then comes first in the colexicographic order of the combinations (the order of gen_all_combin)
+
+    Enumerating all the combinations is too expensive when the pool grows (Combination(30, 8) = 5.8E+6),
+    so the selections are searched with a branch and bound:
+     - a greedy selection gives the first bound
+     - a branch is cut as soon as a lower bound of its integrity, nb of sections and durations is worse
+       than the best selection found so far
+
+    The exact search stops after exploring max_nodes nodes (if given), the best selection found so far is then
+    returned.
+
+    :param sections_masks: for each candidate, the bit mask of its sections
+    :param durations: for each candidate, its pseudo duration
+    :return: the sorted indexes of the chosen journeys and True if the search has been completed
     """
-    nb_sections = np.sum(res_pool, axis=1)
+    nb_candidates = len(sections_masks)
+    if nb_journeys_to_find >= nb_candidates:
+        return list(range(nb_candidates)), True
 
-    """
-    integrity shows at which point a solution(chosen journeys) covers sections.
-    0 means a solution covers all sections
-    1 means a solutions covers almost all sections but 1 is missing
-    2 means 2 sections are missing
-    .... etc
-    """
-    integrity = res_pool.shape[1] - np.array([np.count_nonzero(r) for r in res_pool])
+    all_sections = 0
+    for mask in sections_masks:
+        all_sections |= mask
+    nb_sections = [_nb_bits(m) for m in sections_masks]
+    must_keep = set(idx_of_jrny_must_keep)
 
     """
-    We want to find the solutions covers as many sections as possible which has less sections(less transfer to do)
+    The combinations are explored from their biggest index to their smallest one, so that the first complete
+    combination found for a score is also the first one in the colexicographic order.
+    The next index is then always chosen among the first indexes, for each prefix [0, i) of the candidates we
+    compute:
+     - the union of their sections
+     - the number of must-keep journeys
+     - the cumulated sums of their sorted nb of sections and durations, to bound what is left to choose
     """
-    the_best_idx = np.lexsort((nb_sections, integrity))[0]  # sort by integrity then by nb_sections
-
-    best_indexes = np.where(np.logical_and(nb_sections == nb_sections[the_best_idx],
-                                           integrity == integrity[the_best_idx]))[0]
+    prefix_union = [0] * (nb_candidates + 1)
+    prefix_nb_must_keep = [0] * (nb_candidates + 1)
+    last_must_keep_before = [-1] * (nb_candidates + 1)
+    for i in range(nb_candidates):
+        prefix_union[i + 1] = prefix_union[i] | sections_masks[i]
+        prefix_nb_must_keep[i + 1] = prefix_nb_must_keep[i] + (i in must_keep)
+        last_must_keep_before[i + 1] = i if i in must_keep else last_must_keep_before[i]
+
+    def _cumulated_sums(values):
+        res = [0]
+        for v in values:
+            res.append(res[-1] + v)
+        return res
+
+    smallest_nb_sections = [_cumulated_sums(sorted(nb_sections[:i])) for i in range(nb_candidates + 1)]
+    smallest_durations = [_cumulated_sums(sorted(durations[:i])) for i in range(nb_candidates + 1)]
+
+    def _score(selection):
+        covered = 0
+        for i in selection:
+            covered |= sections_masks[i]
+        return (_nb_bits(all_sections & ~covered),
+                sum(nb_sections[i] for i in selection),
+                sum(durations[i] for i in selection),
+                tuple(sorted(selection, reverse=True)))
+
+    # the greedy selection: the must-keep journeys, then the journeys adding the most new sections
+    greedy = set(must_keep)
+    greedy_covered = 0
+    for i in greedy:
+        greedy_covered |= sections_masks[i]
+    while len(greedy) < nb_journeys_to_find:
+        chosen = min((i for i in range(nb_candidates) if i not in greedy),
+                     key=lambda i: (-_nb_bits(sections_masks[i] & ~greedy_covered), nb_sections[i], durations[i], i))
+        greedy.add(chosen)
+        greedy_covered |= sections_masks[chosen]
+
+    best = [_score(greedy)]
+    nb_nodes = [0]
+
+    class _BudgetExceeded(Exception):
+        pass
+
+    def _explore(prefix, end, covered, nb_secs, duration):
+        # the next index is chosen in [0, end)
+        nb_left = nb_journeys_to_find - len(prefix)
+        # all the must-keep journeys before end have to be chosen, so the next index can't be
+        # smaller than the last of them
+        first = max(nb_left - 1, last_must_keep_before[end])
+        for i in range(first, end):
+            if prefix_nb_must_keep[i] > nb_left - 1:
+                break
+            nb_nodes[0] += 1
+            if max_nodes is not None and nb_nodes[0] > max_nodes:
+                raise _BudgetExceeded()
+            new_prefix = prefix + (i,)
+            new_covered = covered | sections_masks[i]
+            new_nb_secs = nb_secs + nb_sections[i]
+            new_duration = duration + durations[i]
+            if nb_left == 1:
+                score = (_nb_bits(all_sections & ~new_covered), new_nb_secs, new_duration, new_prefix)
+                if score < best[0]:
+                    best[0] = score
+                continue
+            uncovered = all_sections & ~new_covered
+            # each of the journeys left can't cover more than its own uncovered sections
+            gains = sorted((_nb_bits(sections_masks[j] & uncovered) for j in range(i)), reverse=True)
+            lower_bound = (max(_nb_bits(uncovered & ~prefix_union[i]),
+                               _nb_bits(uncovered) - sum(gains[:nb_left - 1])),
+                           new_nb_secs + smallest_nb_sections[i][nb_left - 1],
+                           new_duration + smallest_durations[i][nb_left - 1],
+                           new_prefix)
+            if lower_bound > best[0]:
+                continue
+            _explore(new_prefix, i, new_covered, new_nb_secs, new_duration)
 
-    logger.debug("Best Itegrity: {0}".format(integrity[the_best_idx]))
-    logger.debug("Best Nb sections: {0}".format(nb_sections[the_best_idx]))
+    is_complete = True
+    try:
+        _explore((), nb_candidates, 0, 0, 0)
+    except _BudgetExceeded:
+        is_complete = False
 
-    return best_indexes, selection_matrix
+    return sorted(best[0][3]), is_complete
 
 
 def culling_journeys(resp, request):
@@ -548,34 +597,23 @@ def culling_journeys(resp, request):
      [1,0,1,1] -> journey_3
     ]
     """
-    selected_sections_matrix = _build_selected_sections_matrix(sections_set, candidates_pool)
-
-    best_indexes, selection_matrix = _get_sorted_solutions_indexes(selected_sections_matrix,
-                                                                   max_nb_journeys,
-                                                                   idx_of_jrnys_must_keep)
-
-    logger.debug("Nb best solutions: {0}".format(best_indexes.shape[0]))
+    sections_masks = _build_sections_masks(sections_set, candidates_pool)
 
-    the_best_index = best_indexes[0]
+    requested_dt = request['datetime']
+    is_clockwise = request.get('clockwise', True)
+    durations = [get_pseudo_duration(jrny, requested_dt, is_clockwise) for jrny in candidates_pool]
 
-    logger.debug("Trying to find the best of best")
-    """
-    Let's find the best of best :)
-    """
-    # If there're several solutions which have the same score of integrity and nb_sections
-    if best_indexes.shape[0] != 1:
-        requested_dt = request['datetime']
-        is_clockwise = request.get('clockwise', True)
-
-        def combinations_sorter(v):
-            # Hoping to find We sort the solution by the sum of journeys' pseudo duration
-            return np.sum((get_pseudo_duration(jrny, requested_dt, is_clockwise)
-                           for jrny in np.array(candidates_pool)[np.where(selection_matrix[v, :])]))
-        the_best_index = min(best_indexes, key=combinations_sorter)
+    selected_indexes, is_complete = _get_best_selection(sections_masks, durations, max_nb_journeys,
+                                                        idx_of_jrnys_must_keep,
+                                                        app.config['CULLING_JOURNEYS_MAX_NODES'])
+    if not is_complete:
+        logger.debug('the search of the best journeys has been stopped, the best found is kept')
 
     logger.debug('Removing non selected journeys')
-    for jrny in candidates_pool[np.where(selection_matrix[the_best_index, :] == 0)]:
-        journey_filter.mark_as_dead(jrny, is_debug, 'Filtered by max_nb_journeys')
+    selected_indexes = set(selected_indexes)
+    for i, jrny in enumerate(candidates_pool):
+        if i not in selected_indexes:
+            journey_filter.mark_as_dead(jrny, is_debug, 'Filtered by max_nb_journeys')
 
     journey_filter.delete_journeys((resp,), request)
 
@@ -922,33 +960,20 @@ class Scenario(simple.Scenario):
             request = self.create_next_kraken_request(request, new_resp)
 
             # we filter unwanted journeys in the new response
-            # note that filter_journeys returns a generator which will be evaluated later
+            # note that filter_journeys returns a generator which is evaluated when building new_journeys
             filtered_new_resp = journey_filter.filter_journeys(new_resp, instance, api_request)
 
-            # duplicate the generator
-            tmp1, tmp2 = itertools.tee(filtered_new_resp)
-            qualified_journeys = journey_filter.get_qualified_journeys(responses)
+            new_journeys = list(filtered_new_resp)
+            qualified_journeys = list(journey_filter.get_qualified_journeys(responses))
 
             # now we want to filter similar journeys in the new response which is done in 2 steps
             # In the first step, we compare journeys from the new response only , 2 by 2
             # hopefully, it may lead to some early return for the second step to improve the perf a little
             # In the second step, we compare the journeys from the new response with those that have been qualified
             # already in the former iterations
-            # note that the journey_pairs_pool is a list of 2-element tuple of journeys
-            journey_pairs_pool = itertools.chain(
-                # First step: compare journeys from the new response only
-                itertools.combinations(tmp1, 2),
-                # Second step:
-                # we use the itertools.product to create combinations between qualified journeys and new journeys
-                # Ex:
-                # new_journeys = [n_1, n_2]
-                # qualified_journeys = [q_1, q_2, q_3]
-                # itertools.product(new_journeys, qualified_journeys) gives combinations as follows:
-                # (n_1, q_1), (n_1, q_2),(n_1, q_3),(n_2, q_1),(n_2, q_2),(n_2, q_3)
-                itertools.product(tmp2, qualified_journeys),
-            )
-
-            journey_filter.filter_similar_vj_journeys(journey_pairs_pool, api_request)
+            # Only the journeys with the same signature (the succession of their vjs) are compared, the signature of
+            # each journey is computed once
+            journey_filter.filter_similar_vj_journeys_by_signature(new_journeys, qualified_journeys, api_request)
 
             responses.extend(new_resp)  # we keep the error for building the response
 
@@ -1019,8 +1044,10 @@ class Scenario(simple.Scenario):
         pool = gevent.pool.Pool(app.config.get('GREENLET_POOL_SIZE', 3))
         for dep_mode, arr_mode in krakens_call:
             pb_request = create_pb_request(request_type, request, dep_mode, arr_mode)
-            # we spawn a new greenlet, it won't have access to our thread local request object so we pass the request_id
-            futures.append(pool.spawn(worker, dep_mode, arr_mode, instance, pb_request, flask_request_id=flask.request.id))
+            # we spawn a new greenlet, it won't have access to our thread local request object so we pass the
+            # request_id
+            futures.append(pool.spawn(worker, dep_mode, arr_mode, instance, pb_request,
+                                      flask_request_id=flask.request.id))
 
         for future in gevent.iwait(futures):
             dep_mode, arr_mode, local_resp = future.get()
@@ -36,7 +36,7 @@ import pytz
 import requests as requests
 
 from jormungandr import utils
-from jormungandr import app
+from jormungandr import app, http_client
 import jormungandr.scenarios.ridesharing.ridesharing_journey as rsj
 from jormungandr.scenarios.ridesharing.ridesharing_service import AbstractRidesharingService, RsFeedPublisher, \
     RidesharingServiceError
@@ -89,7 +89,7 @@ class InstantSystem(AbstractRidesharingService):
 
         headers = {'Authorization': 'apiKey {}'.format(self.api_key)}
         try:
-            return self.breaker.call(requests.get, url=self.service_url, headers=headers,
+            return self.breaker.call(http_client.get, url=self.service_url, connector='instant_system', headers=headers,
                                      params=params, timeout=self.timeout)
         except pybreaker.CircuitBreakerError as e:
             logging.getLogger(__name__).error('Instant System service dead (error: %s)', e,
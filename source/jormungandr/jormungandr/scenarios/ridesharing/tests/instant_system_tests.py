@@ -227,7 +227,7 @@ def get_ridesharing_service_test():
 
 
 def instant_system_test():
-    with mock.patch('requests.get', mock_get):
+    with mock.patch('jormungandr.http_client.get', mock_get):
 
         instant_system = InstantSystem(DummyInstance(), service_url='dummyUrl', api_key='dummyApiKey',
                                        network='dummyNetwork', feed_publisher=DUMMY_INSTANT_SYSTEM_FEED_PUBLISHER,
@@ -614,6 +614,42 @@ def test_similar_journeys_bss_park():
     assert jf.compare(journey1, journey2, jf.similar_journeys_vj_generator)
 
 
+def _add_random_journeys(response, prefix, nb_journeys):
+    for i in range(nb_journeys):
+        journey = response.journeys.add()
+        journey.internal_id = '{}_{}'.format(prefix, i)
+        journey.arrival_date_time = random.randint(0, 3) * 60
+        journey.duration = random.randint(0, 3) * 60
+        for vj in random.choice([('vj_a',), ('vj_a', 'vj_b'), ('vj_b',), ('vj_c', 'vj_b')]):
+            section = journey.sections.add()
+            section.type = response_pb2.PUBLIC_TRANSPORT
+            section.pt_display_informations.uris.vehicle_journey = vj
+
+
+def test_similar_journeys_by_signature():
+    """
+    comparing only the journeys with the same signature must give the same result as comparing all the pairs
+    """
+    random.seed(42)
+    for _ in range(20):
+        new_resp = response_pb2.Response()
+        _add_random_journeys(new_resp, 'new', 15)
+        qualified_resp = response_pb2.Response()
+        _add_random_journeys(qualified_resp, 'qualified', 10)
+        new_resp_bis = deepcopy(new_resp)
+        qualified_resp_bis = deepcopy(qualified_resp)
+
+        journey_pairs_pool = itertools.chain(itertools.combinations(new_resp.journeys, 2),
+                                             itertools.product(new_resp.journeys, qualified_resp.journeys))
+        jf.filter_similar_vj_journeys(journey_pairs_pool, {'debug': True})
+        jf.filter_similar_vj_journeys_by_signature(new_resp_bis.journeys, qualified_resp_bis.journeys,
+                                                   {'debug': True})
+
+        assert [list(j.tags) for j in new_resp.journeys] == [list(j.tags) for j in new_resp_bis.journeys]
+        assert [list(j.tags) for j in qualified_resp.journeys] == \
+               [list(j.tags) for j in qualified_resp_bis.journeys]
+
+
 def test_departure_sort():
     """
     we want to sort by departure hour, then by duration
@@ -32,9 +32,11 @@ import navitiacommon.response_pb2 as response_pb2
 import jormungandr.scenarios.tests.helpers_tests as helpers_tests
 from jormungandr.scenarios import new_default
 from jormungandr.scenarios.new_default import _tag_journey_by_mode, get_kraken_calls
-from jormungandr.scenarios.utils import switch_back_to_ridesharing
+from jormungandr.scenarios.utils import switch_back_to_ridesharing, gen_all_combin
 from werkzeug.exceptions import HTTPException
 import pytest
+import random
+from functools import reduce
 
 """
  sections       0   1   2   3   4   5   6   7   8   9   10
@@ -168,31 +170,86 @@ def create_candidate_pool_and_sections_set_test():
     assert len(sections_set) == 11
 
 
-def build_candidate_pool_and_sections_set_test():
+def build_sections_masks_test():
     mocked_pb_response = build_mocked_response()
     candidates_pool, sections_set, idx_jrny_must_keep = \
         new_default._build_candidate_pool_and_sections_set(mocked_pb_response.journeys)
-    selected_sections_matrix = new_default._build_selected_sections_matrix(sections_set, candidates_pool)
+    sections_masks = new_default._build_sections_masks(sections_set, candidates_pool)
 
-    # selected_sections_matrix should have 19 lines(19 journeys) and 11 columns(11 sections)
-    assert selected_sections_matrix.shape == (19, 11)
+    # one mask per journey, the 11 sections are used
+    assert len(sections_masks) == 19
+    assert reduce(lambda a, b: a | b, sections_masks) == (1 << 11) - 1
 
-    # it's too verbose to check the entire matrix... we check only two lines
-    assert [1, 0, 1, 0, 1, 0, 0, 1, 0, 0, 1] in selected_sections_matrix
-    assert [0, 0, 0, 1, 0, 0, 0, 1, 1, 0, 1] in selected_sections_matrix
+    # J1 and J19 have the same sections, J14 and J15 don't
+    assert sections_masks[2] == sections_masks[18]
+    assert sections_masks[13] != sections_masks[14]
+    assert [bin(m).count('1') for m in sections_masks[13:16]] == [2, 3, 1]
 
 
-def get_sorted_solutions_indexes_test():
+def get_best_selection_test():
     mocked_pb_response = build_mocked_response()
     candidates_pool, sections_set, idx_jrny_must_keep = \
         new_default._build_candidate_pool_and_sections_set(mocked_pb_response.journeys)
-    selected_sections_matrix = new_default._build_selected_sections_matrix(sections_set, candidates_pool)
+    sections_masks = new_default._build_sections_masks(sections_set, candidates_pool)
     # 4 journeys are must-have, we'd like to select another 5 journeys
-    best_indexes, selection_matrix = \
-        new_default._get_sorted_solutions_indexes(selected_sections_matrix, (5 + 4), idx_jrny_must_keep)
+    # with the same durations, the first of the 33 best combinations is chosen
+    selection, is_complete = new_default._get_best_selection(sections_masks, [0] * 19, (5 + 4),
+                                                             idx_jrny_must_keep)
 
-    assert best_indexes.shape[0] == 33
-    assert all(selection_matrix[best_indexes[0]] == [0, 0, 1, 1, 0, 1, 0, 1, 1, 0, 0, 0, 0, 1, 1, 1, 1, 0, 0])
+    assert is_complete
+    assert selection == [2, 3, 5, 7, 8, 13, 14, 15, 16]
+
+
+def _brute_force_selection(sections_masks, durations, nb_journeys_to_find, idx_of_jrny_must_keep):
+    """
+    the best selection by enumerating all the combinations, in the order of gen_all_combin
+    """
+    all_sections = reduce(lambda a, b: a | b, sections_masks)
+    best = None
+    for combination in gen_all_combin(len(sections_masks), nb_journeys_to_find):
+        if not set(combination).issuperset(idx_of_jrny_must_keep):
+            continue
+        covered = reduce(lambda a, b: a | b, (sections_masks[i] for i in combination))
+        score = (bin(all_sections & ~covered).count('1'),
+                 sum(bin(sections_masks[i]).count('1') for i in combination),
+                 sum(durations[i] for i in combination))
+        if best is None or score < best[0]:
+            best = (score, list(combination))
+    return best[1]
+
+
+def get_best_selection_same_as_brute_force_test():
+    """
+    the branch and bound must find the same selection as the enumeration of all the combinations
+    """
+    random.seed(42)
+    for _ in range(200):
+        nb_candidates = random.randint(2, 12)
+        nb_journeys_to_find = random.randint(1, nb_candidates - 1)
+        sections_masks = [random.getrandbits(10) & random.getrandbits(10) for _ in range(nb_candidates)]
+        durations = [random.choice([600, 1200, random.randint(0, 3600)]) for _ in range(nb_candidates)]
+        must_keep = sorted(random.sample(range(nb_candidates), random.randint(0, min(nb_journeys_to_find, 3))))
+
+        selection, is_complete = new_default._get_best_selection(sections_masks, durations,
+                                                                 nb_journeys_to_find, must_keep)
+        assert is_complete
+        assert selection == _brute_force_selection(sections_masks, durations, nb_journeys_to_find, must_keep)
+
+
+def get_best_selection_budget_test():
+    """
+    when the exact search is stopped, a valid selection is still returned
+    """
+    mocked_pb_response = build_mocked_response()
+    candidates_pool, sections_set, idx_jrny_must_keep = \
+        new_default._build_candidate_pool_and_sections_set(mocked_pb_response.journeys)
+    sections_masks = new_default._build_sections_masks(sections_set, candidates_pool)
+    selection, is_complete = new_default._get_best_selection(sections_masks, [0] * 19, (5 + 4),
+                                                             idx_jrny_must_keep, max_nodes=1)
+
+    assert not is_complete
+    assert len(selection) == 9
+    assert set(selection).issuperset(idx_jrny_must_keep)
 
 
 def culling_jounreys_1_test():
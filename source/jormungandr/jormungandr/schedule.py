@@ -36,14 +36,17 @@ from jormungandr import utils
 
 from navitiacommon import type_pb2, request_pb2, response_pb2
 from copy import deepcopy
-from jormungandr import new_relic
+from jormungandr import new_relic, app
 
 import gevent, gevent.pool
 import flask
+from collections import OrderedDict
 
 
 RT_PROXY_PROPERTY_NAME = 'realtime_system'
 RT_PROXY_DATA_FRESHNESS = 'realtime'
+REALTIME_DEADLINE_NOTE_URI = 'note:realtime_deadline_exceeded'
+REALTIME_DEADLINE_NOTE = 'Real-time data not available in time, base schedule displayed'
 
 
 def get_realtime_system_code(route_point):
@@ -159,6 +162,18 @@ def _get_route_point_from_stop_schedule(stop_schedule):
     return rp
 
 
+def _add_realtime_deadline_note(stop_schedule):
+    """
+    mark the stop_schedule as not updated because its realtime system did not answer in time
+    """
+    notes = stop_schedule.pt_display_informations.notes
+    if any(n.uri == REALTIME_DEADLINE_NOTE_URI for n in notes):
+        return
+    note = notes.add()
+    note.uri = REALTIME_DEADLINE_NOTE_URI
+    note.note = REALTIME_DEADLINE_NOTE
+
+
 class MixedSchedule(object):
     """
     class dealing with schedule (arrivals, departure, route)
@@ -185,28 +200,77 @@ class MixedSchedule(object):
             return None
         return rt_system
 
-    def _get_next_realtime_passages(self, rt_system, route_point, request):
+    def _get_next_realtime_passages(self, rt_system, route_points, request):
+        """
+        get the next realtime passages of some route points handled by the same realtime system
+
+        returns a dict route_point => next passages (None to use the base schedule)
+        """
         log = logging.getLogger(__name__)
-        next_rt_passages = None
+        next_rt_passages = {}
 
         try:
-            next_rt_passages = rt_system.next_passage_for_route_point(route_point,
-                                                                      request['items_per_schedule'],
-                                                                      request['from_datetime'],
-                                                                      request['_current_datetime'],
-                                                                      request['duration'],
-                                                                      request['timezone'])
+            next_rt_passages = rt_system.next_passages_for_route_points(route_points,
+                                                                        request['items_per_schedule'],
+                                                                        request['from_datetime'],
+                                                                        request['_current_datetime'],
+                                                                        request['duration'],
+                                                                        request['timezone'])
         except Exception as e:
             log.exception('failure while requesting next passages to external RT system {}'.format(rt_system.rt_system_id))
             new_relic.record_custom_event('realtime_internal_failure', {'rt_system_id': unicode(rt_system.rt_system_id),
                                                                         'message': str(e)})
 
-        if next_rt_passages is None:
-            log.debug('no next passages, using base schedule')
-            return None
+        for route_point in route_points:
+            if next_rt_passages.get(route_point) is None:
+                log.debug('no next passages for {}, using base schedule'.format(route_point))
+                next_rt_passages[route_point] = None
 
         return next_rt_passages
 
+    def _get_realtime_passages_by_route_point(self, route_points, request, deadline=None):
+        """
+        get the next realtime passages of the route points in parallel
+
+        the route points of a stop are asked in one call to the realtime systems handling it in bulk,
+        the others are asked one by one
+
+        generates the (realtime system, route point, next passages) as soon as they are available
+
+        if a deadline is given (in seconds), the calls still running after it are killed and
+        their route points are not generated
+        """
+        calls = OrderedDict()
+        for route_point in route_points:
+            rt_proxy = self._get_realtime_proxy(route_point)
+            if not rt_proxy:
+                continue
+            key = route_point.pb_stop_point.uri if rt_proxy.has_bulk_next_passages else route_point
+            calls.setdefault((rt_proxy, key), []).append(route_point)
+
+        pool = gevent.pool.Pool(self.instance.realtime_pool_size)
+
+        # Copy the current request context to be used in greenlet
+        reqctx = utils.copy_flask_request_context()
+
+        def worker(rt_proxy, route_points):
+            # Use the copied request context in greenlet
+            with utils.copy_context_in_greenlet_stack(reqctx):
+                return rt_proxy, self._get_next_realtime_passages(rt_proxy, route_points, request)
+
+        futures = [pool.spawn(worker, rt_proxy, rps) for (rt_proxy, _), rps in calls.items()]
+
+        try:
+            for future in gevent.iwait(futures, timeout=deadline):
+                rt_proxy, next_rt_passages = future.get()
+                for route_point, passages in next_rt_passages.items():
+                    yield rt_proxy, route_point, passages
+        finally:
+            if any(not f.ready() for f in futures):
+                logging.getLogger(__name__).info('realtime deadline exceeded, {} calls over {} killed'
+                                                 .format(sum(1 for f in futures if not f.ready()), len(futures)))
+            pool.kill(block=False)
+
     def __stop_times(self, request, api, departure_filter="", arrival_filter=""):
         req = request_pb2.Request()
         req.requested_api = api
@@ -261,25 +325,10 @@ class MixedSchedule(object):
                             for rp in resp.route_points)
 
         rt_proxy = None
-        futures = []
-        pool = gevent.pool.Pool(self.instance.realtime_pool_size)
-
-        # Copy the current request context to be used in greenlet
-        reqctx = utils.copy_flask_request_context()
-
-        def worker(rt_proxy, route_point, template, request, resp):
-            # Use the copied request context in greenlet
-            with utils.copy_context_in_greenlet_stack(reqctx):
-                return resp, rt_proxy, route_point, template, self._get_next_realtime_passages(rt_proxy, route_point, request)
-
-        for route_point, template in route_points.items():
-            rt_proxy = self._get_realtime_proxy(route_point)
-            if rt_proxy:
-                futures.append(pool.spawn(worker, rt_proxy, route_point, template, request, resp))
-
-        for future in gevent.iwait(futures):
-            resp, rt_proxy, route_point, template, next_rt_passages = future.get()
-            rt_proxy._update_passages(resp.next_departures, route_point, template, next_rt_passages)
+        for rt_proxy, route_point, next_rt_passages in self._get_realtime_passages_by_route_point(route_points,
+                                                                                                   request):
+            rt_proxy._update_passages(resp.next_departures, route_point, route_points[route_point],
+                                      next_rt_passages)
 
         # sort
         def comparator(p1, p2):
@@ -301,10 +350,24 @@ class MixedSchedule(object):
         if request['data_freshness'] != RT_PROXY_DATA_FRESHNESS:
             return resp
 
+        stop_schedules_by_route_point = OrderedDict()
         for stop_schedule in resp.stop_schedules:
             route_point = _get_route_point_from_stop_schedule(stop_schedule)
-            rt_proxy = self._get_realtime_proxy(route_point)
-            if rt_proxy:
-                next_rt_passages = self._get_next_realtime_passages(rt_proxy, route_point, request)
+            stop_schedules_by_route_point.setdefault(route_point, []).append(stop_schedule)
+
+        deadline = app.config.get('REALTIME_DEADLINE')
+        updated_route_points = set()
+        for rt_proxy, route_point, next_rt_passages in \
+                self._get_realtime_passages_by_route_point(stop_schedules_by_route_point.keys(), request,
+                                                           deadline=deadline / 1000.0 if deadline else None):
+            updated_route_points.add(route_point)
+            for stop_schedule in stop_schedules_by_route_point[route_point]:
                 rt_proxy._update_stop_schedule(stop_schedule, next_rt_passages)
+
+        # the stop_schedules whose realtime system did not answer in time keep their base schedule
+        for route_point, stop_schedules in stop_schedules_by_route_point.items():
+            if route_point in updated_route_points or not self._get_realtime_proxy(route_point):
+                continue
+            for stop_schedule in stop_schedules:
+                _add_realtime_deadline_note(stop_schedule)
         return resp
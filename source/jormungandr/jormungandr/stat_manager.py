@@ -38,7 +38,10 @@ from jormungandr import app
 from jormungandr.authentication import get_user, get_token, get_app_name, get_used_coverages
 from jormungandr import utils
 import re
-from threading import Lock
+from threading import Lock, Thread, Event
+import collections
+import atexit
+import os
 
 import pytz
 import time
@@ -113,6 +116,123 @@ def tz_str_to_utc_timestamp(dt_str, timezone):
     return utils.date_to_timestamp(dt.astimezone(pytz.utc))
 
 
+class AsyncStatPublisher(object):
+    """
+    Publish the stats in a background thread, so a slow broker doesn't slow down the requests
+
+    - the serialized stats are put in a bounded queue, when it's full the oldest stat is dropped
+    - the thread drains the queue by batch of batch_size stats
+    - the remaining stats are published when the worker stops (flush)
+
+    The thread is started by the first put, not when the publisher is created at import: the uwsgi workers
+    are forked after the import and a thread doesn't survive a fork. It's also started again in a forked process.
+    """
+    def __init__(self, publish, max_size=10000, batch_size=100):
+        self._publish = publish
+        self._queue = collections.deque(maxlen=max_size)
+        self._lock = Lock()
+        self._not_empty = Event()
+        self.batch_size = batch_size
+        self._stopped = False
+
+        self.nb_dropped = 0
+        self.nb_published = 0
+        self.nb_errors = 0
+        self.nb_batches = 0
+        self._total_latency = 0.0
+        self._max_latency = 0.0
+
+        self._thread = None
+        # the process in which the thread runs
+        self._pid = None
+        self._start_lock = Lock()
+
+    def _start_if_needed(self):
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            if self._pid is not None:
+                # we are in a forked process: the stats in the queue are published by the parent
+                self._lock = Lock()
+                self._not_empty = Event()
+                self._queue.clear()
+            self._thread = Thread(target=self._run, name='stat_publisher')
+            self._thread.daemon = True
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def put(self, api, pbf):
+        self._start_if_needed()
+        with self._lock:
+            if len(self._queue) == self._queue.maxlen:
+                self.nb_dropped += 1
+            self._queue.append((api, pbf))
+        self._not_empty.set()
+
+    def _pop_batch(self):
+        with self._lock:
+            batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+            if not self._queue:
+                self._not_empty.clear()
+        return batch
+
+    def _publish_batch(self, batch):
+        start = time.time()
+        nb_errors = 0
+        for api, pbf in batch:
+            try:
+                self._publish(api, pbf)
+            except Exception:
+                nb_errors += 1
+        if nb_errors:
+            logging.getLogger(__name__).error('%s stats of a batch of %s have not been published',
+                                              nb_errors, len(batch))
+        latency = time.time() - start
+        self.nb_published += len(batch) - nb_errors
+        self.nb_errors += nb_errors
+        self.nb_batches += 1
+        self._total_latency += latency
+        self._max_latency = max(self._max_latency, latency)
+
+    def _run(self):
+        while not self._stopped:
+            self._not_empty.wait(1)
+            batch = self._pop_batch()
+            if batch:
+                self._publish_batch(batch)
+
+    def flush(self, timeout=5):
+        """
+        stop the thread and publish the remaining stats, for at most timeout seconds
+        """
+        self._stopped = True
+        self._not_empty.set()
+        deadline = time.time() + timeout
+        if self._pid == os.getpid():
+            self._thread.join(timeout)
+        while time.time() < deadline:
+            batch = self._pop_batch()
+            if not batch:
+                break
+            self._publish_batch(batch)
+        if self._queue:
+            logging.getLogger(__name__).warning('%s stats have not been published before the end of the worker',
+                                                len(self._queue))
+
+    def status(self):
+        return {
+            'queue_size': len(self._queue),
+            'max_queue_size': self._queue.maxlen,
+            'nb_dropped': self.nb_dropped,
+            'nb_published': self.nb_published,
+            'nb_errors': self.nb_errors,
+            'mean_batch_latency': self._total_latency / self.nb_batches if self.nb_batches else None,
+            'max_batch_latency': self._max_latency,
+        }
+
+
 class StatManager(object):
 
     def __init__(self):
@@ -136,6 +256,13 @@ class StatManager(object):
 
         self.breaker = pybreaker.CircuitBreaker(fail_max=fail_max, reset_timeout=reset_timeout)
 
+        self.publisher = None
+        if self.save_stat and app.config.get('STAT_ASYNC_PUBLISH', False):
+            self.publisher = AsyncStatPublisher(self._publish_with_retry,
+                                                max_size=app.config.get('STAT_QUEUE_MAX_SIZE', 10000),
+                                                batch_size=app.config.get('STAT_BATCH_SIZE', 100))
+            atexit.register(self.publisher.flush, app.config.get('STAT_FLUSH_TIMEOUT', 5))
+
     def _init_rabbitmq(self):
         """
         connection to rabbitmq and initialize queues
@@ -166,9 +293,15 @@ class StatManager(object):
         self.fill_parameters(stat_request)
         self.fill_result(stat_request, call_result)
 
+        if self.publisher:
+            self.publisher.put(stat_request.api, stat_request.SerializeToString())
+        else:
+            self._publish_with_retry(stat_request.api, stat_request.SerializeToString())
+
+    def _publish_with_retry(self, api, pbf):
         retry = retrying.Retrying(stop_max_attempt_number=2,
                 retry_on_exception=lambda e: not isinstance(e, pybreaker.CircuitBreakerError))
-        retry.call(self.breaker.call, self.publish_request, stat_request.api, stat_request.SerializeToString())
+        retry.call(self.breaker.call, self.publish_request, api, pbf)
 
     def fill_info_response(self, stat_info_response, call_result):
         """
@@ -0,0 +1,132 @@
+# coding=utf-8
+
+#  Copyright (c) 2001-2018, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+from __future__ import absolute_import, print_function, unicode_literals, division
+import hashlib
+import logging
+from jormungandr import cache, utils
+from jormungandr.local_cache import LocalCache
+import six
+
+
+class FallbackCache(object):
+    """
+    Cache of the street network computations used for the fallbacks (crow fly proximities, routing matrices and
+    fallback paths of the time independent modes)
+
+    Those computations only depend on the data of the instance and on the origin of the request: the requests
+    starting from the same place (stations, airports...) always give the same results.
+
+    There are two tiers:
+     - a bounded LRU local to the process
+     - optionally the shared cache of jormungandr (redis, memcached...)
+
+    The publication date of the instance is part of the keys, and the local tier is cleared when the data of the
+    instance change.
+    """
+    def __init__(self, instance, max_size=1000, ttl=300, use_shared_cache=False, coord_precision=5):
+        self._instance = instance
+        self._local = LocalCache(max_size=max_size, ttl=ttl)
+        self.ttl = ttl
+        self.use_shared_cache = use_shared_cache
+        self.coord_precision = coord_precision
+        self.shared_hits = 0
+
+    def snap(self, pt_object):
+        """
+        the coordinates of the object, rounded so that close places share the same entries
+        """
+        coord = utils.get_pt_object_coord(pt_object)
+        return round(coord.lon, self.coord_precision), round(coord.lat, self.coord_precision)
+
+    def _make_key(self, kind, key_parts):
+        digest = hashlib.md5(six.text_type(key_parts).encode('utf-8')).hexdigest()
+        return '{}:{}:{}:{}'.format(self._instance.name, self._instance.publication_date, kind, digest)
+
+    def get(self, kind, key_parts):
+        """
+        return the cached value for the key, None if it isn't cached
+
+        :param kind: the kind of computation ('routing_matrix', 'crow_fly'...)
+        :param key_parts: everything the result depends on (must have a stable text representation)
+        """
+        key = self._make_key(kind, key_parts)
+        value = self._local.get(key)
+        if value is not LocalCache.MISSING:
+            return value
+
+        if not self.use_shared_cache:
+            return None
+        try:
+            value = cache.get(key)
+        except Exception:
+            logging.getLogger(__name__).exception('impossible to read the fallback cache')
+            return None
+        if value is not None:
+            self.shared_hits += 1
+            self._local.set(key, value)
+        return value
+
+    def set(self, kind, key_parts, value):
+        key = self._make_key(kind, key_parts)
+        self._local.set(key, value)
+        if self.use_shared_cache:
+            try:
+                cache.set(key, value, timeout=self.ttl)
+            except Exception:
+                logging.getLogger(__name__).exception('impossible to write in the fallback cache')
+
+    def get_or_compute(self, kind, key_parts, fun):
+        """
+        return the cached value for the key, or compute it with fun() and cache it (None is not cached)
+        """
+        value = self.get(kind, key_parts)
+        if value is not None:
+            return value
+
+        value = fun()
+        if value is not None:
+            self.set(kind, key_parts, value)
+        return value
+
+    def clear(self):
+        self._local.clear()
+
+    def status(self):
+        stats = self._local.stats()
+        return {
+            'local_hits': stats['hits'],
+            'shared_hits': self.shared_hits,
+            'misses': stats['misses'] - self.shared_hits,
+            'size': stats['size'],
+            'max_size': stats['max_size'],
+            'ttl': self.ttl,
+        }
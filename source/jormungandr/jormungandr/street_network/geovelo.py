@@ -33,7 +33,7 @@ import requests as requests
 import pybreaker
 import json
 from navitiacommon import response_pb2
-from jormungandr import app
+from jormungandr import app, http_client
 from jormungandr.exceptions import TechnicalError, InvalidArguments, UnableToParse
 from jormungandr.street_network.street_network import AbstractStreetNetworkService, StreetNetworkPathKey
 from jormungandr.utils import get_pt_object_coord, is_url, decode_polyline
@@ -61,6 +61,7 @@ class Geovelo(AbstractStreetNetworkService):
         self.modes = modes
         self.breaker = pybreaker.CircuitBreaker(fail_max=app.config['CIRCUIT_BREAKER_MAX_GEOVELO_FAIL'],
                                                 reset_timeout=app.config['CIRCUIT_BREAKER_GEOVELO_TIMEOUT_S'])
+        self._init_matrix_options(kwargs)
         self._feed_publisher = FeedPublisher(**feed_publisher) if feed_publisher else None
 
     def status(self):
@@ -68,6 +69,8 @@ class Geovelo(AbstractStreetNetworkService):
                 'class': self.__class__.__name__,
                 'modes': self.modes,
                 'timeout': self.timeout,
+                'matrix_chunk_size': self.matrix_chunk_size,
+                'matrix_max_concurrency': self.matrix_max_concurrency,
                 'circuit_breaker': {'current_state': self.breaker.current_state,
                                     'fail_counter': self.breaker.fail_counter,
                                     'reset_timeout': self.breaker.reset_timeout},
@@ -102,10 +105,10 @@ class Geovelo(AbstractStreetNetworkService):
             'transportModes': ['BIKE']
         }
 
-    def _call_geovelo(self, url, method=requests.post, data=None):
+    def _call_geovelo(self, url, method=http_client.post, data=None):
         logging.getLogger(__name__).debug('Geovelo routing service , call url : {}'.format(url))
         try:
-            return self.breaker.call(method, url, timeout=self.timeout, data=data,
+            return self.breaker.call(method, url, connector='geovelo', timeout=self.timeout, data=data,
                                      headers={'content-type': 'application/json',
                                               'Api-Key': self.api_key})
         except pybreaker.CircuitBreakerError as e:
@@ -165,7 +168,7 @@ class Geovelo(AbstractStreetNetworkService):
 
         data = self._make_request_arguments_isochrone(origins, destinations)
         r = self._call_geovelo('{}/{}'.format(self.service_url, 'api/v2/routes_m2m'),
-                               requests.post, json.dumps(data))
+                               http_client.post, json.dumps(data))
         self._check_response(r)
         resp_json = r.json()
 
@@ -278,7 +281,7 @@ class Geovelo(AbstractStreetNetworkService):
                                                                 'single_result=true&'
                                                                 'bike_stations=false&'
                                                                 'objects_as_ids=true&'),
-                               requests.post, json.dumps(data))
+                               http_client.post, json.dumps(data))
         self._check_response(r)
         resp_json = r.json()
 
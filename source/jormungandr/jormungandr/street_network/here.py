@@ -34,7 +34,7 @@ from navitiacommon import response_pb2
 import logging
 import pybreaker
 import requests as requests
-from jormungandr import app
+from jormungandr import app, http_client
 from jormungandr.exceptions import TechnicalError
 from jormungandr.utils import get_pt_object_coord
 from jormungandr.street_network.street_network import AbstractStreetNetworkService, StreetNetworkPathKey
@@ -69,6 +69,8 @@ def _str_to_dt(timestamp):
 
 
 class Here(AbstractStreetNetworkService):
+    # the traffic is enabled in the matrices (see get_matrix_params)
+    time_dependent_matrix = True
 
     def __init__(self, instance, service_base_url, modes=[], id='here', timeout=10, api_id=None, api_code=None,
                  feed_publisher=DEFAULT_HERE_FEED_PUBLISHER, **kwargs):
@@ -84,6 +86,9 @@ class Here(AbstractStreetNetworkService):
         self.modes = modes
         self.timeout = timeout
         self.max_points = 100  # max number of point asked in the routing matrix
+        # the bigger matrices are split in chunks of max_points, the closest points first
+        self._init_matrix_options(kwargs, default_chunk_size=self.max_points, default_max_concurrency=4)
+        self.matrix_chunk_size = min(self.matrix_chunk_size or self.max_points, self.max_points)
         self.breaker = pybreaker.CircuitBreaker(fail_max=app.config['CIRCUIT_BREAKER_MAX_HERE_FAIL'],
                                                 reset_timeout=app.config['CIRCUIT_BREAKER_HERE_TIMEOUT_S'])
 
@@ -96,6 +101,8 @@ class Here(AbstractStreetNetworkService):
                 'modes': self.modes,
                 'timeout': self.timeout,
                 'max_points': self.max_points,
+                'matrix_chunk_size': self.matrix_chunk_size,
+                'matrix_max_concurrency': self.matrix_max_concurrency,
                 'circuit_breaker': {'current_state': self.breaker.current_state,
                                     'fail_counter': self.breaker.fail_counter,
                                     'reset_timeout': self.breaker.reset_timeout},
@@ -104,7 +111,7 @@ class Here(AbstractStreetNetworkService):
     def _call_here(self, url, params):
         self.log.debug('Here routing service, url: {}'.format(url))
         try:
-            r = self.breaker.call(requests.get, url, timeout=self.timeout, params=params)
+            r = self.breaker.call(http_client.get, url, connector='here', timeout=self.timeout, params=params)
             self.record_call('ok')
             return r
         except pybreaker.CircuitBreakerError as e:
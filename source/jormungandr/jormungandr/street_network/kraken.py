@@ -33,6 +33,7 @@ import copy
 from jormungandr.exceptions import TechnicalError
 from navitiacommon import request_pb2, type_pb2
 from jormungandr.utils import get_uri_pt_object
+from jormungandr.multiplexed_socket import RequestBatch
 from jormungandr.street_network.street_network import AbstractStreetNetworkService, StreetNetworkPathType, \
     StreetNetworkPathKey
 from jormungandr import utils
@@ -68,12 +69,16 @@ class Kraken(AbstractStreetNetworkService):
             j.sections.sort(utils.SectionSorter())
         return response
 
-    def _direct_path(self, mode, pt_object_origin, pt_object_destination, fallback_extremity, request, direct_path_type):
-        """
-        :param direct_path_type: we need to "invert" a direct path when it's a ending fallback by car if and only if
-                                 it's returned by kraken. In other case, it's ignored
-        """
-        should_invert_journey = (mode == 'car' and direct_path_type == StreetNetworkPathType.ENDING_FALLBACK)
+    def _create_direct_path_request(self, mode, pt_object_origin, pt_object_destination, fallback_extremity,
+                                    request, should_invert_journey):
+        req = self._create_direct_path_places_request(pt_object_origin, pt_object_destination, fallback_extremity,
+                                                      should_invert_journey)
+        self._fill_streetnetwork_params(req.direct_path.streetnetwork_params, mode, request)
+        return req
+
+    @staticmethod
+    def _create_direct_path_places_request(pt_object_origin, pt_object_destination, fallback_extremity,
+                                           should_invert_journey):
         if should_invert_journey:
             pt_object_origin, pt_object_destination = pt_object_destination, pt_object_origin
 
@@ -85,18 +90,31 @@ class Kraken(AbstractStreetNetworkService):
         req.direct_path.destination.access_duration = 0
         req.direct_path.datetime = fallback_extremity.datetime
         req.direct_path.clockwise = fallback_extremity.represents_start
-        req.direct_path.streetnetwork_params.origin_mode = mode
-        req.direct_path.streetnetwork_params.destination_mode = mode
-        req.direct_path.streetnetwork_params.walking_speed = request['walking_speed']
-        req.direct_path.streetnetwork_params.max_walking_duration_to_pt = request['max_walking_duration_to_pt']
-        req.direct_path.streetnetwork_params.bike_speed = request['bike_speed']
-        req.direct_path.streetnetwork_params.max_bike_duration_to_pt = request['max_bike_duration_to_pt']
-        req.direct_path.streetnetwork_params.bss_speed = request['bss_speed']
-        req.direct_path.streetnetwork_params.max_bss_duration_to_pt = request['max_bss_duration_to_pt']
-        req.direct_path.streetnetwork_params.car_speed = request['car_speed']
-        req.direct_path.streetnetwork_params.max_car_duration_to_pt = request['max_car_duration_to_pt']
-        req.direct_path.streetnetwork_params.car_no_park_speed = request['car_no_park_speed']
-        req.direct_path.streetnetwork_params.max_car_no_park_duration_to_pt = request['max_car_no_park_duration_to_pt']
+        return req
+
+    @staticmethod
+    def _fill_streetnetwork_params(sn_params, mode, request):
+        sn_params.origin_mode = mode
+        sn_params.destination_mode = mode
+        sn_params.walking_speed = request['walking_speed']
+        sn_params.max_walking_duration_to_pt = request['max_walking_duration_to_pt']
+        sn_params.bike_speed = request['bike_speed']
+        sn_params.max_bike_duration_to_pt = request['max_bike_duration_to_pt']
+        sn_params.bss_speed = request['bss_speed']
+        sn_params.max_bss_duration_to_pt = request['max_bss_duration_to_pt']
+        sn_params.car_speed = request['car_speed']
+        sn_params.max_car_duration_to_pt = request['max_car_duration_to_pt']
+        sn_params.car_no_park_speed = request['car_no_park_speed']
+        sn_params.max_car_no_park_duration_to_pt = request['max_car_no_park_duration_to_pt']
+
+    def _direct_path(self, mode, pt_object_origin, pt_object_destination, fallback_extremity, request, direct_path_type):
+        """
+        :param direct_path_type: we need to "invert" a direct path when it's a ending fallback by car if and only if
+                                 it's returned by kraken. In other case, it's ignored
+        """
+        should_invert_journey = (mode == 'car' and direct_path_type == StreetNetworkPathType.ENDING_FALLBACK)
+        req = self._create_direct_path_request(mode, pt_object_origin, pt_object_destination, fallback_extremity,
+                                               request, should_invert_journey)
 
         response = self.instance.send_and_receive(req)
 
@@ -104,6 +122,37 @@ class Kraken(AbstractStreetNetworkService):
             return self._reverse_journeys(response)
         return response
 
+    def direct_paths_with_fp(self, mode, paths, request):
+        """
+        with the batch api, all the direct paths are sent to kraken in one message
+        """
+        if len(paths) <= 1 or not getattr(self.instance, 'has_batch_api', False):
+            return super(Kraken, self).direct_paths_with_fp(mode, paths, request)
+
+        should_invert = [mode == 'car' and direct_path_type == StreetNetworkPathType.ENDING_FALLBACK
+                         for _, _, _, direct_path_type in paths]
+        # the street network parameters are shared by all the direct paths, they are only sent once
+        def build_streetnetwork_params():
+            req = request_pb2.Request()
+            self._fill_streetnetwork_params(req.direct_path.streetnetwork_params, mode, request)
+            return req
+
+        batch = RequestBatch()
+        sn_params_part = batch.add_part('streetnetwork_params', build_streetnetwork_params)
+        for idx, ((origin, destination, fallback_extremity, _), invert) in enumerate(zip(paths, should_invert)):
+            def build_places():
+                return self._create_direct_path_places_request(origin, destination, fallback_extremity, invert)
+            batch.add_request([batch.add_part(idx, build_places), sn_params_part])
+
+        responses = self.instance.send_and_receive_batch(batch)
+
+        results = []
+        for response, invert in zip(responses, should_invert):
+            if invert:
+                response = self._reverse_journeys(response)
+            self._add_feed_publisher(response)
+            results.append(response)
+        return results
 
     def get_street_network_routing_matrix(self, origins, destinations, street_network_mode, max_duration, request, **kwargs):
         # TODO: reverse is not handled as so far
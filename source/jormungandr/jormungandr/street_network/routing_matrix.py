@@ -0,0 +1,116 @@
+# Copyright (c) 2001-2018, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+from __future__ import absolute_import, print_function, unicode_literals, division
+import logging
+import gevent.pool
+from navitiacommon import response_pb2
+
+
+def _many_side(origins, destinations):
+    """
+    the street network matrices are 1-n or n-1, return the side with many points
+    """
+    return 'origins' if len(origins) > 1 else 'destinations'
+
+
+def _lower_bound_duration(place, speed):
+    """
+    the street network distance is at least the crow fly distance, so it's a lower bound of the duration
+    (the same bound is used to select the proximities by crow fly)
+    """
+    distance = getattr(place, 'distance', None)
+    if not speed or not distance:
+        return 0
+    return distance / speed
+
+
+def get_routing_matrix(service, origins, destinations, mode, max_duration, request, **kwargs):
+    """
+    compute a 1-n (or n-1) routing matrix with the street network service by chunks
+
+    The points are sorted by crow fly distance and split in chunks of service.matrix_chunk_size points,
+    the chunks are sent concurrently (service.matrix_max_concurrency calls at most).
+    The chunks whose closest point cannot be reached before max_duration are not sent, their points are unreached.
+
+    The matrix returned has one row, with a routing_response for each point in the order of the given points.
+
+    :param kwargs: the speed of each mode (as for service.get_street_network_routing_matrix)
+    """
+    chunk_size = getattr(service, 'matrix_chunk_size', None)
+    max_concurrency = getattr(service, 'matrix_max_concurrency', 1) or 1
+
+    many_side = _many_side(origins, destinations)
+    points = origins if many_side == 'origins' else destinations
+    if not chunk_size or len(points) <= chunk_size:
+        return service.get_street_network_routing_matrix(origins, destinations, mode, max_duration, request,
+                                                         **kwargs)
+
+    speed = kwargs.get(mode)
+    ordered = sorted(range(len(points)), key=lambda i: _lower_bound_duration(points[i], speed))
+    chunks = []
+    for begin in range(0, len(ordered), chunk_size):
+        chunk = ordered[begin:begin + chunk_size]
+        # the points are sorted, the next chunks are even farther
+        if max_duration is not None and _lower_bound_duration(points[chunk[0]], speed) > max_duration:
+            logging.getLogger(__name__).debug('routing matrix by %s: %s points too far, not computed',
+                                              mode, len(ordered) - begin)
+            break
+        chunks.append(chunk)
+
+    def compute(chunk):
+        chunk_points = [points[i] for i in chunk]
+        if many_side == 'origins':
+            matrix = service.get_street_network_routing_matrix(chunk_points, destinations, mode, max_duration,
+                                                               request, **kwargs)
+        else:
+            matrix = service.get_street_network_routing_matrix(origins, chunk_points, mode, max_duration,
+                                                               request, **kwargs)
+        # depending on the service a n-1 matrix has one row of n responses or n rows of one response
+        return chunk, [r for row in matrix.rows for r in row.routing_response]
+
+    if len(chunks) == 1 or max_concurrency == 1:
+        results = [compute(chunk) for chunk in chunks]
+    else:
+        results = gevent.pool.Pool(max_concurrency).map(compute, chunks)
+
+    responses = [None] * len(points)
+    for chunk, routing_responses in results:
+        for i, r in zip(chunk, routing_responses):
+            responses[i] = r
+
+    sn_routing_matrix = response_pb2.StreetNetworkRoutingMatrix()
+    row = sn_routing_matrix.rows.add()
+    for r in responses:
+        routing = row.routing_response.add()
+        if r is None:
+            routing.duration = -1
+            routing.routing_status = response_pb2.unreached
+        else:
+            routing.CopyFrom(r)
+    return sn_routing_matrix
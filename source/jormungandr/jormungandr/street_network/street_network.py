@@ -31,7 +31,10 @@
 from __future__ import absolute_import, print_function, unicode_literals, division
 import logging
 from jormungandr import utils, new_relic
+from navitiacommon import response_pb2
+from werkzeug.exceptions import HTTPException
 import abc
+import gevent.pool
 
 # Using abc.ABCMeta in a way it is compatible both with Python 2.7 and Python 3.x
 # http://stackoverflow.com/a/38668373/1614576
@@ -50,6 +53,15 @@ StreetNetworkPathKey = namedtuple('StreetNetworkPathKey', ['mode', 'orig_uri', '
 
 
 class AbstractStreetNetworkService(ABC):
+    # the routing matrices are computed by chunks of matrix_chunk_size points (None: in one call),
+    # with at most matrix_max_concurrency concurrent calls (see street_network.routing_matrix)
+    matrix_chunk_size = None
+    matrix_max_concurrency = 1
+    # number of concurrent calls when computing several direct paths (see direct_paths_with_fp)
+    direct_path_max_concurrency = 8
+    # the routing matrices depend on the departure time (traffic...), they cannot be shared between datetimes
+    time_dependent_matrix = False
+
     @abc.abstractmethod
     def get_street_network_routing_matrix(self, origins, destinations, street_network_mode, max_duration, request, **kwargs):
         pass
@@ -66,6 +78,31 @@ class AbstractStreetNetworkService(ABC):
         self._add_feed_publisher(resp)
         return resp
 
+    def direct_paths_with_fp(self, mode, paths, request):
+        """
+        compute several direct paths of the same mode
+
+        :param paths: list of (pt_object_origin, pt_object_destination, fallback_extremity, direct_path_type)
+        :return: the list of the responses, in the same order as the paths
+
+        by default the paths are requested concurrently, the connectors with a batch api can override it
+
+        a path whose computation fails doesn't fail the others, its response is empty
+        """
+        def compute(path):
+            pt_object_origin, pt_object_destination, fallback_extremity, direct_path_type = path
+            try:
+                return self.direct_path_with_fp(mode, pt_object_origin, pt_object_destination,
+                                                fallback_extremity, request, direct_path_type)
+            # the errors of the connectors are HTTPException (TechnicalError, DeadSocketException...)
+            except HTTPException:
+                logging.getLogger(__name__).exception('the {} direct path from {} to {} has failed'
+                                                      .format(mode, pt_object_origin.uri, pt_object_destination.uri))
+                return response_pb2.Response()
+
+        if len(paths) <= 1 or self.direct_path_max_concurrency <= 1:
+            return [compute(path) for path in paths]
+        return gevent.pool.Pool(self.direct_path_max_concurrency).map(compute, paths)
 
     @abc.abstractmethod
     def _direct_path(self, mode, pt_object_origin, pt_object_destination, fallback_extremity, request, direct_path_type):
@@ -90,6 +127,10 @@ class AbstractStreetNetworkService(ABC):
     def feed_publisher(self):
         return None
 
+    def _init_matrix_options(self, kwargs, default_chunk_size=None, default_max_concurrency=1):
+        self.matrix_chunk_size = kwargs.get('matrix_chunk_size', default_chunk_size)
+        self.matrix_max_concurrency = kwargs.get('matrix_max_concurrency', default_max_concurrency)
+
     def record_external_failure(self, message):
         utils.record_external_failure(message, 'streetnetwork', unicode(self.sn_system_id))
 
@@ -0,0 +1,97 @@
+# coding=utf-8
+
+#  Copyright (c) 2001-2018, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+from __future__ import absolute_import, print_function, unicode_literals, division
+from jormungandr.street_network.fallback_cache import FallbackCache
+from navitiacommon import type_pb2
+
+
+class FakeInstance(object):
+    def __init__(self):
+        self.name = 'fake'
+        self.publication_date = 1
+
+
+def make_poi(lon, lat):
+    pt_object = type_pb2.PtObject()
+    pt_object.embedded_type = type_pb2.POI
+    pt_object.poi.coord.lon = lon
+    pt_object.poi.coord.lat = lat
+    return pt_object
+
+
+class Counter(object):
+    def __init__(self):
+        self.nb_calls = 0
+
+    def __call__(self):
+        self.nb_calls += 1
+        return self.nb_calls
+
+
+def snap_test():
+    fallback_cache = FallbackCache(FakeInstance(), coord_precision=3)
+    assert fallback_cache.snap(make_poi(2.123456, 48.654321)) == (2.123, 48.654)
+
+
+def get_or_compute_test():
+    instance = FakeInstance()
+    fallback_cache = FallbackCache(instance)
+    compute = Counter()
+
+    assert fallback_cache.get_or_compute('matrix', ('walking', 42), compute) == 1
+    assert fallback_cache.get_or_compute('matrix', ('walking', 42), compute) == 1
+    assert compute.nb_calls == 1
+    assert fallback_cache.get_or_compute('matrix', ('bike', 42), compute) == 2
+    assert fallback_cache.get_or_compute('crow_fly', ('walking', 42), compute) == 3
+
+    status = fallback_cache.status()
+    assert status['local_hits'] == 1
+    assert status['misses'] == 3
+    assert status['size'] == 3
+
+    # with a new publication date, the values are computed again
+    instance.publication_date = 2
+    assert fallback_cache.get_or_compute('matrix', ('walking', 42), compute) == 4
+
+
+def none_is_not_cached_test():
+    fallback_cache = FallbackCache(FakeInstance())
+    assert fallback_cache.get_or_compute('matrix', 'key', lambda: None) is None
+    assert fallback_cache.get_or_compute('matrix', 'key', lambda: 42) == 42
+
+
+def get_set_test():
+    fallback_cache = FallbackCache(FakeInstance())
+    assert fallback_cache.get('fallback_path', ('sp1', 'walking')) is None
+    fallback_cache.set('fallback_path', ('sp1', 'walking'), 42)
+    assert fallback_cache.get('fallback_path', ('sp1', 'walking')) == 42
+    assert fallback_cache.get('fallback_path', ('sp1', 'bike')) is None
@@ -0,0 +1,137 @@
+# coding=utf-8
+
+#  Copyright (c) 2001-2018, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+from __future__ import absolute_import, print_function, unicode_literals, division
+import gevent
+from jormungandr.street_network.routing_matrix import get_routing_matrix
+from jormungandr.street_network.tests.streetnetwork_test_utils import make_pt_object
+from navitiacommon import type_pb2, response_pb2
+
+
+class FakeMatrixService(object):
+    """
+    the duration of a point is its distance (speed of 1m/s)
+    """
+    def __init__(self, matrix_chunk_size=None, matrix_max_concurrency=1, one_row_by_point=False):
+        self.matrix_chunk_size = matrix_chunk_size
+        self.matrix_max_concurrency = matrix_max_concurrency
+        self.one_row_by_point = one_row_by_point
+        self.calls = []
+        self.running = 0
+        self.max_running = 0
+
+    def get_street_network_routing_matrix(self, origins, destinations, mode, max_duration, request, **kwargs):
+        points = destinations if origins[0].uri == 'center' else origins
+        self.calls.append([p.uri for p in points])
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        gevent.sleep(0.01)
+        self.running -= 1
+
+        matrix = response_pb2.StreetNetworkRoutingMatrix()
+        row = matrix.rows.add()
+        for p in points:
+            if self.one_row_by_point and p is not points[0]:
+                row = matrix.rows.add()
+            routing = row.routing_response.add()
+            routing.duration = p.distance
+            routing.routing_status = response_pb2.reached
+        return matrix
+
+
+def make_points(distances):
+    points = []
+    for i, distance in enumerate(distances):
+        p = make_pt_object(type_pb2.STOP_POINT, 2.0, 48.0, 'sp{}'.format(i))
+        p.distance = distance
+        points.append(p)
+    return points
+
+
+def get_durations(matrix):
+    assert len(matrix.rows) == 1
+    return [(r.duration, r.routing_status) for r in matrix.rows[0].routing_response]
+
+
+def routing_matrix_not_chunked_test():
+    service = FakeMatrixService()
+    center = make_pt_object(type_pb2.ADDRESS, 2.0, 48.0, 'center')
+    points = make_points([30, 10, 20])
+
+    matrix = get_routing_matrix(service, [center], points, 'walking', 100, {}, walking=1)
+
+    assert service.calls == [['sp0', 'sp1', 'sp2']]
+    assert get_durations(matrix) == [(30, response_pb2.reached), (10, response_pb2.reached),
+                                     (20, response_pb2.reached)]
+
+
+def routing_matrix_chunked_by_distance_test():
+    service = FakeMatrixService(matrix_chunk_size=2, matrix_max_concurrency=3)
+    center = make_pt_object(type_pb2.ADDRESS, 2.0, 48.0, 'center')
+    distances = [50, 10, 40, 20, 30]
+    points = make_points(distances)
+
+    matrix = get_routing_matrix(service, [center], points, 'walking', 100, {}, walking=1)
+
+    # the closest points are in the first chunks
+    assert sorted(service.calls) == [['sp0'], ['sp1', 'sp3'], ['sp4', 'sp2']]
+    assert service.max_running == 3
+    # the responses are in the order of the points
+    assert get_durations(matrix) == [(d, response_pb2.reached) for d in distances]
+
+
+def routing_matrix_chunks_too_far_test():
+    """
+    the chunks whose points are all farther than the max duration (by crow fly) are not sent
+    """
+    service = FakeMatrixService(matrix_chunk_size=2)
+    center = make_pt_object(type_pb2.ADDRESS, 2.0, 48.0, 'center')
+    points = make_points([300, 10, 200, 20, 30])
+
+    matrix = get_routing_matrix(service, points, [center], 'bike', 50, {}, bike=2)
+
+    assert service.calls == [['sp1', 'sp3'], ['sp4', 'sp2']]
+    assert get_durations(matrix) == [(-1, response_pb2.unreached), (10, response_pb2.reached),
+                                     (200, response_pb2.reached), (20, response_pb2.reached),
+                                     (30, response_pb2.reached)]
+
+
+def routing_matrix_one_row_by_point_test():
+    """
+    the responses of a service giving n rows for a n-1 matrix are merged in one row
+    """
+    service = FakeMatrixService(matrix_chunk_size=2, one_row_by_point=True)
+    center = make_pt_object(type_pb2.ADDRESS, 2.0, 48.0, 'center')
+    points = make_points([30, 10, 20])
+
+    matrix = get_routing_matrix(service, points, [center], 'car', 100, {}, car=1)
+
+    assert get_durations(matrix) == [(30, response_pb2.reached), (10, response_pb2.reached),
+                                     (20, response_pb2.reached)]
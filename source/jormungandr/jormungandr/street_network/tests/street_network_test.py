@@ -28,10 +28,15 @@
 # www.navitia.io
 from __future__ import absolute_import
 import pytest
-from jormungandr.street_network.street_network import StreetNetwork
+import navitiacommon.response_pb2 as response_pb2
+from navitiacommon import type_pb2
+from jormungandr.street_network.street_network import StreetNetwork, AbstractStreetNetworkService, \
+    StreetNetworkPathType
 from jormungandr.street_network.kraken import Kraken
 from jormungandr.street_network.valhalla import Valhalla
-from jormungandr.exceptions import ConfigException
+from jormungandr.street_network.tests.streetnetwork_test_utils import make_pt_object
+from jormungandr.exceptions import ConfigException, TechnicalError
+from jormungandr.utils import PeriodExtremity
 
 KRAKEN_CLASS = 'jormungandr.street_network.kraken.Kraken'
 VALHALLA_CLASS = 'jormungandr.street_network.valhalla.Valhalla'
@@ -177,3 +182,43 @@ def valhalla_class_with_class_not_exist_test():
             }
         }]
         StreetNetwork.get_street_network_services(None, kraken_conf)
+
+
+class FailingStreetNetworkService(AbstractStreetNetworkService):
+    """
+    the direct paths to the 'failing' stop point fail
+    """
+    def _direct_path(self, mode, pt_object_origin, pt_object_destination, fallback_extremity, request,
+                     direct_path_type):
+        if pt_object_destination.uri == 'failing':
+            raise TechnicalError('the service has failed')
+        resp = response_pb2.Response()
+        resp.journeys.add().duration = 60
+        return resp
+
+    def get_street_network_routing_matrix(self, origins, destinations, street_network_mode, max_duration, request,
+                                          **kwargs):
+        pass
+
+    def status(self):
+        pass
+
+    def make_path_key(self, mode, orig_uri, dest_uri, streetnetwork_path_type, period_extremity):
+        pass
+
+
+@pytest.mark.parametrize('max_concurrency', [1, 8])
+def direct_paths_with_fp_failure_test(max_concurrency):
+    """
+    a failing path doesn't fail the others, its response is empty
+    """
+    service = FailingStreetNetworkService()
+    service.direct_path_max_concurrency = max_concurrency
+    origin = make_pt_object(type_pb2.ADDRESS, 2.0, 48.0, 'address')
+    paths = [(origin, make_pt_object(type_pb2.STOP_POINT, 2.01, 48.0, uri), PeriodExtremity(1000000, False),
+              StreetNetworkPathType.BEGINNING_FALLBACK)
+             for uri in ('sp1', 'failing', 'sp2')]
+
+    responses = service.direct_paths_with_fp('walking', paths, {})
+
+    assert [len(r.journeys) for r in responses] == [1, 0, 1]
@@ -32,7 +32,7 @@ from navitiacommon import response_pb2
 import logging
 import pybreaker
 import requests as requests
-from jormungandr import app
+from jormungandr import app, http_client
 import json
 from jormungandr.exceptions import TechnicalError, InvalidArguments, ApiNotFound
 from jormungandr.utils import is_url, kilometers_to_meters, get_pt_object_coord, decode_polyline
@@ -73,25 +73,29 @@ class Valhalla(AbstractStreetNetworkService):
         # it is used to represent that it takes time to park a car or a bike
         # since valhalla does not handle such a time, we rig valhalla's result to add it
         self.mode_park_cost = kwargs.get('mode_park_cost', {})  # a dict giving the park time (in s) by mode
+        self._init_matrix_options(kwargs)
 
     def status(self):
         return {'id': unicode(self.sn_system_id),
                 'class': self.__class__.__name__,
                 'modes': self.modes,
                 'timeout': self.timeout,
+                'matrix_chunk_size': self.matrix_chunk_size,
+                'matrix_max_concurrency': self.matrix_max_concurrency,
                 'circuit_breaker': {'current_state': self.breaker.current_state,
                                     'fail_counter': self.breaker.fail_counter,
                                     'reset_timeout': self.breaker.reset_timeout},
             }
 
-    def _call_valhalla(self, url, method=requests.post, data=None):
+    def _call_valhalla(self, url, method=http_client.post, data=None):
         logging.getLogger(__name__).debug('Valhalla routing service , call url : {}'.format(url))
         logging.getLogger(__name__).debug('data : {}'.format(data))
         headers = {}
         if self.api_key:
             headers['api_key'] = self.api_key
         try:
-            return self.breaker.call(method, url, timeout=self.timeout, data=data, headers=headers)
+            return self.breaker.call(method, url, connector='valhalla', timeout=self.timeout, data=data,
+                                     headers=headers)
         except pybreaker.CircuitBreakerError as e:
             logging.getLogger(__name__).error('Valhalla routing service dead (error: {})'.format(e))
             self.record_external_failure('circuit breaker open')
@@ -260,7 +264,7 @@ class Valhalla(AbstractStreetNetworkService):
 
     def _direct_path(self, mode, pt_object_origin, pt_object_destination, fallback_extremity, request, direct_path_type):
         data = self._make_request_arguments(mode, [pt_object_origin], [pt_object_destination], request, api='route')
-        r = self._call_valhalla('{}/{}'.format(self.service_url, 'route'), requests.post, data)
+        r = self._call_valhalla('{}/{}'.format(self.service_url, 'route'), http_client.post, data)
         if r is not None and r.status_code == 400 and r.json()['error_code'] == 442:
             # error_code == 442 => No path could be found for input
             resp = response_pb2.Response()
@@ -300,7 +304,7 @@ class Valhalla(AbstractStreetNetworkService):
                 raise TechnicalError('routing matrix error, no unique center point')
 
         data = self._make_request_arguments(mode, origins, destinations, request, api='sources_to_targets')
-        r = self._call_valhalla('{}/{}'.format(self.service_url, 'sources_to_targets'), requests.post, data)
+        r = self._call_valhalla('{}/{}'.format(self.service_url, 'sources_to_targets'), http_client.post, data)
         self._check_response(r)
         resp_json = r.json()
         return self._get_matrix(resp_json, mode_park_cost=self.mode_park_cost.get(mode))
@@ -0,0 +1,98 @@
+# coding=utf-8
+
+#  Copyright (c) 2001-2018, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+from __future__ import absolute_import, print_function, unicode_literals, division
+import threading
+import mock
+from six.moves import BaseHTTPServer
+from jormungandr import app
+from jormungandr.http_client import HttpClient
+
+
+class KeepAliveHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    protocol_version = str('HTTP/1.1')
+
+    def do_GET(self):
+        body = b'{}'
+        self.send_response(200)
+        self.send_header(str('Content-Type'), str('application/json'))
+        self.send_header(str('Content-Length'), str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def http_client_reuse_connections_test():
+    server = BaseHTTPServer.HTTPServer((str('127.0.0.1'), 0), KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    client = HttpClient()
+    try:
+        url = 'http://127.0.0.1:{}/bob'.format(server.server_address[1])
+        for _ in range(3):
+            assert client.request('GET', url, connector='bob', timeout=1).json() == {}
+        assert client.get_session('bob') is client.get_session('bob')
+
+        status = client.status()
+        assert len(status) == 1
+        pool = status[0]
+        assert pool['connector'] == 'bob'
+        assert pool['host'] == '127.0.0.1'
+        assert pool['nb_requests'] == 3
+        assert pool['nb_connections'] == 1
+        assert pool['nb_reused_connections'] == 2
+        assert pool['nb_idle_connections'] == 1
+    finally:
+        client.clear()
+        server.shutdown()
+        server.server_close()
+
+
+def http_client_connector_config_test():
+    previous_config = app.config.get('HTTP_POOL_CONNECTORS')
+    app.config['HTTP_POOL_CONNECTORS'] = {'small': {'pool_maxsize': 2, 'timeout': 3}}
+    client = HttpClient()
+    try:
+        assert client.get_connector_config('small')['pool_maxsize'] == 2
+        assert client.get_connector_config('other')['pool_maxsize'] == app.config['HTTP_POOL_MAXSIZE']
+
+        with mock.patch('requests.Session.request') as session_request:
+            client.request('GET', 'http://bob.com', connector='small')
+            assert session_request.call_args[1]['timeout'] == 3
+            # the timeout given by the connector is kept
+            client.request('GET', 'http://bob.com', connector='small', timeout=1)
+            assert session_request.call_args[1]['timeout'] == 1
+    finally:
+        app.config['HTTP_POOL_CONNECTORS'] = previous_config
+        client.clear()
@@ -29,7 +29,9 @@
 from __future__ import absolute_import, print_function, unicode_literals, division
 
 from jormungandr import InstanceManager
-from pytest import fixture
+from jormungandr.exceptions import RegionNotFound
+from pytest import fixture, raises
+from shapely import wkt
 from pytest_mock import mocker
 
 from jormungandr import app
@@ -75,3 +77,57 @@ def get_instances_by_object_id_test(manager, mocker):
         assert mock.called
 
 
+class FakeKrakenInstance(FakeInstance):
+    def __init__(self, name, shape=None, ids=()):
+        FakeInstance.__init__(self, name)
+        self.geom = wkt.loads(shape) if shape else None
+        self.publication_date = 1
+        self.ids = set(ids)
+        self.nb_calls = 0
+
+    def has_id(self, id_):
+        self.nb_calls += 1
+        return id_ in self.ids
+
+
+@fixture
+def manager_with_shapes():
+    instance_manager = InstanceManager()
+    instance_manager.instances['paris'] = FakeKrakenInstance('paris', 'POLYGON((2 48, 3 48, 3 49, 2 49, 2 48))',
+                                                             ids=['stop_area:paris:1', 'stop_area:paris:2'])
+    instance_manager.instances['idf'] = FakeKrakenInstance('idf', 'POLYGON((1 47, 4 47, 4 50, 1 50, 1 47))',
+                                                           ids=['stop_area:paris:1', 'stop_area:idf:1'])
+    instance_manager.instances['pdl'] = FakeKrakenInstance('pdl', 'POLYGON((-2 46, 0 46, 0 48, -2 48, -2 46))',
+                                                           ids=['stop_area:pdl:1', 'stop_area:pdl:2'])
+    instance_manager.instances['empty'] = FakeKrakenInstance('empty')
+    return instance_manager
+
+
+def all_keys_of_coord_test(manager_with_shapes):
+    assert set(manager_with_shapes._all_keys_of_coord(2.5, 48.5)) == {'paris', 'idf'}
+    assert manager_with_shapes._all_keys_of_coord(3.5, 48.5) == ['idf']
+    assert manager_with_shapes._all_keys_of_coord(-1, 47) == ['pdl']
+    with raises(RegionNotFound):
+        manager_with_shapes._all_keys_of_coord(10, 10)
+
+
+def all_keys_of_coord_new_shape_test(manager_with_shapes):
+    pdl = manager_with_shapes.instances['pdl']
+    pdl.geom = wkt.loads('POLYGON((-2 46, 0 46, 0 50, -2 50, -2 46))')
+    # the index is not rebuilt while the publication date doesn't change
+    with raises(RegionNotFound):
+        manager_with_shapes._all_keys_of_coord(-1, 49)
+    pdl.publication_date = 2
+    assert manager_with_shapes._all_keys_of_coord(-1, 49) == ['pdl']
+
+
+def all_keys_of_id_test(manager_with_shapes):
+    instances = manager_with_shapes.instances
+
+    assert set(manager_with_shapes._all_keys_of_id.uncached(manager_with_shapes, 'stop_area:paris:1')) == \
+        {'paris', 'idf'}
+    assert all(i.nb_calls == 1 for i in instances.values())
+
+    with raises(RegionNotFound):
+        manager_with_shapes._all_keys_of_id.uncached(manager_with_shapes, 'stop_area:pdl:3')
+    assert all(i.nb_calls == 2 for i in instances.values())
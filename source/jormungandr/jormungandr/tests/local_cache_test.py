@@ -0,0 +1,84 @@
+# coding=utf-8
+
+#  Copyright (c) 2001-2018, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+from __future__ import absolute_import, print_function, unicode_literals, division
+import time
+from jormungandr import app
+from jormungandr.local_cache import LocalCache, memoize, get_local_caches_status
+
+
+def local_cache_ttl_test():
+    c = LocalCache(max_size=10, ttl=0.01)
+    c.set('a', 1)
+    assert c.get('a') == 1
+    time.sleep(0.02)
+    assert c.get('a') is LocalCache.MISSING
+
+
+def memoize_test():
+    app.config['CACHE_CONFIGURATION']['LOCAL_CACHE'] = {'test_memoize': {'max_size': 10, 'ttl': 60}}
+    calls = []
+
+    try:
+        @memoize('test_memoize', 60)
+        def double(a):
+            calls.append(a)
+            return 2 * a
+    finally:
+        del app.config['CACHE_CONFIGURATION']['LOCAL_CACHE']
+
+    with app.test_request_context('/'):
+        assert double(2) == 4
+        assert double(2) == 4
+        assert double(3) == 6
+        assert calls == [2, 3]
+
+        status = next(s for s in get_local_caches_status() if s['name'] == 'test_memoize')
+        assert status['hits'] == 1
+        assert status['misses'] == 2
+        assert status['size'] == 2
+
+        double.clear_local()
+        assert double(2) == 4
+        assert calls == [2, 3, 2]
+
+
+def memoize_without_local_cache_test():
+    """
+    without configuration, it's just a memoize of the shared cache
+    """
+    @memoize('not_configured', 60)
+    def double(a):
+        return 2 * a
+
+    with app.test_request_context('/'):
+        assert double(2) == 4
+    assert 'not_configured' not in [s['name'] for s in get_local_caches_status()]
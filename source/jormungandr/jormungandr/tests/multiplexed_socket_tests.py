@@ -0,0 +1,327 @@
+# coding=utf-8
+
+#  Copyright (c) 2001-2018, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+from __future__ import absolute_import, print_function, unicode_literals, division
+import struct
+import gevent
+import gevent.event
+from zmq import green as zmq
+from pytest import fixture
+
+from jormungandr.multiplexed_socket import MultiplexedSocket, RequestBatch, BATCH_MARKER, unpack_batch_response
+
+SOCKET_PATH = 'inproc://fake_kraken'
+
+
+def read_uint32(message, pos):
+    return struct.unpack_from(str('>I'), message, pos)[0], pos + 4
+
+
+def unpack_batch(message):
+    """
+    rebuild the requests of a batch message as kraken does: each request is the concatenation of its parts
+    """
+    pos = len(BATCH_MARKER)
+    nb_parts, pos = read_uint32(message, pos)
+    parts = []
+    for _ in range(nb_parts):
+        size, pos = read_uint32(message, pos)
+        parts.append(message[pos:pos + size])
+        pos += size
+    nb_requests, pos = read_uint32(message, pos)
+    requests = []
+    for _ in range(nb_requests):
+        nb_indexes, pos = read_uint32(message, pos)
+        indexes = struct.unpack_from(str('>{}I'.format(nb_indexes)), message, pos)
+        pos += 4 * nb_indexes
+        requests.append(b''.join(parts[i] for i in indexes))
+    assert pos == len(message)
+    return requests
+
+
+def pack_batch_response(responses):
+    chunks = [BATCH_MARKER, struct.pack(str('>I'), len(responses))]
+    for response in responses:
+        chunks.append(struct.pack(str('>I'), len(response)))
+        chunks.append(response)
+    return b''.join(chunks)
+
+
+class FakeKraken(object):
+    """
+    A ROUTER reading the messages as kraken's load balancer does: exactly [address, '', request]
+    it answers the requests in the reverse order of their arrival
+
+    it also handles the batch messages as kraken's workers do
+    """
+    def __init__(self, context, nb_messages):
+        self.socket = context.socket(zmq.ROUTER)
+        self.socket.bind(SOCKET_PATH)
+        self.nb_messages = nb_messages
+        self.received = []
+
+    def run(self):
+        messages = []
+        while len(messages) < self.nb_messages:
+            messages.append(self.socket.recv_multipart())
+        for frames in reversed(messages):
+            address, empty, request = frames
+            assert empty == b''
+            self.received.append(request)
+            if request.startswith(BATCH_MARKER):
+                response = pack_batch_response([b'response to ' + r for r in unpack_batch(request)])
+            else:
+                response = b'response to ' + request
+            self.socket.send_multipart([address, empty, response])
+
+    def close(self):
+        self.socket.close()
+
+
+@fixture
+def context():
+    ctx = zmq.Context()
+    yield ctx
+    ctx.term()
+
+
+def multiplexed_requests_test(context):
+    """
+    the responses are routed back to the right caller even if they don't arrive in order
+    """
+    kraken = FakeKraken(context, nb_messages=3)
+    socket = MultiplexedSocket(context, SOCKET_PATH, 'test')
+    server = gevent.spawn(kraken.run)
+
+    calls = [gevent.spawn(socket.send_and_receive, r, 1000) for r in (b'A', b'B', b'C')]
+    gevent.joinall(calls + [server])
+
+    assert [c.value for c in calls] == [b'response to A', b'response to B', b'response to C']
+    status = socket.status()
+    assert status['in_flight'] == 0
+    assert status['max_in_flight'] == 3
+    assert status['nb_connections'] == 3
+    assert status['nb_requests'] == 3
+    assert status['nb_timeouts'] == 0
+
+    # the connections are reused
+    server = gevent.spawn(FakeKraken.run, kraken)
+    kraken.nb_messages = 1
+    assert socket.send_and_receive(b'D', 1000) == b'response to D'
+    server.join()
+    assert socket.status()['nb_connections'] == 3
+
+    socket.close()
+    kraken.close()
+
+
+def timeout_test(context):
+    """
+    a timeout doesn't break the connection, it's reused once the late response is dropped
+    """
+    kraken = FakeKraken(context, nb_messages=2)
+    socket = MultiplexedSocket(context, SOCKET_PATH, 'test')
+    server = gevent.spawn(kraken.run)
+
+    assert socket.send_and_receive(b'A', 10) is None
+    assert socket.status()['nb_timeouts'] == 1
+
+    # the server only answers when it has received the second request
+    assert socket.send_and_receive(b'B', 1000) == b'response to B'
+    server.join()
+    gevent.sleep(0.01)
+    status = socket.status()
+    assert status['nb_late_responses'] == 1
+    assert status['in_flight'] == 0
+    assert status['nb_connections'] == 2
+
+    server = gevent.spawn(kraken.run)
+    kraken.nb_messages = 1
+    assert socket.send_and_receive(b'C', 1000) == b'response to C'
+    server.join()
+    assert socket.status()['nb_connections'] == 2
+
+    socket.close()
+    kraken.close()
+
+
+def abandoned_connection_test(context):
+    """
+    a connection whose late response never arrives is closed after the abandoned timeout
+    """
+    kraken = FakeKraken(context, nb_messages=2)
+    socket = MultiplexedSocket(context, SOCKET_PATH, 'test', abandoned_timeout=0.05)
+
+    assert socket.send_and_receive(b'A', 10) is None
+    status = socket.status()
+    assert status['nb_abandoned'] == 1
+    assert status['nb_connections'] == 1
+    connection = socket._connections[0]
+
+    gevent.sleep(0.1)
+    status = socket.status()
+    assert status['nb_abandoned'] == 0
+    assert status['nb_closed_abandoned'] == 1
+    assert status['nb_connections'] == 0
+    assert connection.socket.closed
+    assert connection.reader.dead
+
+    # a new connection is opened for the next request (the response to the first one is dropped by the ROUTER)
+    server = gevent.spawn(kraken.run)
+    assert socket.send_and_receive(b'B', 1000) == b'response to B'
+    server.join()
+    assert socket.status()['nb_connections'] == 1
+
+    socket.close()
+    kraken.close()
+
+
+def late_response_before_abandoned_timeout_test(context):
+    """
+    a connection reused after its late response is not closed by the abandoned timeout of its previous request
+    """
+    kraken = FakeKraken(context, nb_messages=2)
+    socket = MultiplexedSocket(context, SOCKET_PATH, 'test', abandoned_timeout=0.05)
+    server = gevent.spawn(kraken.run)
+
+    assert socket.send_and_receive(b'A', 10) is None
+    assert socket.send_and_receive(b'B', 1000) == b'response to B'
+    server.join()
+    gevent.sleep(0.01)
+    assert socket.status()['nb_abandoned'] == 0
+
+    # the first connection is reused for a request in flight when the abandoned timeout expires
+    server = gevent.spawn(kraken.run)
+    kraken.nb_messages = 2
+    calls = [gevent.spawn(socket.send_and_receive, r, 1000) for r in (b'C', b'D')]
+    gevent.sleep(0.1)
+    gevent.joinall(calls + [server])
+    assert [c.value for c in calls] == [b'response to C', b'response to D']
+    status = socket.status()
+    assert status['nb_closed_abandoned'] == 0
+    assert status['nb_connections'] == 2
+
+    socket.close()
+    kraken.close()
+
+
+class FailingSocket(object):
+    closed = False
+
+    def __init__(self):
+        self.nb_recv = 0
+
+    def recv_multipart(self):
+        self.nb_recv += 1
+        raise zmq.ZMQError()
+
+    def close(self):
+        self.closed = True
+
+
+class FakeConnection(object):
+    def __init__(self):
+        self.socket = FailingSocket()
+        self.pending = (gevent.event.AsyncResult(), 0)
+        self.abandoned = False
+
+
+def connection_error_test(context):
+    """
+    a connection that fails is closed, its request fails, and its reader stops
+    """
+    socket = MultiplexedSocket(context, SOCKET_PATH, 'test')
+    connection = FakeConnection()
+    result = connection.pending[0]
+    socket._connections.append(connection)
+
+    socket._receive_loop(connection)
+
+    assert connection.socket.nb_recv == 1
+    assert connection.socket.closed
+    assert result.get(timeout=0) is None
+    assert socket.status()['nb_connection_errors'] == 1
+    assert socket.status()['nb_connections'] == 0
+
+
+def make_part(content, built):
+    class Part(object):
+        def SerializePartialToString(self):
+            built.append(content)
+            return content
+    return lambda: Part()
+
+
+def request_batch_test():
+    """
+    a part shared by several requests is only built and packed once
+    """
+    built = []
+    batch = RequestBatch()
+    common = batch.add_part('common', make_part(b'C', built))
+    for key in ('A', 'B', 'A'):
+        batch.add_request([common, batch.add_part(key, make_part(key.encode(), built))])
+
+    assert built == [b'C', b'A', b'B']
+    assert len(batch) == 3
+    assert unpack_batch(batch.pack()) == [b'CA', b'CB', b'CA']
+
+
+def unpack_batch_response_test():
+    assert unpack_batch_response(pack_batch_response([b'A', b'', b'BC'])) == [b'A', b'', b'BC']
+    assert unpack_batch_response(pack_batch_response([])) == []
+    # not a batch response
+    assert unpack_batch_response(b'response') is None
+    # truncated message
+    assert unpack_batch_response(pack_batch_response([b'A', b'BC'])[:-1]) is None
+
+
+def batch_test(context):
+    """
+    all the requests of a batch are sent in one frame, the responses are in the order of the requests
+    """
+    kraken = FakeKraken(context, nb_messages=1)
+    socket = MultiplexedSocket(context, SOCKET_PATH, 'test')
+    server = gevent.spawn(kraken.run)
+
+    batch = RequestBatch()
+    common = batch.add_part('common', make_part(b'common ', []))
+    for key in ('A', 'B', 'C'):
+        batch.add_request([common, batch.add_part(key, make_part(key.encode(), []))])
+    responses = socket.send_and_receive_batch(batch, 1000)
+    server.join()
+
+    assert responses == [b'response to common A', b'response to common B', b'response to common C']
+    assert socket.status()['nb_requests'] == 1
+    # the common part has only been sent once
+    assert kraken.received[0].count(b'common') == 1
+
+    socket.close()
+    kraken.close()
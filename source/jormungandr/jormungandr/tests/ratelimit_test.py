@@ -0,0 +1,171 @@
+# coding=utf-8
+
+#  Copyright (c) 2001-2018, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+from __future__ import absolute_import, print_function, unicode_literals, division
+import os
+import socket
+import uuid
+import mock
+import redis
+from pytest import fixture, raises, skip
+
+from navitiacommon.ratelimit import RateLimiter
+
+# the rate limit is checked by a lua script run by redis, these tests need a redis server
+REDIS_HOST = os.getenv('JORMUNGANDR_TEST_REDIS_HOST', 'localhost')
+REDIS_PORT = int(os.getenv('JORMUNGANDR_TEST_REDIS_PORT', 6379))
+
+
+class Clock(object):
+    def __init__(self, now):
+        self.now = now
+
+
+@fixture
+def clock():
+    """
+    the timestamps of the requests are given by the limiter, they are controlled by the tests
+    """
+    c = Clock(1000.0)
+    with mock.patch('navitiacommon.ratelimit.time') as time_module:
+        time_module.time.side_effect = lambda: c.now
+        yield c
+
+
+@fixture
+def redis_client():
+    client = redis.Redis(host=REDIS_HOST, port=REDIS_PORT)
+    try:
+        client.ping()
+    except redis.ConnectionError:
+        skip('no redis server on {}:{}'.format(REDIS_HOST, REDIS_PORT))
+    return client
+
+
+@fixture
+def make_limiter(redis_client):
+    namespace = 'test_ratelimit_{}'.format(uuid.uuid4().hex)
+
+    def make(*conditions):
+        return RateLimiter(conditions=conditions, redis_host=REDIS_HOST, redis_port=REDIS_PORT,
+                           redis_namespace=namespace)
+    yield make
+    for key in redis_client.keys(namespace + ':*'):
+        redis_client.delete(key)
+
+
+def acquire_at(limiter, clock, timestamp, key='key'):
+    clock.now = timestamp
+    return limiter.acquire(key, block=False)
+
+
+def window_rollover_test(make_limiter, clock):
+    """
+    a request is accepted again once the oldest request of the window is out of it
+    """
+    limiter = make_limiter((3, 10))
+
+    assert [acquire_at(limiter, clock, t) for t in (1000, 1001, 1002)] == [True, True, True]
+    assert not acquire_at(limiter, clock, 1005)
+    # the request of 1000 is out of the window
+    assert acquire_at(limiter, clock, 1010.5)
+    # but not the one of 1001
+    assert not acquire_at(limiter, clock, 1010.6)
+    assert acquire_at(limiter, clock, 1011.1)
+
+
+def over_limit_test(make_limiter, clock):
+    """
+    a request over the limit of any condition is rejected with the time to wait, and it isn't recorded
+    """
+    limiter = make_limiter((2, 1), (4, 60))
+
+    assert acquire_at(limiter, clock, 1000)
+    assert acquire_at(limiter, clock, 1000.1)
+    clock.now = 1000.2
+    accepted, wait = limiter._make_ping('key')
+    assert not accepted
+    assert wait == 1000 + 1 - 1000.2
+
+    assert acquire_at(limiter, clock, 1002)
+    assert acquire_at(limiter, clock, 1004)
+    clock.now = 1006
+    accepted, wait = limiter._make_ping('key')
+    assert not accepted
+    assert wait == 1000 + 60 - 1006
+
+    # the keys are limited independently
+    assert acquire_at(limiter, clock, 1006, key='other_key')
+
+    # the rejected requests have not been recorded
+    assert acquire_at(limiter, clock, 1060.05)
+
+
+def block_test(make_limiter, clock):
+    limiter = make_limiter((100, 10))
+
+    assert limiter.block('key', seconds=30) == 30
+    accepted, wait = limiter._make_ping('key')
+    assert not accepted
+    assert 0 < wait <= 30
+    assert acquire_at(limiter, clock, 1000, key='other_key')
+
+
+def block_all_test(make_limiter, clock):
+    limiter = make_limiter((0, 10))
+
+    assert not acquire_at(limiter, clock, 1000)
+
+
+def script_flushed_test(make_limiter, redis_client, clock):
+    """
+    the script is loaded again if redis has lost it (restart...)
+    """
+    limiter = make_limiter((1, 10))
+    assert acquire_at(limiter, clock, 1000)
+
+    redis_client.script_flush()
+
+    assert not acquire_at(limiter, clock, 1001)
+    assert acquire_at(limiter, clock, 1010.5)
+
+
+def redis_unavailable_test(clock):
+    """
+    without redis the limiter raises a ConnectionError, the callers use it to fall back
+    """
+    s = socket.socket()
+    s.bind(('localhost', 0))
+    closed_port = s.getsockname()[1]
+    s.close()
+    limiter = RateLimiter(conditions=[(1, 10)], redis_host='localhost', redis_port=closed_port)
+
+    with raises(redis.ConnectionError):
+        limiter.acquire('key', block=False)
@@ -0,0 +1,102 @@
+# coding=utf-8
+
+#  Copyright (c) 2001-2018, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+from __future__ import absolute_import, print_function, unicode_literals, division
+from datetime import datetime
+import gevent
+import pytz
+
+from jormungandr import app
+from jormungandr.realtime_schedule.realtime_proxy import RealtimeProxy
+from jormungandr.schedule import MixedSchedule, RealTimePassage, RT_PROXY_PROPERTY_NAME, REALTIME_DEADLINE_NOTE_URI
+from navitiacommon import response_pb2, type_pb2
+
+
+class SleepingProxy(RealtimeProxy):
+    """
+    proxy answering one passage after a delay
+    """
+    def __init__(self, rt_system_id, delay):
+        self.rt_system_id = rt_system_id
+        self.delay = delay
+
+    def status(self):
+        return None
+
+    def _get_next_passage_for_route_point(self, route_point, count=None, from_dt=None, current_dt=None,
+                                          duration=None):
+        gevent.sleep(self.delay)
+        return [RealTimePassage(datetime(2016, 1, 2, 10, 0, tzinfo=pytz.UTC))]
+
+
+class FakeInstance(object):
+    realtime_pool_size = 3
+
+    def __init__(self, proxies):
+        self.realtime_proxy_manager = {p.rt_system_id: p for p in proxies}
+
+
+def make_response(rt_system_ids):
+    resp = response_pb2.Response()
+    for i, rt_system_id in enumerate(rt_system_ids):
+        stop_schedule = resp.stop_schedules.add()
+        stop_schedule.stop_point.uri = 'stop_{}'.format(i)
+        stop_schedule.route.uri = 'route_{}'.format(i)
+        prop = stop_schedule.route.line.properties.add()
+        prop.name = RT_PROXY_PROPERTY_NAME
+        prop.value = rt_system_id
+        base_dt = stop_schedule.date_times.add()
+        base_dt.time = 8 * 3600
+        base_dt.realtime_level = type_pb2.BASE_SCHEDULE
+    return resp
+
+
+def departure_boards_realtime_deadline_test(monkeypatch):
+    """
+    the stop_schedules of the realtime systems answering after the deadline keep their base schedule
+    and are marked with a note
+    """
+    instance = FakeInstance([SleepingProxy('fast', 0), SleepingProxy('slow', 1)])
+    schedule = MixedSchedule(instance)
+    monkeypatch.setattr(schedule, '_MixedSchedule__stop_times',
+                        lambda *args, **kwargs: make_response(['fast', 'slow', 'fast']))
+    monkeypatch.setitem(app.config, 'REALTIME_DEADLINE', 100)
+    request = {'filter': '', 'data_freshness': 'realtime', 'items_per_schedule': 10, 'from_datetime': None,
+               '_current_datetime': None, 'duration': 86400, 'timezone': None}
+
+    with app.test_request_context():
+        resp = schedule.departure_boards(request)
+
+    fast_1, slow, fast_2 = resp.stop_schedules
+    for stop_schedule in (fast_1, fast_2):
+        assert [dt.realtime_level for dt in stop_schedule.date_times] == [type_pb2.REALTIME]
+        assert not stop_schedule.pt_display_informations.notes
+    assert [dt.realtime_level for dt in slow.date_times] == [type_pb2.BASE_SCHEDULE]
+    assert [n.uri for n in slow.pt_display_informations.notes] == [REALTIME_DEADLINE_NOTE_URI]
@@ -0,0 +1,143 @@
+# coding=utf-8
+
+#  Copyright (c) 2001-2018, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+from __future__ import absolute_import, print_function, unicode_literals, division
+import os
+import threading
+import mock
+
+from jormungandr.stat_manager import AsyncStatPublisher
+
+
+class BlockingBroker(object):
+    """
+    store the published stats, it blocks until it is released
+    """
+    def __init__(self):
+        self.published = []
+        self.released = threading.Event()
+
+    def publish(self, api, pbf):
+        self.released.wait(5)
+        self.published.append((api, pbf))
+
+
+def publish_in_background_test():
+    broker = BlockingBroker()
+    publisher = AsyncStatPublisher(broker.publish, max_size=10, batch_size=3)
+
+    for i in range(5):
+        publisher.put('journeys', str(i))
+    # the request path is not blocked by the broker
+    assert publisher.status()['nb_published'] == 0
+
+    broker.released.set()
+    publisher.flush(timeout=5)
+
+    assert broker.published == [('journeys', str(i)) for i in range(5)]
+    status = publisher.status()
+    assert status['queue_size'] == 0
+    assert status['nb_published'] == 5
+    assert status['nb_dropped'] == 0
+
+
+def drop_oldest_test():
+    """
+    when the queue is full, the oldest stats are dropped
+    """
+    broker = BlockingBroker()
+    publisher = AsyncStatPublisher(broker.publish, max_size=3, batch_size=1)
+    # the first stat is taken by the background thread, it waits for the broker
+    publisher.put('journeys', 'first')
+    while publisher.status()['queue_size']:
+        broker.released.wait(0.01)
+
+    for i in range(5):
+        publisher.put('journeys', str(i))
+    status = publisher.status()
+    assert status['queue_size'] == 3
+    assert status['nb_dropped'] == 2
+
+    broker.released.set()
+    publisher.flush(timeout=5)
+    assert broker.published == [('journeys', 'first'), ('journeys', '2'), ('journeys', '3'), ('journeys', '4')]
+
+
+def publish_error_test():
+    """
+    a failing publication doesn't stop the background thread
+    """
+    published = []
+
+    def publish(api, pbf):
+        if pbf == 'bob':
+            raise Exception('broker error')
+        published.append(pbf)
+
+    publisher = AsyncStatPublisher(publish, max_size=10, batch_size=10)
+    for pbf in ('a', 'bob', 'c'):
+        publisher.put('journeys', pbf)
+    publisher.flush(timeout=5)
+
+    assert published == ['a', 'c']
+    status = publisher.status()
+    assert status['nb_errors'] == 1
+    assert status['nb_published'] == 2
+
+
+def start_on_first_put_test():
+    """
+    the thread is only started by the first stat, and started again in a forked process
+    """
+    broker = BlockingBroker()
+    publisher = AsyncStatPublisher(broker.publish, max_size=10, batch_size=1)
+    assert publisher._thread is None
+
+    publisher.put('journeys', 'parent')
+    parent_thread = publisher._thread
+    assert parent_thread.is_alive()
+    while publisher.status()['queue_size']:
+        broker.released.wait(0.01)
+    publisher.put('journeys', 'queued in the parent')
+
+    with mock.patch('os.getpid', return_value=os.getpid() + 1):
+        publisher.put('journeys', 'child')
+        child_thread = publisher._thread
+        assert child_thread is not parent_thread
+        assert child_thread.is_alive()
+        # the stats queued before the fork are left to the parent
+        assert publisher.status()['queue_size'] <= 1
+
+        broker.released.set()
+        publisher.flush(timeout=5)
+
+    assert not child_thread.is_alive()
+    assert ('journeys', 'child') in broker.published
+    assert ('journeys', 'queued in the parent') not in broker.published
@@ -28,7 +28,8 @@
 # www.navitia.io
 
 from __future__ import absolute_import, print_function, unicode_literals, division
-from jormungandr import app, cache
+from jormungandr import app
+from jormungandr.local_cache import memoize
 from navitiacommon import models
 from navitiacommon.default_traveler_profile_params import default_traveler_profile_params, acceptable_traveler_types
 from six.moves import map
@@ -88,7 +89,7 @@ class TravelerProfile(object):
         list(map(override, arg_2_profile_attr))
 
     @classmethod
-    @cache.memoize(app.config['CACHE_CONFIGURATION'].get('TIMEOUT_PARAMS', 300))
+    @memoize('traveler_profile', app.config['CACHE_CONFIGURATION'].get('TIMEOUT_PARAMS', 300))
     def make_traveler_profile(cls, coverage, traveler_type):
         """
         travelers_profile factory method,
@@ -119,7 +120,7 @@ class TravelerProfile(object):
                    )
 
     @classmethod
-    @cache.memoize(app.config['CACHE_CONFIGURATION'].get('TIMEOUT_PARAMS', 300))
+    @memoize('traveler_profiles_by_coverage', app.config['CACHE_CONFIGURATION'].get('TIMEOUT_PARAMS', 300))
     def get_profiles_by_coverage(cls, coverage):
         traveler_profiles = []
         for traveler_type in acceptable_traveler_types:
@@ -738,7 +738,7 @@ class TestBragiAutocomplete(AbstractTestFixture):
 
     def test_autocomplete_call(self):
         mock_requests = mock_bragi_autocomplete_call(BRAGI_MOCK_RESPONSE)
-        with mock.patch('requests.get', mock_requests.get):
+        with mock.patch('jormungandr.http_client.get', mock_requests.get):
             response = self.query_region("places?q=bob&pt_dataset=main_routing_test&type[]=stop_area"
                                          "&type[]=address&type[]=poi&type[]=administrative_region")
 
@@ -755,7 +755,7 @@ class TestBragiAutocomplete(AbstractTestFixture):
 
     def test_autocomplete_call_depth_zero(self):
         mock_requests = mock_bragi_autocomplete_call(deepcopy(BRAGI_MOCK_RESPONSE))
-        with mock.patch('requests.get', mock_requests.get):
+        with mock.patch('jormungandr.http_client.get', mock_requests.get):
             response = self.query_region("places?q=bob&pt_dataset=main_routing_test&type[]=stop_area"
                                          "&type[]=address&type[]=poi&type[]=administrative_region&depth=0")
 
@@ -781,7 +781,7 @@ class TestBragiAutocomplete(AbstractTestFixture):
             assert params.get('lon') == '3.25'
             assert params.get('lat') == '49.84'
             return MockResponse({}, 200, '')
-        with mock.patch('requests.get', http_get) as mock_method:
+        with mock.patch('jormungandr.http_client.get', http_get) as mock_method:
             self.query_region('places?q=bob&from=3.25;49.84')
 
     def test_autocomplete_call_override(self):
@@ -789,7 +789,7 @@ class TestBragiAutocomplete(AbstractTestFixture):
         test that the _autocomplete param switch the right autocomplete service
         """
         mock_requests = mock_bragi_autocomplete_call(BRAGI_MOCK_RESPONSE)
-        with mock.patch('requests.get', mock_requests.get):
+        with mock.patch('jormungandr.http_client.get', mock_requests.get):
             response = self.query_region("places?q=bob&type[]=stop_area&type[]=address&type[]=poi"
                                          "&type[]=administrative_region")
 
@@ -817,7 +817,7 @@ class TestBragiAutocomplete(AbstractTestFixture):
             assert params
             assert params.get('type[]') == ['public_transport:stop_area', 'street', 'house', 'poi', 'city']
             return MockResponse({}, 200, '')
-        with mock.patch('requests.get', http_get) as mock_method:
+        with mock.patch('jormungandr.http_client.get', http_get) as mock_method:
             self.query_region('places?q=bob')
 
     def test_autocomplete_call_with_param_type_administrative_region(self):
@@ -831,7 +831,7 @@ class TestBragiAutocomplete(AbstractTestFixture):
             assert params.get('type[]') == ['city', 'street', 'house']
 
             return MockResponse({}, 200, '')
-        with mock.patch('requests.get', http_get) as mock_method:
+        with mock.patch('jormungandr.http_client.get', http_get) as mock_method:
             self.query_region('places?q=bob&type[]=administrative_region&type[]=address')
 
     def test_autocomplete_call_with_param_type_not_acceptable(self):
@@ -843,7 +843,7 @@ class TestBragiAutocomplete(AbstractTestFixture):
             return MockResponse({}, 422, '')
 
         with raises(Exception):
-            with mock.patch('requests.get', http_get) as mock_method:
+            with mock.patch('jormungandr.http_client.get', http_get) as mock_method:
                 self.query_region('places?q=bob&type[]=bobette')
 
     def test_autocomplete_call_with_param_type_stop_point(self):
@@ -857,7 +857,7 @@ class TestBragiAutocomplete(AbstractTestFixture):
             assert params.get('type[]') == ['street', 'house']
 
             return MockResponse({}, 200, '')
-        with mock.patch('requests.get', http_get) as mock_method:
+        with mock.patch('jormungandr.http_client.get', http_get) as mock_method:
             self.query_region('places?q=bob&type[]=stop_point&type[]=address')
 
     def test_features_call(self):
@@ -869,7 +869,7 @@ class TestBragiAutocomplete(AbstractTestFixture):
         mock_requests = MockRequests({
             url: (BRAGI_MOCK_RESPONSE, 200)
         })
-        with mock.patch('requests.get', mock_requests.get):
+        with mock.patch('jormungandr.http_client.get', mock_requests.get):
             response = self.query_region("places/1234?&pt_dataset=main_routing_test")
 
             is_valid_global_autocomplete(response, depth=1)
@@ -896,7 +896,7 @@ class TestBragiAutocomplete(AbstractTestFixture):
             )
         })
 
-        with mock.patch('requests.get', mock_requests.get):
+        with mock.patch('jormungandr.http_client.get', mock_requests.get):
             response = self.query_region("places/AAA?&pt_dataset=main_routing_test", check=False)
             assert response[1] == 404
             assert response[0]["error"]["id"] == 'unknown_object'
@@ -911,7 +911,7 @@ class TestBragiAutocomplete(AbstractTestFixture):
         mock_requests = MockRequests({
             url: (BRAGI_MOCK_POI_WITHOUT_ADDRESS, 200)
         })
-        with mock.patch('requests.get', mock_requests.get):
+        with mock.patch('jormungandr.http_client.get', mock_requests.get):
             response = self.query_region("places/1234?&pt_dataset=main_routing_test")
 
             r = response.get('places')
@@ -930,7 +930,7 @@ class TestBragiAutocomplete(AbstractTestFixture):
         mock_requests = MockRequests({
             url: (BRAGI_MOCK_STOP_AREA_WITH_MORE_ATTRIBUTS, 200)
         })
-        with mock.patch('requests.get', mock_requests.get):
+        with mock.patch('jormungandr.http_client.get', mock_requests.get):
             response = self.query_region("places/1234?&pt_dataset=main_routing_test")
 
             assert response.get('feed_publishers')
@@ -970,7 +970,7 @@ class TestBragiAutocomplete(AbstractTestFixture):
 
     def test_stop_area_with_modes_depth_zero(self):
         mock_requests = mock_bragi_autocomplete_call(deepcopy(BRAGI_MOCK_STOP_AREA_WITH_MORE_ATTRIBUTS))
-        with mock.patch('requests.get', mock_requests.get):
+        with mock.patch('jormungandr.http_client.get', mock_requests.get):
             response = self.query_region("places?q=bob&pt_dataset=main_routing_test&type[]=stop_area"
                                          "&type[]=address&type[]=poi&type[]=administrative_region&depth=0")
 
@@ -1018,7 +1018,7 @@ class TestBragiAutocomplete(AbstractTestFixture):
         mock_requests = MockRequests({
             url: (BRAGI_MOCK_STOP_AREA_WITH_BASIC_ATTRIBUTS, 200)
         })
-        with mock.patch('requests.get', mock_requests.get):
+        with mock.patch('jormungandr.http_client.get', mock_requests.get):
             response = self.query_region("places/1234?&pt_dataset=main_routing_test")
 
             assert response.get('feed_publishers')
@@ -1038,7 +1038,7 @@ class TestBragiAutocomplete(AbstractTestFixture):
 
     def test_feature_unknown_type(self):
         mock_requests = mock_bragi_autocomplete_call(BRAGI_MOCK_TYPE_UNKNOWN, limite=2)
-        with mock.patch('requests.get', mock_requests.get):
+        with mock.patch('jormungandr.http_client.get', mock_requests.get):
             response = self.query("v1/places?q=bob&count=2")
 
             is_valid_global_autocomplete(response, depth=1)
@@ -1052,7 +1052,7 @@ class TestBragiAutocomplete(AbstractTestFixture):
 
     def test_autocomplete_call_with_depth_zero(self):
         mock_requests = mock_bragi_autocomplete_call(BRAGI_MOCK_BOBETTE_DEPTH_ZERO)
-        with mock.patch('requests.get', mock_requests.get):
+        with mock.patch('jormungandr.http_client.get', mock_requests.get):
             response = self.query_region("places?q=bob&pt_dataset=main_routing_test&type[]=stop_area"
                                          "&type[]=address&type[]=poi&type[]=administrative_region&depth=0")
 
@@ -1075,7 +1075,7 @@ class TestBragiAutocomplete(AbstractTestFixture):
 
     def test_autocomplete_call_with_depth_one(self):
         mock_requests = mock_bragi_autocomplete_call(BRAGI_MOCK_BOBETTE_DEPTH_ONE)
-        with mock.patch('requests.get', mock_requests.get):
+        with mock.patch('jormungandr.http_client.get', mock_requests.get):
             response = self.query_region("places?q=bob&pt_dataset=main_routing_test&type[]=stop_area"
                                          "&type[]=address&type[]=poi&type[]=administrative_region&depth=1")
 
@@ -1108,7 +1108,7 @@ class TestBragiAutocomplete(AbstractTestFixture):
 
     def test_autocomplete_call_with_depth_two(self):
         mock_requests = mock_bragi_autocomplete_call(BRAGI_MOCK_BOBETTE_DEPTH_TWO)
-        with mock.patch('requests.get', mock_requests.get):
+        with mock.patch('jormungandr.http_client.get', mock_requests.get):
             response = self.query_region("places?q=bob&pt_dataset=main_routing_test&type[]=stop_area"
                                          "&type[]=address&type[]=poi&type[]=administrative_region&depth=2")
 
@@ -1149,7 +1149,7 @@ class TestBragiAutocomplete(AbstractTestFixture):
     #This test is to verify that query with depth = 2 and 3 gives the same result as in kraken
     def test_autocomplete_call_with_depth_three(self):
         mock_requests = mock_bragi_autocomplete_call(BRAGI_MOCK_BOBETTE_DEPTH_THREE)
-        with mock.patch('requests.get', mock_requests.get):
+        with mock.patch('jormungandr.http_client.get', mock_requests.get):
             response = self.query_region("places?q=bob&pt_dataset=main_routing_test&type[]=stop_area"
                                          "&type[]=address&type[]=poi&type[]=administrative_region&depth=3")
 
@@ -1189,7 +1189,7 @@ class TestBragiAutocomplete(AbstractTestFixture):
 
     def test_autocomplete_for_admin_depth_zero(self):
         mock_requests = mock_bragi_autocomplete_call(BRAGI_MOCK_ADMIN)
-        with mock.patch('requests.get', mock_requests.get):
+        with mock.patch('jormungandr.http_client.get', mock_requests.get):
             response = self.query_region("places?q=bob&pt_dataset=main_routing_test&type[]=stop_area"
                                          "&type[]=address&type[]=poi&type[]=administrative_region&depth=0")
 
@@ -1207,7 +1207,7 @@ class TestBragiAutocomplete(AbstractTestFixture):
 
     def test_autocomplete_for_administrative_region(self):
         mock_requests = mock_bragi_autocomplete_call(BRAGI_MOCK_ADMINISTRATIVE_REGION)
-        with mock.patch('requests.get', mock_requests.get):
+        with mock.patch('jormungandr.http_client.get', mock_requests.get):
             response = self.query_region("places?q=bob")
             r = response.get('places')
             assert len(r) == 1
@@ -1222,7 +1222,7 @@ class TestBragiAutocomplete(AbstractTestFixture):
 
     def test_autocomplete_for_administrative_region_with_wrong_type(self):
         mock_requests = mock_bragi_autocomplete_call(BRAGI_MOCK_ADMINISTRATIVE_REGION_WITH_WRONG_TYPE)
-        with mock.patch('requests.get', mock_requests.get):
+        with mock.patch('jormungandr.http_client.get', mock_requests.get):
             response = self.query_region("places?q=bob")
             r = response.get('places')
             assert len(r) == 0
@@ -1231,7 +1231,7 @@ class TestBragiAutocomplete(AbstractTestFixture):
     # there is no difference in the final result with depth from 0 to 3
     def test_autocomplete_for_admin_depth_two(self):
         mock_requests = mock_bragi_autocomplete_call(deepcopy(BRAGI_MOCK_ADMIN))
-        with mock.patch('requests.get', mock_requests.get):
+        with mock.patch('jormungandr.http_client.get', mock_requests.get):
             response = self.query_region("places?q=bob&pt_dataset=main_routing_test&type[]=stop_area"
                                          "&type[]=address&type[]=poi&type[]=administrative_region&depth=2")
 
@@ -1250,7 +1250,7 @@ class TestBragiAutocomplete(AbstractTestFixture):
 
     def test_autocomplete_call_with_comments_on_stop_area(self):
         mock_requests = mock_bragi_autocomplete_call(BRAGI_MOCK_RESPONSE_STOP_AREA_WITH_COMMENTS)
-        with mock.patch('requests.get', mock_requests.get):
+        with mock.patch('jormungandr.http_client.get', mock_requests.get):
             response = self.query_region("places?q=bob&pt_dataset=main_routing_test&type[]=stop_area"
                                          "&type[]=address&type[]=poi&type[]=administrative_region")
             is_valid_global_autocomplete(response, depth=1)
@@ -1269,7 +1269,7 @@ class TestBragiAutocomplete(AbstractTestFixture):
 
     def test_autocomplete_call_without_comments_on_stop_area(self):
         mock_requests = mock_bragi_autocomplete_call(BRAGI_MOCK_RESPONSE_STOP_AREA_WITHOUT_COMMENTS)
-        with mock.patch('requests.get', mock_requests.get):
+        with mock.patch('jormungandr.http_client.get', mock_requests.get):
             response = self.query_region("places?q=bob&pt_dataset=main_routing_test&type[]=stop_area"
                                          "&type[]=address&type[]=poi&type[]=administrative_region")
             is_valid_global_autocomplete(response, depth=1)
@@ -1299,8 +1299,8 @@ class TestBragiShape(AbstractTestFixture):
             def http_get(url, *args, **kwargs):
                 assert False
 
-            with mock.patch('requests.get', http_get):
-                with mock.patch('requests.post', mock_post):
+            with mock.patch('jormungandr.http_client.get', http_get):
+                with mock.patch('jormungandr.http_client.post', mock_post):
 
                     self.query('v1/coverage/main_routing_test/places?q=toto&_autocomplete=bragi')
                     assert mock_post.called
@@ -1316,8 +1316,8 @@ class TestBragiShape(AbstractTestFixture):
                 assert json.get('shape').get('geometry')
                 return MockResponse({}, 200, '{}')
 
-            with mock.patch('requests.get', http_get):
-                with mock.patch('requests.post', http_post):
+            with mock.patch('jormungandr.http_client.get', http_get):
+                with mock.patch('jormungandr.http_client.post', http_post):
                     self.query('v1/coverage/main_routing_test/places?q=toto&_autocomplete=bragi')
                     self.query('v1/places?q=toto')
 
@@ -1332,8 +1332,8 @@ class TestBragiShape(AbstractTestFixture):
             def http_post(self, url, *args, **kwargs):
                 assert False
 
-            with mock.patch('requests.get', mock_get):
-                with mock.patch('requests.post', http_post):
+            with mock.patch('jormungandr.http_client.get', mock_get):
+                with mock.patch('jormungandr.http_client.post', http_post):
 
                     self.query('v1/coverage/main_routing_test/places?q=toto&_autocomplete=bragi')
                     assert mock_get.called
@@ -1354,7 +1354,7 @@ class TestBragiShape(AbstractTestFixture):
                 assert params.get('lat') == '42'
                 return MockResponse({}, 200, '')
 
-            with mock.patch('requests.get', http_get):
+            with mock.patch('jormungandr.http_client.get', http_get):
                 self.query('v1/coverage/main_routing_test/places?q=toto&_autocomplete=bragi')
 
     def test_places_for_user_with_coord_and_coord_overriden(self):
@@ -1369,7 +1369,7 @@ class TestBragiShape(AbstractTestFixture):
                 assert params.get('lat') == '2'
                 return MockResponse({}, 200, '')
 
-            with mock.patch('requests.get', http_get):
+            with mock.patch('jormungandr.http_client.get', http_get):
                 self.query('v1/coverage/main_routing_test/places?q=toto&_autocomplete=bragi&from=1;2')
 
     def test_places_for_user_with_coord_and_coord_overriden_to_null(self):
@@ -1384,7 +1384,7 @@ class TestBragiShape(AbstractTestFixture):
                 assert not params.get('lat')
                 return MockResponse({}, 200, '')
 
-            with mock.patch('requests.get', http_get):
+            with mock.patch('jormungandr.http_client.get', http_get):
                 self.query('v1/coverage/main_routing_test/places?q=toto&_autocomplete=bragi&from=')
 
     def test_places_with_empty_coord(self):
@@ -1401,7 +1401,7 @@ class TestBragiShape(AbstractTestFixture):
             # there is no authentication so all the known pt_dataset are added as parameters
             'https://host_of_bragi/features/bob?pt_dataset=main_routing_test': (BRAGI_MOCK_RESPONSE, 200)
         })
-        with mock.patch('requests.get', mock_requests.get):
+        with mock.patch('jormungandr.http_client.get', mock_requests.get):
             response = self.query("/v1/places/bob")
 
             is_valid_global_autocomplete(response, depth=1)
@@ -1425,7 +1425,7 @@ class TestBragiShape(AbstractTestFixture):
             url: (BRAGI_MOCK_RESPONSE, 200)
         })
 
-        with mock.patch('requests.get', mock_requests.get):
+        with mock.patch('jormungandr.http_client.get', mock_requests.get):
             response = self.query("/v1/coverage/{pt_dataset}/coords/{lon};{lat}?_autocomplete=bragi".format(
                 lon=params.get('lon'), lat=params.get('lat'), pt_dataset=params.get('pt_dataset')))
 
@@ -1471,7 +1471,7 @@ class AbstractAutocompleteAndRouting():
             assert len(r) == 1
             return r[0]['id']
 
-        with mock.patch('requests.get', mock_requests.get):
+        with mock.patch('jormungandr.http_client.get', mock_requests.get):
             journeys_from = get_autocomplete('places?q=bobette')
             journeys_to = get_autocomplete('places?q=20 rue bob')
             query = 'journeys?from={f}&to={to}&datetime={dt}'.format(f=journeys_from, to=journeys_to, dt="20120614T080000")
@@ -1516,7 +1516,7 @@ class AbstractAutocompleteAndRouting():
             url: (BRAGI_MOCK_RESPONSE, 200)
         })
 
-        with mock.patch('requests.get', mock_requests.get):
+        with mock.patch('jormungandr.http_client.get', mock_requests.get):
             response = self.query("/v1/coverage/{pt_dataset}/coords/{lon};{lat}".
                                   format(lon=params.get('lon'), lat=params.get('lat'),
                                          pt_dataset=params.get('pt_dataset')))
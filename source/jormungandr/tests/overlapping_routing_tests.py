@@ -120,6 +120,35 @@ class TestOverlappingCoverage(AbstractTestFixture):
         assert 'regions_called' in response['debug']
         assert response['debug']['regions_called'] == ['empty_routing_test', 'main_routing_test']
 
+    def test_journeys_parallel_dispatch(self):
+        """
+        same as test_journeys, but both regions are called at the same time
+
+        the empty region has the priority, but after having returned no journey,
+        the journeys of the real region should be given
+        """
+        query = "/v1/{q}&_parallel_regions_dispatch=true&debug=true".format(q=journey_basic_query)
+        response = self.query(query)
+
+        self.is_valid_journey_response(response, query)
+        assert len(response['feed_publishers']) == 1
+        assert response['feed_publishers'][0]['name'] == u'routing api data'
+        assert set(response['debug']['regions_called']) == {"main_routing_test", "empty_routing_test"}
+
+    def test_journeys_on_different_error_parallel_dispatch(self):
+        """
+        the errors of the regions called at the same time are aggregated the same way
+        """
+        response, error_code = self.query_no_assert("v1/{query}&max_duration_to_pt=20&debug=true"
+                                                    "&_parallel_regions_dispatch=true".
+                                                    format(query=journey_basic_query), display=False)
+
+        assert error_code == 200
+        assert response['error']['id'] == 'no_solution'
+        assert response['error']['message'] == 'No journey found'
+        assert response['debug']['errors_by_region']['empty_routing_test'] == 'no origin point nor destination point'
+        assert response['debug']['errors_by_region']['main_routing_test'] == 'no destination point'
+
     def test_journeys_no_debug(self):
         """no debug in query, no debug in answer"""
         response = self.query("/v1/{q}".format(q=journey_basic_query), display=False)
@@ -156,6 +156,15 @@ class TestJourneysDistributed(JourneyCommon, DirectPath, JourneyMinBikeMinCar, N
         assert(r['journeys'][0]['sections'][1]['to'] == r['journeys'][0]['sections'][-1]['from'])
 
 
+@config({'scenario': 'distributed',
+         'instance_config': {'zmq_socket_type': 'multiplexed', 'batch_api': True}})
+class TestJourneysDistributedBatchApi(TestJourneysDistributed):
+    """
+    Same tests with the direct paths sent to kraken in batches on a multiplexed socket
+    """
+    pass
+
+
 @config({"scenario": "distributed"})
 class TestDistributedJourneysWithPtref(JourneysWithPtref, NewDefaultScenarioAbstractTestFixture):
     pass
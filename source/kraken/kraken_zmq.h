@@ -39,29 +39,176 @@ www.navitia.io
 #include "type/meta_data.h"
 #include <log4cplus/ndc.h>
 #include "metrics.h"
+#include <cstring>
+#include <string>
+#include <vector>
 
 
-static void respond(zmq::socket_t& socket,
-             const std::string& address,
-             const pbnavitia::Response& response){
-    zmq::message_t reply(response.ByteSize());
+/*
+ * serialize the response in message, on failure an internal error is serialized instead
+ */
+static void serialize(const pbnavitia::Response& response, zmq::message_t& message){
+    message.rebuild(response.ByteSize());
     try{
-        response.SerializeToArray(reply.data(), response.ByteSize());
+        response.SerializeToArray(message.data(), response.ByteSize());
     }catch(const google::protobuf::FatalException& e){
         auto logger = log4cplus::Logger::getInstance("worker");
         LOG4CPLUS_ERROR(logger, "failure during serialization: " << e.what());
         pbnavitia::Response error_response;
         error_response.mutable_error()->set_id(pbnavitia::Error::internal_error);
         error_response.mutable_error()->set_message(e.what());
-        reply.rebuild(error_response.ByteSize());
-        error_response.SerializeToArray(reply.data(), error_response.ByteSize());
+        message.rebuild(error_response.ByteSize());
+        error_response.SerializeToArray(message.data(), error_response.ByteSize());
     }
+}
+
+static void respond(zmq::socket_t& socket,
+             const std::string& address,
+             zmq::message_t& reply){
     z_send(socket, address, ZMQ_SNDMORE);
     z_send(socket, "", ZMQ_SNDMORE);
     socket.send(reply);
 }
 
+static void respond(zmq::socket_t& socket,
+             const std::string& address,
+             const pbnavitia::Response& response){
+    zmq::message_t reply;
+    serialize(response, reply);
+    respond(socket, address, reply);
+}
+
+/*
+ * jormungandr can send several requests in one message (see jormungandr/multiplexed_socket.py).
+ * The message starts with BATCH_MARKER (a protobuf never starts with a null byte), then:
+ *  - the number of parts, and for each part its size and its content
+ *  - the number of requests, and for each request the number of its parts and their indexes
+ * A request is the concatenation of its parts, parsing it is the same as merging the parts,
+ * so the parts shared by several requests are only sent once.
+ * The response is BATCH_MARKER, the number of responses, and for each response its size and its content.
+ * All the integers are big endian uint32.
+ */
+static const std::string BATCH_MARKER("\0batch", 6);
+
+static bool is_batch(const zmq::message_t& message){
+    return message.size() >= BATCH_MARKER.size()
+        && BATCH_MARKER.compare(0, BATCH_MARKER.size(),
+                                static_cast<const char*>(message.data()), BATCH_MARKER.size()) == 0;
+}
+
+static bool read_uint32(const char* data, size_t size, size_t& pos, uint32_t& value){
+    if(pos + 4 > size){
+        return false;
+    }
+    const auto* bytes = reinterpret_cast<const unsigned char*>(data + pos);
+    value = (uint32_t(bytes[0]) << 24) | (uint32_t(bytes[1]) << 16) | (uint32_t(bytes[2]) << 8) | uint32_t(bytes[3]);
+    pos += 4;
+    return true;
+}
+
+static void write_uint32(std::string& out, uint32_t value){
+    out.push_back(static_cast<char>((value >> 24) & 0xff));
+    out.push_back(static_cast<char>((value >> 16) & 0xff));
+    out.push_back(static_cast<char>((value >> 8) & 0xff));
+    out.push_back(static_cast<char>(value & 0xff));
+}
+
+static bool unpack_batch(const zmq::message_t& message, std::vector<std::string>& requests){
+    const char* data = static_cast<const char*>(message.data());
+    const size_t size = message.size();
+    size_t pos = BATCH_MARKER.size();
+    uint32_t nb_parts = 0;
+    if(!read_uint32(data, size, pos, nb_parts)){
+        return false;
+    }
+    std::vector<std::pair<size_t, uint32_t>> parts; // offset and size of each part
+    for(uint32_t i = 0; i < nb_parts; ++i){
+        uint32_t part_size = 0;
+        if(!read_uint32(data, size, pos, part_size) || pos + part_size > size){
+            return false;
+        }
+        parts.emplace_back(pos, part_size);
+        pos += part_size;
+    }
+    uint32_t nb_requests = 0;
+    if(!read_uint32(data, size, pos, nb_requests)){
+        return false;
+    }
+    for(uint32_t i = 0; i < nb_requests; ++i){
+        uint32_t nb_indexes = 0;
+        if(!read_uint32(data, size, pos, nb_indexes)){
+            return false;
+        }
+        std::string request;
+        for(uint32_t j = 0; j < nb_indexes; ++j){
+            uint32_t index = 0;
+            if(!read_uint32(data, size, pos, index) || index >= parts.size()){
+                return false;
+            }
+            request.append(data + parts[index].first, parts[index].second);
+        }
+        requests.push_back(std::move(request));
+    }
+    return pos == size;
+}
+
 namespace pt = boost::posix_time;
+
+/*
+ * handle one request, the returned response is either the worker's or error_response
+ */
+static const pbnavitia::Response& handle_request(navitia::Worker& w,
+                                                 const char* request,
+                                                 size_t size,
+                                                 DataManager<navitia::type::Data>& data_manager,
+                                                 const navitia::Metrics& metrics,
+                                                 const pt::time_duration& slow_request_duration,
+                                                 pbnavitia::Response& error_response){
+    auto logger = log4cplus::Logger::getInstance("worker");
+    pbnavitia::Request pb_req;
+    pt::ptime start = pt::microsec_clock::universal_time();
+    pbnavitia::API api = pbnavitia::UNKNOWN_API;
+    if(!pb_req.ParseFromArray(request, size)){
+        LOG4CPLUS_WARN(logger, "receive invalid protobuf");
+        auto* error = error_response.mutable_error();
+        error->set_id(pbnavitia::Error::invalid_protobuf_request);
+        error->set_message("receive invalid protobuf");
+        return error_response;
+    }
+    api = pb_req.requested_api();
+    log4cplus::NDCContextCreator ndc(pb_req.request_id());
+    if(api != pbnavitia::METADATAS){
+        LOG4CPLUS_DEBUG(logger, "receive request: " << pb_req.DebugString());
+    }
+    const auto data = data_manager.get_data();
+    try {
+        w.dispatch(pb_req, *data);
+        if(api != pbnavitia::METADATAS){
+            LOG4CPLUS_TRACE(logger, "response: " << w.pb_creator.get_response().DebugString());
+        }
+    } catch (const navitia::recoverable_exception& e) {
+        //on a recoverable an internal server error is returned
+        LOG4CPLUS_ERROR(logger, "internal server error: " << e.what());
+        LOG4CPLUS_ERROR(logger, "on query: " << pb_req.DebugString());
+        LOG4CPLUS_ERROR(logger, "backtrace: " << e.backtrace());
+        w.pb_creator.fill_pb_error(pbnavitia::Error::internal_error, e.what());
+    }
+    if (! data->loaded){
+        w.pb_creator.set_publication_date(boost::gregorian::not_a_date_time);
+    } else {
+        w.pb_creator.set_publication_date(data->meta->publication_date);
+    }
+    auto duration = pt::microsec_clock::universal_time() - start;
+    metrics.observe_api(api, duration.total_milliseconds()/1000.0);
+    if(duration >= slow_request_duration){
+        LOG4CPLUS_WARN(logger, "slow request! duration: " << duration.total_milliseconds()
+                            << "ms request: " << pb_req.DebugString());
+    }else if(api != pbnavitia::METADATAS){
+        LOG4CPLUS_DEBUG(logger, "processing time : " << duration.total_milliseconds());
+    }
+    return w.pb_creator.get_response();
+}
+
 inline void doWork(zmq::context_t& context,
                    DataManager<navitia::type::Data>& data_manager,
                    navitia::kraken::Configuration conf,
@@ -91,49 +238,39 @@ inline void doWork(zmq::context_t& context,
             continue;
         }
 
-        pbnavitia::Request pb_req;
-        pt::ptime start = pt::microsec_clock::universal_time();
-        pbnavitia::API api = pbnavitia::UNKNOWN_API;
-        if(!pb_req.ParseFromArray(request.data(), request.size())){
-            LOG4CPLUS_WARN(logger, "receive invalid protobuf");
+        if(!is_batch(request)){
+            pbnavitia::Response error_response;
+            const auto& response = handle_request(w, static_cast<const char*>(request.data()), request.size(),
+                                                  data_manager, metrics, slow_request_duration, error_response);
+            respond(socket, address, response);
+            continue;
+        }
+
+        std::vector<std::string> requests;
+        if(!unpack_batch(request, requests)){
+            LOG4CPLUS_WARN(logger, "receive invalid batch");
             pbnavitia::Response response;
             auto* error = response.mutable_error();
             error->set_id(pbnavitia::Error::invalid_protobuf_request);
-            error->set_message("receive invalid protobuf");
+            error->set_message("receive invalid batch");
             respond(socket, address, response);
             continue;
         }
-        api = pb_req.requested_api();
-        log4cplus::NDCContextCreator ndc(pb_req.request_id());
-        if(api != pbnavitia::METADATAS){
-            LOG4CPLUS_DEBUG(logger, "receive request: " << pb_req.DebugString());
-        }
-        const auto data = data_manager.get_data();
-        try {
-            w.dispatch(pb_req, *data);
-            if(api != pbnavitia::METADATAS){
-                LOG4CPLUS_TRACE(logger, "response: " << w.pb_creator.get_response().DebugString());
-            }
-        } catch (const navitia::recoverable_exception& e) {
-            //on a recoverable an internal server error is returned
-            LOG4CPLUS_ERROR(logger, "internal server error: " << e.what());
-            LOG4CPLUS_ERROR(logger, "on query: " << pb_req.DebugString());
-            LOG4CPLUS_ERROR(logger, "backtrace: " << e.backtrace());
-            w.pb_creator.fill_pb_error(pbnavitia::Error::internal_error, e.what());
-        }
-        if (! data->loaded){
-            w.pb_creator.set_publication_date(boost::gregorian::not_a_date_time);
-        } else {
-            w.pb_creator.set_publication_date(data->meta->publication_date);
-        }
-        respond(socket, address, w.pb_creator.get_response());
-        auto duration = pt::microsec_clock::universal_time() - start;
-        metrics.observe_api(api, duration.total_milliseconds()/1000.0);
-        if(duration >= slow_request_duration){
-            LOG4CPLUS_WARN(logger, "slow request! duration: " << duration.total_milliseconds()
-                                << "ms request: " << pb_req.DebugString());
-        }else if(api != pbnavitia::METADATAS){
-            LOG4CPLUS_DEBUG(logger, "processing time : " << duration.total_milliseconds());
+        // the sub-requests are handled one after the other by this worker, so only cheap requests
+        // (like the direct paths) should be sent in batches
+        std::string batch_reply = BATCH_MARKER;
+        write_uint32(batch_reply, requests.size());
+        for(const auto& sub_request: requests){
+            pbnavitia::Response error_response;
+            const auto& response = handle_request(w, sub_request.data(), sub_request.size(),
+                                                  data_manager, metrics, slow_request_duration, error_response);
+            zmq::message_t sub_reply;
+            serialize(response, sub_reply);
+            write_uint32(batch_reply, sub_reply.size());
+            batch_reply.append(static_cast<const char*>(sub_reply.data()), sub_reply.size());
         }
+        zmq::message_t reply(batch_reply.size());
+        memcpy(reply.data(), batch_reply.data(), batch_reply.size());
+        respond(socket, address, reply);
     }
 }
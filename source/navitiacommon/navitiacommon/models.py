@@ -403,6 +403,25 @@ class Instance(db.Model):
             result += data_sets
         return result
 
+    def last_ed_imported_datasets(self):
+        """
+        return the last dataset of each family type imported in ed for this instance
+        """
+        family_types = db.session.query(func.distinct(DataSet.family_type)) \
+            .filter(DataSet.job_id == Job.id, Job.instance_id == self.id, DataSet.ed_imported_at.isnot(None)) \
+            .all()
+
+        result = []
+        for family_type, in family_types:
+            result += db.session.query(DataSet) \
+                .join(Job) \
+                .filter(Job.instance_id == self.id, DataSet.family_type == family_type,
+                        DataSet.ed_imported_at.isnot(None)) \
+                .order_by(DataSet.ed_imported_at.desc()) \
+                .limit(1) \
+                .all()
+        return result
+
     @classmethod
     def query_existing(cls):
         return cls.query.filter_by(discarded=False)
@@ -608,9 +627,21 @@ class Metric(db.Model):
                              name='metric_type'), nullable=False)
     dataset_id = db.Column(db.Integer, db.ForeignKey('data_set.id'), nullable=True)
     duration = db.Column(INTERVAL)
+    # the task has not been run since its dataset had not changed, the duration is the one of its last run
+    skipped = db.Column(db.Boolean, nullable=False, default=False)
 
     dataset = db.relationship('DataSet', lazy='joined')
 
+    @classmethod
+    def last_duration(cls, instance_id, task_type):
+        """
+        return the duration of the last run of a task for an instance (the skipped ones are not considered)
+        """
+        metric = cls.query.join(Job)\
+            .filter(Job.instance_id == instance_id, cls.type == task_type, cls.skipped == false())\
+            .order_by(Job.created_at.desc())\
+            .first()
+        return metric.duration if metric else None
 
     def __repr__(self):
         return '<Metric {}>'.format(self.id)
@@ -621,6 +652,10 @@ class DataSet(db.Model):
     type = db.Column(db.Text, nullable=False)
     family_type = db.Column(db.Text, nullable=False)
     name = db.Column(db.Text, nullable=False)
+    # hash of the content of the dataset, to know if it has changed since the last import
+    fingerprint = db.Column(db.Text, nullable=True)
+    # when the dataset has been imported in ed, None if it has not been (its import failed or it was skipped)
+    ed_imported_at = db.Column(db.DateTime(), nullable=True)
 
     uid = db.Column(UUID, unique=True)
 
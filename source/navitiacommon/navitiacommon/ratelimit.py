@@ -33,7 +33,32 @@ import logging
 import math
 import redis
 import time
-from builtins import zip
+
+PING_OK = 0
+PING_BLOCKED = 1
+PING_LIMITED = 2
+
+# KEYS: the log of the requests, the manual block
+# ARGV: the timestamp, the ttl of the log, the max number of requests,
+#       then the (requests, seconds) of the conditions sorted by requests
+# return {PING_OK}, {PING_BLOCKED, ttl of the block}
+#     or {PING_LIMITED, index of the condition (0 indexed), boundry timestamp}
+PING_SCRIPT = """
+if redis.call('exists', KEYS[2]) == 1 then
+    return {%(blocked)d, redis.call('ttl', KEYS[2])}
+end
+local timestamp = tonumber(ARGV[1])
+for i = 4, #ARGV, 2 do
+    local boundry_timestamp = redis.call('lindex', KEYS[1], tonumber(ARGV[i]) - 1)
+    if boundry_timestamp and tonumber(boundry_timestamp) + tonumber(ARGV[i + 1]) > timestamp then
+        return {%(limited)d, (i - 4) / 2, boundry_timestamp}
+    end
+end
+redis.call('lpush', KEYS[1], ARGV[1])
+redis.call('ltrim', KEYS[1], 0, tonumber(ARGV[3]) - 1)
+redis.call('expire', KEYS[1], ARGV[2])
+return {%(ok)d}
+""" % {'ok': PING_OK, 'blocked': PING_BLOCKED, 'limited': PING_LIMITED}
 
 class RateLimiter(object):
     """
@@ -61,6 +86,9 @@ class RateLimiter(object):
         """
 
         self.redis = redis.Redis(host=redis_host, port=redis_port, db=redis_db, password=redis_password)
+        # the script is sent by its sha, it is loaded in redis on the first call
+        # (not here: the limiter can be created while redis is unavailable)
+        self._ping_script = None
         self.log = logging.getLogger('RateLimiter')
         self.namespace = redis_namespace
         self.conditions = []
@@ -183,51 +211,32 @@ class RateLimiter(object):
             self.log.warn('(%s) hit block all limit (%s/%s)', key, min_requests, min_request_seconds)
             return False, min_request_seconds
 
-
         log_key = ':'.join((self.namespace, key, 'log'))
         block_key = ':'.join((self.namespace, key, 'block'))
-        lock_key = ':'.join((self.namespace, key, 'lock'))
-
-        with self.redis.lock(lock_key, timeout=10):
-
-            with self.redis.pipeline() as pipe:
-                for requests, _ in self.conditions:
-                    pipe.lindex(log_key, requests-1) # subtract 1 as 0 indexed
-
-                # check manual block keys
-                pipe.ttl(block_key)
-                pipe.get(block_key)
-                boundry_timestamps = pipe.execute()
-
-            blocked = boundry_timestamps.pop()
-            block_ttl = boundry_timestamps.pop()
-
-            if blocked is not None:
-                # block_ttl is None for last second of a keys life. set min of 0.5
-                if block_ttl is None:
-                    block_ttl = 0.5
-                self.log.warn('(%s) hit manual block. %ss remaining', key, block_ttl)
-                return False, block_ttl
-
-            timestamp = time.time()
-
-            for boundry_timestamp, (requests, seconds) in zip(boundry_timestamps, self.conditions):
-                # if we dont yet have n number of requests boundry_timestamp will be None and this condition wont be limiting
-                if boundry_timestamp is not None:
-                    boundry_timestamp = float(boundry_timestamp)
-                    if boundry_timestamp + seconds > timestamp:
-                        self.log.warn('(%s) hit limit (%s/%s) time to allow %.1fs',
-                                key, requests, seconds, boundry_timestamp + seconds - timestamp)
-                        return False, boundry_timestamp + seconds - timestamp
-
-            # record our success
-            with self.redis.pipeline() as pipe:
-                pipe.lpush(log_key, timestamp)
-                max_requests, _ = self.conditions[-1]
-                pipe.ltrim(log_key, 0, max_requests-1) # 0 indexed so subtract 1
-                # if we never use this key again, let it fall out of the DB after max seconds has past
-                pipe.expire(log_key, self.list_ttl)
-                pipe.execute()
+
+        # the check of the conditions and the record of the request are done atomically by redis,
+        # in only one round trip, so there is no need for a distributed lock
+        timestamp = time.time()
+        args = [repr(timestamp), self.list_ttl, self.conditions[-1][0]]
+        for requests, seconds in self.conditions:
+            args.extend((requests, seconds))
+        if self._ping_script is None:
+            self._ping_script = self.redis.register_script(PING_SCRIPT)
+        result = self._ping_script(keys=[log_key, block_key], args=args)
+
+        if int(result[0]) == PING_BLOCKED:
+            block_ttl = int(result[1])
+            # block_ttl is negative for last second of a keys life. set min of 0.5
+            if block_ttl < 0:
+                block_ttl = 0.5
+            self.log.warn('(%s) hit manual block. %ss remaining', key, block_ttl)
+            return False, block_ttl
+
+        if int(result[0]) == PING_LIMITED:
+            requests, seconds = self.conditions[int(result[1])]
+            wait = float(result[2]) + seconds - timestamp
+            self.log.warn('(%s) hit limit (%s/%s) time to allow %.1fs', key, requests, seconds, wait)
+            return False, wait
 
         return True, 0.0
 
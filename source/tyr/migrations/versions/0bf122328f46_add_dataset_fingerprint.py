@@ -0,0 +1,24 @@
+"""Add a fingerprint on the datasets and a skipped flag on the metrics
+
+Revision ID: 0bf122328f46
+Revises: 4cd2ff722a7c
+Create Date: 2018-06-04 10:12:43.512034
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '0bf122328f46'
+down_revision = '4cd2ff722a7c'
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade():
+    op.add_column('data_set', sa.Column('fingerprint', sa.Text(), nullable=True))
+    op.add_column('metric', sa.Column('skipped', sa.Boolean(), server_default='false', nullable=False))
+
+
+def downgrade():
+    op.drop_column('metric', 'skipped')
+    op.drop_column('data_set', 'fingerprint')
@@ -0,0 +1,22 @@
+"""Record when the datasets are imported in ed
+
+Revision ID: 5b1f9e2c7a3d
+Revises: 0bf122328f46
+Create Date: 2018-06-11 14:27:05.218342
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '5b1f9e2c7a3d'
+down_revision = '0bf122328f46'
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade():
+    op.add_column('data_set', sa.Column('ed_imported_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('data_set', 'ed_imported_at')
@@ -0,0 +1,268 @@
+from __future__ import absolute_import, print_function, unicode_literals, division
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import timedelta
+import json
+import mock
+import pytest
+from celery.exceptions import Retry
+from navitiacommon import models
+from tyr import app, tasks
+from tyr.binarisation_scheduler import estimate_build, pack_builds, free_memory, start_next_build, \
+    release_memory, launch_plan, PlanInProgress, SLOT_KEY, RESERVATIONS_KEY, INSTANCE_LOCK
+
+
+class FakeRedis(object):
+    """
+    the lists, hashes and strings of redis used by the scheduler
+    """
+    def __init__(self):
+        self.lists = defaultdict(list)
+        self.hashes = defaultdict(dict)
+        self.strings = {}
+
+    @contextmanager
+    def lock(self, name, timeout=None):
+        yield
+
+    def rpush(self, key, value):
+        self.lists[key].append(value)
+
+    def lindex(self, key, index):
+        values = self.lists[key]
+        return values[index] if index < len(values) else None
+
+    def lpop(self, key):
+        return self.lists[key].pop(0) if self.lists[key] else None
+
+    def llen(self, key):
+        return len(self.lists[key])
+
+    def hset(self, key, field, value):
+        self.hashes[key][str(field)] = value
+
+    def hdel(self, key, *fields):
+        for field in fields:
+            self.hashes[key].pop(str(field), None)
+
+    def hgetall(self, key):
+        return dict(self.hashes[key])
+
+    def set(self, key, value):
+        self.strings[key] = value
+
+    def get(self, key):
+        return self.strings.get(key)
+
+    def exists(self, key):
+        return key in self.strings
+
+
+@pytest.fixture
+def fake_redis():
+    fake = FakeRedis()
+    with mock.patch('tyr.binarisation_scheduler.redis', fake):
+        yield fake
+
+
+def queue_build(fake_redis, host, slot, name, memory, job_id):
+    fake_redis.rpush(SLOT_KEY.format(host=host, slot=slot),
+                     json.dumps(dict(build(name, 100, memory), job_id=job_id)))
+
+
+def reserved_memory(fake_redis, host):
+    return {job_id: json.loads(r)['memory'] for job_id, r in fake_redis.hgetall(RESERVATIONS_KEY.format(host=host))
+            .items()}
+
+
+def create_job(name, state):
+    instance = models.Instance(name)
+    job = models.Job()
+    job.instance = instance
+    job.state = state
+    models.db.session.add(instance)
+    models.db.session.add(job)
+    models.db.session.commit()
+    return job.id
+
+
+def build(name, duration, memory):
+    return {'instance': name, 'instance_id': 0, 'duration': duration, 'memory': memory}
+
+
+def test_pack_builds_longest_first():
+    hosts = {'host_a': {'cpu': 2, 'memory': 8000}}
+    builds = [build('short', 100, 1000), build('long', 1000, 1000), build('medium', 500, 1000)]
+
+    planned = {b['instance']: b for b in pack_builds(builds, hosts)}
+
+    assert (planned['long']['start'], planned['long']['end']) == (0, 1000)
+    assert (planned['medium']['start'], planned['medium']['end']) == (0, 500)
+    # the short one waits for the first free slot
+    assert (planned['short']['start'], planned['short']['end']) == (500, 600)
+    assert planned['short']['slot'] == planned['medium']['slot']
+
+
+def test_pack_builds_memory_budget():
+    hosts = {'host_a': {'cpu': 4, 'memory': 4000}, 'host_b': {'cpu': 1, 'memory': 16000}}
+    builds = [build('big', 1000, 10000), build('a', 800, 3000), build('b', 600, 3000), build('huge', 200, 50000)]
+
+    planned = {b['instance']: b for b in pack_builds(builds, hosts)}
+
+    assert planned['big']['host'] == 'host_b'
+    # a and b can't run at the same time on host_a
+    assert planned['a']['host'] == planned['b']['host'] == 'host_a'
+    assert planned['b']['start'] == planned['a']['end']
+    # a build bigger than all the hosts is run alone on the biggest one
+    assert planned['huge']['host'] == 'host_b'
+    assert planned['huge']['start'] == planned['big']['end']
+
+
+def test_pack_builds_no_host():
+    with pytest.raises(ValueError):
+        pack_builds([build('a', 100, 100)], {})
+
+
+def test_free_memory():
+    reservations = {
+        '1': json.dumps({'memory': 3000, 'expire_at': 200}),
+        '2': json.dumps({'memory': 2000, 'expire_at': 200}),
+        # the build of this job never ended
+        '3': json.dumps({'memory': 8000, 'expire_at': 50}),
+    }
+
+    assert free_memory(reservations, 8000, 100) == (3000, ['3'])
+    assert free_memory({}, 8000, 100) == (8000, [])
+    # all the reservations have expired
+    assert free_memory(reservations, 8000, 300)[0] == 8000
+
+
+def test_estimate_build():
+    with app.app_context():
+        instance = models.Instance('fr')
+        models.db.session.add(instance)
+        models.db.session.commit()
+
+        estimate = estimate_build(instance)
+        assert estimate['duration'] == app.config['BINARISATION_DEFAULT_DURATION']
+        assert estimate['memory'] == app.config['BINARISATION_MIN_MEMORY']
+
+        job = models.Job()
+        job.instance = instance
+        job.state = 'done'
+        metric = models.Metric()
+        metric.type = 'ed2nav'
+        metric.duration = timedelta(minutes=42)
+        job.metrics.append(metric)
+        models.db.session.add(job)
+        models.db.session.commit()
+
+        assert estimate_build(instance)['duration'] == 42 * 60
+
+
+def test_start_next_build_memory_budget(fake_redis):
+    with app.app_context():
+        queue_build(fake_redis, 'host_a', 0, 'a', 5000, 1)
+        queue_build(fake_redis, 'host_a', 1, 'b', 5000, 2)
+        # bigger than the host, it can only run alone
+        queue_build(fake_redis, 'host_a', 1, 'huge', 20000, 3)
+
+        started_build, started = start_next_build('host_a', 0, 8000)
+        assert started and started_build['instance'] == 'a'
+        assert reserved_memory(fake_redis, 'host_a') == {'1': 5000}
+        assert start_next_build('host_a', 0, 8000) == (None, False)
+
+        # not enough free memory, the build stays in the queue of its slot
+        waiting_build, started = start_next_build('host_a', 1, 8000)
+        assert not started and waiting_build['instance'] == 'b'
+        assert fake_redis.llen(SLOT_KEY.format(host='host_a', slot=1)) == 2
+
+        release_memory('host_a', 1)
+        assert start_next_build('host_a', 1, 8000)[1]
+        assert not start_next_build('host_a', 1, 8000)[1]
+        release_memory('host_a', 2)
+        assert start_next_build('host_a', 1, 8000)[1]
+        assert reserved_memory(fake_redis, 'host_a') == {'3': 8000}
+
+
+def test_start_next_build_instance_locked(fake_redis):
+    with app.app_context():
+        queue_build(fake_redis, 'host_a', 0, 'a', 1000, 1)
+        fake_redis.set(INSTANCE_LOCK.format(instance='a'), 'token')
+
+        # the build doesn't hold any memory while its instance is locked
+        assert start_next_build('host_a', 0, 8000)[1] is False
+        assert reserved_memory(fake_redis, 'host_a') == {}
+
+        fake_redis.strings.clear()
+        assert start_next_build('host_a', 0, 8000)[1]
+
+
+def test_dispatch_build(fake_redis):
+    with app.app_context():
+        queue_build(fake_redis, 'host_a', 0, 'a', 5000, 1)
+        queue_build(fake_redis, 'host_a', 1, 'b', 5000, 2)
+
+        with mock.patch('tyr.tasks.chain') as chain, mock.patch('tyr.tasks.load_instance_config'):
+            tasks.dispatch_build('host_a', 0, 8000)
+            assert chain.return_value.delay.call_count == 1
+            build_task = chain.call_args[0][0]
+            assert build_task.task == tasks.planned_ed2nav.name
+            assert build_task.options['queue'] == 'host_a'
+
+            # the build of the other slot waits for the end of the first one
+            with mock.patch.object(tasks.dispatch_build, 'retry', side_effect=Retry):
+                with pytest.raises(Retry):
+                    tasks.dispatch_build('host_a', 1, 8000)
+            assert chain.return_value.delay.call_count == 1
+
+            # nothing left on the slot
+            tasks.dispatch_build('host_a', 0, 8000)
+            assert chain.return_value.delay.call_count == 1
+
+
+def test_end_build(fake_redis):
+    with app.app_context():
+        done_job = create_job('fr', 'done')
+        failed_job = create_job('be', 'running')
+        fake_redis.hset(RESERVATIONS_KEY.format(host='host_a'), done_job,
+                        json.dumps({'memory': 1000, 'expire_at': 1e12}))
+        fake_redis.hset(RESERVATIONS_KEY.format(host='host_a'), failed_job,
+                        json.dumps({'memory': 1000, 'expire_at': 1e12}))
+
+        with mock.patch('tyr.tasks.dispatch_build') as dispatch_build:
+            tasks.end_build('host_a', 0, 8000, done_job)
+            tasks.end_build('host_a', 1, 8000, failed_job)
+
+            assert reserved_memory(fake_redis, 'host_a') == {}
+            assert dispatch_build.delay.call_args_list == [mock.call('host_a', 0, 8000),
+                                                           mock.call('host_a', 1, 8000)]
+        assert models.Job.query.get(done_job).state == 'done'
+        # the job of a build that has failed without marking it
+        assert models.Job.query.get(failed_job).state == 'failed'
+
+
+def test_launch_plan_refused_while_running(fake_redis):
+    hosts = {'host_a': {'cpu': 2, 'memory': 8000}}
+    with app.app_context():
+        instance = models.Instance('fr')
+        models.db.session.add(instance)
+        models.db.session.commit()
+
+        with mock.patch('tyr.tasks.dispatch_build') as dispatch_build:
+            plan = launch_plan([instance], hosts)
+            assert len(plan['builds']) == 1
+            assert dispatch_build.delay.call_count == 1
+
+            # the build is still queued
+            with pytest.raises(PlanInProgress):
+                launch_plan([instance], hosts)
+
+            # the build is running
+            start_next_build('host_a', 0, 8000)
+            with pytest.raises(PlanInProgress):
+                launch_plan([instance], hosts)
+
+            release_memory('host_a', plan['builds'][0]['job_id'])
+            launch_plan([instance], hosts)
+            assert dispatch_build.delay.call_count == 2
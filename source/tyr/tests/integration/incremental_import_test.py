@@ -0,0 +1,153 @@
+from __future__ import absolute_import, print_function, unicode_literals, division
+from datetime import datetime, timedelta
+import pytest
+from navitiacommon import models
+from tyr import app
+from tyr.binarisation import record_skipped_metric
+from tyr.helper import get_fingerprint
+from tyr.tasks import get_unchanged_datasets
+
+
+def make_dataset(dataset_type, family_type, fingerprint, ed_imported_at=None):
+    dataset = models.DataSet()
+    dataset.type = dataset_type
+    dataset.family_type = family_type
+    dataset.name = '/path/to/{}'.format(dataset_type)
+    dataset.fingerprint = fingerprint
+    dataset.ed_imported_at = ed_imported_at
+    return dataset
+
+
+def add_job(instance, state, datasets):
+    job = models.Job()
+    job.instance = instance
+    for dataset in datasets:
+        models.db.session.add(dataset)
+        job.data_sets.append(dataset)
+    job.state = state
+    models.db.session.add(job)
+    models.db.session.commit()
+    return job
+
+
+@pytest.fixture
+def loaded_instance():
+    """
+    an instance with a fusio, an osm and a poi dataset imported in ed (in this order), the fusio2ed having
+    taken 10 minutes
+    """
+    with app.app_context():
+        instance = models.Instance('fr')
+        models.db.session.add(instance)
+
+        job = models.Job()
+        job.instance = instance
+        for dataset in (make_dataset('fusio', 'pt', 'pt_hash', datetime(2018, 6, 1, 10)),
+                        make_dataset('osm', 'streetnetwork', 'osm_hash', datetime(2018, 6, 1, 11)),
+                        make_dataset('poi', 'poi', 'poi_hash', datetime(2018, 6, 1, 12))):
+            models.db.session.add(dataset)
+            job.data_sets.append(dataset)
+        metric = models.Metric()
+        metric.type = 'fusio2ed'
+        metric.duration = timedelta(minutes=10)
+        job.metrics.append(metric)
+        job.state = 'done'
+        models.db.session.add(job)
+        models.db.session.commit()
+        return instance.id
+
+
+def test_unchanged_datasets(loaded_instance):
+    with app.app_context():
+        instance = models.Instance.query.get(loaded_instance)
+        fusio = make_dataset('fusio', 'pt', 'pt_hash')
+        osm = make_dataset('osm', 'streetnetwork', 'osm_hash')
+        poi = make_dataset('poi', 'poi', 'poi_hash')
+        last_imported = instance.last_ed_imported_datasets()
+        assert get_unchanged_datasets(last_imported, [fusio, osm, poi]) == [fusio, osm, poi]
+
+        new_poi = make_dataset('poi', 'poi', 'new_poi_hash')
+        assert get_unchanged_datasets(last_imported, [fusio, osm, new_poi]) == [fusio, osm]
+
+
+def test_unchanged_datasets_with_dependent_family(loaded_instance):
+    """
+    the import of the street network overwrites the pois, so they are imported again even if they have not changed
+    """
+    with app.app_context():
+        instance = models.Instance.query.get(loaded_instance)
+        fusio = make_dataset('fusio', 'pt', 'pt_hash')
+        new_osm = make_dataset('osm', 'streetnetwork', 'new_osm_hash')
+        poi = make_dataset('poi', 'poi', 'poi_hash')
+        assert get_unchanged_datasets(instance.last_ed_imported_datasets(), [fusio, new_osm, poi]) == [fusio]
+
+
+def test_unchanged_datasets_compared_to_ed(loaded_instance):
+    """
+    the datasets are compared to the last ones imported in ed, even if the job of the import has failed after it,
+    and not to the datasets of a job whose import in ed has not been done
+    """
+    with app.app_context():
+        instance = models.Instance.query.get(loaded_instance)
+        # the fusio2ed of new_pt_hash succeeded but the ed2nav failed
+        add_job(instance, 'failed', [make_dataset('fusio', 'pt', 'new_pt_hash', datetime(2018, 6, 2, 10))])
+        # the osm2ed of new_osm_hash failed
+        add_job(instance, 'failed', [make_dataset('osm', 'streetnetwork', 'new_osm_hash')])
+        last_imported = instance.last_ed_imported_datasets()
+        assert {(d.family_type, d.fingerprint) for d in last_imported} == \
+            {('pt', 'new_pt_hash'), ('streetnetwork', 'osm_hash'), ('poi', 'poi_hash')}
+
+        # the previous pt data is imported again
+        fusio = make_dataset('fusio', 'pt', 'pt_hash')
+        assert get_unchanged_datasets(last_imported, [fusio]) == []
+        new_fusio = make_dataset('fusio', 'pt', 'new_pt_hash')
+        assert get_unchanged_datasets(last_imported, [new_fusio]) == [new_fusio]
+        new_osm = make_dataset('osm', 'streetnetwork', 'new_osm_hash')
+        assert get_unchanged_datasets(last_imported, [new_osm]) == []
+
+
+def test_unchanged_datasets_overwritten_in_ed(loaded_instance):
+    """
+    the pois imported in ed before the last import of the street network have been overwritten by it
+    """
+    with app.app_context():
+        instance = models.Instance.query.get(loaded_instance)
+        add_job(instance, 'done', [make_dataset('osm', 'streetnetwork', 'osm_hash', datetime(2018, 6, 2, 10))])
+        osm = make_dataset('osm', 'streetnetwork', 'osm_hash')
+        poi = make_dataset('poi', 'poi', 'poi_hash')
+        assert get_unchanged_datasets(instance.last_ed_imported_datasets(), [osm, poi]) == [osm]
+
+
+def test_record_skipped_metric(loaded_instance):
+    with app.app_context():
+        instance = models.Instance.query.get(loaded_instance)
+        job = models.Job()
+        job.instance = instance
+        job.state = 'done'
+        dataset = make_dataset('fusio', 'pt', 'pt_hash')
+        models.db.session.add(dataset)
+        job.data_sets.append(dataset)
+        models.db.session.add(job)
+        models.db.session.commit()
+
+        record_skipped_metric('fusio2ed', job, dataset)
+        # there is no metric for fare2ed, nothing is recorded
+        record_skipped_metric('fare2ed', job, dataset)
+
+        metrics = job.metrics.all()
+        assert len(metrics) == 1
+        assert metrics[0].skipped
+        assert metrics[0].duration == timedelta(minutes=10)
+        # the skipped metrics are not used as the duration of the task
+        assert models.Metric.last_duration(instance.id, 'fusio2ed') == timedelta(minutes=10)
+
+
+def test_fingerprint(tmpdir):
+    tmpdir.join('stops.txt').write('stop_id\n')
+    tmpdir.mkdir('sub').join('routes.txt').write('route_id\n')
+    fingerprint = get_fingerprint(str(tmpdir))
+    assert fingerprint == get_fingerprint(str(tmpdir))
+
+    tmpdir.join('sub', 'routes.txt').write('route_id\nr1\n')
+    assert get_fingerprint(str(tmpdir)) != fingerprint
+    assert get_fingerprint(str(tmpdir.join('stops.txt'))) != fingerprint
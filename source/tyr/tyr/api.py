@@ -89,3 +89,6 @@ def error_handler(exception):
     log exception
     """
     app.logger.exception('')
+
+api.add_resource(resources.BinarisationPlan,
+                 '/v0/binarisation_plan/')
@@ -97,8 +97,12 @@ def make_connection_string(instance_config):
     return connection_string
 
 class Lock(object):
-    def __init__(self, timeout):
+    def __init__(self, timeout, max_retries=10):
+        """
+        :param max_retries: number of times the task is retried while the instance is locked
+        """
         self.timeout = timeout
+        self.max_retries = max_retries
     def __call__(self, func):
         @wraps(func)
         def wrapper(*args, **kwargs):
@@ -116,7 +120,7 @@ class Lock(object):
             if not locked:
                 countdown = 300
                 logger.info('lock on %s retry %s in %s sec', job.instance.name, func.__name__, countdown)
-                task.retry(countdown=countdown, max_retries=10)
+                task.retry(countdown=countdown, max_retries=self.max_retries)
             else:
                 try:
                     logger.debug('lock acquired on %s for %s', job.instance.name, func.__name__)
@@ -147,6 +151,44 @@ def collect_metric(task_type, job, dataset_uid):
         logger = logging.getLogger(__name__)
         logger.exception('unable to persist Metrics data: ')
 
+def record_skipped_metric(task_type, job, dataset):
+    """
+    record that a task has not been run for the dataset (it has not changed since its last import)
+
+    the duration is the one of the last run of the task, it's the time saved by the skip
+    """
+    logger = logging.getLogger(__name__)
+    if task_type not in models.Metric.__table__.c.type.type.enums:
+        logger.debug('no metric for {}'.format(task_type))
+        return
+    try:
+        metric = models.Metric()
+        metric.job = job
+        metric.dataset = dataset
+        metric.type = task_type
+        metric.skipped = True
+        metric.duration = models.Metric.last_duration(job.instance_id, task_type)
+        models.db.session.add(metric)
+        models.db.session.commit()
+    except:
+        logger.exception('unable to persist Metrics data: ')
+
+def record_ed_import(dataset_uid):
+    """
+    record that the dataset has been imported in ed
+
+    the last dataset imported in ed of a family is the one the next datasets are compared to, to know if they
+    have changed
+    """
+    try:
+        dataset = models.DataSet.find_by_uid(dataset_uid)
+        if dataset:
+            dataset.ed_imported_at = datetime.datetime.utcnow()
+            models.db.session.commit()
+    except:
+        logger = logging.getLogger(__name__)
+        logger.exception('unable to record the import in ed of the dataset {}: '.format(dataset_uid))
+
 @celery.task(bind=True)
 @Lock(timeout=30*60)
 def fusio2ed(self, instance_config, filename, job_id, dataset_uid):
@@ -176,6 +218,7 @@ def fusio2ed(self, instance_config, filename, job_id, dataset_uid):
             res = launch_exec("fusio2ed", params, logger)
         if res != 0:
             raise ValueError('fusio2ed failed')
+        record_ed_import(dataset_uid)
     except:
         logger.exception('')
         job.state = 'failed'
@@ -212,6 +255,7 @@ def gtfs2ed(self, instance_config, gtfs_filename, job_id, dataset_uid):
             res = launch_exec("gtfs2ed", params, logger)
         if res != 0:
             raise ValueError('gtfs2ed failed')
+        record_ed_import(dataset_uid)
     except:
         logger.exception('')
         job.state = 'failed'
@@ -249,6 +293,7 @@ def osm2ed(self, instance_config, osm_filename, job_id, dataset_uid):
         if res != 0:
             #@TODO: exception
             raise ValueError('osm2ed failed')
+        record_ed_import(dataset_uid)
     except:
         logger.exception('')
         job.state = 'failed'
@@ -275,6 +320,7 @@ def geopal2ed(self, instance_config, filename, job_id, dataset_uid):
         if res != 0:
             #@TODO: exception
             raise ValueError('geopal2ed failed')
+        record_ed_import(dataset_uid)
     except:
         logger.exception('')
         job.state = 'failed'
@@ -301,6 +347,7 @@ def poi2ed(self, instance_config, filename, job_id, dataset_uid):
         if res != 0:
             #@TODO: exception
             raise ValueError('poi2ed failed')
+        record_ed_import(dataset_uid)
     except:
         logger.exception('')
         job.state = 'failed'
@@ -326,6 +373,7 @@ def synonym2ed(self, instance_config, filename, job_id, dataset_uid):
         if res != 0:
             #@TODO: exception
             raise ValueError('synonym2ed failed')
+        record_ed_import(dataset_uid)
     except:
         logger.exception('')
         job.state = 'failed'
@@ -419,6 +467,7 @@ def shape2ed(self, instance_config, filename, job_id, dataset_uid):
     instance = job.instance
     logging.info("loading bounding shape for {} from = {}".format(instance.name, filename))
     load_bounding_shape(instance.name, instance_config, filename)
+    record_ed_import(dataset_uid)
 
 
 @celery.task(bind=True)
@@ -447,6 +496,22 @@ def reload_data(self, instance_config, job_id):
 @Lock(10*60)
 def ed2nav(self, instance_config, job_id, custom_output_dir):
     """ Launch ed2nav"""
+    launch_ed2nav(instance_config, job_id, custom_output_dir)
+
+
+@celery.task(bind=True)
+@Lock(10*60, max_retries=0)
+def planned_ed2nav(self, instance_config, job_id):
+    """
+    Launch ed2nav for a build of the binarisation plan
+
+    it fails at once if the instance is locked, waiting for the lock would hold the slot of the build and its
+    memory reservation
+    """
+    launch_ed2nav(instance_config, job_id, None)
+
+
+def launch_ed2nav(instance_config, job_id, custom_output_dir):
     job = models.Job.query.get(job_id)
     instance = job.instance
 
@@ -502,6 +567,7 @@ def fare2ed(self, instance_config, filename, job_id, dataset_uid):
         if res != 0:
             #@TODO: exception
             raise ValueError('fare2ed failed')
+        record_ed_import(dataset_uid)
     except:
         logger.exception('')
         job.state = 'failed'
@@ -0,0 +1,273 @@
+# Copyright (c) 2001-2018, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+"""
+Plan the rebuild of the data of all the instances on the binarisation hosts
+
+Each host is a celery queue with a budget: the number of binarisations it can run at the same time
+(cpu) and the memory they can use. The builds are estimated from the history (duration of the last
+ed2nav of the instance, size of its data.nav) and packed on the hosts, longest first.
+
+Each cpu slot of a host has a queue of builds in redis, in the order of the plan. A build is only started
+(by the dispatch_build task) when its host has enough free memory: the memory of the running builds is
+reserved in redis until their end, so the budget is kept even if the real durations are not the estimated
+ones. The builds of a slot are independent, the next one is started at the end of a build, even if it has
+failed. A build doesn't wait for the lock of its instance while holding its slot and its memory: it isn't
+started while the instance is locked, and its ed2nav fails at once if the lock is taken in between.
+
+Only one plan runs at a time, a new plan is refused until all the builds of the current one have ended.
+"""
+from __future__ import absolute_import, print_function, division
+import json
+import logging
+import os
+import time
+from datetime import datetime
+
+from flask import current_app
+
+from navitiacommon import models
+from tyr import redis
+from tyr.helper import load_instance_config
+
+PLAN_KEY = 'tyr.binarisation_plan'
+# the builds still to start on a slot of a host
+SLOT_KEY = 'tyr.binarisation_plan|{host}|{slot}'
+# the memory reserved by the running builds of a host: {job_id: {'memory': ..., 'expire_at': ...}}
+RESERVATIONS_KEY = 'tyr.binarisation_memory|{host}'
+RESERVATIONS_LOCK = 'tyr.lock|binarisation_memory|{host}'
+PLAN_LOCK = 'tyr.lock|binarisation_plan'
+# the lock taken by the tasks updating the data of an instance (see binarisation.Lock)
+INSTANCE_LOCK = 'tyr.lock|{instance}'
+
+
+class PlanInProgress(Exception):
+    pass
+
+
+def estimate_build(instance):
+    """
+    estimate the duration (in seconds) and the memory (in MB) needed to rebuild the data of an instance
+    """
+    config = current_app.config
+    duration = models.Metric.last_duration(instance.id, 'ed2nav')
+    duration = duration.total_seconds() if duration else config['BINARISATION_DEFAULT_DURATION']
+
+    memory = config['BINARISATION_MIN_MEMORY']
+    try:
+        target_file = load_instance_config(instance.name).target_file
+        nav_size = os.path.getsize(target_file) / (1024 * 1024)
+        memory = max(memory, nav_size * config['BINARISATION_MEMORY_FACTOR'])
+    except (ValueError, OSError):
+        logging.getLogger(__name__).debug('no data.nav for {}, using the min memory'.format(instance.name))
+
+    return {'instance': instance.name, 'instance_id': instance.id, 'duration': duration, 'memory': memory}
+
+
+def pack_builds(builds, hosts):
+    """
+    pack the builds on the hosts, longest first
+
+    the builds are started in order as soon as a host has a free slot and enough free memory,
+    a build needing more memory than any host is run alone on the host with the most memory
+
+    return the builds with their host, their slot on this host and their estimated start and end
+    (in seconds from the beginning of the plan)
+    """
+    if not hosts:
+        raise ValueError('no binarisation host')
+    free_slots = {name: list(range(host['cpu'])) for name, host in hosts.items()}
+    free_memory = {name: host['memory'] for name, host in hosts.items()}
+    biggest_host = max(hosts, key=lambda name: hosts[name]['memory'])
+
+    pending = sorted(builds, key=lambda b: (-b['duration'], b['instance']))
+    running = []
+    planned = []
+    now = 0
+    while pending:
+        started = False
+        for build in list(pending):
+            for name in sorted(hosts, key=lambda n: (-free_memory[n], n)):
+                memory = min(build['memory'], hosts[name]['memory']) if name == biggest_host else build['memory']
+                if free_slots[name] and memory <= free_memory[name]:
+                    slot = free_slots[name].pop(0)
+                    free_memory[name] -= memory
+                    planned_build = dict(build, host=name, slot=slot, start=now, end=now + build['duration'])
+                    running.append((planned_build, memory))
+                    planned.append(planned_build)
+                    pending.remove(build)
+                    started = True
+                    break
+        if not pending:
+            break
+        if not running:
+            # should not happen, the biggest host can always run a build when it's empty
+            raise ValueError('impossible to plan {}'.format([b['instance'] for b in pending]))
+        if not started or not any(free_slots.values()):
+            # we wait for the end of the next build to free its resources
+            running.sort(key=lambda r: r[0]['end'])
+            finished, memory = running.pop(0)
+            now = finished['end']
+            free_slots[finished['host']].append(finished['slot'])
+            free_slots[finished['host']].sort()
+            free_memory[finished['host']] += memory
+
+    return planned
+
+
+def free_memory(reservations, host_memory, now):
+    """
+    the memory of the host not reserved by its running builds
+
+    :param reservations: the reservations of the host, as stored in redis
+    :return: the free memory and the ids of the expired reservations (of the builds that never ended)
+    """
+    expired = []
+    reserved = 0
+    for job_id, raw_reservation in reservations.items():
+        reservation = json.loads(raw_reservation)
+        if reservation['expire_at'] < now:
+            expired.append(job_id)
+        else:
+            reserved += reservation['memory']
+    return host_memory - reserved, expired
+
+
+def start_next_build(host, slot, host_memory):
+    """
+    take the next build of a slot if its host has enough free memory for it, the memory is reserved
+
+    a build needing more memory than the host is started when no other build is running on the host
+
+    a build isn't started while its instance is locked (by the import of a dataset...)
+
+    :return: the build (with the memory reserved for it), or None if there isn't any build to start on the
+    slot, and whether the build has been started
+    """
+    with redis.lock(RESERVATIONS_LOCK.format(host=host), timeout=60):
+        raw_build = redis.lindex(SLOT_KEY.format(host=host, slot=slot), 0)
+        if raw_build is None:
+            return None, False
+        build = json.loads(raw_build)
+        if redis.exists(INSTANCE_LOCK.format(instance=build['instance'])):
+            return build, False
+        memory = min(build['memory'], host_memory)
+        reservations_key = RESERVATIONS_KEY.format(host=host)
+        now = time.time()
+        free, expired = free_memory(redis.hgetall(reservations_key), host_memory, now)
+        if expired:
+            logging.getLogger(__name__).warning('memory reservations of the jobs {} on {} expired'
+                                                .format(expired, host))
+            redis.hdel(reservations_key, *expired)
+        if memory > free:
+            return build, False
+        expire_at = now + current_app.config['BINARISATION_RESERVATION_TIMEOUT']
+        redis.hset(reservations_key, build['job_id'], json.dumps({'memory': memory, 'expire_at': expire_at}))
+        redis.lpop(SLOT_KEY.format(host=host, slot=slot))
+        return build, True
+
+
+def release_memory(host, job_id):
+    """
+    release the memory reserved by a build
+    """
+    with redis.lock(RESERVATIONS_LOCK.format(host=host), timeout=60):
+        redis.hdel(RESERVATIONS_KEY.format(host=host), job_id)
+
+
+def is_plan_running(hosts):
+    """
+    a plan is running while builds are waiting in the queue of a slot or running (their memory is reserved)
+    """
+    now = time.time()
+    for host, config in hosts.items():
+        if any(redis.llen(SLOT_KEY.format(host=host, slot=slot)) for slot in range(config['cpu'])):
+            return True
+        free, _ = free_memory(redis.hgetall(RESERVATIONS_KEY.format(host=host)), config['memory'], now)
+        if free < config['memory']:
+            return True
+    return False
+
+
+def launch_plan(instances, hosts):
+    """
+    plan and launch the rebuild of the data of the instances, the plan is stored in redis
+
+    raise PlanInProgress if the builds of the previous plan have not all ended
+    """
+    from tyr.tasks import dispatch_build
+
+    planned = pack_builds([estimate_build(i) for i in instances], hosts)
+
+    with redis.lock(PLAN_LOCK, timeout=60):
+        if is_plan_running(hosts):
+            raise PlanInProgress('the previous binarisation plan is still running')
+
+        slots = set()
+        for build in sorted(planned, key=lambda b: b['start']):
+            job = models.Job()
+            job.instance_id = build['instance_id']
+            job.state = 'pending'
+            models.db.session.add(job)
+            models.db.session.commit()
+            build['job_id'] = job.id
+            redis.rpush(SLOT_KEY.format(host=build['host'], slot=build['slot']), json.dumps(build))
+            slots.add((build['host'], build['slot']))
+
+        plan = {
+            'created_at': datetime.utcnow().strftime('%Y%m%dT%H%M%S'),
+            'estimated_duration': max([b['end'] for b in planned] + [0]),
+            'builds': planned,
+        }
+        redis.set(PLAN_KEY, json.dumps(plan))
+
+    for host, slot in slots:
+        dispatch_build.delay(host, slot, hosts[host]['memory'])
+    logging.getLogger(__name__).info('binarisation plan of {} instances launched on {} hosts, estimated to {}s'
+                                     .format(len(planned), len(hosts), plan['estimated_duration']))
+    return plan
+
+
+def get_plan():
+    """
+    return the last plan with the progress of its builds (the state of their job)
+    """
+    raw_plan = redis.get(PLAN_KEY)
+    if not raw_plan:
+        return None
+    plan = json.loads(raw_plan)
+    job_ids = [b['job_id'] for b in plan['builds']]
+    jobs = {j.id: j for j in models.Job.query.filter(models.Job.id.in_(job_ids))} if job_ids else {}
+    progress = {'pending': 0, 'running': 0, 'done': 0, 'failed': 0}
+    for build in plan['builds']:
+        job = jobs.get(build['job_id'])
+        build['state'] = job.state if job else 'failed'
+        progress[build['state']] = progress.get(build['state'], 0) + 1
+    plan['progress'] = progress
+    return plan
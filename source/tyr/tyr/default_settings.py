@@ -33,6 +33,26 @@ AUOTOCOMPLETE_MAX_BACKUPS_TO_KEEP = 5
 #Max number of dataset to keep per instance and type
 DATASET_MAX_BACKUPS_TO_KEEP = 1
 
+#Hosts used by build_all_data to rebuild the data of all the instances in parallel, a host is a celery queue
+#(consumed by the workers of this host) with a budget: the number of binarisations it can run at the same time
+#and the memory (in MB) they can use. ex: {'build_host_1': {'cpu': 4, 'memory': 16000}}
+#If empty, the instances are rebuilt one after the other on the default queue
+BINARISATION_HOSTS = {}
+#Estimated duration (in s) of the binarisation of an instance without any history
+BINARISATION_DEFAULT_DURATION = 600
+#The memory used by the binarisation of an instance is estimated to this factor times the size of its data.nav
+BINARISATION_MEMORY_FACTOR = 10
+#Min memory (in MB) of the binarisation of an instance
+BINARISATION_MIN_MEMORY = 500
+#A build waiting for free memory on its host is checked again after this delay (in s)
+BINARISATION_DISPATCH_DELAY = 30
+#The memory reserved by a build that never ended (killed worker...) is released after this delay (in s)
+BINARISATION_RESERVATION_TIMEOUT = 6 * 3600
+
+#The files of the source directory with the same content as the last dataset loaded of their family
+#are not imported again (the import_last_dataset command can be used to force it)
+SKIP_UNCHANGED_DATASETS = True
+
 # Period of time to keep job (in days)
 JOB_MAX_PERIOD_TO_KEEP = 60
 
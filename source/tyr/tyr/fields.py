@@ -178,6 +178,7 @@ dataset_field = {
     'type': fields.Raw,
     'name': fields.Raw,
     'family_type': fields.Raw,
+    'fingerprint': fields.Raw,
 }
 
 job_fields = {
@@ -28,6 +28,7 @@
 # https://groups.google.com/d/forum/navitia
 # www.navitia.io
 
+import hashlib
 import logging
 import logging.config
 import uuid
@@ -226,3 +227,21 @@ def save_in_tmp(file_storage):
     tmp_file = os.path.join(tempfile.gettempdir(), file_storage.filename)
     file_storage.save(tmp_file)
     return tmp_file
+
+
+def get_fingerprint(path, chunk_size=1024 * 1024):
+    """
+    return a hash of the content of a file or of all the files of a directory (with their relative paths)
+    """
+    sha = hashlib.sha1()
+    if os.path.isdir(path):
+        files = sorted(os.path.join(root, f) for root, _, names in os.walk(path) for f in names)
+    else:
+        files = [path]
+    for filename in files:
+        if filename != path:
+            sha.update(os.path.relpath(filename, path))
+        with open(filename, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                sha.update(chunk)
+    return sha.hexdigest()
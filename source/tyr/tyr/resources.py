@@ -54,6 +54,7 @@ from functools import wraps
 from tyr.validations import datetime_format
 from tyr.tasks import create_autocomplete_depot, remove_autocomplete_depot, import_autocomplete
 from tyr.helper import get_instance_logger, save_in_tmp
+from tyr.binarisation_scheduler import launch_plan, get_plan, PlanInProgress
 from tyr.fields import *
 
 __ALL__ = ['Api', 'Instance', 'User', 'Key']
@@ -1157,3 +1158,27 @@ class MigrateFromPoiToOsm(flask_restful.Resource):
             return_status = 404
 
         return {'action': return_msg}, return_status
+
+
+class BinarisationPlan(flask_restful.Resource):
+
+    def get(self):
+        """
+        the last plan of the rebuild of all the instances, with the state of each build
+        """
+        plan = get_plan()
+        if not plan:
+            return {'message': 'no binarisation plan'}, 404
+        return plan, 200
+
+    def post(self):
+        """
+        plan and launch the rebuild of all the instances on the binarisation hosts
+        """
+        hosts = current_app.config.get('BINARISATION_HOSTS')
+        if not hosts:
+            return {'error': 'no binarisation host configured'}, 400
+        try:
+            return launch_plan(models.Instance.query_existing().all(), hosts), 200
+        except PlanInProgress as e:
+            return {'error': str(e)}, 409
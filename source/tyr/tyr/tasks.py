@@ -41,10 +41,11 @@ import kombu
 
 from tyr.binarisation import gtfs2ed, osm2ed, ed2nav, fusio2ed, geopal2ed, fare2ed, poi2ed, synonym2ed, \
     shape2ed, load_bounding_shape, bano2mimir, osm2mimir, stops2mimir, ntfs2mimir
-from tyr.binarisation import reload_data, move_to_backupdirectory
+from tyr.binarisation import reload_data, move_to_backupdirectory, record_skipped_metric, planned_ed2nav
 from tyr import celery
 from navitiacommon import models, task_pb2, utils
-from tyr.helper import load_instance_config, get_instance_logger
+from tyr.helper import load_instance_config, get_instance_logger, get_fingerprint
+from tyr.binarisation_scheduler import launch_plan, start_next_build, release_memory, PlanInProgress
 from navitiacommon.launch_exec import launch_exec
 from datetime import datetime, timedelta
 @celery.task()
@@ -58,7 +59,37 @@ def finish_job(job_id):
     models.db.session.commit()
 
 
-def import_data(files, instance, backup_file, async=True, reload=True, custom_output_dir=None):
+# when the data of a family is imported, the data of these families has to be imported again
+# (the pt data can contain fares, the streetnetwork can contain pois)
+DEPENDENT_FAMILIES = {
+    'pt': {'fare'},
+    'streetnetwork': {'poi'},
+}
+
+
+def get_unchanged_datasets(last_imported_datasets, datasets):
+    """
+    return the datasets with the same content as the last dataset imported in ed of their family
+
+    the last imported dataset of a family is not considered if a family it depends on has been imported after it,
+    its data may have been overwritten
+    """
+    last_imported = {d.family_type: d for d in last_imported_datasets}
+    last_fingerprints = {}
+    for family, dataset in last_imported.items():
+        if not any(family in DEPENDENT_FAMILIES.get(f, ()) and d.ed_imported_at > dataset.ed_imported_at
+                   for f, d in last_imported.items()):
+            last_fingerprints[family] = dataset.fingerprint
+    unchanged = [d for d in datasets
+                 if d.fingerprint and last_fingerprints.get(d.family_type) == d.fingerprint]
+    # the import of a family can overwrite the data of its dependent families, they are imported again
+    imported_families = {d.family_type for d in datasets if d not in unchanged}
+    return [d for d in unchanged
+            if not any(d.family_type in DEPENDENT_FAMILIES.get(f, ()) for f in imported_families)]
+
+
+def import_data(files, instance, backup_file, async=True, reload=True, custom_output_dir=None,
+                skip_unchanged=False):
     """
     import the data contains in the list of 'files' in the 'instance'
 
@@ -67,6 +98,9 @@ def import_data(files, instance, backup_file, async=True, reload=True, custom_ou
     :param backup_file: If True the files are moved to a backup directory, else they are not moved
     :param async: If True all jobs are run in background, else the jobs are run in sequence the function will only return when all of them are finish
     :param reload: If True kraken would be reload at the end of the treatment
+    :param skip_unchanged: If True the files with the same content as the last dataset imported in ed of their
+    family are not imported again, and if no file has changed and the data in ed has been built nothing is done
+    (the skips are recorded in the metrics)
 
     run the whole data import process:
 
@@ -91,33 +125,55 @@ def import_data(files, instance, backup_file, async=True, reload=True, custom_ou
         'shape': shape2ed,
     }
 
+    datasets = []
     for _file in files:
-        filename = None
-
         dataset = models.DataSet()
         # NOTE: for the moment we do not use the path to load the data here
         # but we'll need to refactor this to take it into account
         dataset.type, _ = utils.type_of_data(_file)
         dataset.family_type = utils.family_of_data(dataset.type)
-        if dataset.type in task:
-            if backup_file:
-                filename = move_to_backupdirectory(_file,
-                                                   instance_config.backup_directory)
-            else:
-                filename = _file
-            actions.append(task[dataset.type].si(instance_config, filename, dataset_uid=dataset.uid))
-        else:
+        if dataset.type not in task:
             #unknown type, we skip it
             current_app.logger.debug("unknown file type: {} for file {}"
                                      .format(dataset.type, _file))
             continue
+        dataset.fingerprint = get_fingerprint(_file)
+        datasets.append((dataset, _file))
+
+    last_imported_datasets = instance.last_ed_imported_datasets() if skip_unchanged else []
+    unchanged_datasets = get_unchanged_datasets(last_imported_datasets, [d for d, _ in datasets])
+    # the data imported in ed by a job that is not done (its ed2nav or its reload failed) has to be built again
+    is_ed_built = all(d.job.state == 'done' for d in last_imported_datasets)
+
+    for dataset, _file in datasets:
+        if backup_file:
+            filename = move_to_backupdirectory(_file,
+                                               instance_config.backup_directory)
+        else:
+            filename = _file
+        if dataset in unchanged_datasets:
+            current_app.logger.info("{} has not changed since its last import, skipping".format(_file))
+        else:
+            actions.append(task[dataset.type].si(instance_config, filename, dataset_uid=dataset.uid))
 
         #currently the name of a dataset is the path to it
         dataset.name = filename
         models.db.session.add(dataset)
         job.data_sets.append(dataset)
 
-    if actions:
+    nothing_to_build = not actions and (is_ed_built or not unchanged_datasets)
+    if unchanged_datasets:
+        if nothing_to_build:
+            # nothing has changed, there is no need to build and reload the data
+            job.state = 'done'
+        models.db.session.add(job)
+        models.db.session.commit()
+        for dataset in unchanged_datasets:
+            record_skipped_metric('{}2ed'.format(dataset.type), job, dataset)
+        if nothing_to_build:
+            record_skipped_metric('ed2nav', job, None)
+
+    if not nothing_to_build:
         models.db.session.add(job)
         models.db.session.commit()
         # We pass the job id to each tasks, but job need to be commited for having an id
@@ -131,7 +187,7 @@ def import_data(files, instance, backup_file, async=True, reload=True, custom_ou
             actions.append(reload_data.si(instance_config, job.id))
 
         for dataset in job.data_sets:
-            if dataset.family_type == 'pt':
+            if dataset.family_type == 'pt' and dataset not in unchanged_datasets:
                 actions.extend(send_to_mimir(instance, dataset.name))
 
         actions.append(finish_job.si(job.id))
@@ -194,7 +250,8 @@ def update_data():
         instance_config = load_instance_config(instance.name)
         files = glob.glob(instance_config.source_directory + "/*")
         if files:
-            import_data(files, instance, backup_file=True)
+            import_data(files, instance, backup_file=True,
+                        skip_unchanged=current_app.config.get('SKIP_UNCHANGED_DATASETS', True))
 
 
 BANO_REGEXP = re.compile('.*bano.*')
@@ -405,10 +462,55 @@ def reload_kraken(instance_id):
 
 @celery.task()
 def build_all_data():
-    for instance in models.Instance.query_existing().all():
+    instances = models.Instance.query_existing().all()
+    hosts = current_app.config.get('BINARISATION_HOSTS')
+    if hosts:
+        try:
+            launch_plan(instances, hosts)
+        except PlanInProgress:
+            logging.warning('the previous binarisation plan is still running, the data are not rebuilt')
+        return
+    for instance in instances:
         build_data(instance)
 
 
+@celery.task(bind=True, max_retries=None)
+def dispatch_build(self, host, slot, host_memory):
+    """
+    start the next build of a slot of the binarisation plan, it waits until its host has enough free memory
+    """
+    build, started = start_next_build(host, slot, host_memory)
+    if build is None:
+        return
+    if not started:
+        logging.debug('not enough memory on {} for the build of {}, retry later'.format(host, build['instance']))
+        raise self.retry(countdown=current_app.config['BINARISATION_DISPATCH_DELAY'])
+
+    job_id = build['job_id']
+    instance_config = load_instance_config(build['instance'])
+    # the end of the build is called even if it fails, to start the next build of the slot
+    build_task = planned_ed2nav.si(instance_config, job_id).set(queue=host)
+    build_task.link_error(end_build.si(host, slot, host_memory, job_id))
+    finish_task = finish_job.si(job_id).set(queue=host)
+    finish_task.link_error(end_build.si(host, slot, host_memory, job_id))
+    chain(build_task, finish_task, end_build.si(host, slot, host_memory, job_id)).delay()
+    logging.info('build of {} started on {} (slot {})'.format(build['instance'], host, slot))
+
+
+@celery.task()
+def end_build(host, slot, host_memory, job_id):
+    """
+    release the memory of a build and start the next build of its slot
+    """
+    release_memory(host, job_id)
+    job = models.Job.query.get(job_id)
+    if job.state != 'done':
+        # the build has failed without marking its job (the instance was locked...)
+        job.state = 'failed'
+        models.db.session.commit()
+    dispatch_build.delay(host, slot, host_memory)
+
+
 @celery.task()
 def build_data(instance):
     job = models.Job()